@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SociosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.socios'
+
+    def ready(self):
+        """Importa signals cuando la app está lista"""
+        import apps.socios.signals  # noqa
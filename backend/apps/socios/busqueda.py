@@ -0,0 +1,67 @@
+"""
+Búsqueda liviana de socios para selectores (autocompletado).
+
+Devuelve solo id, nombre y documento de los primeros N socios que coinciden,
+priorizando coincidencias por prefijo (cubiertas por los índices sobre
+lower(nombre_completo) y documento; en PostgreSQL un índice trigram cubre las
+parciales). Los resultados se guardan en la caché de Django durante
+`SOCIO_BUSQUEDA_CACHE_SECONDS`; al guardar o borrar un socio se cambia la
+versión de las claves para no servir resultados viejos.
+"""
+from __future__ import annotations
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from .models import Socio
+
+
+VERSION_KEY = "socios:buscar:version"
+CAMPOS = ("id", "nombre_completo", "documento")
+
+
+def _consultar(texto: str, limit: int) -> list[dict]:
+    q = texto.lower()
+    base = Socio.objects.annotate(nombre_l=Lower("nombre_completo")).order_by("nombre_l")
+    if not q:
+        filas = list(base.values_list(*CAMPOS)[:limit])
+    else:
+        filas = list(
+            base.filter(Q(nombre_l__startswith=q) | Q(documento__startswith=texto)).values_list(*CAMPOS)[:limit]
+        )
+        if len(filas) < limit and len(q) >= 2:
+            vistos = [fila[0] for fila in filas]
+            filas += list(
+                base.filter(Q(nombre_l__contains=q) | Q(documento__icontains=q))
+                .exclude(pk__in=vistos)
+                .values_list(*CAMPOS)[: limit - len(filas)]
+            )
+    return [{"id": str(pk), "nombre_completo": nombre, "documento": documento} for pk, nombre, documento in filas]
+
+
+def buscar_socios(q: str, limit: int = 10) -> list[dict]:
+    """Top-N socios cuyo nombre o documento empieza por (o contiene) `q`."""
+    q = (q or "").strip()
+    ttl = getattr(settings, "SOCIO_BUSQUEDA_CACHE_SECONDS", 0)
+    if ttl <= 0:
+        return _consultar(q, limit)
+
+    version = cache.get_or_set(VERSION_KEY, 1, None)
+    clave = f"socios:buscar:{version}:{limit}:{hashlib.sha1(q.encode()).hexdigest()}"
+    resultados = cache.get(clave)
+    if resultados is None:
+        resultados = _consultar(q, limit)
+        cache.set(clave, resultados, ttl)
+    return resultados
+
+
+def invalidar_busqueda_socios() -> None:
+    """Cambia la versión de las búsquedas cacheadas; las anteriores expiran solas."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
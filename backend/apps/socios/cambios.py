@@ -0,0 +1,122 @@
+"""
+Secuencia de cambios por socio para la sincronización incremental de
+"Mis préstamos" (`GET prestamos/mis?since=<token>`).
+
+Cada escritura que altera lo que ve el socio (préstamo, pago, desembolso o
+solicitud) registra una fila en `cambio_socio` dentro de la misma transacción.
+El token que recibe el cliente es `<último id>.<epoch de emisión>`; con él se
+consultan solo los ids modificados desde entonces (índice `socio_id, id`).
+
+- Las filas se purgan pasada la retención (`CAMBIOS_RETENCION_HORAS`); un token
+  más viejo que eso, o ilegible, obliga a una recarga completa.
+- Como los ids se asignan al insertar y no al confirmar, se reenvían también
+  los cambios de los últimos `CAMBIOS_MARGEN_SEGUNDOS` previos al token: un
+  item repetido es inofensivo para el cliente, uno perdido no.
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import CambioSocio
+
+
+PURGA_CADA = 500  # se purga lo vencido cada N cambios registrados
+
+
+def registrar_cambio(socio_id, entidad: str, objeto_id) -> CambioSocio | None:
+    if not socio_id or not objeto_id:
+        return None
+    cambio = CambioSocio.objects.create(socio_id=socio_id, entidad=entidad, objeto_id=str(objeto_id))
+    if cambio.id % PURGA_CADA == 0:
+        purgar_cambios()
+    return cambio
+
+
+def registrar_cambios(cambios: list[tuple]) -> None:
+    """Varios `(socio_id, entidad, objeto_id)` en un solo INSERT (altas con bulk_create)."""
+    filas = [
+        CambioSocio(socio_id=socio_id, entidad=entidad, objeto_id=str(objeto_id))
+        for socio_id, entidad, objeto_id in cambios
+        if socio_id and objeto_id
+    ]
+    if filas:
+        CambioSocio.objects.bulk_create(filas)
+
+
+def purgar_cambios(horas: int | None = None) -> int:
+    """Borra cambios más viejos que la retención configurada; retorna cuántos."""
+    horas = horas if horas is not None else _retencion_horas()
+    limite = timezone.now() - timedelta(hours=horas)
+    borrados, _ = CambioSocio.objects.filter(created_at__lt=limite).delete()
+    return borrados
+
+
+def cambio_reciente(socio_id, segundos: int) -> bool:
+    """
+    True si el socio tiene un cambio registrado en los últimos `segundos`. Se
+    lee siempre de `default`: es lo que decide si sus lecturas usan la réplica.
+    """
+    ultimo = (
+        CambioSocio.objects.using("default")
+        .filter(socio_id=socio_id)
+        .order_by("-id")
+        .values_list("created_at", flat=True)
+        .first()
+    )
+    return ultimo is not None and ultimo >= timezone.now() - timedelta(seconds=segundos)
+
+
+def token_actual(socio_id) -> str:
+    """Token para una respuesta completa; se calcula antes de leer los datos."""
+    ultimo = CambioSocio.objects.filter(socio_id=socio_id).order_by("-id").values_list("id", flat=True).first()
+    return _emitir(ultimo or 0)
+
+
+def cambios_desde(socio_id, token: str) -> tuple[set[str], str] | None:
+    """
+    Ids de préstamos/solicitudes del socio modificados desde `token` y el token
+    nuevo. None si el token no sirve y el cliente debe recargar todo.
+    """
+    leido = _leer_token(token)
+    if leido is None:
+        return None
+    ultimo_id, emitido = leido
+    if time.time() - emitido > _retencion_horas() * 3600:
+        return None
+
+    margen = datetime.fromtimestamp(emitido - _margen_segundos(), tz=dt_timezone.utc)
+    filas = list(
+        CambioSocio.objects.filter(socio_id=socio_id)
+        .filter(Q(id__gt=ultimo_id) | Q(created_at__gte=margen))
+        .values_list("id", "objeto_id")
+    )
+    ids = {objeto_id for _, objeto_id in filas}
+    nuevo_ultimo = max([ultimo_id, *(id_ for id_, _ in filas)])
+    return ids, _emitir(nuevo_ultimo)
+
+
+def _emitir(ultimo_id: int) -> str:
+    return f"{ultimo_id}.{int(time.time())}"
+
+
+def _leer_token(token: str) -> tuple[int, int] | None:
+    try:
+        ultimo, emitido = (int(parte) for parte in str(token).split(".", 1))
+    except (TypeError, ValueError):
+        return None
+    if ultimo < 0 or emitido <= 0:
+        return None
+    return ultimo, emitido
+
+
+def _retencion_horas() -> int:
+    return getattr(settings, "CAMBIOS_RETENCION_HORAS", 720)
+
+
+def _margen_segundos() -> int:
+    return getattr(settings, "CAMBIOS_MARGEN_SEGUNDOS", 10)
@@ -0,0 +1,100 @@
+"""
+Caché en memoria (por proceso) de los catálogos pequeños: tipos de préstamo y
+políticas de aprobación.
+
+Simulación, registro de solicitudes y aprobación consultan el tipo por id en
+cada request contra una tabla de una docena de filas. Aquí se carga el catálogo
+completo una vez y se sirve desde memoria durante `CATALOG_CACHE_SECONDS`
+segundos. Los signals de guardado/borrado lo descartan en el proceso actual; el
+TTL cubre los cambios hechos por otros workers.
+
+Las instancias devueltas son copias: se pueden modificar sin afectar la caché.
+"""
+from __future__ import annotations
+
+import copy
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import connection
+
+from .models import PoliticaAprobacion, TipoPrestamo
+
+
+_cache: dict[tuple[str, str], tuple[float, dict]] = {}
+_lock = threading.Lock()
+
+
+def _ttl() -> int:
+    return getattr(settings, "CATALOG_CACHE_SECONDS", 0)
+
+
+def _normalizar_id(valor) -> uuid.UUID | None:
+    if valor is None or valor == "":
+        return None
+    if isinstance(valor, uuid.UUID):
+        return valor
+    try:
+        return uuid.UUID(str(valor))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _catalogo(model) -> dict[uuid.UUID, object]:
+    """Filas del catálogo indexadas por id, ordenadas como el `ordering` del modelo."""
+    ttl = _ttl()
+    key = (connection.alias, model._meta.label_lower)
+    if ttl > 0:
+        hit = _cache.get(key)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+    filas = {obj.pk: obj for obj in model.objects.all()}
+    if ttl > 0:
+        with _lock:
+            _cache[key] = (time.monotonic() + ttl, filas)
+    return filas
+
+
+def _buscar(model, obj_id, solo_activos: bool):
+    pk = _normalizar_id(obj_id)
+    if pk is None:
+        return None
+    obj = _catalogo(model).get(pk)
+    if obj is None and _ttl() > 0:
+        # Puede haberse creado en otro worker: se lee de la base y se recarga en el próximo acceso
+        obj = model.objects.filter(pk=pk).first()
+        if obj is not None:
+            invalidar_catalogos(model)
+    if obj is None or (solo_activos and not obj.activo):
+        return None
+    return copy.copy(obj)
+
+
+def tipo_prestamo(tipo_id, solo_activos: bool = False) -> TipoPrestamo | None:
+    """Tipo de préstamo por id (UUID o string); None si no existe o está inactivo y se pidió solo activos."""
+    return _buscar(TipoPrestamo, tipo_id, solo_activos)
+
+
+def tipos_prestamo(solo_activos: bool = False) -> list[TipoPrestamo]:
+    return [copy.copy(t) for t in _catalogo(TipoPrestamo).values() if t.activo or not solo_activos]
+
+
+def politica_aprobacion(politica_id, solo_activas: bool = False) -> PoliticaAprobacion | None:
+    return _buscar(PoliticaAprobacion, politica_id, solo_activas)
+
+
+def politicas_aprobacion(solo_activas: bool = True) -> list[PoliticaAprobacion]:
+    return [copy.copy(p) for p in _catalogo(PoliticaAprobacion).values() if p.activo or not solo_activas]
+
+
+def invalidar_catalogos(model=None) -> None:
+    """Descarta el catálogo del modelo indicado (o todos) en este proceso."""
+    with _lock:
+        if model is None:
+            _cache.clear()
+            return
+        label = model._meta.label_lower
+        for key in [k for k in _cache if k[1] == label]:
+            del _cache[key]
@@ -0,0 +1,47 @@
+"""
+Ejecución de consultas independientes en paralelo desde vistas async.
+
+Con la base remota (Supabase) cada consulta es sobre todo espera de red: las
+lecturas que no dependen entre sí (fila de solicitud, préstamo con pagos,
+metadatos de desembolso) se lanzan a la vez, cada una en un hilo con su propia
+conexión, que se devuelve/cierra según CONN_MAX_AGE al terminar.
+
+Dentro de una transacción abierta (p. ej. tests con TestCase) otra conexión no
+vería los datos sin confirmar, así que ahí las tareas corren en secuencia en el
+hilo de la request.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+
+def _en_hilo_propio(tarea: Callable[[], Any]) -> Callable[[], Any]:
+    def ejecutar():
+        try:
+            return tarea()
+        finally:
+            # Los hilos del executor no reciben request_finished: se cierra aquí
+            close_old_connections()
+
+    return ejecutar
+
+
+def _en_transaccion() -> bool:
+    return connection.in_atomic_block
+
+
+async def en_paralelo(*tareas: Callable[[], Any]) -> list:
+    """Ejecuta funciones sync (con acceso a BD) y devuelve sus resultados en orden."""
+    # Las conexiones son por hilo: la transacción se consulta en el hilo de la request
+    if not getattr(settings, "ASYNC_DB_CONCURRENCY", False) or await sync_to_async(_en_transaccion)():
+        return [await sync_to_async(tarea)() for tarea in tareas]
+    return list(
+        await asyncio.gather(
+            *(sync_to_async(_en_hilo_propio(tarea), thread_sensitive=False)() for tarea in tareas)
+        )
+    )
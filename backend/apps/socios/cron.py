@@ -0,0 +1,98 @@
+"""
+Expresiones cron de cinco campos (minuto hora día-del-mes mes día-de-la-semana)
+para el programador de tareas.
+
+Soporta `*`, listas (`1,15`), rangos (`1-5`), pasos (`*/15`, `0-30/10`) y los
+alias `@hourly`, `@daily`, `@weekly`, `@monthly`. Como en cron, si día del mes
+y día de la semana están restringidos basta con que coincida uno de los dos.
+Domingo es 0 (se acepta también 7).
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+
+ALIAS = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+
+# (mínimo, máximo) de cada campo
+RANGOS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+MAX_MINUTOS_BUSQUEDA = 366 * 24 * 60
+
+
+class CronInvalido(ValueError):
+    pass
+
+
+def _campo(texto: str, minimo: int, maximo: int) -> frozenset[int]:
+    valores: set[int] = set()
+    for parte in texto.split(","):
+        rango, _, paso_txt = parte.partition("/")
+        try:
+            paso = int(paso_txt) if paso_txt else 1
+            if rango == "*":
+                inicio, fin = minimo, maximo
+            elif "-" in rango:
+                inicio, fin = (int(v) for v in rango.split("-", 1))
+            else:
+                inicio = int(rango)
+                fin = maximo if paso_txt else inicio
+        except ValueError as exc:
+            raise CronInvalido(f"Campo cron inválido: {texto!r}") from exc
+        if paso <= 0 or inicio < minimo or fin > maximo or inicio > fin:
+            raise CronInvalido(f"Campo cron fuera de rango: {texto!r}")
+        valores.update(range(inicio, fin + 1, paso))
+    return frozenset(valores)
+
+
+class Cron:
+    def __init__(self, expresion: str):
+        self.expresion = expresion.strip()
+        campos = ALIAS.get(self.expresion, self.expresion).split()
+        if len(campos) != 5:
+            raise CronInvalido(f"Se esperaban 5 campos: {expresion!r}")
+        self.minutos, self.horas, self.dias, self.meses, dias_semana = (
+            _campo(texto, *rango) for texto, rango in zip(campos, RANGOS)
+        )
+        self.dias_semana = frozenset(d % 7 for d in dias_semana)
+        self._dia_libre = campos[2] == "*"
+        self._semana_libre = campos[4] == "*"
+
+    def __repr__(self) -> str:
+        return f"Cron({self.expresion!r})"
+
+    def _coincide_dia(self, momento: datetime) -> bool:
+        # isoweekday: lunes=1 … domingo=7 -> domingo=0
+        en_mes = momento.day in self.dias
+        en_semana = momento.isoweekday() % 7 in self.dias_semana
+        if self._dia_libre or self._semana_libre:
+            return en_mes and en_semana
+        return en_mes or en_semana
+
+    def coincide(self, momento: datetime) -> bool:
+        return (
+            momento.minute in self.minutos
+            and momento.hour in self.horas
+            and momento.month in self.meses
+            and self._coincide_dia(momento)
+        )
+
+    def siguiente(self, desde: datetime) -> datetime:
+        """Primer minuto estrictamente posterior a `desde` que cumple la expresión."""
+        momento = desde.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(MAX_MINUTOS_BUSQUEDA):
+            if momento.month not in self.meses or not self._coincide_dia(momento):
+                momento = (momento + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if momento.hour not in self.horas:
+                momento = (momento + timedelta(hours=1)).replace(minute=0)
+                continue
+            if momento.minute in self.minutos:
+                return momento
+            momento += timedelta(minutes=1)
+        raise CronInvalido(f"La expresión {self.expresion!r} no tiene próximas ejecuciones")
@@ -0,0 +1,48 @@
+"""
+Caché corta de la respuesta de estado de solicitud que consulta el chatbot.
+
+El chatbot pide el estado de la misma solicitud en cada mensaje de la
+conversación; la respuesta armada (solicitud, préstamo, pagos, desembolsos y
+cuota) se guarda en la caché de Django durante `ESTADO_CLIENTE_CACHE_SECONDS`.
+La clave es el id de la solicitud (igual al del préstamo) y se guarda junto con
+el socio dueño: una respuesta solo se sirve al mismo socio. Decisiones, pagos y
+desembolsos descartan la entrada para no mostrar un estado viejo.
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _ttl() -> int:
+    return getattr(settings, "ESTADO_CLIENTE_CACHE_SECONDS", 0)
+
+
+def _clave(solicitud_id) -> str:
+    return f"estado-cliente:{solicitud_id}"
+
+
+def respuesta_cacheada(solicitud_id, socio_id) -> dict | None:
+    if _ttl() <= 0:
+        return None
+    hit = cache.get(_clave(solicitud_id))
+    if not hit or hit[0] != str(socio_id):
+        return None
+    return hit[1]
+
+
+def guardar_respuesta(solicitud_id, socio_id, data: dict) -> None:
+    ttl = _ttl()
+    if ttl > 0:
+        cache.set(_clave(solicitud_id), (str(socio_id), data), ttl)
+
+
+def invalidar_estado_cliente(solicitud_id) -> None:
+    if solicitud_id:
+        cache.delete(_clave(solicitud_id))
+
+
+def invalidar_estados_cliente(solicitud_ids) -> None:
+    claves = [_clave(solicitud_id) for solicitud_id in solicitud_ids if solicitud_id]
+    if claves:
+        cache.delete_many(claves)
@@ -0,0 +1,276 @@
+"""
+Simulador de estrés y provisiones de la cartera (Reportes > Estrés).
+
+La cartera abierta se agrupa por producto (`TipoPrestamo`) y tramo de mora; el
+atraso se mide como en `calcular_metricas_prestamo` (días desde el vencimiento
+con saldo pendiente). Cada escenario ajusta la probabilidad de default (PD) por
+tramo, el prepago y la LGD, globalmente o por producto, y se simula con
+`apps/socios/montecarlo.py`.
+
+Las simulaciones se parten en bloques de `ESTRES_SIMULACIONES_POR_BLOQUE` con
+semillas derivadas de una sola `SeedSequence` y, por defecto, corren en el
+mismo proceso (NumPy vectorizado por lotes de simulaciones). Con
+`ESTRES_WORKERS` > 1 (opt-in) los bloques se reparten en un pool de procesos
+único por proceso del servidor, creado al primer uso y acotado por la
+cantidad de CPU (spawn: no hereda conexiones ni hilos del servidor); las
+requests concurrentes comparten ese pool en vez de levantar uno cada una. Con
+la misma semilla el resultado es idéntico con o sin pool.
+
+Resultado por escenario: pérdida esperada (= provisión requerida), percentiles
+95/99 de la pérdida, pérdida inesperada (p99 - esperada) y el detalle por
+producto y tramo.
+"""
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db.models import DecimalField, Sum, Value
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import ValidationError
+
+from . import montecarlo
+from .metricas import TRAMOS_MORA
+from .models import Prestamo
+from .politicas import ESTADOS_EXPOSICION
+
+
+TRAMOS = TRAMOS_MORA
+PD_TRAMO = {"al_dia": 0.03, "1-30": 0.12, "31-60": 0.30, "61-90": 0.55, "90+": 0.85}
+PREPAGO_ANUAL = 0.06
+LGD = 0.45
+CORRELACION = 0.12
+
+ESCENARIOS_PREDEFINIDOS = {
+    "base": {"factor_default": 1.0, "factor_prepago": 1.0, "lgd": LGD},
+    "adverso": {"factor_default": 1.6, "factor_prepago": 0.7, "lgd": 0.55},
+    "severo": {"factor_default": 2.5, "factor_prepago": 0.4, "lgd": 0.65, "correlacion": 0.2},
+}
+
+MAX_ESCENARIOS = 10
+MAX_HORIZONTE_MESES = 60
+SIN_TIPO = "Sin tipo"
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class CarteraEstres:
+    grupo: np.ndarray  # producto * len(TRAMOS) + tramo, por préstamo
+    exposicion: np.ndarray  # saldo pendiente, por préstamo
+    productos: tuple[str, ...]
+
+    def __len__(self) -> int:
+        return len(self.grupo)
+
+
+@dataclass(frozen=True)
+class Escenario:
+    nombre: str
+    pd: np.ndarray
+    prepago: np.ndarray
+    lgd: np.ndarray
+    correlacion: float
+
+
+def cargar_cartera(hoy: date | None = None) -> CarteraEstres:
+    hoy = hoy or date.today()
+    filas = (
+        Prestamo.objects.filter(estado__in=ESTADOS_EXPOSICION)
+        .annotate(
+            pagado=Coalesce(
+                Sum("pagos__monto"),
+                Value(Decimal("0")),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            )
+        )
+        .order_by()
+        .values_list("monto", "pagado", "fecha_vencimiento", "tipo__nombre")
+    )
+    productos: dict[str, int] = {}
+    exposicion, dias, producto = [], [], []
+    for monto, pagado, fecha_vencimiento, tipo_nombre in filas.iterator(chunk_size=5000):
+        saldo = monto - pagado
+        if saldo <= 0:
+            continue
+        exposicion.append(float(saldo))
+        dias.append((hoy - fecha_vencimiento).days if fecha_vencimiento and fecha_vencimiento < hoy else 0)
+        producto.append(productos.setdefault(tipo_nombre or SIN_TIPO, len(productos)))
+    tramo = np.digitize(np.asarray(dias, dtype=np.int64), [inicio for _, inicio in TRAMOS[1:]])
+    return CarteraEstres(
+        grupo=np.asarray(producto, dtype=np.int64) * len(TRAMOS) + tramo,
+        exposicion=np.asarray(exposicion, dtype=np.float64),
+        productos=tuple(productos),
+    )
+
+
+def _tasa(valor, campo: str, maximo: float | None = None) -> float:
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        raise ValidationError({campo: "Debe ser numerico."})
+    if not math.isfinite(numero) or numero < 0 or (maximo is not None and numero > maximo):
+        limite = f" y {maximo}" if maximo is not None else ""
+        raise ValidationError({campo: f"Debe estar entre 0{limite}."})
+    return numero
+
+
+def construir_escenario(datos: dict | str, productos: tuple[str, ...]) -> Escenario:
+    """
+    Un escenario es el nombre de uno predefinido o un dict con `nombre` y
+    opcionalmente `factor_default`, `factor_prepago`, `lgd`, `correlacion`,
+    `pd_tramo` ({tramo: pd anual}) y `productos` ({nombre: {factor_default,
+    factor_prepago, lgd}}).
+    """
+    if isinstance(datos, str):
+        if datos not in ESCENARIOS_PREDEFINIDOS:
+            raise ValidationError({"escenarios": f"Escenario desconocido: {datos}."})
+        datos = {"nombre": datos, **ESCENARIOS_PREDEFINIDOS[datos]}
+    if not isinstance(datos, dict):
+        raise ValidationError({"escenarios": "Cada escenario es un nombre o un objeto."})
+    nombre = str(datos.get("nombre") or "").strip()[:60]
+    if not nombre:
+        raise ValidationError({"escenarios": "Cada escenario necesita nombre."})
+
+    pd_tramo = dict(PD_TRAMO)
+    for tramo, valor in (datos.get("pd_tramo") or {}).items():
+        if tramo not in pd_tramo:
+            raise ValidationError({"pd_tramo": f"Tramo desconocido: {tramo}."})
+        pd_tramo[tramo] = _tasa(valor, "pd_tramo", 1)
+    base_pd = np.array([pd_tramo[tramo] for tramo, _ in TRAMOS])
+
+    factor_default = _tasa(datos.get("factor_default", 1), "factor_default")
+    factor_prepago = _tasa(datos.get("factor_prepago", 1), "factor_prepago")
+    lgd = _tasa(datos.get("lgd", LGD), "lgd", 1)
+    correlacion = _tasa(datos.get("correlacion", CORRELACION), "correlacion", 0.99)
+    por_producto = datos.get("productos") or {}
+    if not isinstance(por_producto, dict):
+        raise ValidationError({"productos": "Usa un objeto {producto: ajustes}."})
+
+    pd, prepago, lgds = [], [], []
+    for producto in productos:
+        ajuste = por_producto.get(producto) or {}
+        f_default = _tasa(ajuste.get("factor_default", factor_default), "factor_default")
+        f_prepago = _tasa(ajuste.get("factor_prepago", factor_prepago), "factor_prepago")
+        lgd_producto = _tasa(ajuste.get("lgd", lgd), "lgd", 1)
+        pd.append(np.minimum(base_pd * f_default, 0.999))
+        prepago.append(np.full(len(TRAMOS), min(PREPAGO_ANUAL * f_prepago, 0.999)))
+        lgds.append(np.full(len(TRAMOS), lgd_producto))
+    vacio = np.zeros(0)
+    return Escenario(
+        nombre=nombre,
+        pd=np.concatenate(pd) if pd else vacio,
+        prepago=np.concatenate(prepago) if prepago else vacio,
+        lgd=np.concatenate(lgds) if lgds else vacio,
+        correlacion=correlacion,
+    )
+
+
+def _workers() -> int:
+    return max(1, min(getattr(settings, "ESTRES_WORKERS", 1) or 1, os.cpu_count() or 1))
+
+
+def _pool_procesos(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def cerrar_pool() -> None:
+    """Apaga el pool de procesos (si se creó); el próximo uso levanta otro."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool, _pool_workers = None, 0
+
+
+def _bloques(escenarios: list[Escenario], simulaciones: int, meses: int, semilla: int) -> list[tuple]:
+    por_bloque = max(1, getattr(settings, "ESTRES_SIMULACIONES_POR_BLOQUE", 100))
+    tamanos = [por_bloque] * (simulaciones // por_bloque)
+    if simulaciones % por_bloque:
+        tamanos.append(simulaciones % por_bloque)
+    semillas = np.random.SeedSequence(semilla).spawn(len(escenarios) * len(tamanos))
+    tareas = []
+    for i, escenario in enumerate(escenarios):
+        for j, tamano in enumerate(tamanos):
+            tareas.append(
+                (i, escenario.pd, escenario.prepago, escenario.lgd, escenario.correlacion, meses, tamano, semillas[i * len(tamanos) + j])
+            )
+    return tareas
+
+
+def simular(
+    cartera: CarteraEstres,
+    escenarios: list[Escenario],
+    simulaciones: int,
+    meses: int = 12,
+    semilla: int = 0,
+) -> list[dict]:
+    tareas = _bloques(escenarios, simulaciones, meses, semilla)
+    workers = min(_workers(), len(tareas))
+    if workers > 1 and len(cartera):
+        # Una llamada por proceso con su parte de los bloques: la cartera se envía `workers` veces
+        partes = [tareas[i::workers] for i in range(workers)]
+        pool = _pool_procesos(_workers())
+        bloques = [
+            bloque
+            for parte in pool.map(montecarlo.correr_bloques, [cartera.grupo] * workers, [cartera.exposicion] * workers, partes)
+            for bloque in parte
+        ]
+    else:
+        bloques = montecarlo.correr_bloques(cartera.grupo, cartera.exposicion, tareas)
+
+    grupos = len(cartera.productos) * len(TRAMOS)
+    exposicion_grupo = np.bincount(cartera.grupo, weights=cartera.exposicion, minlength=grupos)
+    prestamos_grupo = np.bincount(cartera.grupo, minlength=grupos)
+    resultados = []
+    for i, escenario in enumerate(escenarios):
+        propios = [bloque for indice, bloque in bloques if indice == i]
+        perdidas = np.concatenate([b["perdidas"] for b in propios])
+        perdidas_grupo = sum(b["perdidas_grupo"] for b in propios) / simulaciones
+        prepago_grupo = sum(b["prepago_grupo"] for b in propios) / simulaciones
+        esperada = float(perdidas.mean())
+        p99 = float(np.percentile(perdidas, 99))
+        detalle = []
+        for g in np.flatnonzero(prestamos_grupo):
+            producto, tramo = divmod(int(g), len(TRAMOS))
+            detalle.append({
+                "producto": cartera.productos[producto],
+                "tramo": TRAMOS[tramo][0],
+                "prestamos": int(prestamos_grupo[g]),
+                "exposicion": _dinero(exposicion_grupo[g]),
+                "pd": round(float(escenario.pd[g]), 4),
+                "perdida_esperada": _dinero(perdidas_grupo[g]),
+                "prepago_esperado": _dinero(prepago_grupo[g]),
+            })
+        resultados.append({
+            "escenario": escenario.nombre,
+            "perdida_esperada": _dinero(esperada),
+            "provision_requerida": _dinero(esperada),
+            "perdida_p95": _dinero(np.percentile(perdidas, 95)),
+            "perdida_p99": _dinero(p99),
+            "perdida_inesperada": _dinero(max(p99 - esperada, 0.0)),
+            "prepago_esperado": _dinero(prepago_grupo.sum()),
+            "detalle": detalle,
+        })
+    return resultados
+
+
+def _dinero(valor) -> Decimal:
+    return Decimal(str(round(float(valor), 2))).quantize(Decimal("0.01"))
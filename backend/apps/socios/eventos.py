@@ -0,0 +1,208 @@
+"""
+Eventos de las colas de trabajo (solicitudes nuevas, decisiones y desembolsos)
+para los paneles de analista y tesorería.
+
+Los eventos se guardan en `evento_cola` dentro de la misma transacción que el
+cambio que los origina; el id autoincremental sirve como `Last-Event-ID` del
+stream SSE. El id se asigna al INSERT y no al commit: un evento de una
+transacción más larga (decisión en lote, desembolso) puede confirmarse después
+de otro con id mayor ya entregado. Por eso, además de `id > último`, se releen
+los eventos creados en los últimos `EVENTOS_MARGEN_SEGUNDOS` (como
+`cambios.cambios_desde`); el stream descarta los que ya envió y el cliente
+deduplica por id los que se repiten al reconectar. Un evento cuya transacción
+tarde más que el margen en confirmarse sí puede perderse.
+
+Para despertar a los streams abiertos:
+
+- en el mismo proceso se avisa al broker al confirmar la transacción;
+- en PostgreSQL se hace `pg_notify` y un hilo por proceso escucha el canal
+  (LISTEN), así los eventos de otros workers también llegan al instante;
+- en SQLite, o si LISTEN no está disponible (pooler en modo transacción), los
+  streams consultan la tabla cada `EVENTOS_POLL_SECONDS`.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import EventoCola
+
+
+logger = logging.getLogger(__name__)
+
+CANAL = "coop_eventos"
+PURGA_CADA = 500  # se purga lo vencido cada N eventos publicados
+
+
+class _Broker:
+    """Despierta a los streams SSE del proceso cuando hay eventos nuevos."""
+
+    def __init__(self):
+        self._esperando: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self._lock = threading.Lock()
+        self._listener: threading.Thread | None = None
+
+    def notificar(self) -> None:
+        with self._lock:
+            esperando = list(self._esperando)
+        for loop, evento in esperando:
+            try:
+                loop.call_soon_threadsafe(evento.set)
+            except RuntimeError:
+                # El loop del stream ya se cerró
+                pass
+
+    async def esperar(self, timeout: float) -> bool:
+        """Espera un aviso hasta `timeout` segundos; True si llegó alguno."""
+        self._asegurar_listener()
+        item = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._esperando.add(item)
+        try:
+            await asyncio.wait_for(item[1].wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._esperando.discard(item)
+
+    def _asegurar_listener(self) -> None:
+        if self._listener is not None or not _usa_listen():
+            return
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._escuchar, name="eventos-listen", daemon=True)
+                self._listener.start()
+
+    def _escuchar(self) -> None:
+        while True:
+            raw = None
+            try:
+                # Conexión propia fuera del pool: queda tomada mientras escucha
+                wrapper = connections["default"]
+                raw = wrapper.Database.connect(**wrapper.get_connection_params())
+                raw.autocommit = True
+                with raw.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CANAL}")
+                self._bucle_notificaciones(raw)
+            except Exception:
+                logger.warning("LISTEN %s interrumpido; reintentando", CANAL, exc_info=True)
+                time.sleep(5)
+            finally:
+                try:
+                    if raw is not None:
+                        raw.close()
+                except Exception:
+                    pass
+
+    def _bucle_notificaciones(self, raw) -> None:
+        if hasattr(raw, "notifies") and callable(raw.notifies):
+            # psycopg 3
+            while True:
+                for _ in raw.notifies(timeout=30, stop_after=1):
+                    self.notificar()
+        # psycopg2
+        while True:
+            if select.select([raw], [], [], 30) == ([], [], []):
+                continue
+            raw.poll()
+            if raw.notifies:
+                raw.notifies.clear()
+                self.notificar()
+
+
+broker = _Broker()
+
+
+def _usa_listen() -> bool:
+    return connection.vendor == "postgresql" and getattr(settings, "EVENTOS_PG_LISTEN", False)
+
+
+def publicar_evento(tipo: str, payload: dict | None = None) -> EventoCola:
+    """
+    Registra un evento de cola. Si hay una transacción abierta el evento (y el
+    aviso a los streams) solo se hace visible al confirmarla.
+    """
+    evento = EventoCola.objects.create(tipo=tipo, payload=payload or {})
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CANAL, str(evento.id)])
+    transaction.on_commit(broker.notificar)
+    if evento.id % PURGA_CADA == 0:
+        purgar_eventos()
+    return evento
+
+
+def publicar_eventos(tipo: str, payloads: list[dict]) -> list[EventoCola]:
+    """Como `publicar_evento` para varios eventos: un INSERT y un solo aviso."""
+    if not payloads:
+        return []
+    eventos = EventoCola.objects.bulk_create([EventoCola(tipo=tipo, payload=payload) for payload in payloads])
+    ultimo_id = max((evento.id or 0) for evento in eventos)
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CANAL, str(ultimo_id)])
+    transaction.on_commit(broker.notificar)
+    if ultimo_id // PURGA_CADA != (ultimo_id - len(eventos)) // PURGA_CADA:
+        purgar_eventos()
+    return eventos
+
+
+def purgar_eventos(horas: int | None = None) -> int:
+    """Borra eventos más viejos que la retención configurada; retorna cuántos."""
+    horas = horas if horas is not None else getattr(settings, "EVENTOS_RETENCION_HORAS", 72)
+    limite = timezone.now() - timedelta(hours=horas)
+    borrados, _ = EventoCola.objects.filter(created_at__lt=limite).delete()
+    return borrados
+
+
+def ultimo_evento_id() -> int:
+    ultimo = EventoCola.objects.order_by("-id").values_list("id", flat=True).first()
+    return ultimo or 0
+
+
+def margen() -> timedelta:
+    return timedelta(seconds=getattr(settings, "EVENTOS_MARGEN_SEGUNDOS", 30))
+
+
+def recientes(hasta_id: int, desde: datetime) -> dict[int, datetime]:
+    """Eventos ya visibles con id <= `hasta_id` creados desde `desde`: lo que un cliente nuevo no debe recibir."""
+    return dict(EventoCola.objects.filter(id__lte=hasta_id, created_at__gte=desde).values_list("id", "created_at"))
+
+
+def eventos_desde(
+    ultimo_id: int,
+    tipos: set[str] | None = None,
+    limit: int = 200,
+    desde: datetime | None = None,
+    excluir=(),
+) -> list[dict]:
+    """
+    Eventos con id > `ultimo_id` y, con `desde`, también los de id menor
+    creados desde entonces (confirmados tarde); `excluir` son ids ya enviados.
+    """
+    filtro = Q(id__gt=ultimo_id)
+    if desde is not None:
+        filtro |= Q(created_at__gte=desde)
+    qs = EventoCola.objects.filter(filtro).order_by("id")
+    if excluir:
+        qs = qs.exclude(id__in=list(excluir))
+    if tipos:
+        qs = qs.filter(tipo__in=tipos)
+    return list(qs.values("id", "tipo", "payload", "created_at")[:limit])
+
+
+def formato_sse(evento: dict) -> str:
+    data = {**evento["payload"], "created_at": evento["created_at"].isoformat()}
+    return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,137 @@
+"""
+Exportaciones de reportes en segundo plano.
+
+Cuando un reporte supera `REPORTES_PDF_MAX_FILAS_SINCRONO` la vista guarda una
+`ExportacionReporte` pendiente con sus filtros y responde 202; la tarea
+periódica `procesar_exportaciones` (run_scheduler, cada minuto) la genera y el
+usuario la descarga desde `/api/reportes/exportaciones/<id>/?descargar=1`.
+
+El programador corre en su propio proceso (servicio `coop-scheduler`), sin disco
+compartido con el servicio web: el archivo generado se guarda en la misma fila
+(`contenido`) y solo se marca lista cuando está completo. Las filas viejas se
+borran en `purgar_bitacoras`.
+
+El reclamo es una transacción corta en `default` (FOR UPDATE SKIP LOCKED +
+`iniciada_at`); el reporte se lee después, fuera de esa transacción y desde la
+réplica (`leer_desde_replica`), así un reporte grande no es una lectura larga
+en la primaria con una fila bloqueada.
+"""
+from __future__ import annotations
+
+import io
+import logging
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.db_router import leer_desde_replica
+
+from .models import ExportacionReporte
+
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {ExportacionReporte.Formatos.PDF: "application/pdf"}
+
+
+def _generador(formato: str):
+    from . import reporte_pdf
+
+    return {ExportacionReporte.Formatos.PDF: reporte_pdf.generar}[formato]
+
+
+def encolar(usuario, formato: str, parametros: dict) -> ExportacionReporte:
+    return ExportacionReporte.objects.create(
+        solicitada_por=usuario if getattr(usuario, "pk", None) else None,
+        formato=formato,
+        parametros=parametros,
+    )
+
+
+def como_dict(exportacion: ExportacionReporte) -> dict:
+    return {
+        "id": str(exportacion.id),
+        "formato": exportacion.formato,
+        "estado": exportacion.estado,
+        "filas": exportacion.filas,
+        "error": exportacion.error or None,
+        "created_at": exportacion.created_at,
+        "terminada_at": exportacion.terminada_at,
+        "url": f"/api/reportes/exportaciones/{exportacion.id}/",
+    }
+
+
+def _reclamar() -> ExportacionReporte | None:
+    """Toma la pendiente más vieja sin reclamo vigente y la marca; la transacción termina al volver."""
+    ahora = timezone.now()
+    lease = timedelta(seconds=getattr(settings, "EXPORTACIONES_LEASE_SECONDS", 1800))
+    with transaction.atomic():
+        qs = (
+            ExportacionReporte.objects.filter(estado=ExportacionReporte.Estados.PENDIENTE)
+            .filter(Q(iniciada_at__isnull=True) | Q(iniciada_at__lt=ahora - lease))
+            .defer("contenido")
+            .order_by("created_at")
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            qs = qs.select_for_update(skip_locked=True)
+        exportacion = qs.first()
+        if exportacion is not None:
+            ExportacionReporte.objects.filter(pk=exportacion.pk).update(iniciada_at=ahora)
+            exportacion.iniciada_at = ahora
+    return exportacion
+
+
+def procesar(exportacion: ExportacionReporte) -> ExportacionReporte:
+    """Genera el archivo y deja la exportación lista o fallida (no propaga el error)."""
+    try:
+        # Lecturas a la réplica. Si quien llama está dentro de una transacción,
+        # un savepoint evita que un error de base la invalide antes de marcar
+        # la exportación fallida; fuera de una, no se abre ninguna en `default`
+        savepoint = transaction.atomic() if connection.in_atomic_block else nullcontext()
+        with leer_desde_replica(), savepoint:
+            destino = io.BytesIO()
+            exportacion.filas = _generador(exportacion.formato)(exportacion.parametros, destino)
+        exportacion.contenido = destino.getvalue()
+        exportacion.archivo = (
+            f"reporte_{exportacion.created_at:%Y%m%d_%H%M%S}_{exportacion.id.hex[:8]}.{exportacion.formato}"
+        )
+        exportacion.estado = ExportacionReporte.Estados.LISTA
+        exportacion.error = ""
+    except Exception as exc:
+        logger.exception("Exportación %s falló", exportacion.id)
+        exportacion.contenido = None
+        exportacion.estado = ExportacionReporte.Estados.FALLIDA
+        exportacion.error = str(exc)[:2000]
+    exportacion.terminada_at = timezone.now()
+    exportacion.save(update_fields=["estado", "filas", "archivo", "contenido", "error", "terminada_at"])
+    return exportacion
+
+
+def procesar_pendientes(limite: int | None = None) -> dict[str, int]:
+    """
+    Procesa hasta `limite` exportaciones pendientes, una a una: reclamo corto,
+    generación sin transacción abierta en `default` y guardado del resultado.
+    """
+    limite = limite or getattr(settings, "EXPORTACIONES_LOTE", 5)
+    conteo = {"listas": 0, "fallidas": 0}
+    for _ in range(limite):
+        exportacion = _reclamar()
+        if exportacion is None:
+            break
+        procesar(exportacion)
+        conteo["listas" if exportacion.estado == ExportacionReporte.Estados.LISTA else "fallidas"] += 1
+    return conteo
+
+
+def purgar_exportaciones(horas: int | None = None) -> int:
+    """Borra exportaciones terminadas más viejas que la retención."""
+    horas = horas if horas is not None else getattr(settings, "EXPORTACIONES_RETENCION_HORAS", 48)
+    viejas = ExportacionReporte.objects.filter(created_at__lt=timezone.now() - timedelta(hours=horas)).exclude(
+        estado=ExportacionReporte.Estados.PENDIENTE
+    )
+    borradas, _ = viejas.delete()
+    return borradas
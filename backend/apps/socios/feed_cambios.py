@@ -0,0 +1,164 @@
+"""
+Feed de cambios para el data warehouse (`GET /api/cambios/feed/` y
+`manage.py exportar_cambios`).
+
+Por entidad (socio, prestamo, pago, desembolso, solicitud) entrega las filas
+insertadas o modificadas desde un cursor, ordenadas por `(marca, id)`. La marca
+es `updated_at` o, en tablas sin esa columna (pago, desembolso), `created_at`.
+El cursor es base64 url-safe de `{"e": entidad, "m": marca, "i": id}` de la
+última fila entregada: retomar con él no repite ni salta filas (paginación por
+keyset sobre los índices de la migración 0018).
+
+- Solo se entregan filas con marca anterior a `FEED_CAMBIOS_MARGEN_SEGUNDOS`:
+  una transacción en curso puede confirmar una marca algo vieja cuando el
+  cursor ya la pasó. Por lo mismo el feed lee siempre de `default`, no de la
+  réplica atrasada.
+- `op` es `insert` si la fila se creó después de la marca del cursor y
+  `update` si no (sin cursor, todo es `insert`). Pagos y desembolsos no se
+  editan: solo generan inserts. Cada item trae la fila completa, así que el
+  consumidor puede aplicar todo como upsert por id.
+- Los borrados no se emiten.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import Desembolso, Pago, Prestamo, Socio
+from .schema import get_table_columns
+
+
+FUENTES = {
+    "socio": (Socio, "updated_at"),
+    "prestamo": (Prestamo, "updated_at"),
+    "pago": (Pago, "created_at"),
+    "desembolso": (Desembolso, "created_at"),
+}
+ENTIDADES = (*FUENTES, "solicitud")
+
+
+@dataclass
+class Pagina:
+    entidad: str
+    cursor: str | None
+    items: list[dict] = field(default_factory=list)
+    hay_mas: bool = False
+
+
+def _fecha(valor) -> datetime:
+    # La tabla solicitud no es del ORM: en SQLite sus fechas llegan como texto
+    if isinstance(valor, str):
+        valor = datetime.fromisoformat(valor)
+    return valor if timezone.is_aware(valor) else timezone.make_aware(valor, dt_timezone.utc)
+
+
+def codificar_cursor(entidad: str, marca: datetime, ultimo_id=None) -> str:
+    crudo = json.dumps({"e": entidad, "m": marca.isoformat(), "i": ultimo_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip("=")
+
+
+def leer_cursor(entidad: str, cursor: str) -> tuple[datetime, object]:
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        datos = json.loads(crudo)
+        marca = datetime.fromisoformat(datos["m"])
+        ultimo_id = datos["i"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValidationError({"cursor": "Cursor invalido."})
+    if datos.get("e") != entidad:
+        raise ValidationError({"cursor": f"El cursor no corresponde a la entidad {entidad}."})
+    return marca, ultimo_id
+
+
+def _tope(ahora: datetime | None) -> datetime:
+    return (ahora or timezone.now()) - timedelta(seconds=getattr(settings, "FEED_CAMBIOS_MARGEN_SEGUNDOS", 30))
+
+
+def _filas_orm(entidad: str, desde, ultimo_id, tope, limite: int) -> tuple[str, list[dict]]:
+    modelo, marca = FUENTES[entidad]
+    campos = [f.attname for f in modelo._meta.concrete_fields]
+    qs = modelo.objects.filter(**{f"{marca}__lte": tope}).order_by(marca, "pk").values(*campos)
+    if desde is not None and ultimo_id is not None:
+        qs = qs.filter(Q(**{f"{marca}__gt": desde}) | Q(**{marca: desde, "pk__gt": ultimo_id}))
+    elif desde is not None:
+        qs = qs.filter(**{f"{marca}__gte": desde})
+    return marca, list(qs[:limite])
+
+
+def _filas_solicitud(desde, ultimo_id, tope, limite: int) -> tuple[str | None, list[dict]]:
+    columnas = sorted(get_table_columns("solicitud"))
+    marca = next((c for c in ("updated_at", "created_at") if c in columnas), None)
+    if marca is None or "id" not in columnas:
+        return None, []
+    condiciones = [f"{marca} <= %s"]
+    params: list = [tope]
+    if desde is not None and ultimo_id is not None:
+        condiciones.append(f"({marca} > %s OR ({marca} = %s AND id > %s))")
+        params += [desde, desde, ultimo_id]
+    elif desde is not None:
+        condiciones.append(f"{marca} >= %s")
+        params.append(desde)
+    table_name = "solicitud" if connection.vendor != "postgresql" else "public.solicitud"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {', '.join(columnas)} FROM {table_name} WHERE {' AND '.join(condiciones)} "
+            f"ORDER BY {marca}, id LIMIT %s",
+            [*params, limite],
+        )
+        filas = [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+    for fila in filas:
+        for clave in ("id", "socio_id"):
+            if fila.get(clave) is not None:
+                fila[clave] = str(fila[clave])
+    return marca, filas
+
+
+def pagina(entidad: str, cursor: str | None = None, desde: datetime | None = None, limite: int | None = None,
+           ahora: datetime | None = None) -> Pagina:
+    """
+    Siguiente página de cambios de `entidad`. Sin `cursor` empieza en `desde`
+    (o desde el principio). El cursor devuelto se usa para la página siguiente
+    y se repite tal cual si no hubo cambios.
+    """
+    if entidad not in ENTIDADES:
+        raise ValidationError({"entidad": f"Usa una de: {', '.join(ENTIDADES)}."})
+    limite = limite or getattr(settings, "FEED_CAMBIOS_LIMITE", 1000)
+    ultimo_id = None
+    if cursor:
+        desde, ultimo_id = leer_cursor(entidad, cursor)
+    tope = _tope(ahora)
+
+    if entidad == "solicitud":
+        marca, filas = _filas_solicitud(desde, ultimo_id, tope, limite + 1)
+    else:
+        marca, filas = _filas_orm(entidad, desde, ultimo_id, tope, limite + 1)
+
+    resultado = Pagina(entidad=entidad, cursor=cursor, hay_mas=len(filas) > limite)
+    filas = filas[:limite]
+    for fila in filas:
+        creada = fila.get("created_at")
+        insert = desde is None or marca == "created_at" or creada is None or _fecha(creada) > _fecha(desde)
+        resultado.items.append({
+            "op": "insert" if insert else "update",
+            "id": fila["id"],
+            "marca": _fecha(fila[marca]),
+            "datos": fila,
+        })
+    if filas:
+        ultima = filas[-1]
+        # La marca va tal cual se leyó: en SQLite la tabla solicitud compara texto
+        marca_cursor = ultima[marca] if not isinstance(ultima[marca], str) else datetime.fromisoformat(ultima[marca])
+        ultimo_id = ultima["id"] if isinstance(ultima["id"], int) else str(ultima["id"])
+        resultado.cursor = codificar_cursor(entidad, marca_cursor, ultimo_id)
+    elif cursor is None and desde is not None:
+        resultado.cursor = codificar_cursor(entidad, desde)
+    return resultado
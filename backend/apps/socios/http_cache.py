@@ -0,0 +1,109 @@
+"""
+GET condicional (ETag / Last-Modified) para catálogos que casi no cambian
+(tipos de préstamo y políticas de aprobación).
+
+La versión de un catálogo se obtiene con una sola consulta agregada
+(cantidad de filas + max(updated_at)). Si el cliente ya tiene esa versión se
+responde 304 sin serializar; si no, se reutiliza el payload serializado que
+quedó en memoria para esa versión. Los signals de guardado/borrado limpian la
+caché del proceso; la versión en la base cubre los cambios hechos por otros
+workers.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+
+MAX_PAYLOADS = 256
+
+_payloads: OrderedDict[tuple[str, str], tuple[str, object]] = OrderedDict()
+_lock = threading.Lock()
+
+
+def version_catalogo(model) -> tuple[int, object]:
+    """Cantidad de filas y última modificación del catálogo (una consulta)."""
+    agg = model.objects.aggregate(total=Count("pk"), ultima=Max("updated_at"))
+    return agg["total"], agg["ultima"]
+
+
+def _etag(label: str, variante: str, total: int, ultima) -> str:
+    marca = ultima.isoformat() if ultima else ""
+    digest = hashlib.sha1(f"{label}|{variante}|{total}|{marca}".encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def _no_modificado(request, etag: str, ultima) -> bool:
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return "*" in etags or etag in etags or f"W/{etag}" in etags
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+    if if_modified_since and ultima:
+        return int(ultima.timestamp()) <= if_modified_since
+    return False
+
+
+def _con_cabeceras(response: Response, etag: str, ultima) -> Response:
+    response["ETag"] = etag
+    if ultima:
+        response["Last-Modified"] = http_date(ultima.timestamp())
+    max_age = getattr(settings, "CATALOG_HTTP_MAX_AGE", 0)
+    # Respuestas autenticadas: solo el navegador puede guardarlas (no CDN/Vercel)
+    if max_age > 0:
+        patch_cache_control(response, private=True, max_age=max_age, stale_while_revalidate=max_age * 5)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ("Cookie", "Authorization", "X-API-Key"))
+    return response
+
+
+def respuesta_catalogo(request, model, construir: Callable[[], object], variante: str = "") -> Response:
+    """
+    Responde un GET de catálogo con soporte de GET condicional.
+    `variante` distingue filtros o recursos puntuales dentro del mismo catálogo.
+    `construir` puede devolver un Response (p. ej. 404) que se entrega sin cachear.
+    """
+    label = model._meta.label_lower
+    total, ultima = version_catalogo(model)
+    etag = _etag(label, variante, total, ultima)
+
+    if _no_modificado(request, etag, ultima):
+        return _con_cabeceras(Response(status=status.HTTP_304_NOT_MODIFIED), etag, ultima)
+
+    clave = (label, variante)
+    cached = _payloads.get(clave)
+    if cached and cached[0] == etag:
+        data = cached[1]
+    else:
+        data = construir()
+        if isinstance(data, Response):
+            return data
+        with _lock:
+            _payloads[clave] = (etag, data)
+            _payloads.move_to_end(clave)
+            while len(_payloads) > MAX_PAYLOADS:
+                _payloads.popitem(last=False)
+
+    return _con_cabeceras(Response(data), etag, ultima)
+
+
+def variante_desde_query(request, *params: str) -> str:
+    """Clave estable a partir de los query params que afectan el listado."""
+    return "&".join(f"{p}={(request.query_params.get(p) or '').strip()}" for p in params)
+
+
+def invalidar_catalogo(model) -> None:
+    label = model._meta.label_lower
+    with _lock:
+        for clave in [c for c in _payloads if c[0] == label]:
+            del _payloads[clave]
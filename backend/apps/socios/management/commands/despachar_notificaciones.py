@@ -0,0 +1,74 @@
+"""
+Despachador de la bandeja de salida de notificaciones (proceso aparte del web).
+
+Uso:
+    python manage.py despachar_notificaciones              # bucle continuo
+    python manage.py despachar_notificaciones --una-vez    # un lote y termina (cron)
+
+Ver apps/socios/notificaciones.py para transportes, reintentos y límite de envío.
+"""
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.socios import notificaciones
+
+
+PURGA_CADA_SEGUNDOS = 3600
+
+
+class Command(BaseCommand):
+    help = 'Envía las notificaciones pendientes de la bandeja de salida'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true', help='Procesa un lote y termina')
+        parser.add_argument('--lote', type=int, default=None, help='Notificaciones por lote (default NOTIFY_LOTE)')
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=None,
+            help='Segundos de espera cuando no hay pendientes (default NOTIFY_POLL_SECONDS)',
+        )
+
+    def handle(self, *args, **options):
+        transporte = notificaciones.obtener_transporte()
+        limitador = notificaciones.Limitador(getattr(settings, 'NOTIFY_RATE_PER_SECOND', 2))
+        intervalo = options['intervalo'] if options['intervalo'] is not None else getattr(settings, 'NOTIFY_POLL_SECONDS', 5)
+
+        if options['una_vez']:
+            self._reportar(notificaciones.despachar_lote(transporte, options['lote'], limitador))
+            return
+
+        self._detener = False
+        signal.signal(signal.SIGTERM, self._pedir_detencion)
+        signal.signal(signal.SIGINT, self._pedir_detencion)
+        self.stdout.write(f'Despachando notificaciones con {type(transporte).__name__}')
+
+        ultima_purga = 0.0
+        while not self._detener:
+            close_old_connections()
+            if time.monotonic() - ultima_purga > PURGA_CADA_SEGUNDOS:
+                notificaciones.purgar_notificaciones()
+                ultima_purga = time.monotonic()
+            try:
+                conteo = notificaciones.despachar_lote(transporte, options['lote'], limitador)
+            except Exception as exc:
+                # Base caída o reiniciándose: se reintenta en el próximo ciclo
+                self.stderr.write(f'Error al despachar: {exc}')
+                conteo = None
+            if conteo and any(conteo.values()):
+                self._reportar(conteo)
+            else:
+                time.sleep(intervalo)
+        close_old_connections()
+
+    def _pedir_detencion(self, signum, frame):
+        self._detener = True
+
+    def _reportar(self, conteo: dict) -> None:
+        self.stdout.write(
+            f"Enviadas: {conteo['enviadas']} · Reintentos: {conteo['reintentos']} · Fallidas: {conteo['fallidas']}"
+        )
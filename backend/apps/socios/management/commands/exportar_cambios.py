@@ -0,0 +1,91 @@
+"""
+Exporta a JSONL los cambios desde la última corrida, para la carga nocturna
+del data warehouse.
+
+Uso:
+    python manage.py exportar_cambios --directorio /data/cambios
+    python manage.py exportar_cambios --directorio /data/cambios --entidades socio,pago
+    python manage.py exportar_cambios --directorio /data/cambios --desde 2026-01-01T00:00:00
+
+Por entidad escribe `<entidad>_<AAAAMMDD_HHMMSS>.jsonl` (un item del feed por
+línea, ver apps/socios/feed_cambios.py) y guarda el cursor en `estado.json`
+del mismo directorio, solo después de que el archivo quedó completo: si la
+corrida se corta, la siguiente retoma desde el último archivo terminado.
+"""
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from apps.socios import feed_cambios
+
+
+class Command(BaseCommand):
+    help = 'Exporta a JSONL las filas insertadas o modificadas desde la última corrida'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--directorio', required=True, help='Carpeta de los archivos JSONL y del estado')
+        parser.add_argument(
+            '--entidades',
+            default=','.join(feed_cambios.ENTIDADES),
+            help=f"Entidades separadas por coma (default {','.join(feed_cambios.ENTIDADES)})",
+        )
+        parser.add_argument('--desde', help='Fecha ISO de inicio para entidades sin cursor guardado')
+        parser.add_argument('--lote', type=int, default=None, help='Filas por consulta (default FEED_CAMBIOS_LIMITE)')
+
+    def handle(self, *args, **options):
+        directorio = Path(options['directorio'])
+        directorio.mkdir(parents=True, exist_ok=True)
+        entidades = [e.strip().lower() for e in options['entidades'].split(',') if e.strip()]
+        desconocidas = set(entidades) - set(feed_cambios.ENTIDADES)
+        if desconocidas:
+            raise CommandError(f"Entidades desconocidas: {', '.join(sorted(desconocidas))}")
+        desde = None
+        if options['desde']:
+            try:
+                desde = datetime.fromisoformat(options['desde'])
+            except ValueError:
+                raise CommandError('--desde debe tener formato ISO AAAA-MM-DDTHH:MM:SS')
+            if timezone.is_naive(desde):
+                desde = timezone.make_aware(desde)
+
+        ruta_estado = directorio / 'estado.json'
+        estado = json.loads(ruta_estado.read_text()) if ruta_estado.exists() else {}
+        sello = timezone.localtime().strftime('%Y%m%d_%H%M%S')
+        # Mismo tope para todas las páginas de la corrida
+        ahora = timezone.now()
+
+        for entidad in entidades:
+            destino = directorio / f'{entidad}_{sello}.jsonl'
+            temporal = destino.with_suffix('.jsonl.parcial')
+            cursor = estado.get(entidad)
+            filas = 0
+            with temporal.open('w', encoding='utf-8') as archivo:
+                while True:
+                    pagina = feed_cambios.pagina(
+                        entidad, cursor=cursor, desde=None if cursor else desde, limite=options['lote'], ahora=ahora
+                    )
+                    for item in pagina.items:
+                        archivo.write(json.dumps(item, cls=DjangoJSONEncoder, ensure_ascii=False))
+                        archivo.write('\n')
+                    filas += len(pagina.items)
+                    cursor = pagina.cursor
+                    if not pagina.hay_mas:
+                        break
+            if filas:
+                os.replace(temporal, destino)
+            else:
+                temporal.unlink()
+            if cursor:
+                estado[entidad] = cursor
+                self._guardar_estado(ruta_estado, estado)
+            self.stdout.write(f"{entidad}: {filas} cambios" + (f" -> {destino.name}" if filas else ""))
+
+    def _guardar_estado(self, ruta: Path, estado: dict) -> None:
+        temporal = ruta.with_suffix('.json.parcial')
+        temporal.write_text(json.dumps(estado, indent=2, sort_keys=True))
+        os.replace(temporal, ruta)
@@ -0,0 +1,79 @@
+"""
+Comando de arranque/release: aplica migraciones solo si hay alguna pendiente.
+
+Uso:
+    python manage.py migrar_si_pendiente
+    python manage.py migrar_si_pendiente --check   # sale con error si hay pendientes, sin aplicar nada
+
+Cuando la base está al día hace una sola consulta (`django_migrations`) y
+termina. Si hay pendientes, corre el marcado de tablas preexistentes
+(scripts/mark_existing_tables_as_fake.py, solo PostgreSQL) y luego
+`migrate --fake-initial`, con `migrate` normal como respaldo.
+"""
+import runpy
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.migrations.loader import MigrationLoader
+
+
+SCRIPT_FAKE = Path(settings.BASE_DIR) / "scripts" / "mark_existing_tables_as_fake.py"
+
+
+class Command(BaseCommand):
+    help = 'Aplica migraciones solo si hay pendientes (una consulta cuando la base está al día)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Alias de la base a migrar (default: default)',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Solo verificar: termina con error si hay migraciones pendientes',
+        )
+
+    def handle(self, *args, **options):
+        database = options['database']
+        connection = connections[database]
+
+        # Las migraciones en disco se leen sin tocar la base
+        en_disco = set(MigrationLoader(None, ignore_no_migrations=True).graph.nodes)
+        aplicadas = self._aplicadas(connection)
+        pendientes = sorted(en_disco - aplicadas) if aplicadas is not None else sorted(en_disco)
+
+        if not pendientes:
+            self.stdout.write(self.style.SUCCESS(f'Migraciones al día ({len(en_disco)}); nada que hacer.'))
+            return
+
+        nombres = ', '.join(f'{app}.{name}' for app, name in pendientes)
+        if options['check']:
+            raise CommandError(f'Migraciones pendientes: {nombres}')
+        self.stdout.write(f'Migraciones pendientes: {nombres}')
+
+        if connection.vendor == 'postgresql' and SCRIPT_FAKE.exists():
+            try:
+                runpy.run_path(str(SCRIPT_FAKE), run_name='__main__')
+            except Exception as exc:
+                self.stderr.write(f'No se pudieron marcar tablas existentes: {exc}')
+
+        verbosity = options['verbosity']
+        try:
+            call_command('migrate', database=database, fake_initial=True, interactive=False, verbosity=verbosity)
+        except Exception as exc:
+            self.stderr.write(f'migrate --fake-initial falló ({exc}); reintentando sin --fake-initial')
+            call_command('migrate', database=database, interactive=False, verbosity=verbosity)
+
+    def _aplicadas(self, connection) -> set[tuple[str, str]] | None:
+        """(app, nombre) registrados en django_migrations; None si la tabla no existe."""
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT app, name FROM django_migrations')
+                return {(app, name) for app, name in cursor.fetchall()}
+        except DatabaseError:
+            return None
@@ -0,0 +1,91 @@
+"""
+Programador de tareas periódicas (mora, conciliación de saldos, purgas).
+
+Uso:
+    python manage.py run_scheduler                       # bucle continuo
+    python manage.py run_scheduler --una-vez             # corre lo vencido y termina (cron externo)
+    python manage.py run_scheduler --tarea marcar_mora   # ejecuta ya una tarea, esté vencida o no
+    python manage.py run_scheduler --listar              # tareas, próximo horario y duraciones
+
+Se pueden levantar varias instancias: en PostgreSQL cada tarea corre en una
+sola a la vez (ver apps/socios/programador.py).
+"""
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from apps.socios import programador
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta las tareas periódicas registradas según su cron'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true', help='Corre las tareas vencidas y termina')
+        parser.add_argument('--tarea', help='Ejecuta ahora la tarea indicada y termina')
+        parser.add_argument('--listar', action='store_true', help='Lista tareas con su historial y termina')
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=None,
+            help='Segundos entre revisiones (default SCHEDULER_TICK_SECONDS)',
+        )
+
+    def handle(self, *args, **options):
+        if options['listar']:
+            self._listar()
+            return
+        if options['tarea']:
+            if options['tarea'] not in programador.registradas():
+                raise CommandError(f"Tarea desconocida: {options['tarea']}")
+            ejecucion = programador.ejecutar(options['tarea'], forzar=True)
+            if ejecucion is None:
+                raise CommandError('La tarea está corriendo en otra instancia')
+            self._reportar(ejecucion)
+            return
+        if options['una_vez']:
+            for ejecucion in programador.ejecutar_pendientes():
+                self._reportar(ejecucion)
+            return
+
+        intervalo = options['intervalo'] or getattr(settings, 'SCHEDULER_TICK_SECONDS', 30)
+        self._detener = False
+        signal.signal(signal.SIGTERM, self._pedir_detencion)
+        signal.signal(signal.SIGINT, self._pedir_detencion)
+        self.stdout.write(f"Programador activo: {', '.join(sorted(programador.registradas()))}")
+        while not self._detener:
+            close_old_connections()
+            try:
+                for ejecucion in programador.ejecutar_pendientes():
+                    self._reportar(ejecucion)
+            except Exception as exc:
+                # Base caída o reiniciándose: se reintenta en la próxima vuelta
+                self.stderr.write(f'Error en el programador: {exc}')
+            fin = time.monotonic() + intervalo
+            while not self._detener and time.monotonic() < fin:
+                time.sleep(min(1.0, fin - time.monotonic()))
+        close_old_connections()
+
+    def _pedir_detencion(self, signum, frame):
+        self._detener = True
+
+    def _reportar(self, ejecucion) -> None:
+        estilo = self.style.SUCCESS if ejecucion.estado == 'ok' else self.style.ERROR
+        self.stdout.write(estilo(f'{ejecucion.tarea_id}: {ejecucion.estado} en {ejecucion.duracion_ms} ms {ejecucion.resultado}'))
+
+    def _listar(self) -> None:
+        tareas = programador.registradas()
+        for nombre, fila in sorted(programador.sincronizar_registro().items()):
+            stats = programador.estadisticas(nombre)
+            estado = 'activa' if fila.activa else 'inactiva'
+            proxima = f'{fila.proxima_ejecucion:%Y-%m-%d %H:%M}' if fila.proxima_ejecucion else '-'
+            self.stdout.write(
+                f"{nombre} [{fila.cron}] {estado} · próxima: {proxima} · "
+                f"ejecuciones: {stats['ejecuciones']} (errores {stats['errores']}) · "
+                f"p50 {stats['p50_ms']} ms · p95 {stats['p95_ms']} ms · máx {stats['max_ms']} ms"
+            )
+            if tareas[nombre].descripcion:
+                self.stdout.write(f'    {tareas[nombre].descripcion}')
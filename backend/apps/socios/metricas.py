@@ -0,0 +1,84 @@
+"""
+Métricas derivadas de un préstamo (cuota, pagado, saldo y mora).
+
+Se calculan en una sola pasada sobre los pagos para que serializers, vistas y
+exportaciones no vuelvan a sumar los mismos pagos varias veces por préstamo.
+"""
+from __future__ import annotations
+
+import math
+from datetime import date
+from decimal import Decimal
+from typing import Iterable
+
+from rest_framework.exceptions import ValidationError
+
+
+# Tramos de atraso (nombre, primer día del tramo) para reportes de mora y estrés
+TRAMOS_MORA = (("al_dia", 0), ("1-30", 1), ("31-60", 31), ("61-90", 61), ("90+", 91))
+
+
+def calcular_cuota_mensual(monto: Decimal, tasa_anual: Decimal, plazo_meses: int) -> Decimal:
+    """Cuota fija (sistema frances) sin generar la tabla completa."""
+    if plazo_meses <= 0:
+        raise ValidationError({'plazo_meses': 'El plazo en meses debe ser mayor a 0.'})
+
+    tasa_mensual = (Decimal(tasa_anual) / Decimal('100')) / Decimal('12')
+    if tasa_mensual > 0:
+        factor = (Decimal('1') + tasa_mensual) ** (-plazo_meses)
+        cuota = monto * tasa_mensual / (Decimal('1') - factor)
+    else:
+        cuota = monto / Decimal(plazo_meses)
+    return cuota.quantize(Decimal('0.01'))
+
+
+def calcular_metricas_prestamo(
+    monto: Decimal,
+    fecha_vencimiento: date | None,
+    pagos: Iterable,
+    hoy: date | None = None,
+) -> dict:
+    """Devuelve total pagado, saldo y métricas de mora recorriendo los pagos una vez."""
+    total_pagado = Decimal('0')
+    cantidad_pagos = 0
+    for pago in pagos:
+        total_pagado += pago.monto
+        cantidad_pagos += 1
+
+    saldo = monto - total_pagado
+    if saldo < Decimal('0'):
+        saldo = Decimal('0')
+
+    dias_en_mora = 0
+    if fecha_vencimiento and saldo > Decimal('0'):
+        hoy = hoy or date.today()
+        if fecha_vencimiento < hoy:
+            dias_en_mora = (hoy - fecha_vencimiento).days
+
+    return {
+        'total_pagado': total_pagado,
+        'saldo_pendiente': saldo,
+        'dias_en_mora': dias_en_mora,
+        'monto_en_mora': saldo if dias_en_mora > 0 else Decimal('0'),
+        'cuotas_vencidas': max(1, math.ceil(dias_en_mora / 30)) if dias_en_mora > 0 else 0,
+        'pagos_registrados': cantidad_pagos,
+    }
+
+
+def precalcular_metricas(prestamo, pagos_filtrados: list | None = None, hoy: date | None = None) -> None:
+    """
+    Adjunta al préstamo las métricas de sus pagos filtrados (`_metricas`) y de todos
+    sus pagos (`_metricas_totales`). Si no hay filtro se reutiliza el mismo cálculo.
+    """
+    hoy = hoy or date.today()
+    pagos = list(prestamo.pagos.all())
+    totales = calcular_metricas_prestamo(prestamo.monto, prestamo.fecha_vencimiento, pagos, hoy)
+    if pagos_filtrados is None:
+        prestamo._pagos_filtrados = pagos
+        prestamo._metricas = totales
+    else:
+        prestamo._pagos_filtrados = pagos_filtrados
+        prestamo._metricas = calcular_metricas_prestamo(
+            prestamo.monto, prestamo.fecha_vencimiento, pagos_filtrados, hoy
+        )
+    prestamo._metricas_totales = totales
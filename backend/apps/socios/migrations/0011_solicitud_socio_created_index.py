@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+def create_solicitud_socio_index(apps, schema_editor):
+    """
+    Index the socio lookups on solicitud ("mis prestamos", chatbot).
+    The table is not managed by Django, so only act when it already exists.
+    """
+    connection = schema_editor.connection
+    if 'solicitud' not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS solicitud_socio_created_idx "
+            "ON solicitud (socio_id, created_at DESC)"
+        )
+
+
+def drop_solicitud_socio_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP INDEX IF EXISTS solicitud_socio_created_idx")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("socios", "0010_cleanup_desembolso_metodo_column"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_solicitud_socio_index, drop_solicitud_socio_index),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+
+def create_socio_search_indexes(apps, schema_editor):
+    """
+    Index the socio typeahead: prefix search on lower(nombre_completo) and
+    documento. On PostgreSQL a pg_trgm GIN index also covers substring matches;
+    the extension is optional, so a failure there leaves only the btree indexes.
+    """
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor != "postgresql":
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS socio_nombre_lower_idx ON socio (lower(nombre_completo))"
+            )
+            return
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS socio_nombre_lower_idx "
+            "ON socio (lower(nombre_completo) text_pattern_ops)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS socio_documento_prefix_idx "
+            "ON socio (documento text_pattern_ops)"
+        )
+        cursor.execute("SAVEPOINT socio_trgm")
+        try:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS socio_nombre_trgm_idx "
+                "ON socio USING gin (lower(nombre_completo) gin_trgm_ops)"
+            )
+        except Exception:
+            cursor.execute("ROLLBACK TO SAVEPOINT socio_trgm")
+        else:
+            cursor.execute("RELEASE SAVEPOINT socio_trgm")
+
+
+def drop_socio_search_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for name in ("socio_nombre_trgm_idx", "socio_documento_prefix_idx", "socio_nombre_lower_idx"):
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("socios", "0011_solicitud_socio_created_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_socio_search_indexes, drop_socio_search_indexes),
+    ]
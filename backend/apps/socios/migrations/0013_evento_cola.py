@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('socios', '0012_socio_busqueda_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoCola',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('solicitud_creada', 'Solicitud creada'), ('solicitud_decidida', 'Solicitud decidida'), ('desembolso_registrado', 'Desembolso registrado')], max_length=40)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Evento de cola',
+                'verbose_name_plural': 'Eventos de cola',
+                'db_table': 'evento_cola',
+                'ordering': ['id'],
+            },
+        ),
+    ]
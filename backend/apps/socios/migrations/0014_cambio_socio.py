@@ -0,0 +1,28 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('socios', '0013_evento_cola'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CambioSocio',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('socio_id', models.UUIDField()),
+                ('entidad', models.CharField(choices=[('prestamo', 'Préstamo'), ('solicitud', 'Solicitud')], max_length=20)),
+                ('objeto_id', models.CharField(max_length=36)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Cambio de socio',
+                'verbose_name_plural': 'Cambios de socio',
+                'db_table': 'cambio_socio',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['socio_id', 'id'], name='cambio_socio_socio_id_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('socios', '0015_notificacion_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TareaProgramada',
+            fields=[
+                ('nombre', models.CharField(max_length=80, primary_key=True, serialize=False)),
+                ('cron', models.CharField(max_length=100)),
+                ('activa', models.BooleanField(default=True)),
+                ('proxima_ejecucion', models.DateTimeField(blank=True, null=True)),
+                ('ultima_ejecucion', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Tarea programada',
+                'verbose_name_plural': 'Tareas programadas',
+                'db_table': 'tarea_programada',
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EjecucionTarea',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('estado', models.CharField(choices=[('ok', 'Correcta'), ('error', 'Con error')], max_length=10)),
+                ('inicio', models.DateTimeField()),
+                ('duracion_ms', models.PositiveIntegerField(default=0)),
+                ('resultado', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True, default='')),
+                ('host', models.CharField(blank=True, default='', max_length=120)),
+                ('tarea', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ejecuciones', to='socios.tareaprogramada')),
+            ],
+            options={
+                'verbose_name': 'Ejecución de tarea',
+                'verbose_name_plural': 'Ejecuciones de tareas',
+                'db_table': 'ejecucion_tarea',
+                'ordering': ['-inicio'],
+                'indexes': [models.Index(fields=['tarea', '-inicio'], name='ejecucion_tarea_inicio_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+
+INDICES = (
+    ("socio_feed_idx", "socio", "updated_at"),
+    ("prestamo_feed_idx", "prestamo", "updated_at"),
+    ("pago_feed_idx", "pago", "created_at"),
+    ("desembolso_feed_idx", "desembolso", "created_at"),
+)
+
+
+def create_feed_indexes(apps, schema_editor):
+    """
+    Keyset indexes for the warehouse change feed: (marca, id) per table.
+    solicitud is not managed by Django, so it is only indexed when it exists,
+    on updated_at if the deployment has that column and created_at otherwise.
+    """
+    connection = schema_editor.connection
+    tablas = set(connection.introspection.table_names())
+    indices = [indice for indice in INDICES if indice[1] in tablas]
+    if "solicitud" in tablas:
+        with connection.cursor() as cursor:
+            columnas = {c.name for c in connection.introspection.get_table_description(cursor, "solicitud")}
+        marca = next((c for c in ("updated_at", "created_at") if c in columnas), None)
+        if marca and "id" in columnas:
+            indices.append(("solicitud_feed_idx", "solicitud", marca))
+    with connection.cursor() as cursor:
+        for nombre, tabla, marca in indices:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} ({marca}, id)")
+
+
+def drop_feed_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for nombre in ("solicitud_feed_idx", *(nombre for nombre, _, _ in INDICES)):
+            cursor.execute(f"DROP INDEX IF EXISTS {nombre}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("socios", "0017_exportacion_reporte"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_feed_indexes, drop_feed_indexes),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('socios', '0018_feed_cambios_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportacionreporte',
+            name='contenido',
+            field=models.BinaryField(blank=True, editable=False, null=True),
+        ),
+    ]
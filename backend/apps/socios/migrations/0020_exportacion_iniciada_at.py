@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('socios', '0019_exportacion_contenido'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportacionreporte',
+            name='iniciada_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
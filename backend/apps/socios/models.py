@@ -4,6 +4,7 @@ from decimal import Decimal
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 
 User = get_user_model()
@@ -201,3 +202,192 @@ class Desembolso(models.Model):
 
     def __str__(self) -> str:
         return f"Desembolso {self.id} - {self.metodo_pago} - {self.monto}"
+
+
+class EventoCola(models.Model):
+    """Eventos de las colas de analistas y tesorería que se empujan por SSE."""
+
+    class Tipos(models.TextChoices):
+        SOLICITUD_CREADA = 'solicitud_creada', 'Solicitud creada'
+        SOLICITUD_DECIDIDA = 'solicitud_decidida', 'Solicitud decidida'
+        DESEMBOLSO_REGISTRADO = 'desembolso_registrado', 'Desembolso registrado'
+
+    id = models.BigAutoField(primary_key=True)
+    tipo = models.CharField(max_length=40, choices=Tipos.choices)
+    payload = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+        db_table = 'evento_cola'
+        verbose_name = 'Evento de cola'
+        verbose_name_plural = 'Eventos de cola'
+
+    def __str__(self) -> str:
+        return f"{self.tipo} #{self.id}"
+
+
+class CambioSocio(models.Model):
+    """
+    Bitácora de cambios visibles en "Mis préstamos". El id autoincremental es
+    la secuencia con la que el cliente pide solo lo modificado (`?since=`).
+    """
+
+    class Entidades(models.TextChoices):
+        PRESTAMO = 'prestamo', 'Préstamo'
+        SOLICITUD = 'solicitud', 'Solicitud'
+
+    id = models.BigAutoField(primary_key=True)
+    # Sin FK: los cambios se registran también al borrar el socio en cascada
+    socio_id = models.UUIDField()
+    entidad = models.CharField(max_length=20, choices=Entidades.choices)
+    objeto_id = models.CharField(max_length=36)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+        db_table = 'cambio_socio'
+        verbose_name = 'Cambio de socio'
+        verbose_name_plural = 'Cambios de socio'
+        indexes = [
+            models.Index(fields=['socio_id', 'id'], name='cambio_socio_socio_id_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.entidad} {self.objeto_id} #{self.id}"
+
+
+class Notificacion(models.Model):
+    """
+    Bandeja de salida de correos. Se escribe en la misma transacción que la
+    decisión, el pago o el desembolso; el envío lo hace `despachar_notificaciones`.
+    """
+
+    class Tipos(models.TextChoices):
+        SOLICITUD_DECIDIDA = 'solicitud_decidida', 'Solicitud decidida'
+        PAGO_REGISTRADO = 'pago_registrado', 'Pago registrado'
+        DESEMBOLSO_REGISTRADO = 'desembolso_registrado', 'Desembolso registrado'
+
+    class Estados(models.TextChoices):
+        PENDIENTE = 'pendiente', 'Pendiente'
+        ENVIADA = 'enviada', 'Enviada'
+        FALLIDA = 'fallida', 'Fallida'
+
+    id = models.BigAutoField(primary_key=True)
+    tipo = models.CharField(max_length=40, choices=Tipos.choices)
+    destinatario = models.EmailField()
+    asunto = models.CharField(max_length=200)
+    cuerpo = models.TextField()
+    estado = models.CharField(max_length=20, choices=Estados.choices, default=Estados.PENDIENTE)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    proximo_intento = models.DateTimeField(default=timezone.now)
+    ultimo_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    enviada_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        db_table = 'notificacion_outbox'
+        verbose_name = 'Notificación'
+        verbose_name_plural = 'Notificaciones'
+        indexes = [
+            models.Index(fields=['estado', 'proximo_intento'], name='notif_estado_proximo_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.tipo} → {self.destinatario} ({self.estado})"
+
+
+class TareaProgramada(models.Model):
+    """
+    Registro en base de las tareas periódicas que corre `run_scheduler`. Las
+    tareas se declaran en código (apps/socios/tareas.py); aquí se guarda su
+    cron vigente (editable sin desplegar), si está activa y cuándo toca.
+    """
+
+    nombre = models.CharField(max_length=80, primary_key=True)
+    cron = models.CharField(max_length=100)
+    activa = models.BooleanField(default=True)
+    proxima_ejecucion = models.DateTimeField(null=True, blank=True)
+    ultima_ejecucion = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['nombre']
+        db_table = 'tarea_programada'
+        verbose_name = 'Tarea programada'
+        verbose_name_plural = 'Tareas programadas'
+
+    def __str__(self) -> str:
+        return f"{self.nombre} ({self.cron})"
+
+
+class EjecucionTarea(models.Model):
+    """Historial de ejecuciones de tareas programadas, con duración y resultado."""
+
+    class Estados(models.TextChoices):
+        OK = 'ok', 'Correcta'
+        ERROR = 'error', 'Con error'
+
+    id = models.BigAutoField(primary_key=True)
+    tarea = models.ForeignKey(TareaProgramada, on_delete=models.CASCADE, related_name='ejecuciones')
+    estado = models.CharField(max_length=10, choices=Estados.choices)
+    inicio = models.DateTimeField()
+    duracion_ms = models.PositiveIntegerField(default=0)
+    resultado = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True, default='')
+    host = models.CharField(max_length=120, blank=True, default='')
+
+    class Meta:
+        ordering = ['-inicio']
+        db_table = 'ejecucion_tarea'
+        verbose_name = 'Ejecución de tarea'
+        verbose_name_plural = 'Ejecuciones de tareas'
+        indexes = [
+            models.Index(fields=['tarea', '-inicio'], name='ejecucion_tarea_inicio_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.tarea_id} {self.inicio:%Y-%m-%d %H:%M} ({self.estado})"
+
+
+class ExportacionReporte(models.Model):
+    """
+    Exportación de reporte generada en segundo plano por la tarea
+    `procesar_exportaciones` cuando es demasiado grande para la respuesta HTTP.
+    """
+
+    class Formatos(models.TextChoices):
+        PDF = 'pdf', 'PDF'
+
+    class Estados(models.TextChoices):
+        PENDIENTE = 'pendiente', 'Pendiente'
+        LISTA = 'lista', 'Lista'
+        FALLIDA = 'fallida', 'Fallida'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    solicitada_por = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='exportaciones')
+    formato = models.CharField(max_length=10, choices=Formatos.choices)
+    parametros = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(max_length=20, choices=Estados.choices, default=Estados.PENDIENTE)
+    filas = models.PositiveIntegerField(default=0)
+    archivo = models.CharField(max_length=255, blank=True)
+    # El archivo va en la fila: el programador y el servicio web no comparten disco
+    contenido = models.BinaryField(null=True, blank=True, editable=False)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Marca del reclamo: otra instancia no la toma hasta que venza EXPORTACIONES_LEASE_SECONDS
+    iniciada_at = models.DateTimeField(null=True, blank=True)
+    terminada_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        db_table = 'exportacion_reporte'
+        verbose_name = 'Exportación de reporte'
+        verbose_name_plural = 'Exportaciones de reporte'
+        indexes = [
+            models.Index(fields=['estado', 'created_at'], name='export_estado_created_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"Exportación {self.formato} {self.id} ({self.estado})"
@@ -0,0 +1,268 @@
+"""
+Notificaciones por correo con bandeja de salida (outbox).
+
+Las vistas no envían nada: agregan filas a `notificacion_outbox` dentro de la
+misma transacción que la decisión, el pago o el desembolso, así el aviso existe
+si y solo si el cambio se confirmó y la request no espera al proveedor.
+
+`python manage.py despachar_notificaciones` (proceso aparte) toma lotes de
+pendientes, los reclama por `NOTIFY_LEASE_SECONDS` para que dos despachadores
+no envíen lo mismo, respeta `NOTIFY_RATE_PER_SECOND` y reintenta con backoff
+exponencial hasta `NOTIFY_MAX_INTENTOS`.
+
+El transporte se elige con `NOTIFY_TRANSPORT`: `resend` (API HTTP de Resend),
+`consola`, `archivo` (una línea JSON por correo en `NOTIFY_ARCHIVO`) o la ruta
+de una clase propia con método `enviar(notificacion)`.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import random
+import time
+import urllib.error
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Notificacion
+
+
+logger = logging.getLogger(__name__)
+
+RESEND_URL = "https://api.resend.com/emails"
+
+ESTADOS_DECISION = {
+    "aprobado": "fue aprobada",
+    "rechazado": "fue rechazada",
+}
+
+
+class ErrorTransporte(Exception):
+    """Falla de envío que vale la pena reintentar."""
+
+
+class ErrorPermanente(ErrorTransporte):
+    """Falla que no se arregla reintentando (destinatario o payload inválido)."""
+
+
+# Avisos --------------------------------------------------------------------
+
+def aviso_decision(email: str | None, solicitud_id, estado: str) -> Notificacion | None:
+    if not email:
+        return None
+    resultado = ESTADOS_DECISION.get(estado, f"cambió a estado {estado}")
+    return Notificacion(
+        tipo=Notificacion.Tipos.SOLICITUD_DECIDIDA,
+        destinatario=email,
+        asunto=f"Tu solicitud de préstamo {resultado}",
+        cuerpo=f"Tu solicitud {solicitud_id} {resultado}. Puedes revisar el detalle en Mis préstamos.",
+    )
+
+
+def aviso_pago(email: str | None, prestamo_id, monto: str, saldo: str) -> Notificacion | None:
+    if not email:
+        return None
+    return Notificacion(
+        tipo=Notificacion.Tipos.PAGO_REGISTRADO,
+        destinatario=email,
+        asunto="Registramos tu pago",
+        cuerpo=f"Recibimos un pago de {monto} para el préstamo {prestamo_id}. Saldo pendiente: {saldo}.",
+    )
+
+
+def aviso_desembolso(email: str | None, prestamo_id, monto: str) -> Notificacion | None:
+    if not email:
+        return None
+    return Notificacion(
+        tipo=Notificacion.Tipos.DESEMBOLSO_REGISTRADO,
+        destinatario=email,
+        asunto="Tu préstamo fue desembolsado",
+        cuerpo=f"Se desembolsaron {monto} del préstamo {prestamo_id}.",
+    )
+
+
+def encolar(*avisos: Notificacion | None) -> list[Notificacion]:
+    """Guarda los avisos en la transacción actual (un solo INSERT)."""
+    filas = [aviso for aviso in avisos if aviso is not None]
+    if not filas:
+        return []
+    return Notificacion.objects.bulk_create(filas)
+
+
+# Transportes ---------------------------------------------------------------
+
+class ConsolaTransporte:
+    def enviar(self, notificacion: Notificacion) -> None:
+        logger.info("Correo a %s: %s\n%s", notificacion.destinatario, notificacion.asunto, notificacion.cuerpo)
+
+
+class ArchivoTransporte:
+    """Agrega cada correo como una línea JSON; sirve para desarrollo y pruebas."""
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta or getattr(settings, "NOTIFY_ARCHIVO", "notificaciones.jsonl")
+
+    def enviar(self, notificacion: Notificacion) -> None:
+        linea = {
+            "id": notificacion.id,
+            "tipo": notificacion.tipo,
+            "to": notificacion.destinatario,
+            "subject": notificacion.asunto,
+            "text": notificacion.cuerpo,
+        }
+        with open(self.ruta, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(linea, ensure_ascii=False) + "\n")
+
+
+class ResendTransporte:
+    def __init__(self, api_key: str | None = None, remitente: str | None = None, timeout: float = 10):
+        self.api_key = api_key or settings.RESEND_API_KEY
+        self.remitente = remitente or settings.NOTIFY_FROM
+        self.timeout = timeout
+
+    def enviar(self, notificacion: Notificacion) -> None:
+        if not self.api_key:
+            raise ErrorPermanente("RESEND_API_KEY no configurada")
+        body = json.dumps(
+            {
+                "from": self.remitente,
+                "to": [notificacion.destinatario],
+                "subject": notificacion.asunto,
+                "text": notificacion.cuerpo,
+            }
+        ).encode()
+        req = urllib.request.Request(
+            RESEND_URL,
+            data=body,
+            method="POST",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                # Clave de idempotencia: un reintento tras timeout no duplica el correo
+                "Idempotency-Key": f"notificacion-{notificacion.id}",
+            },
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout):
+                pass
+        except urllib.error.HTTPError as exc:
+            detalle = f"HTTP {exc.code}: {exc.read()[:300].decode(errors='replace')}"
+            if 400 <= exc.code < 500 and exc.code not in (408, 409, 429):
+                raise ErrorPermanente(detalle) from exc
+            raise ErrorTransporte(detalle) from exc
+        except (urllib.error.URLError, TimeoutError, OSError) as exc:
+            raise ErrorTransporte(str(exc)) from exc
+
+
+TRANSPORTES = {
+    "consola": ConsolaTransporte,
+    "archivo": ArchivoTransporte,
+    "resend": ResendTransporte,
+}
+
+
+def obtener_transporte():
+    nombre = getattr(settings, "NOTIFY_TRANSPORT", "") or ("resend" if settings.RESEND_API_KEY else "consola")
+    clase = TRANSPORTES.get(nombre) or import_string(nombre)
+    return clase()
+
+
+# Despacho ------------------------------------------------------------------
+
+class Limitador:
+    """Espacia los envíos para no superar `por_segundo` correos por segundo."""
+
+    def __init__(self, por_segundo: float):
+        self.intervalo = 1 / por_segundo if por_segundo and por_segundo > 0 else 0
+        self._siguiente = 0.0
+
+    def esperar(self) -> None:
+        if not self.intervalo:
+            return
+        ahora = time.monotonic()
+        if self._siguiente > ahora:
+            time.sleep(self._siguiente - ahora)
+            ahora = self._siguiente
+        self._siguiente = ahora + self.intervalo
+
+
+def backoff(intentos: int) -> timedelta:
+    """Espera antes del siguiente intento: base * 2^(n-1), con tope y ±10 % de jitter."""
+    base = getattr(settings, "NOTIFY_BACKOFF_SECONDS", 30)
+    tope = getattr(settings, "NOTIFY_BACKOFF_MAX_SECONDS", 3600)
+    segundos = min(tope, base * 2 ** max(intentos - 1, 0))
+    return timedelta(seconds=segundos * random.uniform(0.9, 1.1))
+
+
+def reclamar_lote(limite: int) -> list[Notificacion]:
+    """Toma hasta `limite` pendientes vencidas y corre su próximo intento para que otro despachador no las tome."""
+    ahora = timezone.now()
+    lease = timedelta(seconds=getattr(settings, "NOTIFY_LEASE_SECONDS", 300))
+    with transaction.atomic():
+        qs = Notificacion.objects.filter(
+            estado=Notificacion.Estados.PENDIENTE, proximo_intento__lte=ahora
+        ).order_by("proximo_intento", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            qs = qs.select_for_update(skip_locked=True)
+        lote = list(qs[:limite])
+        if lote:
+            Notificacion.objects.filter(pk__in=[n.pk for n in lote]).update(proximo_intento=ahora + lease)
+    return lote
+
+
+def despachar_lote(transporte=None, limite: int | None = None, limitador: Limitador | None = None) -> dict[str, int]:
+    """Envía un lote de pendientes y guarda el resultado de cada una. Retorna conteos por resultado."""
+    transporte = transporte or obtener_transporte()
+    limite = limite or getattr(settings, "NOTIFY_LOTE", 50)
+    limitador = limitador or Limitador(getattr(settings, "NOTIFY_RATE_PER_SECOND", 2))
+    max_intentos = getattr(settings, "NOTIFY_MAX_INTENTOS", 6)
+
+    conteo = {"enviadas": 0, "reintentos": 0, "fallidas": 0}
+    lote = reclamar_lote(limite)
+    for notificacion in lote:
+        limitador.esperar()
+        notificacion.intentos += 1
+        try:
+            transporte.enviar(notificacion)
+        except ErrorPermanente as exc:
+            notificacion.estado = Notificacion.Estados.FALLIDA
+            notificacion.ultimo_error = str(exc)[:1000]
+        except Exception as exc:
+            notificacion.ultimo_error = str(exc)[:1000]
+            if notificacion.intentos >= max_intentos:
+                notificacion.estado = Notificacion.Estados.FALLIDA
+            else:
+                notificacion.proximo_intento = timezone.now() + backoff(notificacion.intentos)
+        else:
+            notificacion.estado = Notificacion.Estados.ENVIADA
+            notificacion.enviada_at = timezone.now()
+            notificacion.ultimo_error = ""
+
+        if notificacion.estado == Notificacion.Estados.ENVIADA:
+            conteo["enviadas"] += 1
+        elif notificacion.estado == Notificacion.Estados.FALLIDA:
+            conteo["fallidas"] += 1
+            logger.warning("Notificación %s descartada: %s", notificacion.id, notificacion.ultimo_error)
+        else:
+            conteo["reintentos"] += 1
+
+    if lote:
+        Notificacion.objects.bulk_update(
+            lote, ["estado", "intentos", "proximo_intento", "ultimo_error", "enviada_at"]
+        )
+    return conteo
+
+
+def purgar_notificaciones(dias: int | None = None) -> int:
+    """Borra las enviadas más viejas que la retención; las fallidas se conservan para revisión."""
+    dias = dias if dias is not None else getattr(settings, "NOTIFY_RETENCION_DIAS", 30)
+    limite = timezone.now() - timedelta(days=dias)
+    borradas, _ = Notificacion.objects.filter(
+        estado=Notificacion.Estados.ENVIADA, created_at__lt=limite
+    ).delete()
+    return borradas
@@ -0,0 +1,293 @@
+"""
+Motor de evaluación de solicitudes contra las políticas de aprobación activas.
+
+Cada política activa se compila una vez (por versión del catálogo) a una tupla
+de límites; evaluar una solicitud es comparar sus entradas contra esos límites:
+
+- score crediticio del socio (`datos_fiscales.score`) >= score_minimo
+- antigüedad en meses desde `fecha_alta` >= antiguedad_min_meses
+- (cuota nueva + cuotas de préstamos vigentes) / ingreso mensual <= ratio_cuota_ingreso_max
+
+La solicitud se recomienda para aprobar si cumple al menos una política; si
+ninguna se cumple por completo pero alguna solo tiene criterios sin verificar
+(dato ausente), queda en revisión. Sin políticas activas se usa la regla por
+monto histórica.
+
+Las entradas de varias solicitudes se arman con un número fijo de consultas
+(socios y exposición vigente), de modo que evaluar toda la cola de pendientes
+no hace consultas por fila. La exposición de una solicitud no incluye el
+préstamo que ella misma ya generó (mismo id), que si no se contaría dos veces.
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Iterable, NamedTuple
+
+from django.db.models import DecimalField, Sum, Value
+from django.db.models.functions import Coalesce
+
+from . import catalogos
+from .metricas import calcular_cuota_mensual
+from .models import Prestamo, Socio
+
+
+ESTADOS_EXPOSICION = ("activo", "moroso", "aprobado", "desembolsado")
+RECOMENDACIONES = ("rechazar", "revisar", "aprobar")  # de peor a mejor
+
+_compiladas: tuple[str, tuple] | None = None
+
+
+class PoliticaCompilada(NamedTuple):
+    id: str
+    nombre: str
+    score_minimo: int
+    antiguedad_min_meses: int
+    ratio_max: Decimal
+
+
+def _decimal(valor) -> Decimal | None:
+    if valor is None or valor == "":
+        return None
+    try:
+        return Decimal(str(valor))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _entero(valor) -> int | None:
+    dec = _decimal(valor)
+    return int(dec) if dec is not None else None
+
+
+def _primer_valor(datos: dict, claves: tuple[str, ...]):
+    for clave in claves:
+        if datos.get(clave) not in (None, ""):
+            return datos[clave]
+    return None
+
+
+def _clave_uuid(valor) -> str:
+    """Normaliza ids guardados como UUID, texto con guiones o hex de 32 caracteres."""
+    try:
+        return uuid.UUID(str(valor)).hex
+    except (TypeError, ValueError, AttributeError):
+        return str(valor)
+
+
+def _meses_entre(inicio: date, fin: date) -> int:
+    meses = (fin.year - inicio.year) * 12 + (fin.month - inicio.month)
+    if fin.day < inicio.day:
+        meses -= 1
+    return max(meses, 0)
+
+
+def politicas_compiladas() -> tuple[PoliticaCompilada, ...]:
+    """Políticas activas compiladas; se recompilan solo si cambia el catálogo."""
+    global _compiladas
+    politicas = catalogos.politicas_aprobacion(solo_activas=True)
+    huella = "|".join(f"{p.pk}:{p.updated_at.isoformat() if p.updated_at else ''}" for p in politicas)
+    actual = _compiladas
+    if actual and actual[0] == huella:
+        return actual[1]
+    compiladas = tuple(
+        PoliticaCompilada(
+            id=str(p.pk),
+            nombre=p.nombre,
+            score_minimo=p.score_minimo,
+            antiguedad_min_meses=p.antiguedad_min_meses,
+            ratio_max=Decimal(p.ratio_cuota_ingreso_max),
+        )
+        for p in politicas
+    )
+    _compiladas = (huella, compiladas)
+    return compiladas
+
+
+def exposicion_por_socio(socio_ids: Iterable, hoy: date | None = None) -> dict[str, dict]:
+    """
+    Saldo pendiente y carga mensual de los préstamos vigentes de cada socio,
+    calculados con una sola consulta agregada. `por_prestamo` guarda el aporte
+    de cada préstamo para descontar el de la propia solicitud.
+    """
+    hoy = hoy or date.today()
+    ids = {_clave_uuid(s) for s in socio_ids if s}
+    if not ids:
+        return {}
+    prestamos = (
+        Prestamo.objects.filter(socio_id__in=ids, estado__in=ESTADOS_EXPOSICION)
+        .select_related("tipo")
+        .annotate(
+            total_pagado_agg=Coalesce(
+                Sum("pagos__monto"),
+                Value(Decimal("0")),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            )
+        )
+    )
+    exposicion: dict[str, dict] = {}
+    for prestamo in prestamos:
+        saldo = prestamo.monto - prestamo.total_pagado_agg
+        if saldo <= Decimal("0"):
+            continue
+        if prestamo.fecha_desembolso and prestamo.fecha_vencimiento:
+            plazo = _meses_entre(prestamo.fecha_desembolso, prestamo.fecha_vencimiento)
+        else:
+            plazo = getattr(prestamo.tipo, "plazo_meses", None) or 12
+        tasa = prestamo.tasa_interes or getattr(prestamo.tipo, "tasa_interes_anual", Decimal("0"))
+        cuota = calcular_cuota_mensual(prestamo.monto, tasa, plazo or 1)
+        item = exposicion.setdefault(
+            _clave_uuid(prestamo.socio_id),
+            {"saldo": Decimal("0"), "cuota_mensual": Decimal("0"), "prestamos": 0, "por_prestamo": {}},
+        )
+        item["saldo"] += saldo
+        item["cuota_mensual"] += cuota
+        item["prestamos"] += 1
+        item["por_prestamo"][prestamo.pk.hex] = (saldo, cuota)
+    return exposicion
+
+
+def sin_prestamo_propio(exposicion: dict | None, solicitud_id) -> dict | None:
+    """Exposición sin el préstamo que generó la solicitud al aprobarse (comparte su id)."""
+    propio = exposicion["por_prestamo"].get(_clave_uuid(solicitud_id)) if exposicion else None
+    if propio is None:
+        return exposicion
+    saldo, cuota = propio
+    return {
+        **exposicion,
+        "saldo": exposicion["saldo"] - saldo,
+        "cuota_mensual": exposicion["cuota_mensual"] - cuota,
+        "prestamos": exposicion["prestamos"] - 1,
+    }
+
+
+def entradas_evaluacion(solicitud: dict, socio: Socio | None, exposicion: dict | None, hoy: date | None = None) -> dict:
+    """Datos de la solicitud y del socio que usan las políticas."""
+    hoy = hoy or date.today()
+    tipo = catalogos.tipo_prestamo(solicitud.get("tipo_prestamo_id") or solicitud.get("producto_id"))
+    monto = _decimal(solicitud.get("monto")) or Decimal("0")
+    plazo = _entero(solicitud.get("plazo_meses")) or getattr(tipo, "plazo_meses", None) or 12
+    tasa = _decimal(solicitud.get("tasa_interes"))
+    if tasa is None:
+        tasa = getattr(tipo, "tasa_interes_anual", None) or Decimal("0")
+    cuota = calcular_cuota_mensual(monto, tasa, plazo) if plazo > 0 else Decimal("0")
+
+    datos = (socio.datos_fiscales if socio and isinstance(socio.datos_fiscales, dict) else {}) or {}
+    ingreso = _decimal(_primer_valor(datos, ("ingreso_mensual", "ingresos_mensuales", "ingreso")))
+    score = _entero(_primer_valor(datos, ("score", "score_crediticio")))
+    antiguedad = _meses_entre(socio.fecha_alta, hoy) if socio and socio.fecha_alta else None
+
+    exposicion = exposicion or {}
+    carga_vigente = exposicion.get("cuota_mensual", Decimal("0"))
+    ratio = None
+    if ingreso and ingreso > 0:
+        ratio = ((cuota + carga_vigente) / ingreso).quantize(Decimal("0.001"))
+
+    return {
+        "socio_activo": bool(socio and socio.estado == Socio.ESTADO_ACTIVO),
+        "monto": monto,
+        "plazo_meses": plazo,
+        "cuota_mensual": cuota,
+        "ingreso_mensual": ingreso,
+        "score": score,
+        "antiguedad_meses": antiguedad,
+        "exposicion_saldo": exposicion.get("saldo", Decimal("0")),
+        "exposicion_cuota_mensual": carga_vigente,
+        "ratio_cuota_ingreso": ratio,
+    }
+
+
+def recomendacion_por_monto(socio_activo: bool, monto: Decimal) -> str:
+    """Regla histórica por umbrales de monto, usada cuando no hay políticas activas."""
+    if not socio_activo:
+        return "rechazar"
+    if monto <= Decimal("10000000"):
+        return "aprobar"
+    if monto <= Decimal("20000000"):
+        return "revisar"
+    return "rechazar"
+
+
+def _regla(nombre: str, valor, limite, cumple) -> dict:
+    return {"regla": nombre, "valor": valor, "limite": limite, "cumple": cumple}
+
+
+def _evaluar_politica(politica: PoliticaCompilada, entradas: dict) -> dict:
+    score = entradas["score"]
+    antiguedad = entradas["antiguedad_meses"]
+    ratio = entradas["ratio_cuota_ingreso"]
+    reglas = [
+        _regla("score_minimo", score, politica.score_minimo, None if score is None else score >= politica.score_minimo),
+        _regla(
+            "antiguedad_min_meses",
+            antiguedad,
+            politica.antiguedad_min_meses,
+            None if antiguedad is None else antiguedad >= politica.antiguedad_min_meses,
+        ),
+        _regla(
+            "ratio_cuota_ingreso_max",
+            None if ratio is None else str(ratio),
+            str(politica.ratio_max),
+            None if ratio is None else ratio <= politica.ratio_max,
+        ),
+    ]
+    cumplimientos = [r["cumple"] for r in reglas]
+    if False in cumplimientos:
+        resultado = "rechazar"
+    elif None in cumplimientos:
+        resultado = "revisar"
+    else:
+        resultado = "aprobar"
+    return {"id": politica.id, "nombre": politica.nombre, "resultado": resultado, "reglas": reglas}
+
+
+def evaluar_entradas(entradas: dict, politicas: tuple[PoliticaCompilada, ...]) -> dict:
+    """Recomendación y detalle por política para un conjunto de entradas."""
+    if not entradas["socio_activo"]:
+        return {"recomendacion": "rechazar", "motivo": "socio_inactivo", "politica": None, "politicas": []}
+    if not politicas:
+        return {
+            "recomendacion": recomendacion_por_monto(True, entradas["monto"]),
+            "motivo": "sin_politicas",
+            "politica": None,
+            "politicas": [],
+        }
+    detalle = [_evaluar_politica(p, entradas) for p in politicas]
+    mejor = max(detalle, key=lambda d: RECOMENDACIONES.index(d["resultado"]))
+    return {
+        "recomendacion": mejor["resultado"],
+        "motivo": "politicas",
+        "politica": {"id": mejor["id"], "nombre": mejor["nombre"]} if mejor["resultado"] != "rechazar" else None,
+        "politicas": detalle,
+    }
+
+
+def _serializar_entradas(entradas: dict) -> dict:
+    return {k: (str(v) if isinstance(v, Decimal) else v) for k, v in entradas.items()}
+
+
+def evaluar_solicitudes(solicitudes: list[dict], hoy: date | None = None) -> dict[str, dict]:
+    """
+    Evalúa varias filas de solicitud (dicts con id, socio_id, monto, plazo...).
+    Devuelve {solicitud_id: resultado}. Hace una consulta de socios y una de
+    exposición sin importar cuántas solicitudes se evalúen.
+    """
+    hoy = hoy or date.today()
+    socio_ids = {_clave_uuid(s["socio_id"]) for s in solicitudes if s.get("socio_id")}
+    socios = {s.pk.hex: s for s in Socio.objects.filter(pk__in=socio_ids)} if socio_ids else {}
+    exposiciones = exposicion_por_socio(socios.keys(), hoy)
+    politicas = politicas_compiladas()
+
+    resultados: dict[str, dict] = {}
+    for solicitud in solicitudes:
+        solicitud_id = str(solicitud.get("id"))
+        socio = socios.get(_clave_uuid(solicitud["socio_id"])) if solicitud.get("socio_id") else None
+        exposicion = sin_prestamo_propio(exposiciones.get(socio.pk.hex) if socio else None, solicitud_id)
+        entradas = entradas_evaluacion(solicitud, socio, exposicion, hoy)
+        resultados[solicitud_id] = {**evaluar_entradas(entradas, politicas), "entradas": _serializar_entradas(entradas)}
+    return resultados
+
+
+def evaluar_solicitud(solicitud: dict, hoy: date | None = None) -> dict:
+    return evaluar_solicitudes([solicitud], hoy)[str(solicitud.get("id"))]
@@ -0,0 +1,236 @@
+"""
+Programador de tareas periódicas (`python manage.py run_scheduler`).
+
+Las tareas se declaran en código con `@tarea(nombre, cron)` (ver
+apps/socios/tareas.py) y se registran en `tarea_programada` al arrancar; el
+cron guardado en base manda, así se puede cambiar o desactivar una tarea sin
+desplegar.
+
+Varias instancias del programador pueden correr a la vez: en PostgreSQL cada
+ejecución toma `pg_try_advisory_xact_lock` con una clave derivada del nombre
+(si otra instancia la tiene, se salta) y vuelve a leer la fila con
+`select_for_update` para no repetir una ejecución que otra instancia ya hizo.
+La tarea corre en un savepoint: si falla se deshace su trabajo pero queda
+registrada en `ejecucion_tarea` con el error y la duración.
+
+Las tareas declaradas con `transaccional=False` (exportaciones) manejan sus
+propias transacciones: el lock y la reserva de la fila (que adelanta
+`proxima_ejecucion`) se confirman en una transacción corta, la función corre
+fuera de toda transacción y el resultado se registra en otra. Así su trabajo
+se ve y sus locks se liberan a medida que avanza, no al final de la tanda.
+"""
+from __future__ import annotations
+
+import hashlib
+import importlib
+import logging
+import socket
+import time
+import traceback
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cron import Cron, CronInvalido
+from .models import EjecucionTarea, TareaProgramada
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Tarea:
+    nombre: str
+    cron: str
+    funcion: Callable[[], dict | None]
+    descripcion: str = ""
+    transaccional: bool = True
+
+
+_registro: dict[str, Tarea] = {}
+
+
+def tarea(nombre: str, cron: str, transaccional: bool = True):
+    """
+    Registra la función como tarea periódica con un cron por defecto. Con
+    `transaccional=False` la función no corre dentro de la transacción del
+    programador (ver docstring del módulo).
+    """
+    Cron(cron)  # falla al importar si la expresión es inválida
+
+    def decorador(funcion):
+        descripcion = (funcion.__doc__ or "").strip().split("\n", 1)[0]
+        _registro[nombre] = Tarea(nombre, cron, funcion, descripcion, transaccional)
+        return funcion
+
+    return decorador
+
+
+def registradas() -> dict[str, Tarea]:
+    for modulo in getattr(settings, "SCHEDULER_MODULOS", ["apps.socios.tareas"]):
+        importlib.import_module(modulo)
+    return dict(_registro)
+
+
+def sincronizar_registro(ahora=None) -> dict[str, TareaProgramada]:
+    """Crea en base las tareas nuevas del código; devuelve las filas por nombre."""
+    ahora = ahora or timezone.now()
+    tareas = registradas()
+    existentes = TareaProgramada.objects.in_bulk(list(tareas))
+    nuevas = [
+        TareaProgramada(nombre=t.nombre, cron=t.cron, proxima_ejecucion=_siguiente(t.cron, ahora))
+        for t in tareas.values()
+        if t.nombre not in existentes
+    ]
+    if nuevas:
+        TareaProgramada.objects.bulk_create(nuevas, ignore_conflicts=True)
+        existentes = TareaProgramada.objects.in_bulk(list(tareas))
+    return existentes
+
+
+def ejecutar_pendientes(ahora=None) -> list[EjecucionTarea]:
+    """Corre las tareas activas cuyo próximo horario ya pasó."""
+    ahora = ahora or timezone.now()
+    tareas = registradas()
+    ejecuciones = []
+    for nombre, fila in sincronizar_registro(ahora).items():
+        if not fila.activa or nombre not in tareas:
+            continue
+        if fila.proxima_ejecucion is not None and fila.proxima_ejecucion > ahora:
+            continue
+        ejecucion = ejecutar(nombre)
+        if ejecucion is not None:
+            ejecuciones.append(ejecucion)
+    return ejecuciones
+
+
+def ejecutar(nombre: str, forzar: bool = False) -> EjecucionTarea | None:
+    """
+    Ejecuta una tarea si esta instancia gana el lock y sigue vencida (o con
+    `forzar`). Devuelve la ejecución registrada o None si no le tocó.
+    """
+    definicion = registradas()[nombre]
+    if definicion.transaccional:
+        with transaction.atomic():
+            fila = _reservar(nombre, forzar)
+            if fila is None:
+                return None
+            inicio = timezone.now()
+            resultado, estado, error, duracion_ms = _correr(definicion, savepoint=True)
+            ejecucion = _registrar(fila, inicio, estado, duracion_ms, resultado, error)
+    else:
+        with transaction.atomic():
+            fila = _reservar(nombre, forzar)
+            if fila is None:
+                return None
+            inicio = timezone.now()
+            # Reserva: otra instancia no la repite mientras corre fuera del lock
+            _avanzar(fila, inicio)
+            fila.save(update_fields=["proxima_ejecucion", "activa", "updated_at"])
+        resultado, estado, error, duracion_ms = _correr(definicion, savepoint=False)
+        with transaction.atomic():
+            ejecucion = _registrar(fila, inicio, estado, duracion_ms, resultado, error)
+    logger.info("Tarea %s: %s en %d ms %s", nombre, estado, duracion_ms, resultado)
+    return ejecucion
+
+
+def _reservar(nombre: str, forzar: bool) -> TareaProgramada | None:
+    """Lock y fila de la tarea dentro de la transacción en curso; None si no le toca a esta instancia."""
+    if not _tomar_lock(nombre):
+        logger.info("Tarea %s en curso en otra instancia; se omite", nombre)
+        return None
+    fila = TareaProgramada.objects.select_for_update().filter(pk=nombre).first()
+    if fila is None:
+        sincronizar_registro()
+        fila = TareaProgramada.objects.select_for_update().get(pk=nombre)
+    if not forzar and (not fila.activa or (fila.proxima_ejecucion and fila.proxima_ejecucion > timezone.now())):
+        return None
+    return fila
+
+
+def _correr(definicion: Tarea, savepoint: bool) -> tuple[dict, str, str, int]:
+    t0 = time.perf_counter()
+    resultado, error = {}, ""
+    try:
+        with transaction.atomic() if savepoint else nullcontext():
+            resultado = definicion.funcion() or {}
+        estado = EjecucionTarea.Estados.OK
+    except Exception:
+        estado = EjecucionTarea.Estados.ERROR
+        error = traceback.format_exc(limit=5)[-4000:]
+        logger.exception("Tarea %s falló", definicion.nombre)
+    return resultado, estado, error, int((time.perf_counter() - t0) * 1000)
+
+
+def _avanzar(fila: TareaProgramada, desde) -> None:
+    try:
+        fila.proxima_ejecucion = _siguiente(fila.cron, desde)
+    except CronInvalido:
+        logger.error("Cron inválido para %s (%r); se desactiva", fila.nombre, fila.cron)
+        fila.activa = False
+
+
+def _registrar(fila: TareaProgramada, inicio, estado: str, duracion_ms: int, resultado: dict, error: str) -> EjecucionTarea:
+    fila.ultima_ejecucion = inicio
+    _avanzar(fila, timezone.now())
+    fila.save(update_fields=["ultima_ejecucion", "proxima_ejecucion", "activa", "updated_at"])
+    return EjecucionTarea.objects.create(
+        tarea=fila,
+        estado=estado,
+        inicio=inicio,
+        duracion_ms=duracion_ms,
+        resultado=resultado,
+        error=error,
+        host=socket.gethostname()[:120],
+    )
+
+
+def estadisticas(nombre: str, ultimas: int = 50) -> dict:
+    """Conteo, errores y duración (p50/p95/máx, ms) de las últimas ejecuciones."""
+    filas = list(
+        EjecucionTarea.objects.filter(tarea_id=nombre).order_by("-inicio").values_list("estado", "duracion_ms")[:ultimas]
+    )
+    duraciones = sorted(d for _, d in filas)
+    if not duraciones:
+        return {"ejecuciones": 0, "errores": 0, "p50_ms": None, "p95_ms": None, "max_ms": None}
+
+    def percentil(p: float) -> int:
+        return duraciones[min(len(duraciones) - 1, int(round(p * (len(duraciones) - 1))))]
+
+    return {
+        "ejecuciones": len(filas),
+        "errores": sum(1 for estado, _ in filas if estado == EjecucionTarea.Estados.ERROR),
+        "p50_ms": percentil(0.5),
+        "p95_ms": percentil(0.95),
+        "max_ms": duraciones[-1],
+    }
+
+
+def purgar_historial(dias: int | None = None) -> int:
+    dias = dias if dias is not None else getattr(settings, "SCHEDULER_HISTORIAL_DIAS", 30)
+    borradas, _ = EjecucionTarea.objects.filter(inicio__lt=timezone.now() - timedelta(days=dias)).delete()
+    return borradas
+
+
+def _siguiente(cron: str, desde):
+    # El cron se interpreta en la zona horaria del proyecto
+    return Cron(cron).siguiente(timezone.localtime(desde))
+
+
+def _clave_lock(nombre: str) -> int:
+    """Entero de 64 bits con signo estable entre procesos (hash() de Python no lo es)."""
+    digest = hashlib.blake2b(f"coop-tarea:{nombre}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _tomar_lock(nombre: str) -> bool:
+    if connection.vendor != "postgresql":
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [_clave_lock(nombre)])
+        return bool(cursor.fetchone()[0])
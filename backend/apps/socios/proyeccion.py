@@ -0,0 +1,232 @@
+"""
+Proyección de cobros de la cartera (capital e interés esperados por mes).
+
+Cada préstamo abierto se amortiza con el sistema francés de
+`calcular_tabla_amortizacion` (cuota fija redondeada al centavo, interés del mes
+sobre el saldo, capital = cuota - interés) pero para toda la cartera a la vez:
+los montos viven en arreglos de NumPy en centavos y el bucle recorre números de
+cuota, no préstamos. Los préstamos se ordenan por plazo descendente, así en la
+cuota k solo se opera sobre el prefijo que todavía tiene cuotas.
+
+La cuota n vence n meses después del desembolso. Lo ya pagado se imputa a las
+cuotas en orden (como en "Mis préstamos"); lo que queda de cuotas anteriores al
+mes de inicio se informa aparte como vencido y no entra en el flujo mensual.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from django.db import connection
+from django.db.models import DecimalField, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Prestamo
+from .politicas import ESTADOS_EXPOSICION
+from .schema import get_table_columns
+
+
+PLAZO_POR_DEFECTO = 12
+MAX_MESES = 120
+# Préstamos por consulta de solicitudes (y por bloque del cursor)
+LOTE = 5000
+
+
+@dataclass(frozen=True)
+class Cartera:
+    """Un préstamo por posición; montos en centavos."""
+    monto: np.ndarray
+    tasa_anual: np.ndarray
+    plazo: np.ndarray
+    mes_desembolso: np.ndarray  # año * 12 + (mes - 1)
+    pagado: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.monto)
+
+
+def indice_mes(fecha: date) -> int:
+    return fecha.year * 12 + fecha.month - 1
+
+
+def _etiqueta_mes(indice: int) -> str:
+    return f"{indice // 12:04d}-{indice % 12 + 1:02d}"
+
+
+def _centavos(valor) -> int:
+    return int((Decimal(str(valor or 0)) * 100).to_integral_value())
+
+
+def _a_decimal(centavos: float) -> Decimal:
+    return (Decimal(int(round(centavos))) / 100).quantize(Decimal("0.01"))
+
+
+def _condiciones_solicitud(prestamo_ids: list, columnas: set[str]) -> dict[str, tuple]:
+    """
+    (plazo_meses, tasa_interes) por id de solicitud sin guiones, solo de las
+    solicitudes de origen de `prestamo_ids` (el préstamo usa el id de su
+    solicitud); vacío si no hay tabla.
+    """
+    if not prestamo_ids or "id" not in columnas or not {"plazo_meses", "tasa_interes"} & columnas:
+        return {}
+    plazo_col = "plazo_meses" if "plazo_meses" in columnas else "NULL"
+    tasa_col = "tasa_interes" if "tasa_interes" in columnas else "NULL"
+    table_name = "solicitud" if connection.vendor != "postgresql" else "public.solicitud"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT id, {plazo_col}, {tasa_col} FROM {table_name} WHERE id IN ({', '.join(['%s'] * len(prestamo_ids))})",
+            [str(pk) for pk in prestamo_ids],
+        )
+        return {str(fila[0]).replace("-", "").lower(): (fila[1], fila[2]) for fila in cursor.fetchall()}
+
+
+def cargar_cartera() -> Cartera:
+    """
+    Préstamos con exposición (activo, moroso, aprobado, desembolsado) con el
+    mismo criterio de plazo y tasa que `_plan_cliente_para_prestamo`: primero la
+    solicitud de origen, luego el préstamo y por último su tipo. Las
+    solicitudes se leen por lote de préstamos, no la tabla entera.
+    """
+    columnas = get_table_columns("solicitud")
+    filas = (
+        Prestamo.objects.filter(estado__in=ESTADOS_EXPOSICION)
+        .annotate(
+            pagado=Coalesce(
+                Sum("pagos__monto"),
+                Value(Decimal("0")),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            )
+        )
+        .order_by()
+        .values_list("id", "monto", "tasa_interes", "fecha_desembolso", "pagado", "tipo__plazo_meses", "tipo__tasa_interes_anual")
+    )
+    monto, tasa, plazo, mes, pagado = [], [], [], [], []
+    lote: list[tuple] = []
+
+    def procesar_lote():
+        condiciones = _condiciones_solicitud([fila[0] for fila in lote], columnas)
+        for pk, monto_p, tasa_p, fecha, pagado_p, plazo_tipo, tasa_tipo in lote:
+            plazo_sol, tasa_sol = condiciones.get(pk.hex, (None, None))
+            try:
+                plazo_meses = int(plazo_sol) if plazo_sol is not None else None
+            except (TypeError, ValueError):
+                plazo_meses = None
+            if not plazo_meses or plazo_meses <= 0:
+                plazo_meses = plazo_tipo or PLAZO_POR_DEFECTO
+            tasa_raw = tasa_sol if tasa_sol else (tasa_p or tasa_tipo or 0)
+            try:
+                tasa_anual = float(tasa_raw)
+            except (TypeError, ValueError):
+                tasa_anual = 0.0
+            monto.append(_centavos(monto_p))
+            tasa.append(tasa_anual)
+            plazo.append(plazo_meses)
+            mes.append(indice_mes(fecha))
+            pagado.append(_centavos(pagado_p))
+        lote.clear()
+
+    for fila in filas.iterator(chunk_size=LOTE):
+        lote.append(fila)
+        if len(lote) >= LOTE:
+            procesar_lote()
+    if lote:
+        procesar_lote()
+    return Cartera(
+        monto=np.asarray(monto, dtype=np.float64),
+        tasa_anual=np.asarray(tasa, dtype=np.float64),
+        plazo=np.asarray(plazo, dtype=np.int64),
+        mes_desembolso=np.asarray(mes, dtype=np.int64),
+        pagado=np.asarray(pagado, dtype=np.float64),
+    )
+
+
+def cuotas_mensuales(monto: np.ndarray, tasa_anual: np.ndarray, plazo: np.ndarray) -> np.ndarray:
+    """`calcular_cuota_mensual` vectorizada, en centavos."""
+    tasa_mensual = tasa_anual / 100.0 / 12.0
+    con_tasa = tasa_mensual > 0
+    cuota = monto / np.maximum(plazo, 1)
+    factor = np.power(1.0 + tasa_mensual[con_tasa], -plazo[con_tasa].astype(np.float64))
+    cuota[con_tasa] = monto[con_tasa] * tasa_mensual[con_tasa] / (1.0 - factor)
+    return np.round(cuota)
+
+
+def proyectar(cartera: Cartera, mes_inicio: int, meses: int) -> dict:
+    """
+    Capital, interés y cantidad de cuotas esperados por mes en
+    [mes_inicio, mes_inicio + meses), más el vencido impago. Centavos (float).
+    """
+    capital_mes = np.zeros(meses)
+    interes_mes = np.zeros(meses)
+    cuotas_mes = np.zeros(meses, dtype=np.int64)
+    vencido = 0.0
+    if len(cartera) == 0:
+        return {"capital": capital_mes, "interes": interes_mes, "cuotas": cuotas_mes, "vencido": vencido}
+
+    orden = np.argsort(-cartera.plazo, kind="stable")
+    plazo = cartera.plazo[orden]
+    tasa_mensual = cartera.tasa_anual[orden] / 100.0 / 12.0
+    cuota = cuotas_mensuales(cartera.monto[orden], cartera.tasa_anual[orden], plazo)
+    saldo = cartera.monto[orden].copy()
+    restante = cartera.pagado[orden].copy()
+    desfase = cartera.mes_desembolso[orden] - mes_inicio
+    # vigentes[k - 1]: cuántos préstamos (prefijo del orden) tienen al menos k cuotas
+    vigentes = np.searchsorted(-plazo, -np.arange(1, int(plazo[0]) + 1), side="right")
+
+    for k, n in enumerate(vigentes, start=1):
+        if n == 0:
+            break
+        if int(desfase[:n].min()) + k >= meses:
+            break  # todas las cuotas restantes caen después del horizonte
+        interes = np.round(saldo[:n] * tasa_mensual[:n])
+        capital = cuota[:n] - interes
+        saldo[:n] = np.maximum(saldo[:n] - capital, 0.0)
+        monto_cuota = capital + interes
+        aplicado = np.minimum(np.maximum(monto_cuota, 0.0), restante[:n])
+        restante[:n] -= aplicado
+        pendiente = monto_cuota - aplicado
+
+        posicion = desfase[:n] + k
+        vencido += float(pendiente[posicion < 0].sum())
+        en_rango = (posicion >= 0) & (posicion < meses) & (pendiente > 0)
+        if not en_rango.any():
+            continue
+        fraccion = pendiente[en_rango] / monto_cuota[en_rango]
+        destino = posicion[en_rango]
+        capital_mes += np.bincount(destino, weights=capital[en_rango] * fraccion, minlength=meses)
+        interes_mes += np.bincount(destino, weights=interes[en_rango] * fraccion, minlength=meses)
+        cuotas_mes += np.bincount(destino, minlength=meses)
+
+    return {"capital": capital_mes, "interes": interes_mes, "cuotas": cuotas_mes, "vencido": vencido}
+
+
+def proyeccion_cartera(desde: date, meses: int, cartera: Cartera | None = None) -> dict:
+    """Proyección lista para la API: meses con etiqueta AAAA-MM y montos en Decimal."""
+    cartera = cartera if cartera is not None else cargar_cartera()
+    mes_inicio = indice_mes(desde)
+    flujo = proyectar(cartera, mes_inicio, meses)
+    filas = []
+    for pos in range(meses):
+        capital = _a_decimal(flujo["capital"][pos])
+        interes = _a_decimal(flujo["interes"][pos])
+        filas.append({
+            "mes": _etiqueta_mes(mes_inicio + pos),
+            "capital": capital,
+            "interes": interes,
+            "total": capital + interes,
+            "cuotas": int(flujo["cuotas"][pos]),
+        })
+    capital_total = sum((f["capital"] for f in filas), Decimal("0.00"))
+    interes_total = sum((f["interes"] for f in filas), Decimal("0.00"))
+    return {
+        "desde": _etiqueta_mes(mes_inicio),
+        "meses": filas,
+        "prestamos": len(cartera),
+        "totales": {
+            "capital": capital_total,
+            "interes": interes_total,
+            "total": capital_total + interes_total,
+            "vencido": _a_decimal(flujo["vencido"]),
+        },
+    }
@@ -0,0 +1,178 @@
+"""
+PDF del reporte de socios y préstamos (fpdf2, sin servicios externos).
+
+Las filas llegan en streaming desde `apps/socios/reportes.py` (`iterator()` por
+bloques) y se dibujan a medida que llegan: cada página repite el encabezado de
+la tabla y el resumen de cada sección se escribe al final, cuando ya se
+conocen los totales. fpdf2 arma el documento en memoria, así que el tamaño se
+acota con `REPORTES_PDF_MAX_FILAS`; más allá de eso el PDF indica que se cortó.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from typing import BinaryIO
+
+from django.conf import settings
+from django.utils import timezone
+from fpdf import FPDF
+
+from . import reportes
+
+
+ALTO_FILA = 6
+COLUMNAS_SOCIOS = (("Nombre", 80), ("Documento", 40), ("Estado", 30), ("Email", 82), ("Alta", 28))
+COLUMNAS_PRESTAMOS = (
+    ("Socio", 58), ("Documento", 32), ("Tipo", 40), ("Estado", 28),
+    ("Monto", 30), ("Saldo", 30), ("Desembolso", 24), ("Vencimiento", 24),
+)
+NUMERICAS = {"Monto", "Saldo"}
+
+
+def _texto(valor) -> str:
+    # Las fuentes estándar de PDF solo cubren latin-1
+    return str(valor if valor is not None else "").encode("latin-1", "replace").decode("latin-1")
+
+
+def _monto(valor) -> str:
+    return f"{valor:,.2f}"
+
+
+class ReportePDF(FPDF):
+    def __init__(self, subtitulo: str):
+        super().__init__(orientation="L", unit="mm", format="A4")
+        self.subtitulo = subtitulo
+        self.columnas: tuple = ()
+        self.set_auto_page_break(auto=False, margin=15)
+        self.set_margins(15, 15, 15)
+        self.set_title("Reporte de gestion")
+        self.set_creator("Cooprestamos")
+
+    def header(self):
+        self.set_font("Helvetica", "B", 14)
+        self.cell(0, 8, "Reporte de gestion", new_x="LMARGIN", new_y="NEXT")
+        self.set_font("Helvetica", "", 8)
+        self.set_text_color(107, 114, 128)
+        self.cell(0, 5, _texto(self.subtitulo), new_x="LMARGIN", new_y="NEXT")
+        self.set_text_color(0, 0, 0)
+        self.ln(2)
+        if self.columnas:
+            self.encabezado_tabla()
+
+    def footer(self):
+        self.set_y(-12)
+        self.set_font("Helvetica", "", 8)
+        self.set_text_color(107, 114, 128)
+        self.cell(0, 5, f"Pagina {self.page_no()}/{{nb}}", align="R")
+        self.set_text_color(0, 0, 0)
+
+    def encabezado_tabla(self):
+        self.set_font("Helvetica", "B", 8)
+        self.set_fill_color(67, 165, 157)
+        self.set_text_color(255, 255, 255)
+        for titulo, ancho in self.columnas:
+            self.cell(ancho, ALTO_FILA, titulo, border=1, fill=True, align="C")
+        self.ln()
+        self.set_text_color(0, 0, 0)
+        self.set_font("Helvetica", "", 8)
+
+    def seccion(self, titulo: str, columnas: tuple):
+        self.columnas = ()
+        if self.page_no() == 0 or self.get_y() > self.h - 45:
+            self.add_page()
+        self.ln(3)
+        self.set_font("Helvetica", "B", 11)
+        self.cell(0, 7, titulo, new_x="LMARGIN", new_y="NEXT")
+        self.columnas = columnas
+        self.encabezado_tabla()
+
+    def fila(self, valores: list):
+        if self.get_y() + ALTO_FILA > self.h - 15:
+            self.add_page()
+        for (titulo, ancho), valor in zip(self.columnas, valores):
+            texto = _texto(valor)
+            # Recorte barato: solo se mide el texto si puede no entrar
+            if len(texto) * 1.6 > ancho - 2:
+                while texto and self.get_string_width(texto) > ancho - 2:
+                    texto = texto[:-1]
+            self.cell(ancho, ALTO_FILA, texto, border="B", align="R" if titulo in NUMERICAS else "L")
+        self.ln()
+
+    def nota(self, texto: str):
+        self.columnas = ()
+        if self.get_y() + 12 > self.h - 15:
+            self.add_page()
+        self.ln(1)
+        self.set_font("Helvetica", "I", 8)
+        self.multi_cell(0, 5, _texto(texto), new_x="LMARGIN", new_y="NEXT")
+        self.set_font("Helvetica", "", 8)
+
+
+def _subtitulo(filtros: dict) -> str:
+    return (
+        f"Generado: {timezone.localtime():%Y-%m-%d %H:%M} - Entidad: {filtros['entidad']}, "
+        f"Estados: {','.join(filtros.get('estado') or []) or 'todos'}, "
+        f"Rango: {filtros.get('desde') or '-'} a {filtros.get('hasta') or '-'}, "
+        f"Tipo: {filtros.get('tipo') or 'todos'}, Busqueda: {filtros.get('q') or '-'}"
+    )
+
+
+def generar(filtros: dict, destino: BinaryIO) -> int:
+    """Escribe el PDF del reporte en `destino` y devuelve la cantidad de filas dibujadas."""
+    maximo = getattr(settings, "REPORTES_PDF_MAX_FILAS", 50000)
+    pdf = ReportePDF(_subtitulo(filtros))
+    pdf.alias_nb_pages()
+    filas = 0
+
+    if reportes.incluye_socios(filtros):
+        pdf.seccion("Socios", COLUMNAS_SOCIOS)
+        por_estado: Counter = Counter()
+        for socio in reportes.iterar_socios(filtros):
+            por_estado[socio.estado] += 1
+            if filas >= maximo:
+                continue
+            pdf.fila([
+                socio.nombre_completo,
+                socio.documento,
+                socio.estado,
+                socio.usuario.email if socio.usuario else "",
+                f"{timezone.localtime(socio.created_at):%Y-%m-%d}" if socio.created_at else "",
+            ])
+            filas += 1
+        resumen = ", ".join(f"{estado}: {n}" for estado, n in sorted(por_estado.items())) or "sin resultados"
+        pdf.nota(f"Total socios: {sum(por_estado.values())} ({resumen})")
+
+    if reportes.incluye_prestamos(filtros):
+        pdf.seccion("Prestamos", COLUMNAS_PRESTAMOS)
+        por_estado = Counter()
+        monto_total = saldo_total = 0
+        for prestamo, estado, saldo in reportes.iterar_prestamos(filtros):
+            por_estado[estado] += 1
+            monto_total += prestamo.monto
+            saldo_total += saldo
+            if filas >= maximo:
+                continue
+            socio = prestamo.socio
+            pdf.fila([
+                socio.nombre_completo if socio else "",
+                socio.documento if socio else "",
+                prestamo.tipo.nombre if prestamo.tipo else "",
+                estado,
+                _monto(prestamo.monto),
+                _monto(saldo),
+                prestamo.fecha_desembolso.isoformat() if prestamo.fecha_desembolso else "",
+                prestamo.fecha_vencimiento.isoformat() if prestamo.fecha_vencimiento else "",
+            ])
+            filas += 1
+        resumen = ", ".join(f"{estado}: {n}" for estado, n in sorted(por_estado.items())) or "sin resultados"
+        pdf.nota(
+            f"Total prestamos: {sum(por_estado.values())} ({resumen}) - "
+            f"Monto: {_monto(monto_total)} - Saldo pendiente: {_monto(saldo_total)}"
+        )
+
+    if filas >= maximo:
+        pdf.nota(
+            f"El reporte se corto en {maximo} filas; los totales incluyen todos los registros. "
+            "Usa filtros mas especificos para ver el detalle completo."
+        )
+    destino.write(pdf.output())
+    return filas
@@ -0,0 +1,159 @@
+"""
+Consultas del reporte de socios y préstamos (Reportes), compartidas por la vista
+JSON, el PDF y las exportaciones en segundo plano.
+
+Los filtros viajan como un dict serializable (fechas en ISO) para poder
+guardarlos en una `ExportacionReporte` y repetir exactamente la misma consulta
+en el worker.
+"""
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from typing import Iterator
+
+from django.db.models import Count, DecimalField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Lower, Trim
+
+from .models import Pago, Prestamo, Socio
+
+
+ENTIDADES = ("todos", "socios", "prestamos")
+CHUNK = 2000
+
+# Columnas de `?format=csv|parquet` (ver core/tablas.py)
+COLUMNAS_SOCIOS = (
+    ("id", "texto"), ("nombre", "texto"), ("documento", "texto"), ("email", "texto"),
+    ("estado", "texto"), ("created_at", "texto"),
+)
+COLUMNAS_PRESTAMOS = (
+    ("id", "texto"), ("socio_id", "texto"), ("socio", "texto"), ("documento", "texto"), ("tipo", "texto"),
+    ("estado", "texto"), ("estado_visible", "texto"), ("monto", "decimal"), ("pagado", "decimal"),
+    ("saldo", "decimal"), ("fecha_desembolso", "texto"), ("fecha_vencimiento", "texto"),
+)
+
+
+def incluye_socios(filtros: dict) -> bool:
+    return filtros["entidad"] in {"todos", "socios"}
+
+
+def incluye_prestamos(filtros: dict) -> bool:
+    return filtros["entidad"] in {"todos", "prestamos"}
+
+
+def _fecha(valor: str | None) -> date | None:
+    return date.fromisoformat(valor) if valor else None
+
+
+def socios_filtrados(filtros: dict):
+    qs = Socio.objects.all().order_by("-created_at")
+    if filtros.get("desde"):
+        qs = qs.filter(created_at__date__gte=_fecha(filtros["desde"]))
+    if filtros.get("hasta"):
+        qs = qs.filter(created_at__date__lte=_fecha(filtros["hasta"]))
+    if filtros.get("estado"):
+        qs = qs.filter(estado__in=filtros["estado"])
+    if filtros.get("q"):
+        q = filtros["q"]
+        qs = qs.filter(Q(nombre_completo__icontains=q) | Q(documento__icontains=q) | Q(usuario__email__icontains=q))
+    return qs
+
+
+def prestamos_filtrados(filtros: dict):
+    qs = Prestamo.objects.select_related("socio", "socio__usuario", "tipo").order_by("-fecha_desembolso", "-created_at")
+    if filtros.get("desde"):
+        qs = qs.filter(fecha_desembolso__gte=_fecha(filtros["desde"]))
+    if filtros.get("hasta"):
+        qs = qs.filter(fecha_desembolso__lte=_fecha(filtros["hasta"]))
+    if filtros.get("tipo"):
+        qs = qs.filter(tipo_id=filtros["tipo"])
+    if filtros.get("q"):
+        q = filtros["q"]
+        qs = qs.filter(
+            Q(socio__nombre_completo__icontains=q)
+            | Q(socio__documento__icontains=q)
+            | Q(id__icontains=q)
+            | Q(descripcion__icontains=q)
+        )
+    return qs
+
+
+def estado_visible(prestamo, saldo: Decimal) -> str:
+    base = (getattr(prestamo, "estado_norm", "") or prestamo.estado or "").strip().lower()
+    if saldo <= 0 or base == "pagado":
+        return "pagado"
+    if base == "cancelado":
+        return "cancelado"
+    if base == "moroso":
+        return "moroso"
+    if getattr(prestamo, "desembolsos_count", 0) > 0:
+        return "desembolsado"
+    if base in {"aprobado", "activo"}:
+        return "aprobado"
+    return base or "desconocido"
+
+
+def iterar_socios(filtros: dict) -> Iterator[Socio]:
+    yield from socios_filtrados(filtros).select_related("usuario").iterator(chunk_size=CHUNK)
+
+
+def iterar_prestamos(filtros: dict) -> Iterator[tuple[Prestamo, str, Decimal]]:
+    """
+    (préstamo, estado visible, saldo) en streaming. El pagado sale de una
+    subconsulta por préstamo en vez de `prestamo.total_pagado`, que consulta
+    los pagos de cada fila.
+    """
+    monto = DecimalField(max_digits=14, decimal_places=2)
+    pagado = Pago.objects.filter(prestamo=OuterRef("pk")).order_by().values("prestamo").annotate(t=Sum("monto")).values("t")
+    desembolsos = Prestamo.objects.filter(pk=OuterRef("pk")).annotate(n=Count("desembolsos")).values("n")
+    qs = prestamos_filtrados(filtros).annotate(
+        pagado_total=Coalesce(Subquery(pagado, output_field=monto), Value(Decimal("0")), output_field=monto),
+        desembolsos_count=Subquery(desembolsos),
+        estado_norm=Lower(Trim("estado")),
+    )
+    estados = set(filtros.get("estado") or ())
+    for prestamo in qs.iterator(chunk_size=CHUNK):
+        saldo = max(prestamo.monto - prestamo.pagado_total, Decimal("0"))
+        visible = estado_visible(prestamo, saldo)
+        if estados and visible not in estados:
+            continue
+        yield prestamo, visible, saldo
+
+
+def filas_estimadas(filtros: dict) -> int:
+    """Cota superior de filas del reporte (sin el filtro por estado visible de préstamos)."""
+    total = socios_filtrados(filtros).count() if incluye_socios(filtros) else 0
+    if incluye_prestamos(filtros):
+        total += prestamos_filtrados(filtros).count()
+    return total
+
+
+def filas_socios(filtros: dict) -> Iterator[list]:
+    for socio in iterar_socios(filtros):
+        yield [
+            str(socio.id),
+            socio.nombre_completo,
+            socio.documento,
+            socio.usuario.email if socio.usuario else "",
+            socio.estado,
+            socio.created_at.isoformat() if socio.created_at else "",
+        ]
+
+
+def filas_prestamos(filtros: dict) -> Iterator[list]:
+    for prestamo, visible, saldo in iterar_prestamos(filtros):
+        socio = prestamo.socio
+        yield [
+            str(prestamo.id),
+            str(socio.id) if socio else "",
+            socio.nombre_completo if socio else "",
+            socio.documento if socio else "",
+            prestamo.tipo.nombre if prestamo.tipo else "",
+            prestamo.estado,
+            visible,
+            float(prestamo.monto),
+            float(prestamo.pagado_total),
+            float(saldo),
+            prestamo.fecha_desembolso.isoformat() if prestamo.fecha_desembolso else "",
+            prestamo.fecha_vencimiento.isoformat() if prestamo.fecha_vencimiento else "",
+        ]
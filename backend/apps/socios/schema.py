@@ -0,0 +1,145 @@
+"""
+Introspección de tablas que no administra Django (solicitud, desembolso,
+producto_prestamo) con caché en memoria por proceso.
+
+Las columnas de estas tablas varían entre despliegues, por eso las vistas las
+consultan antes de armar SQL. El catálogo se guarda `SCHEMA_CACHE_SECONDS`
+segundos para no repetir la consulta a information_schema en cada request.
+Cuando una vista necesita varias tablas, `get_tables_columns` las resuelve con
+una sola consulta en vez de una por tabla.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+
+_cache: dict[tuple[str, str, str], tuple[float, object]] = {}
+_lock = threading.Lock()
+
+
+def _ttl() -> int:
+    return getattr(settings, "SCHEMA_CACHE_SECONDS", 0)
+
+
+def _cached(kind: str, table_name: str, loader):
+    ttl = _ttl()
+    key = (connection.alias, kind, table_name)
+    if ttl > 0:
+        hit = _cache.get(key)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+    value = loader(table_name)
+    # Una tabla vacía/inexistente no se cachea: puede crearse en caliente
+    if ttl > 0 and value:
+        with _lock:
+            _cache[key] = (time.monotonic() + ttl, value)
+    return value
+
+
+def clear_schema_cache() -> None:
+    with _lock:
+        _cache.clear()
+
+
+def _load_columns(table_name: str) -> frozenset[str]:
+    vendor = connection.vendor
+    with connection.cursor() as cursor:
+        if vendor == "postgresql":
+            cursor.execute(
+                """
+                SELECT column_name
+                FROM information_schema.columns
+                WHERE table_schema = %s AND table_name = %s
+                """,
+                ["public", table_name],
+            )
+            return frozenset(row[0] for row in cursor.fetchall())
+        # SQLite fallback
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        return frozenset(row[1] for row in cursor.fetchall())
+
+
+def _load_metadata(table_name: str) -> tuple[dict, ...]:
+    vendor = connection.vendor
+    with connection.cursor() as cursor:
+        if vendor == "postgresql":
+            cursor.execute(
+                """
+                SELECT column_name, is_nullable, column_default, data_type
+                FROM information_schema.columns
+                WHERE table_schema = %s AND table_name = %s
+                """,
+                ["public", table_name],
+            )
+            return tuple(
+                {
+                    "name": row[0],
+                    "nullable": row[1] == "YES",
+                    "has_default": row[2] is not None,
+                    "type": row[3],
+                }
+                for row in cursor.fetchall()
+            )
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        return tuple(
+            {
+                "name": row[1],
+                "nullable": not bool(row[3]),  # 0 => nullable in sqlite pragma
+                "has_default": row[4] is not None,
+                "type": row[2],
+            }
+            for row in cursor.fetchall()
+        )
+
+
+def get_table_columns(table_name: str) -> set[str]:
+    """Retorna las columnas existentes de una tabla (schema public)."""
+    return set(_cached("columns", table_name, _load_columns))
+
+
+def get_tables_columns(*table_names: str) -> dict[str, set[str]]:
+    """Columnas de varias tablas; las que no están en caché se leen en una sola consulta."""
+    ttl = _ttl()
+    now = time.monotonic()
+    result: dict[str, set[str]] = {}
+    faltantes = []
+    for table_name in dict.fromkeys(table_names):
+        hit = _cache.get((connection.alias, "columns", table_name)) if ttl > 0 else None
+        if hit and hit[0] > now:
+            result[table_name] = set(hit[1])
+        else:
+            faltantes.append(table_name)
+    if not faltantes:
+        return result
+
+    if connection.vendor == "postgresql":
+        cargadas: dict[str, set[str]] = {t: set() for t in faltantes}
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT table_name, column_name
+                FROM information_schema.columns
+                WHERE table_schema = %s AND table_name = ANY(%s)
+                """,
+                ["public", faltantes],
+            )
+            for table_name, column_name in cursor.fetchall():
+                cargadas[table_name].add(column_name)
+    else:
+        cargadas = {t: set(_load_columns(t)) for t in faltantes}
+
+    with _lock:
+        for table_name, columnas in cargadas.items():
+            if ttl > 0 and columnas:
+                _cache[(connection.alias, "columns", table_name)] = (time.monotonic() + ttl, frozenset(columnas))
+    result.update(cargadas)
+    return result
+
+
+def get_table_metadata(table_name: str) -> list[dict]:
+    """Retorna metadatos simples de columnas: nombre, nullable, default."""
+    return [dict(col) for col in _cached("metadata", table_name, _load_metadata)]
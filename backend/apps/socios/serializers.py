@@ -1,5 +1,4 @@
 from decimal import Decimal
-import math
 from datetime import date
 import uuid
 
@@ -7,6 +6,7 @@ from rest_framework import serializers
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from .metricas import calcular_metricas_prestamo
 from .models import Pago, Prestamo, Socio, TipoPrestamo, PoliticaAprobacion, Desembolso
 
 
@@ -218,48 +218,28 @@ class PrestamoSerializer(serializers.ModelSerializer):
         pagos = getattr(obj, '_pagos_filtrados', obj.pagos.all())
         return PagoSerializer(pagos, many=True).data
 
-    def _sum_pagos(self, obj: Prestamo) -> Decimal:
-        pagos = getattr(obj, '_pagos_filtrados', obj.pagos.all())
-        return sum((p.monto for p in pagos), Decimal('0'))
+    def _metricas(self, obj: Prestamo) -> dict:
+        metricas = getattr(obj, '_metricas', None)
+        if metricas is None:
+            pagos = getattr(obj, '_pagos_filtrados', obj.pagos.all())
+            metricas = calcular_metricas_prestamo(obj.monto, obj.fecha_vencimiento, pagos)
+            obj._metricas = metricas
+        return metricas
 
     def get_total_pagado(self, obj: Prestamo) -> str:
-        total = self._sum_pagos(obj)
-        return f"{total:.2f}"
+        return f"{self._metricas(obj)['total_pagado']:.2f}"
 
     def get_saldo_pendiente(self, obj: Prestamo) -> str:
-        saldo = obj.monto - self._sum_pagos(obj)
-        if saldo < Decimal('0'):
-            saldo = Decimal('0')
-        return f"{saldo:.2f}"
-
-    def _dias_en_mora(self, obj: Prestamo, saldo: Decimal) -> int:
-        if not obj.fecha_vencimiento or saldo <= Decimal('0'):
-            return 0
-        hoy = date.today()
-        if obj.fecha_vencimiento >= hoy:
-            return 0
-        return (hoy - obj.fecha_vencimiento).days
-
-    def _saldo_pendiente_decimal(self, obj: Prestamo) -> Decimal:
-        saldo = obj.monto - self._sum_pagos(obj)
-        return saldo if saldo > Decimal('0') else Decimal('0')
+        return f"{self._metricas(obj)['saldo_pendiente']:.2f}"
 
     def get_monto_en_mora(self, obj: Prestamo) -> str:
-        saldo = self._saldo_pendiente_decimal(obj)
-        dias = self._dias_en_mora(obj, saldo)
-        monto = saldo if dias > 0 else Decimal('0')
-        return f"{monto:.2f}"
+        return f"{self._metricas(obj)['monto_en_mora']:.2f}"
 
     def get_dias_en_mora(self, obj: Prestamo) -> int:
-        saldo = self._saldo_pendiente_decimal(obj)
-        return self._dias_en_mora(obj, saldo)
+        return self._metricas(obj)['dias_en_mora']
 
     def get_cuotas_vencidas(self, obj: Prestamo) -> int:
-        saldo = self._saldo_pendiente_decimal(obj)
-        dias = self._dias_en_mora(obj, saldo)
-        if dias <= 0:
-            return 0
-        return max(1, math.ceil(dias / 30))
+        return self._metricas(obj)['cuotas_vencidas']
 
     def get_socio_nombre(self, obj: Prestamo) -> str:
         return obj.socio.nombre_completo if obj.socio else ""
@@ -292,13 +272,19 @@ class HistorialCrediticioSerializer(serializers.Serializer):
         cuotas_vencidas_total = 0
         abiertos = morosos = pagados = 0
 
+        hoy = date.today()
         for prestamo in prestamos:
-            pagos_filtrados = getattr(prestamo, '_pagos_filtrados', prestamo.pagos.all())
-            pagos_mostrados += len(pagos_filtrados)
-            total_pagado = sum((p.monto for p in prestamo.pagos.all()), Decimal('0'))
-            saldo = prestamo.monto - total_pagado
-            saldo = saldo if saldo > Decimal('0') else Decimal('0')
-            saldo_pendiente_total += saldo
+            metricas_filtradas = getattr(prestamo, '_metricas', None)
+            if metricas_filtradas is not None:
+                pagos_mostrados += metricas_filtradas['pagos_registrados']
+            else:
+                pagos_mostrados += len(getattr(prestamo, '_pagos_filtrados', prestamo.pagos.all()))
+
+            # Saldo y mora se calculan sobre todos los pagos del préstamo
+            metricas = getattr(prestamo, '_metricas_totales', None)
+            if metricas is None:
+                metricas = calcular_metricas_prestamo(prestamo.monto, prestamo.fecha_vencimiento, prestamo.pagos.all(), hoy)
+            saldo_pendiente_total += metricas['saldo_pendiente']
 
             if prestamo.estado == Prestamo.Estados.MOROSO:
                 morosos += 1
@@ -307,14 +293,10 @@ class HistorialCrediticioSerializer(serializers.Serializer):
             else:
                 abiertos += 1
 
-            # Métricas de mora por fechas
-            if prestamo.fecha_vencimiento and saldo > Decimal('0'):
-                hoy = date.today()
-                if prestamo.fecha_vencimiento < hoy:
-                    dias_mora = (hoy - prestamo.fecha_vencimiento).days
-                    dias_mora_list.append(dias_mora)
-                    cuotas_vencidas_total += max(1, math.ceil(dias_mora / 30))
-                    monto_en_mora_total += saldo
+            if metricas['dias_en_mora'] > 0:
+                dias_mora_list.append(metricas['dias_en_mora'])
+                cuotas_vencidas_total += metricas['cuotas_vencidas']
+                monto_en_mora_total += metricas['monto_en_mora']
 
         dias_en_mora_max = max(dias_mora_list) if dias_mora_list else 0
         dias_en_mora_promedio = sum(dias_mora_list) / len(dias_mora_list) if dias_mora_list else 0
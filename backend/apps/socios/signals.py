@@ -0,0 +1,75 @@
+"""
+Signals que mantienen coherentes las cachés de los catálogos (tipos de
+préstamo y políticas de aprobación), de la búsqueda de socios y del estado de
+solicitud que consulta el chatbot y la secuencia de cambios de "Mis
+préstamos" (que también mantiene en `default` las lecturas de los socios con
+movimientos recientes, ver core/db_router.py).
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .busqueda import invalidar_busqueda_socios
+from .cambios import registrar_cambio, registrar_cambios
+from .catalogos import invalidar_catalogos
+from .estado_cliente import invalidar_estado_cliente, invalidar_estados_cliente
+from .http_cache import invalidar_catalogo
+from .models import CambioSocio, Desembolso, Pago, PoliticaAprobacion, Prestamo, Socio, TipoPrestamo
+
+
+@receiver(post_save, sender=TipoPrestamo)
+@receiver(post_delete, sender=TipoPrestamo)
+@receiver(post_save, sender=PoliticaAprobacion)
+@receiver(post_delete, sender=PoliticaAprobacion)
+def invalidar_caches_catalogo(sender, **kwargs):
+    """Descarta las filas y payloads cacheados del catálogo modificado."""
+    invalidar_catalogos(sender)
+    invalidar_catalogo(sender)
+
+
+@receiver(post_save, sender=Socio)
+@receiver(post_delete, sender=Socio)
+def invalidar_busqueda(sender, **kwargs):
+    """Las búsquedas cacheadas dejan de servirse tras alta, edición o baja de un socio."""
+    invalidar_busqueda_socios()
+
+
+@receiver(post_save, sender=Prestamo)
+@receiver(post_delete, sender=Prestamo)
+def invalidar_estado_prestamo(sender, instance, **kwargs):
+    invalidar_estado_cliente(instance.pk)
+
+
+@receiver(post_save, sender=Pago)
+@receiver(post_delete, sender=Pago)
+@receiver(post_save, sender=Desembolso)
+@receiver(post_delete, sender=Desembolso)
+def invalidar_estado_movimiento(sender, instance, **kwargs):
+    """Un pago o desembolso cambia saldo y estado visible del préstamo."""
+    invalidar_estado_cliente(instance.prestamo_id)
+
+
+@receiver(post_save, sender=Prestamo)
+@receiver(post_delete, sender=Prestamo)
+def registrar_cambio_prestamo(sender, instance, **kwargs):
+    registrar_cambio(instance.socio_id, CambioSocio.Entidades.PRESTAMO, instance.pk)
+
+
+def prestamos_creados_en_lote(prestamos) -> None:
+    """
+    Lo que hacen los receivers post_save de Prestamo, para altas con
+    `bulk_create` (que no dispara signals): un solo INSERT en cambio_socio
+    (que además mantiene al socio en `default` frente a la réplica) e
+    invalidación del estado que consulta el chatbot.
+    """
+    registrar_cambios([(p.socio_id, CambioSocio.Entidades.PRESTAMO, p.pk) for p in prestamos])
+    invalidar_estados_cliente(p.pk for p in prestamos)
+
+
+@receiver(post_save, sender=Pago)
+@receiver(post_delete, sender=Pago)
+@receiver(post_save, sender=Desembolso)
+@receiver(post_delete, sender=Desembolso)
+def registrar_cambio_movimiento(sender, instance, **kwargs):
+    """Pagos y desembolsos se ven en "Mis préstamos" como cambios del préstamo."""
+    socio_id = getattr(instance, "socio_id", None) or instance.prestamo.socio_id
+    registrar_cambio(socio_id, CambioSocio.Entidades.PRESTAMO, instance.prestamo_id)
@@ -0,0 +1,87 @@
+"""
+Tareas periódicas de mantenimiento que corre `run_scheduler`.
+
+Cada tarea devuelve un dict pequeño con lo que hizo; queda en el historial
+(`ejecucion_tarea`). Las actualizaciones masivas usan `QuerySet.update`, que no
+dispara signals: por eso registran a mano los cambios de "Mis préstamos" y
+descartan la caché de estado del chatbot de los préstamos tocados.
+"""
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import cambios, estado_cliente, eventos, exportaciones, notificaciones, programador
+from .models import CambioSocio, Prestamo
+from .programador import tarea
+
+
+ESTADOS_ABIERTOS = (Prestamo.Estados.ACTIVO, "aprobado", "desembolsado")
+
+
+def _prestamos_con_pagado():
+    return Prestamo.objects.annotate(
+        pagado=Coalesce(
+            Sum("pagos__monto"),
+            Value(Decimal("0")),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        )
+    )
+
+
+def _actualizar_estado(filas: list[tuple], estado: str) -> int:
+    """filas: (id, socio_id). Un UPDATE, un INSERT de cambios y un borrado de caché."""
+    if not filas:
+        return 0
+    ids = [pk for pk, _ in filas]
+    actualizados = Prestamo.objects.filter(pk__in=ids).update(estado=estado, updated_at=timezone.now())
+    cambios.registrar_cambios([(socio_id, CambioSocio.Entidades.PRESTAMO, pk) for pk, socio_id in filas])
+    estado_cliente.invalidar_estados_cliente(ids)
+    return actualizados
+
+
+@tarea("marcar_mora", cron="10 0 * * *")
+def marcar_mora(hoy: date | None = None) -> dict:
+    """Marca como morosos los préstamos abiertos vencidos con saldo pendiente."""
+    hoy = hoy or timezone.localdate()
+    filas = list(
+        _prestamos_con_pagado()
+        .filter(estado__in=ESTADOS_ABIERTOS, fecha_vencimiento__lt=hoy, pagado__lt=F("monto"))
+        .values_list("pk", "socio_id")
+    )
+    return {"morosos": _actualizar_estado(filas, Prestamo.Estados.MOROSO)}
+
+
+@tarea("conciliar_saldos", cron="20 0 * * *")
+def conciliar_saldos() -> dict:
+    """Pasa a pagado los préstamos abiertos o morosos cuyos pagos ya cubren el monto."""
+    filas = list(
+        _prestamos_con_pagado()
+        .filter(estado__in=(*ESTADOS_ABIERTOS, Prestamo.Estados.MOROSO), pagado__gte=F("monto"))
+        .values_list("pk", "socio_id")
+    )
+    return {"pagados": _actualizar_estado(filas, Prestamo.Estados.PAGADO)}
+
+
+# Fuera de la transacción del programador: cada exportación se reclama y se
+# confirma por separado (ver exportaciones.procesar_pendientes)
+@tarea("procesar_exportaciones", cron="* * * * *", transaccional=False)
+def procesar_exportaciones() -> dict:
+    """Genera las exportaciones de reportes pendientes (PDF grandes)."""
+    return exportaciones.procesar_pendientes()
+
+
+@tarea("purgar_bitacoras", cron="30 3 * * *")
+def purgar_bitacoras() -> dict:
+    """Borra eventos de cola, cambios, notificaciones enviadas, exportaciones e historial vencidos."""
+    return {
+        "eventos": eventos.purgar_eventos(),
+        "cambios": cambios.purgar_cambios(),
+        "notificaciones": notificaciones.purgar_notificaciones(),
+        "exportaciones": exportaciones.purgar_exportaciones(),
+        "ejecuciones": programador.purgar_historial(),
+    }
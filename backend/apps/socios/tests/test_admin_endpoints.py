@@ -1,4 +1,6 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
@@ -53,6 +55,51 @@ class SocioAdminEndpointsTests(APITestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['estado'], Socio.ESTADO_ACTIVO)
 
+    def test_list_socios_formato_columnas(self):
+        Socio.objects.create(nombre_completo='Otro Socio', documento='DOC-9')
+        self.authenticate(self.admin)
+        filas = self.client.get(reverse('socios-list')).json()
+
+        response = self.client.get(reverse('socios-list'), {'format': 'columns'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        columnas = response.json()
+        self.assertEqual(list(columnas), list(filas[0]))
+        self.assertEqual(columnas['documento'], [fila['documento'] for fila in filas])
+
+    def test_buscar_socios_prefijo_antes_que_parcial(self):
+        Socio.objects.create(nombre_completo='Ana Demostenes', documento='DOC-2')
+        Socio.objects.create(nombre_completo='Demo Perez', documento='DOC-3')
+        Socio.objects.create(nombre_completo='Carlos Ruiz', documento='77001')
+
+        self.authenticate(self.no_admin)
+        response = self.client.get(reverse('socios-buscar'), {'q': 'demo'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.authenticate(self.admin)
+        response = self.client.get(reverse('socios-buscar'), {'q': 'demo'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        nombres = [item['nombre_completo'] for item in response.data['results']]
+        self.assertEqual(nombres, ['Demo Perez', 'Ana Demostenes', 'Socio Demo'])
+        self.assertEqual(set(response.data['results'][0]), {'id', 'nombre_completo', 'documento'})
+
+        response = self.client.get(reverse('socios-buscar'), {'q': '770', 'limit': 1})
+        self.assertEqual([item['documento'] for item in response.data['results']], ['77001'])
+
+    @override_settings(SOCIO_BUSQUEDA_CACHE_SECONDS=30)
+    def test_buscar_socios_cachea_e_invalida_al_guardar(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.authenticate(self.admin)
+        url = reverse('socios-buscar')
+        self.client.get(url, {'q': 'soc'})
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'q': 'soc'})
+        self.assertEqual(len(response.data['results']), 1)
+
+        Socio.objects.create(nombre_completo='Socorro Diaz', documento='DOC-4')
+        response = self.client.get(url, {'q': 'soc'})
+        self.assertEqual(len(response.data['results']), 2)
+
     def test_put_updates_allowed_fields_and_logs_audit(self):
         self.authenticate(self.admin)
         payload = {
@@ -2,7 +2,8 @@ from decimal import Decimal
 from datetime import date
 import uuid
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.db import connection
 from rest_framework import status
@@ -165,3 +166,19 @@ class ChatbotEndpointsTests(TestCase):
         self.assertGreaterEqual(len(resp.data["pagos"]), 1)
         self.assertGreaterEqual(Decimal(prestamo["saldo_pendiente"]), Decimal("0"))
 
+    @override_settings(ESTADO_CLIENTE_CACHE_SECONDS=30)
+    def test_estado_solicitud_se_cachea_hasta_nuevo_pago(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        url = reverse("solicitudes-estado-cliente", args=[self.solicitud_aprobada_id])
+        pagos_iniciales = len(self.client.get(url).data["pagos"])
+
+        # bulk_create no dispara signals: se sigue sirviendo la respuesta cacheada
+        Pago.objects.bulk_create(
+            [Pago(prestamo=self.prestamo, monto=Decimal("1000.00"), fecha_pago=date.today(), referencia="BULK")]
+        )
+        self.assertEqual(len(self.client.get(url).data["pagos"]), pagos_iniciales)
+
+        Pago.objects.create(prestamo=self.prestamo, monto=Decimal("1000.00"), fecha_pago=date.today(), referencia="P2")
+        self.assertEqual(len(self.client.get(url).data["pagos"]), pagos_iniciales + 2)
+
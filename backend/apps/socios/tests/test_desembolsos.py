@@ -6,7 +6,7 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from apps.socios.models import Prestamo, Socio, TipoPrestamo, Desembolso, Pago
+from apps.socios.models import CambioSocio, Prestamo, Socio, TipoPrestamo, Desembolso, Pago
 from apps.usuarios.models import Usuario, Rol
 
 
@@ -76,6 +76,16 @@ class DesembolsoApiTests(TestCase):
         self.assertEqual(resp_ok.status_code, status.HTTP_201_CREATED, resp_ok.data)
         self.assertEqual(Desembolso.objects.count(), 1)
 
+    def test_post_registra_un_cambio_por_escritura(self):
+        self.client.force_authenticate(user=self.tesorero)
+        CambioSocio.objects.all().delete()
+        payload = {"prestamo_id": str(self.prestamo.id), "monto": "500000.00", "metodo_pago": "transferencia"}
+        resp = self.client.post(reverse("desembolsos-list-create"), payload, format="json")
+
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED, resp.data)
+        # Los receivers de Desembolso y del save del préstamo; sin el registro manual del alta por SQL
+        self.assertEqual(CambioSocio.objects.filter(objeto_id=str(self.prestamo.id)).count(), 2)
+
     def test_post_rechaza_prestamo_no_aprobado(self):
         self.client.force_authenticate(user=self.tesorero)
         self.prestamo.estado = Prestamo.Estados.MOROSO
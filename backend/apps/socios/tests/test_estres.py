@@ -0,0 +1,144 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APITestCase
+
+from apps.socios import estres, montecarlo
+from apps.socios.models import Pago, Prestamo, Socio, TipoPrestamo
+
+
+User = get_user_model()
+
+
+def _cartera(n=20_000, productos=("Consumo", "Vivienda")):
+    rng = np.random.default_rng(3)
+    return estres.CarteraEstres(
+        grupo=(rng.integers(0, len(productos), n) * len(estres.TRAMOS) + rng.integers(0, len(estres.TRAMOS), n)).astype(np.int64),
+        exposicion=rng.uniform(100, 10_000, n),
+        productos=productos,
+    )
+
+
+class SimuladorEstresTests(SimpleTestCase):
+    def test_perdida_esperada_coincide_con_la_analitica_sin_correlacion(self):
+        cartera = _cartera()
+        escenario = estres.construir_escenario({"nombre": "plano", "correlacion": 0}, cartera.productos)
+        resultado = estres.simular(cartera, [escenario], simulaciones=100, meses=12, semilla=5)[0]
+
+        p_default, _ = montecarlo.probabilidades_horizonte(escenario.pd, escenario.prepago, 12)
+        analitica = float((cartera.exposicion * escenario.lgd[cartera.grupo] * p_default[cartera.grupo]).sum())
+        self.assertAlmostEqual(float(resultado["perdida_esperada"]) / analitica, 1.0, delta=0.01)
+        self.assertEqual(resultado["provision_requerida"], resultado["perdida_esperada"])
+
+    def test_escenarios_adversos_pierden_mas_y_prepagan_menos(self):
+        cartera = _cartera()
+        escenarios = [estres.construir_escenario(nombre, cartera.productos) for nombre in ("base", "adverso", "severo")]
+        base, adverso, severo = estres.simular(cartera, escenarios, simulaciones=50, semilla=1)
+
+        self.assertLess(base["perdida_esperada"], adverso["perdida_esperada"])
+        self.assertLess(adverso["perdida_esperada"], severo["perdida_esperada"])
+        self.assertGreater(base["prepago_esperado"], severo["prepago_esperado"])
+        self.assertGreaterEqual(severo["perdida_p99"], severo["perdida_p95"])
+        self.assertEqual(len(base["detalle"]), len(cartera.productos) * len(estres.TRAMOS))
+
+    def test_ajuste_por_producto(self):
+        cartera = _cartera()
+        escenario = estres.construir_escenario(
+            {"nombre": "vivienda", "productos": {"Vivienda": {"factor_default": 0}}}, cartera.productos
+        )
+        resultado = estres.simular(cartera, [escenario], simulaciones=20, semilla=2)[0]
+        perdidas = {fila["producto"]: Decimal("0") for fila in resultado["detalle"]}
+        for fila in resultado["detalle"]:
+            perdidas[fila["producto"]] += fila["perdida_esperada"]
+        self.assertLess(perdidas["Vivienda"], Decimal("1.00"))
+        self.assertGreater(perdidas["Consumo"], Decimal("0"))
+
+    @override_settings(ESTRES_SIMULACIONES_POR_BLOQUE=10)
+    def test_misma_semilla_mismo_resultado_con_o_sin_pool(self):
+        cartera = _cartera(n=2_000)
+        escenarios = [estres.construir_escenario(nombre, cartera.productos) for nombre in ("base", "severo")]
+        en_proceso = estres.simular(cartera, escenarios, simulaciones=30, semilla=9)
+        self.assertIsNone(estres._pool)
+        self.addCleanup(estres.cerrar_pool)
+        with override_settings(ESTRES_WORKERS=2), patch.object(estres.os, "cpu_count", return_value=2):
+            con_pool = estres.simular(cartera, escenarios, simulaciones=30, semilla=9)
+            pool = estres._pool
+            estres.simular(cartera, escenarios, simulaciones=30, semilla=9)
+        self.assertEqual(en_proceso, con_pool)
+        # Un solo pool por proceso, reutilizado entre requests
+        self.assertIs(estres._pool, pool)
+
+    @override_settings(ESTRES_WORKERS=64)
+    def test_workers_acotados_por_cpu(self):
+        with patch.object(estres.os, "cpu_count", return_value=4):
+            self.assertEqual(estres._workers(), 4)
+        with override_settings(ESTRES_WORKERS=0):
+            self.assertEqual(estres._workers(), 1)
+
+    def test_valida_escenarios(self):
+        with self.assertRaises(ValidationError):
+            estres.construir_escenario("catastrofico", ("Consumo",))
+        with self.assertRaises(ValidationError):
+            estres.construir_escenario({"nombre": "x", "lgd": 1.5}, ("Consumo",))
+        with self.assertRaises(ValidationError):
+            estres.construir_escenario({"nombre": "x", "pd_tramo": {"180+": 0.9}}, ("Consumo",))
+
+
+class EstresEndpointTests(APITestCase):
+    def setUp(self):
+        patcher = patch("core.db_router.replica_configurada", return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.admin = User.objects.create_superuser(email="admin-estres@example.com", password="secret123", nombres="Admin")
+        self.no_admin = User.objects.create_user(email="user-estres@example.com", password="secret123", nombres="Usuario")
+        socio = Socio.objects.create(
+            nombre_completo="Socio Estres", documento="CC-EST", estado=Socio.ESTADO_ACTIVO, fecha_alta=date.today()
+        )
+        tipo = TipoPrestamo.objects.create(nombre="Consumo estres", tasa_interes_anual=Decimal("18"), plazo_meses=12)
+        hoy = date.today()
+        Prestamo.objects.create(
+            socio=socio, tipo=tipo, monto=Decimal("1000.00"), estado="activo",
+            fecha_desembolso=hoy - timedelta(days=400), fecha_vencimiento=hoy - timedelta(days=45),
+        )
+        al_dia = Prestamo.objects.create(
+            socio=socio, tipo=tipo, monto=Decimal("3000.00"), estado="activo",
+            fecha_desembolso=hoy, fecha_vencimiento=hoy + timedelta(days=365),
+        )
+        Pago.objects.create(prestamo=al_dia, monto=Decimal("500.00"), fecha_pago=hoy)
+        Prestamo.objects.create(
+            socio=socio, monto=Decimal("800.00"), estado="pagado", fecha_desembolso=hoy, fecha_vencimiento=hoy
+        )
+
+    def test_simula_cartera_por_producto_y_tramo(self):
+        self.client.force_authenticate(user=self.admin)
+        resp = self.client.post(
+            reverse("reportes-estres"),
+            {"escenarios": ["base", {"nombre": "propio", "factor_default": 2}], "simulaciones": 20, "semilla": 4},
+            format="json",
+        )
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["prestamos"], 2)
+        self.assertEqual(resp.data["exposicion"], "3500.00")
+        self.assertEqual(resp.data["semilla"], 4)
+        self.assertEqual([e["escenario"] for e in resp.data["escenarios"]], ["base", "propio"])
+        tramos = {(f["producto"], f["tramo"]): f["exposicion"] for f in resp.data["escenarios"][0]["detalle"]}
+        self.assertEqual(tramos, {("Consumo estres", "al_dia"): "2500.00", ("Consumo estres", "31-60"): "1000.00"})
+
+    def test_valida_parametros_y_permisos(self):
+        self.client.force_authenticate(user=self.admin)
+        resp = self.client.post(reverse("reportes-estres"), {"simulaciones": 10**6}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        resp = self.client.get(reverse("reportes-estres"))
+        self.assertIn("severo", resp.data["escenarios"])
+
+        self.client.force_authenticate(user=self.no_admin)
+        resp = self.client.post(reverse("reportes-estres"), {}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
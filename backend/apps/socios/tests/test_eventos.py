@@ -0,0 +1,111 @@
+from asgiref.sync import async_to_sync
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.socios import eventos
+from apps.socios.models import EventoCola
+from apps.socios.views.colas import _stream_eventos
+from apps.usuarios.models import Rol, Usuario
+
+
+@override_settings(MIGRATION_MODULES={"usuarios": None}, EVENTOS_SSE_MAX_SECONDS=0)
+class EventosColaStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.analista = Usuario.objects.create_user(
+            email="analista@test.com",
+            password="claveSegura123",
+            nombres="Analista",
+            rol=Rol.objects.create(nombre="ANALISTA"),
+        )
+        cls.tesorero = Usuario.objects.create_user(
+            email="tesorero@test.com",
+            password="claveSegura123",
+            nombres="Tesorero",
+            rol=Rol.objects.create(nombre="TESORERO"),
+        )
+        cls.socio_user = Usuario.objects.create_user(
+            email="socio@test.com",
+            password="claveSegura123",
+            nombres="Socio",
+            rol=Rol.objects.create(nombre="SOCIO"),
+        )
+
+    def leer_stream(self, user, **headers):
+        self.client.force_login(user)
+        resp = self.client.get(reverse("eventos-stream"), **headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "text/event-stream")
+        return async_to_sync(self._consumir)(resp.streaming_content)
+
+    @staticmethod
+    async def _consumir(contenido):
+        return b"".join([parte async for parte in contenido]).decode()
+
+    def test_reenvia_desde_last_event_id_segun_rol(self):
+        creada = eventos.publicar_evento(EventoCola.Tipos.SOLICITUD_CREADA, {"solicitud_id": "s1"})
+        eventos.publicar_evento(EventoCola.Tipos.SOLICITUD_DECIDIDA, {"solicitud_id": "s1", "estado": "aprobado"})
+        eventos.publicar_evento(EventoCola.Tipos.DESEMBOLSO_REGISTRADO, {"prestamo_id": "p1"})
+
+        cuerpo = self.leer_stream(self.analista, HTTP_LAST_EVENT_ID=str(creada.id - 1))
+        self.assertIn("event: solicitud_creada", cuerpo)
+        self.assertIn("event: solicitud_decidida", cuerpo)
+        self.assertNotIn("desembolso_registrado", cuerpo)
+
+        cuerpo = self.leer_stream(self.tesorero, HTTP_LAST_EVENT_ID=str(creada.id))
+        self.assertNotIn("solicitud_creada", cuerpo)
+        self.assertIn("event: desembolso_registrado", cuerpo)
+        self.assertIn('"prestamo_id": "p1"', cuerpo)
+
+    def test_sin_last_event_id_solo_eventos_nuevos(self):
+        eventos.publicar_evento(EventoCola.Tipos.SOLICITUD_CREADA, {"solicitud_id": "viejo"})
+        cuerpo = self.leer_stream(self.analista)
+        self.assertNotIn("viejo", cuerpo)
+        self.assertTrue(cuerpo.startswith("retry:"))
+
+    def test_evento_confirmado_tarde_no_se_pierde(self):
+        tardio = eventos.publicar_evento(EventoCola.Tipos.DESEMBOLSO_REGISTRADO, {"prestamo_id": "tarde"})
+        visto = eventos.publicar_evento(EventoCola.Tipos.SOLICITUD_CREADA, {"solicitud_id": "visto"})
+        # La transacción de `tardio` todavía no confirmó cuando el cliente conecta
+        tardio_id = tardio.id
+        tardio.delete()
+        tipos = {EventoCola.Tipos.DESEMBOLSO_REGISTRADO, EventoCola.Tipos.SOLICITUD_CREADA}
+        enviados = eventos.recientes(visto.id, timezone.now() - eventos.margen())
+        self.assertEqual(set(enviados), {visto.id})
+
+        EventoCola.objects.create(id=tardio_id, tipo=tardio.tipo, payload=tardio.payload)
+        cuerpo = async_to_sync(self._consumir_generador)(_stream_eventos(visto.id, tipos, enviados))
+
+        self.assertIn(f"id: {tardio_id}\nevent: desembolso_registrado", cuerpo)
+        self.assertNotIn('"solicitud_id": "visto"', cuerpo)
+        # El Last-Event-ID del cliente no retrocede al del evento tardío
+        self.assertTrue(cuerpo.endswith(f"id: {visto.id}\n\n"))
+
+    def test_reconexion_reenvia_el_margen_para_deduplicar(self):
+        primero = eventos.publicar_evento(EventoCola.Tipos.SOLICITUD_CREADA, {"solicitud_id": "s1"})
+        segundo = eventos.publicar_evento(EventoCola.Tipos.SOLICITUD_CREADA, {"solicitud_id": "s2"})
+        cuerpo = self.leer_stream(self.analista, HTTP_LAST_EVENT_ID=str(segundo.id))
+        self.assertIn(f"id: {primero.id}\n", cuerpo)
+        self.assertIn(f"id: {segundo.id}\n", cuerpo)
+
+        with override_settings(EVENTOS_MARGEN_SEGUNDOS=0):
+            cuerpo = self.leer_stream(self.analista, HTTP_LAST_EVENT_ID=str(segundo.id))
+        self.assertNotIn("solicitud_creada", cuerpo)
+
+    @staticmethod
+    async def _consumir_generador(generador):
+        return "".join([parte async for parte in generador])
+
+    def test_requiere_rol_de_cola(self):
+        self.client.force_login(self.socio_user)
+        self.assertEqual(self.client.get(reverse("eventos-stream")).status_code, 403)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("eventos-stream")).status_code, 401)
+
+    def test_purga_eventos_vencidos(self):
+        viejo = eventos.publicar_evento(EventoCola.Tipos.SOLICITUD_CREADA, {})
+        EventoCola.objects.filter(pk=viejo.pk).update(created_at=viejo.created_at.replace(year=2000))
+        eventos.publicar_evento(EventoCola.Tipos.SOLICITUD_CREADA, {})
+        self.assertEqual(eventos.purgar_eventos(horas=1), 1)
+        self.assertEqual(EventoCola.objects.count(), 1)
@@ -0,0 +1,193 @@
+import asyncio
+import csv
+import io
+import sys
+from datetime import date
+from decimal import Decimal
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.http import StreamingHttpResponse
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.socios.models import Pago, Prestamo, Socio, SocioAuditLog, TipoPrestamo
+from apps.socios.views import exportes
+from apps.socios.views.exportes import COLUMNAS_PAGOS, COLUMNAS_SOCIOS
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dependencia opcional
+    pq = None
+
+
+User = get_user_model()
+
+
+def _csv(resp) -> list[list[str]]:
+    return list(csv.reader(io.StringIO(b"".join(resp.streaming_content).decode("utf-8"))))
+
+
+class ExportacionTablaTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email="admin-tabla@example.com", password="secret123", nombres="Admin")
+        tipo = TipoPrestamo.objects.create(nombre="Consumo tabla", tasa_interes_anual=Decimal("18"), plazo_meses=12)
+        for i in range(5):
+            socio = Socio.objects.create(
+                nombre_completo=f"Socio, Tabla {i}", documento=f"CC-TAB{i}",
+                estado=Socio.ESTADO_ACTIVO if i else Socio.ESTADO_INACTIVO,
+            )
+            prestamo = Prestamo.objects.create(
+                socio=socio, tipo=tipo, monto=Decimal("1000.00"), estado="activo", fecha_desembolso=date(2026, 1, i + 1)
+            )
+            Pago.objects.create(prestamo=prestamo, monto=Decimal("250.50"), fecha_pago=date(2026, 2, 1))
+        SocioAuditLog.objects.create(socio=socio, action=SocioAuditLog.Actions.UPDATE, datos_nuevos={"telefono": "1"})
+
+    def setUp(self):
+        patcher = patch("core.db_router.replica_configurada", return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client.force_authenticate(user=self.admin)
+
+    def test_csv_de_socios_en_streaming(self):
+        resp = self.client.get(reverse("socios-export"), {"format": "csv", "estado": Socio.ESTADO_ACTIVO})
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(resp, StreamingHttpResponse)
+        self.assertTrue(resp["Content-Type"].startswith("text/csv"))
+        filas = _csv(resp)
+        self.assertEqual(filas[0], [nombre for nombre, _ in COLUMNAS_SOCIOS])
+        self.assertEqual(len(filas), 5)
+        self.assertIn("Socio, Tabla 1", [fila[1] for fila in filas])
+
+        filas = _csv(self.client.get(reverse("socios-export"), {"format": "csv", "tabla": "auditoria"}))
+        self.assertEqual(len(filas), 2)
+        self.assertEqual(filas[1][9], '{"telefono": "1"}')
+
+    def test_historial_y_reportes_en_csv(self):
+        filas = _csv(self.client.get(reverse("socios-historial-export-global"), {"format": "csv", "tabla": "pagos"}))
+        self.assertEqual(filas[0], [nombre for nombre, _ in COLUMNAS_PAGOS])
+        self.assertEqual(len(filas), 6)
+        self.assertEqual(filas[1][3], "250.5")
+
+        resp = self.client.get(reverse("reportes"), {"format": "csv", "entidad": "prestamos", "q": "CC-TAB3"})
+        filas = _csv(resp)
+        self.assertEqual(len(filas), 2)
+        self.assertEqual(filas[1][6:10], ["aprobado", "1000.0", "250.5", "749.5"])
+
+    def test_errores_se_responden_en_json(self):
+        resp = self.client.get(reverse("socios-historial-export-global"), {"format": "csv", "tabla": "cuotas"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(resp["Content-Type"], "application/json")
+        self.assertIn("tabla", resp.json())
+
+        with patch.dict(sys.modules, {"pyarrow": None, "pyarrow.parquet": None}):
+            resp = self.client.get(reverse("socios-export"), {"format": "parquet"})
+        self.assertEqual(resp.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+
+        resp = self.client.get(reverse("socios-export"))
+        self.assertIn("spreadsheetml", resp["Content-Type"])
+
+    @skipUnless(pq, "pyarrow no instalado")
+    def test_parquet_con_tipos(self):
+        resp = self.client.get(reverse("socios-historial-export-global"), {"format": "parquet"})
+
+        self.assertEqual(resp["Content-Type"], "application/vnd.apache.parquet")
+        tabla = pq.read_table(io.BytesIO(b"".join(resp.streaming_content)))
+        self.assertEqual(tabla.num_rows, 5)
+        self.assertEqual(str(tabla.schema.field("Saldo").type), "double")
+        self.assertEqual(str(tabla.schema.field("Plazo (meses)").type), "int64")
+        self.assertEqual(sorted(tabla.column("Pagado").to_pylist()), [250.5] * 5)
+
+        resp = self.client.get(reverse("reportes"), {"format": "parquet", "tabla": "socios"})
+        self.assertEqual(pq.read_table(io.BytesIO(b"".join(resp.streaming_content))).num_rows, 5)
+
+
+class ExportacionTablaASGITests(TransactionTestCase):
+    """El CSV/Parquet sale por ASGI en bloques, sin armar el archivo completo antes del primer byte."""
+
+    SOCIOS = 60
+
+    def setUp(self):
+        patcher = patch("core.db_router.replica_configurada", return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        admin = User.objects.create_superuser(email="admin-asgi@example.com", password="secret123", nombres="Admin")
+        Socio.objects.bulk_create(
+            Socio(nombre_completo=f"Socio ASGI {i:03d}", documento=f"CC-ASGI{i}", estado=Socio.ESTADO_ACTIVO)
+            for i in range(self.SOCIOS)
+        )
+        self.client.force_login(admin)
+
+    async def _get_asgi(self, query: str) -> tuple[list[dict], list[int]]:
+        """Pide /api/socios/export/ al handler ASGI; devuelve los mensajes y las filas leídas al enviar cada uno."""
+        leidas = [0]
+        original = exportes.filas_socios
+
+        def contar(qs):
+            for fila in original(qs):
+                leidas[0] += 1
+                yield fila
+
+        mensajes, leidas_por_mensaje = [], []
+        cuerpo_leido, desconexion = asyncio.Event(), asyncio.Event()
+
+        async def receive():
+            if not cuerpo_leido.is_set():
+                cuerpo_leido.set()
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await desconexion.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(mensaje):
+            mensajes.append(mensaje)
+            leidas_por_mensaje.append(leidas[0])
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": reverse("socios-export"),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"cookie", self.client.cookies.output(header="", sep=";").strip().encode()),
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+        with patch.object(exportes, "filas_socios", contar):
+            await ASGIHandler()(scope, receive, send)
+        desconexion.set()
+        return mensajes, leidas_por_mensaje
+
+    @patch("core.tablas.BLOQUE_CSV", 512)
+    async def test_csv_por_asgi_llega_en_bloques(self):
+        mensajes, leidas = await self._get_asgi("format=csv")
+
+        self.assertEqual(mensajes[0]["status"], 200)
+        cuerpos = [(m, n) for m, n in zip(mensajes, leidas) if m["type"] == "http.response.body" and m.get("body")]
+        self.assertGreater(len(cuerpos), 3)
+        # El primer bloque salió cuando aún faltaban filas por leer de la base
+        self.assertLess(cuerpos[0][1], self.SOCIOS)
+        filas = list(csv.reader(io.StringIO(b"".join(m["body"] for m, _ in cuerpos).decode("utf-8"))))
+        self.assertEqual(len(filas), self.SOCIOS + 1)
+
+    @skipUnless(pq, "pyarrow no instalado")
+    @patch("core.tablas.LOTE", 10)
+    async def test_parquet_por_asgi_llega_por_row_group(self):
+        mensajes, leidas = await self._get_asgi("format=parquet")
+
+        cuerpos = [(m, n) for m, n in zip(mensajes, leidas) if m["type"] == "http.response.body" and m.get("body")]
+        self.assertGreater(len(cuerpos), 3)
+        self.assertLess(cuerpos[0][1], self.SOCIOS)
+        tabla = pq.read_table(io.BytesIO(b"".join(m["body"] for m, _ in cuerpos)))
+        self.assertEqual(tabla.num_rows, self.SOCIOS)
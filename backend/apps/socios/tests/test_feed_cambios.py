@@ -0,0 +1,146 @@
+import json
+import tempfile
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.socios import feed_cambios
+from apps.socios.models import Pago, Prestamo, Socio
+
+
+User = get_user_model()
+
+
+def _solicitud(solicitud_id, socio_id, creada, modificada=None):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO solicitud (id, socio_id, monto, estado, created_at, updated_at) VALUES (%s, %s, %s, %s, %s, %s)",
+            [str(solicitud_id), str(socio_id), 1500, "pendiente", creada, modificada or creada],
+        )
+
+
+@override_settings(FEED_CAMBIOS_MARGEN_SEGUNDOS=0)
+class FeedCambiosTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email="admin-feed@example.com", password="secret123", nombres="Admin")
+        cls.no_admin = User.objects.create_user(email="user-feed@example.com", password="secret123", nombres="Usuario")
+        cls.socios = [
+            Socio.objects.create(nombre_completo=f"Socio Feed {i}", documento=f"CC-FEED{i}", estado=Socio.ESTADO_ACTIVO)
+            for i in range(5)
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS solicitud (
+                    id TEXT PRIMARY KEY,
+                    socio_id TEXT,
+                    monto REAL,
+                    tasa_interes REAL,
+                    plazo_meses INTEGER,
+                    descripcion TEXT,
+                    estado TEXT,
+                    created_at TEXT,
+                    updated_at TEXT,
+                    producto_id TEXT,
+                    tipo_prestamo_id TEXT,
+                    observaciones TEXT
+                );
+                """
+            )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.admin)
+
+    def _todas(self, entidad, cursor=None, limite=2):
+        items = []
+        while True:
+            params = {"entidad": entidad, "limite": limite}
+            if cursor:
+                params["cursor"] = cursor
+            resp = self.client.get(reverse("cambios-feed"), params)
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            items += resp.data["items"]
+            cursor = resp.data["cursor"]
+            if not resp.data["hay_mas"]:
+                return items, cursor
+
+    def test_paginas_por_cursor_sin_repetir_ni_saltar(self):
+        items, cursor = self._todas("socio")
+
+        self.assertEqual([i["id"] for i in items], [s.id for s in self.socios])
+        self.assertEqual({i["op"] for i in items}, {"insert"})
+        self.assertEqual(items[0]["datos"]["documento"], "CC-FEED0")
+
+        self.assertEqual(self._todas("socio", cursor)[0], [])
+        socio = self.socios[2]
+        socio.telefono = "3001234567"
+        socio.save()
+        prestamo = Prestamo.objects.create(
+            socio=socio, monto=Decimal("900.00"), estado="activo", fecha_desembolso=date(2026, 1, 1)
+        )
+        Pago.objects.create(prestamo=prestamo, monto=Decimal("100.00"), fecha_pago=date(2026, 2, 1))
+
+        cambios, _ = self._todas("socio", cursor)
+        self.assertEqual([(c["id"], c["op"]) for c in cambios], [(socio.id, "update")])
+        self.assertEqual(cambios[0]["datos"]["telefono"], "3001234567")
+        pagos, _ = self._todas("pago")
+        self.assertEqual([(p["op"], p["datos"]["prestamo_id"]) for p in pagos], [("insert", prestamo.id)])
+
+    def test_solicitud_desde_la_tabla_sin_modelo(self):
+        ahora = timezone.now()
+        primera, segunda = uuid.uuid4(), uuid.uuid4()
+        _solicitud(primera, self.socios[0].id, ahora - timedelta(minutes=5))
+        _solicitud(segunda, self.socios[1].id, ahora - timedelta(minutes=4))
+
+        items, cursor = self._todas("solicitud", limite=1)
+        self.assertEqual([i["id"] for i in items], [str(primera), str(segunda)])
+
+        with connection.cursor() as c:
+            c.execute("UPDATE solicitud SET estado = %s, updated_at = %s WHERE id = %s", ["aprobada", ahora, str(primera)])
+        cambios, _ = self._todas("solicitud", cursor)
+        self.assertEqual([(i["id"], i["op"], i["datos"]["estado"]) for i in cambios], [(str(primera), "update", "aprobada")])
+
+    def test_margen_y_validaciones(self):
+        with override_settings(FEED_CAMBIOS_MARGEN_SEGUNDOS=600):
+            self.assertEqual(feed_cambios.pagina("socio").items, [])
+
+        desde = (timezone.now() + timedelta(hours=1)).isoformat()
+        resp = self.client.get(reverse("cambios-feed"), {"entidad": "socio", "desde": desde})
+        self.assertEqual(resp.data["items"], [])
+        self.assertTrue(resp.data["cursor"])
+        resp = self.client.get(reverse("cambios-feed"), {"entidad": "pago", "cursor": resp.data["cursor"]})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        for params in ({"entidad": "socio", "cursor": "no-es-un-cursor"}, {"entidad": "cuota"}, {"entidad": "socio", "limite": 0}):
+            self.assertEqual(self.client.get(reverse("cambios-feed"), params).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=self.no_admin)
+        self.assertEqual(self.client.get(reverse("cambios-feed"), {"entidad": "socio"}).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_comando_escribe_jsonl_y_retoma(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            call_command("exportar_cambios", "--directorio", directorio, "--entidades", "socio,pago", "--lote", "2", stdout=StringIO())
+
+            archivos = list(Path(directorio).glob("socio_*.jsonl"))
+            self.assertEqual(len(archivos), 1)
+            lineas = [json.loads(linea) for linea in archivos[0].read_text().splitlines()]
+            self.assertEqual(len(lineas), 5)
+            self.assertEqual(lineas[0]["datos"]["id"], str(self.socios[0].id))
+            estado = json.loads((Path(directorio) / "estado.json").read_text())
+            self.assertEqual(set(estado), {"socio"})
+
+            salida = StringIO()
+            call_command("exportar_cambios", "--directorio", directorio, "--entidades", "socio", stdout=salida)
+            self.assertIn("socio: 0 cambios", salida.getvalue())
+            self.assertEqual(len(list(Path(directorio).glob("*.jsonl"))), 1)
@@ -1,11 +1,14 @@
 from datetime import date
 from decimal import Decimal
+from types import SimpleNamespace
 
 from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 
+from apps.socios.metricas import calcular_metricas_prestamo
 from apps.socios.models import Pago, Prestamo, Socio
 
 
@@ -166,3 +169,45 @@ class HistorialCrediticioTests(APITestCase):
         response = self.client.get(url, {'estado': 'foobar'})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('estado', response.data)
+
+    def test_filtro_por_fecha_no_consulta_pagos_por_prestamo(self):
+        url = reverse('socios-historial', kwargs={'socio_id': str(self.socio.id)})
+        self.authenticate(self.admin)
+        # adherencia a la replica (cambio_socio) + socio + prestamos + pagos precargados,
+        # sin importar cuantos prestamos haya
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {'desde': '2025-01-01', 'hasta': '2025-12-31'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_metricas_de_mora_por_prestamo(self):
+        url = reverse('socios-historial', kwargs={'socio_id': str(self.socio.id)})
+        self.authenticate(self.admin)
+        response = self.client.get(url)
+        prestamo = next(p for p in response.data['prestamos'] if p['id'] == str(self.prestamo_activo.id))
+        self.assertEqual(prestamo['total_pagado'], '5000.00')
+        self.assertEqual(prestamo['saldo_pendiente'], '5000.00')
+        self.assertEqual(prestamo['monto_en_mora'], '5000.00')
+        self.assertGreater(prestamo['dias_en_mora'], 0)
+        self.assertGreaterEqual(prestamo['cuotas_vencidas'], 1)
+        pagado = next(p for p in response.data['prestamos'] if p['id'] == str(self.prestamo_pagado.id))
+        self.assertEqual(pagado['dias_en_mora'], 0)
+        self.assertEqual(response.data['resumen']['monto_en_mora_total'], '11000.00')
+
+
+class MetricasPrestamoTests(SimpleTestCase):
+    def test_calcula_saldo_y_mora_en_una_pasada(self):
+        pagos = [SimpleNamespace(monto=Decimal('300')), SimpleNamespace(monto=Decimal('200'))]
+        metricas = calcular_metricas_prestamo(Decimal('1000'), date(2025, 1, 1), pagos, hoy=date(2025, 3, 2))
+        self.assertEqual(metricas['total_pagado'], Decimal('500'))
+        self.assertEqual(metricas['saldo_pendiente'], Decimal('500'))
+        self.assertEqual(metricas['dias_en_mora'], 60)
+        self.assertEqual(metricas['monto_en_mora'], Decimal('500'))
+        self.assertEqual(metricas['cuotas_vencidas'], 2)
+        self.assertEqual(metricas['pagos_registrados'], 2)
+
+    def test_sin_saldo_no_hay_mora(self):
+        pagos = [SimpleNamespace(monto=Decimal('1200'))]
+        metricas = calcular_metricas_prestamo(Decimal('1000'), date(2025, 1, 1), pagos, hoy=date(2025, 6, 1))
+        self.assertEqual(metricas['saldo_pendiente'], Decimal('0'))
+        self.assertEqual(metricas['dias_en_mora'], 0)
+        self.assertEqual(metricas['cuotas_vencidas'], 0)
@@ -0,0 +1,75 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from apps.socios.models import PoliticaAprobacion, TipoPrestamo
+
+
+User = get_user_model()
+
+
+class CatalogoGetCondicionalTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            email='admin@example.com',
+            password='secret123',
+            nombres='Admin',
+        )
+        self.tipo = TipoPrestamo.objects.create(
+            nombre='Personal',
+            descripcion='Tipo Personal',
+            tasa_interes_anual=Decimal('18.50'),
+            plazo_meses=24,
+            requisitos=['Documento'],
+            activo=True,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def test_respuesta_incluye_etag_y_cache_control(self):
+        response = self.client.get(reverse('tipos-prestamo-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['ETag'])
+        self.assertIn('Last-Modified', response)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_if_none_match_responde_304_sin_cuerpo(self):
+        url = reverse('tipos-prestamo-list')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_cambio_en_catalogo_genera_nuevo_etag(self):
+        url = reverse('tipos-prestamo-list')
+        etag = self.client.get(url)['ETag']
+        self.tipo.plazo_meses = 36
+        self.tipo.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data[0]['plazo_meses'], 36)
+
+    def test_filtros_tienen_etag_propio(self):
+        url = reverse('tipos-prestamo-list')
+        etag_todos = self.client.get(url)['ETag']
+        etag_filtrado = self.client.get(url, {'q': 'zzz'})['ETag']
+        self.assertNotEqual(etag_todos, etag_filtrado)
+        response = self.client.get(url, {'q': 'zzz'})
+        self.assertEqual(response.data, [])
+
+    def test_politicas_soportan_get_condicional(self):
+        PoliticaAprobacion.objects.create(
+            nombre='Base',
+            score_minimo=600,
+            antiguedad_min_meses=6,
+            ratio_cuota_ingreso_max=Decimal('0.350'),
+        )
+        url = reverse('politicas-aprobacion-public')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,20 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+
+class MigrarSiPendienteTests(TestCase):
+    def test_base_al_dia_no_hace_mas_que_una_consulta(self):
+        out = StringIO()
+        with self.assertNumQueries(1):
+            call_command("migrar_si_pendiente", stdout=out)
+        self.assertIn("al día", out.getvalue())
+
+    def test_check_informa_pendientes_sin_migrar(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM django_migrations WHERE app = %s AND name = %s", ["sessions", "0001_initial"])
+        with self.assertRaisesMessage(CommandError, "sessions.0001_initial"):
+            call_command("migrar_si_pendiente", "--check", stdout=StringIO())
@@ -2,13 +2,15 @@ from decimal import Decimal
 from datetime import date
 import uuid
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.db import connection
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from apps.socios.models import Socio, TipoPrestamo, Prestamo, Desembolso, Pago
+from apps.socios.schema import clear_schema_cache, get_table_columns, get_tables_columns
 from apps.usuarios.models import Usuario, Rol
 
 
@@ -151,3 +153,101 @@ class MisPrestamosApiTests(TestCase):
         self.assertIn(resp.data["prestamo"]["estado"], {"pagado", "desembolsado", "aprobado"})
         monto_pagado = Decimal(resp.data["pago"]["monto"])
         self.assertGreater(monto_pagado, Decimal("0"))
+
+    def test_totales_de_pagos_se_agregan_en_sql(self):
+        Pago.objects.create(prestamo=self.prestamo_desembolsado, monto=Decimal("100000.00"), fecha_pago=date.today())
+        Pago.objects.create(prestamo=self.prestamo_desembolsado, monto=Decimal("50000.00"), fecha_pago=date.today())
+        resp = self.client.get(reverse("prestamos-mis"))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        item = next(i for i in resp.data["prestamos"] if i["id"] == str(self.prestamo_desembolsado.id))
+        self.assertEqual(item["total_pagado"], "150000.00")
+        self.assertEqual(item["saldo_pendiente"], "1050000.00")
+        self.assertEqual(item["pagos_registrados"], 2)
+        self.assertTrue(item["tiene_desembolso"])
+
+    def test_consultas_no_crecen_con_la_cantidad_de_prestamos(self):
+        url = reverse("prestamos-mis")
+        self.client.get(url)  # carga perezosa de request.user.socio
+        with CaptureQueriesContext(connection) as base:
+            self.client.get(url)
+        for _ in range(3):
+            Prestamo.objects.create(
+                socio=self.socio,
+                tipo=self.tipo,
+                monto=Decimal("1000.00"),
+                estado="aprobado",
+                fecha_desembolso=date.today(),
+            )
+        with CaptureQueriesContext(connection) as ampliado:
+            self.client.get(url)
+        self.assertEqual(len(base.captured_queries), len(ampliado.captured_queries))
+
+    def test_delta_solo_trae_lo_modificado(self):
+        url = reverse("prestamos-mis")
+        completo = self.client.get(url)
+        self.assertTrue(completo.data["completo"])
+        Pago.objects.create(prestamo=self.prestamo_desembolsado, monto=Decimal("100000.00"), fecha_pago=date.today())
+
+        resp = self.client.get(url, {"since": completo.data["since"]})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertFalse(resp.data["completo"])
+        self.assertNotIn("resumen", resp.data)
+        ids = {item["id"] for item in resp.data["prestamos"]}
+        self.assertEqual(ids, {str(self.prestamo_desembolsado.id)})
+        self.assertEqual(resp.data["prestamos"][0]["total_pagado"], "100000.00")
+        self.assertEqual(resp.data["eliminados"], [])
+        self.assertNotEqual(resp.data["since"], completo.data["since"])
+
+    def test_delta_informa_prestamos_eliminados(self):
+        url = reverse("prestamos-mis")
+        prestamo = Prestamo.objects.create(
+            socio=self.socio, tipo=self.tipo, monto=Decimal("1000.00"), estado="aprobado", fecha_desembolso=date.today()
+        )
+        prestamo_id = str(prestamo.id)
+        token = self.client.get(url).data["since"]
+        prestamo.delete()
+
+        resp = self.client.get(url, {"since": token})
+        self.assertFalse(resp.data["completo"])
+        self.assertIn(prestamo_id, resp.data["eliminados"])
+        self.assertNotIn(prestamo_id, {item["id"] for item in resp.data["prestamos"]})
+
+    def test_token_invalido_devuelve_listado_completo(self):
+        resp = self.client.get(reverse("prestamos-mis"), {"since": "no-es-token"})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp.data["completo"])
+        self.assertEqual(resp.data["resumen"]["pendientes"], 1)
+
+    @override_settings(CAMBIOS_RETENCION_HORAS=1)
+    def test_token_vencido_devuelve_listado_completo(self):
+        resp = self.client.get(reverse("prestamos-mis"), {"since": "1.1000000000"})
+        self.assertTrue(resp.data["completo"])
+
+
+class SchemaCacheTests(TestCase):
+    def tearDown(self):
+        clear_schema_cache()
+
+    @override_settings(SCHEMA_CACHE_SECONDS=60)
+    def test_columnas_se_cachean_por_proceso(self):
+        clear_schema_cache()
+        self.assertIn("monto", get_table_columns("prestamo"))
+        with self.assertNumQueries(0):
+            self.assertIn("monto", get_table_columns("prestamo"))
+
+    @override_settings(SCHEMA_CACHE_SECONDS=60)
+    def test_tabla_inexistente_no_se_cachea(self):
+        clear_schema_cache()
+        self.assertEqual(get_table_columns("tabla_que_no_existe"), set())
+        with self.assertNumQueries(1):
+            get_table_columns("tabla_que_no_existe")
+
+    @override_settings(SCHEMA_CACHE_SECONDS=60)
+    def test_varias_tablas_comparten_cache(self):
+        clear_schema_cache()
+        tablas = get_tables_columns("prestamo", "pago")
+        self.assertIn("monto", tablas["prestamo"])
+        self.assertIn("fecha_pago", tablas["pago"])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_table_columns("pago"), tablas["pago"])
+            get_tables_columns("prestamo", "pago")
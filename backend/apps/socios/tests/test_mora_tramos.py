@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.socios.models import Pago, Prestamo, Socio, TipoPrestamo
+
+
+User = get_user_model()
+CORTE = date(2026, 6, 30)
+
+
+class MoraTramosTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email="admin-mora@example.com", password="secret123", nombres="Admin")
+        cls.no_admin = User.objects.create_user(email="user-mora@example.com", password="secret123", nombres="Usuario")
+        antiguo = Socio.objects.create(
+            nombre_completo="Socio Antiguo", documento="CC-MOR1", estado=Socio.ESTADO_ACTIVO, fecha_alta=date(2020, 1, 1)
+        )
+        nuevo = Socio.objects.create(
+            nombre_completo="Socio Nuevo", documento="CC-MOR2", estado=Socio.ESTADO_SUSPENDIDO, fecha_alta=date(2026, 1, 1)
+        )
+        consumo = TipoPrestamo.objects.create(nombre="Consumo mora", tasa_interes_anual=Decimal("18"), plazo_meses=12)
+
+        def prestamo(socio, monto, dias_atraso, tipo=consumo, estado="activo", pagado=None):
+            vencimiento = CORTE - timedelta(days=dias_atraso) if dias_atraso is not None else None
+            p = Prestamo.objects.create(
+                socio=socio, tipo=tipo, monto=Decimal(monto), estado=estado,
+                fecha_desembolso=date(2025, 1, 1), fecha_vencimiento=vencimiento,
+            )
+            if pagado:
+                Pago.objects.create(prestamo=p, monto=Decimal(pagado), fecha_pago=date(2026, 1, 1))
+            return p
+
+        prestamo(antiguo, "1000.00", -10, pagado="400.00")  # al día, saldo 600
+        prestamo(antiguo, "500.00", None)  # sin vencimiento: al día
+        prestamo(antiguo, "800.00", 1)  # 1-30
+        prestamo(nuevo, "700.00", 30, tipo=None)  # 1-30, sin tipo
+        prestamo(nuevo, "900.00", 31)  # 31-60
+        prestamo(antiguo, "300.00", 90, estado="moroso")  # 61-90
+        prestamo(nuevo, "2000.00", 91, pagado="500.00")  # 90+, saldo 1500
+        prestamo(antiguo, "650.00", 200, pagado="650.00")  # sin saldo: fuera
+        prestamo(antiguo, "999.00", 200, estado="pagado")  # cerrado: fuera
+
+    def setUp(self):
+        patcher = patch("core.db_router.replica_configurada", return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client.force_authenticate(user=self.admin)
+
+    def test_tramos_en_una_consulta(self):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(reverse("reportes-mora"), {"corte": CORTE.isoformat()})
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        reportes = [q["sql"] for q in queries.captured_queries if '"prestamo"' in q["sql"]]
+        self.assertEqual(len(reportes), 1)
+        self.assertIn("GROUP BY", reportes[0])
+        totales = resp.data["totales"]
+        self.assertEqual(totales["al_dia"], {"prestamos": 2, "saldo": "1100.00"})
+        self.assertEqual(totales["1-30"], {"prestamos": 2, "saldo": "1500.00"})
+        self.assertEqual(totales["31-60"], {"prestamos": 1, "saldo": "900.00"})
+        self.assertEqual(totales["61-90"], {"prestamos": 1, "saldo": "300.00"})
+        self.assertEqual(totales["90+"], {"prestamos": 1, "saldo": "1500.00"})
+        self.assertEqual(totales["total"], {"prestamos": 7, "saldo": "5300.00"})
+        self.assertEqual(totales["indice_mora"], "79.25")
+
+    def test_agrupa_por_tipo_y_segmento(self):
+        resp = self.client.get(reverse("reportes-mora"), {"corte": CORTE.isoformat(), "agrupar": "tipo,antiguedad"})
+
+        filas = {(f["tipo"], f["antiguedad"]): f for f in resp.data["filas"]}
+        self.assertEqual(
+            set(filas),
+            {("Consumo mora", "mas_3_anios"), ("Consumo mora", "menos_1_anio"), ("Sin tipo", "menos_1_anio")},
+        )
+        self.assertEqual(filas[("Sin tipo", "menos_1_anio")]["1-30"]["saldo"], "700.00")
+        self.assertEqual(filas[("Consumo mora", "menos_1_anio")]["total"]["saldo"], "2400.00")
+
+        resp = self.client.get(reverse("reportes-mora"), {"corte": CORTE.isoformat(), "agrupar": "estado_socio"})
+        self.assertEqual({f["estado_socio"] for f in resp.data["filas"]}, {"activo", "suspendido"})
+
+    def test_exporta_excel_y_valida(self):
+        resp = self.client.get(reverse("reportes-mora"), {"agrupar": "tipo", "export": "xlsx"})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIn("spreadsheetml", resp["Content-Type"])
+
+        resp = self.client.get(reverse("reportes-mora"), {"agrupar": "region"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=self.no_admin)
+        self.assertEqual(self.client.get(reverse("reportes-mora")).status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,70 @@
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.socios import notificaciones
+from apps.socios.models import Notificacion
+
+
+class TransporteQueFalla:
+    def __init__(self, error):
+        self.error = error
+
+    def enviar(self, notificacion):
+        raise self.error
+
+
+@override_settings(NOTIFY_RATE_PER_SECOND=0, NOTIFY_MAX_INTENTOS=3)
+class DespachoNotificacionesTests(TestCase):
+    def setUp(self):
+        notificaciones.encolar(
+            notificaciones.aviso_decision("socio@test.com", "abc", "aprobado"),
+            notificaciones.aviso_pago(None, "abc", "10.00", "90.00"),  # sin correo no se encola
+        )
+
+    def test_envia_pendientes_con_el_transporte_archivo(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ruta = Path(tmp) / "salida.jsonl"
+            conteo = notificaciones.despachar_lote(notificaciones.ArchivoTransporte(ruta))
+            lineas = [json.loads(linea) for linea in ruta.read_text(encoding="utf-8").splitlines()]
+
+        self.assertEqual(conteo, {"enviadas": 1, "reintentos": 0, "fallidas": 0})
+        self.assertEqual(lineas[0]["to"], "socio@test.com")
+        notificacion = Notificacion.objects.get()
+        self.assertEqual(notificacion.estado, Notificacion.Estados.ENVIADA)
+        self.assertIsNotNone(notificacion.enviada_at)
+        # Nada más que enviar
+        self.assertEqual(notificaciones.despachar_lote(notificaciones.ArchivoTransporte(ruta))["enviadas"], 0)
+
+    def test_error_transitorio_reintenta_con_backoff_hasta_el_maximo(self):
+        transporte = TransporteQueFalla(notificaciones.ErrorTransporte("timeout"))
+        conteo = notificaciones.despachar_lote(transporte)
+        self.assertEqual(conteo["reintentos"], 1)
+        notificacion = Notificacion.objects.get()
+        self.assertEqual(notificacion.intentos, 1)
+        self.assertGreater(notificacion.proximo_intento, timezone.now() + timedelta(seconds=20))
+
+        # Aún no vence el backoff: no se vuelve a tomar
+        self.assertEqual(notificaciones.despachar_lote(transporte), {"enviadas": 0, "reintentos": 0, "fallidas": 0})
+
+        for _ in range(2):
+            Notificacion.objects.update(proximo_intento=timezone.now())
+            conteo = notificaciones.despachar_lote(transporte)
+        self.assertEqual(conteo["fallidas"], 1)
+        notificacion.refresh_from_db()
+        self.assertEqual(notificacion.estado, Notificacion.Estados.FALLIDA)
+        self.assertEqual(notificacion.intentos, 3)
+
+    def test_error_permanente_no_se_reintenta(self):
+        conteo = notificaciones.despachar_lote(TransporteQueFalla(notificaciones.ErrorPermanente("HTTP 422")))
+        self.assertEqual(conteo["fallidas"], 1)
+        self.assertEqual(Notificacion.objects.get().ultimo_error, "HTTP 422")
+
+    def test_reclamar_lote_aparta_las_tomadas(self):
+        lote = notificaciones.reclamar_lote(10)
+        self.assertEqual(len(lote), 1)
+        self.assertEqual(notificaciones.reclamar_lote(10), [])
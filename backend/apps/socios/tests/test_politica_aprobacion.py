@@ -1,11 +1,15 @@
+import uuid
+from datetime import date, timedelta
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 
-from apps.socios.models import PoliticaAprobacion
+from apps.socios.models import PoliticaAprobacion, Prestamo, Socio
+from apps.socios.politicas import PoliticaCompilada, evaluar_entradas, evaluar_solicitud
 
 
 User = get_user_model()
@@ -105,3 +109,93 @@ class PoliticaAprobacionTests(APITestCase):
         self.assertIn('score_minimo', resp.data)
         self.assertIn('antiguedad_min_meses', resp.data)
         self.assertIn('ratio_cuota_ingreso_max', resp.data)
+
+
+class MotorPoliticasTests(SimpleTestCase):
+    def setUp(self):
+        self.estandar = PoliticaCompilada(
+            id='p1', nombre='Estandar', score_minimo=600, antiguedad_min_meses=6, ratio_max=Decimal('0.350'),
+        )
+        self.estricta = PoliticaCompilada(
+            id='p2', nombre='Estricta', score_minimo=800, antiguedad_min_meses=24, ratio_max=Decimal('0.250'),
+        )
+
+    def entradas(self, **overrides):
+        base = {
+            'socio_activo': True,
+            'monto': Decimal('5000000'),
+            'score': 700,
+            'antiguedad_meses': 12,
+            'ratio_cuota_ingreso': Decimal('0.300'),
+        }
+        base.update(overrides)
+        return base
+
+    def test_aprueba_si_cumple_alguna_politica(self):
+        resultado = evaluar_entradas(self.entradas(), (self.estricta, self.estandar))
+        self.assertEqual(resultado['recomendacion'], 'aprobar')
+        self.assertEqual(resultado['politica']['nombre'], 'Estandar')
+        self.assertEqual(len(resultado['politicas']), 2)
+
+    def test_rechaza_si_falla_todas(self):
+        resultado = evaluar_entradas(self.entradas(ratio_cuota_ingreso=Decimal('0.500')), (self.estandar,))
+        self.assertEqual(resultado['recomendacion'], 'rechazar')
+        self.assertIsNone(resultado['politica'])
+        reglas = {r['regla']: r['cumple'] for r in resultado['politicas'][0]['reglas']}
+        self.assertFalse(reglas['ratio_cuota_ingreso_max'])
+
+    def test_revisar_si_faltan_datos(self):
+        resultado = evaluar_entradas(self.entradas(score=None), (self.estandar,))
+        self.assertEqual(resultado['recomendacion'], 'revisar')
+
+    def test_sin_politicas_usa_regla_por_monto(self):
+        resultado = evaluar_entradas(self.entradas(monto=Decimal('15000000')), ())
+        self.assertEqual(resultado['recomendacion'], 'revisar')
+        self.assertEqual(resultado['motivo'], 'sin_politicas')
+
+    def test_socio_inactivo_rechaza(self):
+        resultado = evaluar_entradas(self.entradas(socio_activo=False), (self.estandar,))
+        self.assertEqual(resultado['recomendacion'], 'rechazar')
+
+
+class ExposicionSolicitudTests(TestCase):
+    def setUp(self):
+        PoliticaAprobacion.objects.create(
+            nombre='Estandar', score_minimo=600, antiguedad_min_meses=6, ratio_cuota_ingreso_max=Decimal('0.35'),
+        )
+        self.socio = Socio.objects.create(
+            nombre_completo='Socio Exposicion',
+            documento='CC-EXPO',
+            estado=Socio.ESTADO_ACTIVO,
+            fecha_alta=date.today() - timedelta(days=3 * 365),
+            datos_fiscales={'ingreso_mensual': 3000000, 'score': 750},
+        )
+        self.solicitud = {
+            'id': str(uuid.uuid4()), 'socio_id': str(self.socio.id), 'monto': 6000000, 'plazo_meses': 12,
+            'tasa_interes': 0,
+        }
+
+    def prestamo(self, pk=None):
+        return Prestamo.objects.create(
+            id=pk or uuid.uuid4(), socio=self.socio, monto=Decimal('6000000'), tasa_interes=Decimal('0'),
+            estado='aprobado', fecha_desembolso=date.today(), fecha_vencimiento=date.today() + timedelta(days=366),
+        )
+
+    def test_no_cuenta_el_prestamo_de_la_propia_solicitud(self):
+        self.prestamo(pk=uuid.UUID(self.solicitud['id']))
+
+        resultado = evaluar_solicitud(self.solicitud)
+
+        self.assertEqual(resultado['recomendacion'], 'aprobar')
+        self.assertEqual(Decimal(resultado['entradas']['exposicion_cuota_mensual']), 0)
+        self.assertEqual(resultado['entradas']['ratio_cuota_ingreso'], '0.167')
+
+    def test_otros_prestamos_vigentes_si_cuentan(self):
+        self.prestamo(pk=uuid.UUID(self.solicitud['id']))
+        self.prestamo()
+        self.prestamo()
+
+        resultado = evaluar_solicitud(self.solicitud)
+
+        self.assertEqual(resultado['recomendacion'], 'rechazar')
+        self.assertEqual(resultado['entradas']['ratio_cuota_ingreso'], '0.500')
@@ -0,0 +1,120 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+
+from apps.socios import exportaciones, programador
+from apps.socios.cron import Cron, CronInvalido
+from apps.socios.models import CambioSocio, EjecucionTarea, Pago, Prestamo, Socio, TareaProgramada
+
+
+class CronTests(SimpleTestCase):
+    def test_siguiente_respeta_pasos_y_rangos(self):
+        base = datetime(2026, 3, 2, 10, 7, tzinfo=dt_timezone.utc)  # lunes
+        self.assertEqual(Cron("*/15 * * * *").siguiente(base), base.replace(minute=15))
+        self.assertEqual(Cron("0 9-17 * * 1-5").siguiente(base), base.replace(hour=11, minute=0))
+        self.assertEqual(Cron("30 2 * * 0").siguiente(base), datetime(2026, 3, 8, 2, 30, tzinfo=dt_timezone.utc))
+        self.assertEqual(Cron("@monthly").siguiente(base), datetime(2026, 4, 1, 0, 0, tzinfo=dt_timezone.utc))
+
+    def test_dia_del_mes_o_de_la_semana(self):
+        # Como en cron: con ambos campos restringidos alcanza con uno
+        base = datetime(2026, 3, 2, 0, 0, tzinfo=dt_timezone.utc)
+        self.assertEqual(Cron("0 0 15 * 5").siguiente(base), datetime(2026, 3, 6, 0, 0, tzinfo=dt_timezone.utc))
+
+    def test_expresiones_invalidas(self):
+        for expresion in ("* * * *", "61 * * * *", "*/0 * * * *", "a * * * *", "0 0 31 2 *"):
+            with self.subTest(expresion=expresion), self.assertRaises(CronInvalido):
+                Cron(expresion).siguiente(datetime(2026, 1, 1, tzinfo=dt_timezone.utc))
+
+
+class ProgramadorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.socio = Socio.objects.create(
+            nombre_completo="Socio Tareas", documento="CC-TAR", estado=Socio.ESTADO_ACTIVO, fecha_alta=date.today()
+        )
+        vencido = date.today() - timedelta(days=40)
+        cls.vencido = Prestamo.objects.create(
+            socio=cls.socio, monto=Decimal("1000.00"), estado="activo",
+            fecha_desembolso=vencido - timedelta(days=300), fecha_vencimiento=vencido,
+        )
+        cls.cubierto = Prestamo.objects.create(
+            socio=cls.socio, monto=Decimal("500.00"), estado="activo",
+            fecha_desembolso=vencido - timedelta(days=300), fecha_vencimiento=vencido,
+        )
+        Pago.objects.create(prestamo=cls.cubierto, monto=Decimal("500.00"), fecha_pago=date.today())
+
+    def test_ejecuta_pendientes_y_registra_historial(self):
+        programador.sincronizar_registro()
+        TareaProgramada.objects.filter(pk__in=["marcar_mora", "conciliar_saldos"]).update(
+            proxima_ejecucion=timezone.now() - timedelta(minutes=1)
+        )
+        ultimo_cambio = CambioSocio.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+        ejecuciones = {e.tarea_id: e for e in programador.ejecutar_pendientes()}
+
+        self.assertEqual(set(ejecuciones), {"marcar_mora", "conciliar_saldos"})
+        self.assertEqual(ejecuciones["marcar_mora"].resultado, {"morosos": 1})
+        self.assertEqual(ejecuciones["conciliar_saldos"].resultado, {"pagados": 1})
+        self.vencido.refresh_from_db()
+        self.cubierto.refresh_from_db()
+        self.assertEqual(self.vencido.estado, Prestamo.Estados.MOROSO)
+        self.assertEqual(self.cubierto.estado, Prestamo.Estados.PAGADO)
+        self.assertEqual(CambioSocio.objects.filter(id__gt=ultimo_cambio).count(), 2)
+
+        fila = TareaProgramada.objects.get(pk="marcar_mora")
+        self.assertGreater(fila.proxima_ejecucion, timezone.now())
+        # Ya no está vencida: no se repite
+        self.assertEqual(programador.ejecutar_pendientes(), [])
+
+    def test_error_queda_en_el_historial_y_se_deshace(self):
+        def falla():
+            Prestamo.objects.filter(pk=self.vencido.pk).update(estado="cancelado")
+            raise RuntimeError("boom")
+
+        programador.tarea("tarea_que_falla", cron="@daily")(falla)
+        self.addCleanup(programador._registro.pop, "tarea_que_falla", None)
+
+        with self.assertLogs("apps.socios.programador", level="ERROR"):
+            ejecucion = programador.ejecutar("tarea_que_falla", forzar=True)
+
+        self.assertEqual(ejecucion.estado, EjecucionTarea.Estados.ERROR)
+        self.assertIn("boom", ejecucion.error)
+        self.vencido.refresh_from_db()
+        self.assertEqual(self.vencido.estado, "activo")
+        self.assertEqual(programador.estadisticas("tarea_que_falla")["errores"], 1)
+
+    def test_comando_ejecuta_y_lista_con_duraciones(self):
+        call_command("run_scheduler", "--tarea", "purgar_bitacoras", stdout=StringIO())
+        self.assertEqual(EjecucionTarea.objects.filter(tarea_id="purgar_bitacoras").count(), 1)
+
+        salida = StringIO()
+        call_command("run_scheduler", "--listar", stdout=salida)
+        linea = next(l for l in salida.getvalue().splitlines() if l.startswith("purgar_bitacoras"))
+        self.assertIn("ejecuciones: 1 (errores 0)", linea)
+        self.assertIn("p95", linea)
+
+
+class TareaNoTransaccionalTests(TransactionTestCase):
+    def test_exportaciones_corren_fuera_de_la_transaccion_del_programador(self):
+        vistos = []
+
+        def procesar_pendientes():
+            fila = TareaProgramada.objects.get(pk="procesar_exportaciones")
+            vistos.append((connection.in_atomic_block, fila.proxima_ejecucion > timezone.now()))
+            return {"listas": 0, "fallidas": 0}
+
+        with patch.object(exportaciones, "procesar_pendientes", side_effect=procesar_pendientes):
+            ejecucion = programador.ejecutar("procesar_exportaciones", forzar=True)
+
+        # Sin transacción abierta y con la reserva ya confirmada
+        self.assertEqual(vistos, [(False, True)])
+        self.assertEqual(ejecucion.estado, EjecucionTarea.Estados.OK)
+        self.assertEqual(ejecucion.resultado, {"listas": 0, "fallidas": 0})
+        self.assertIsNotNone(TareaProgramada.objects.get(pk="procesar_exportaciones").ultima_ejecucion)
+        self.assertEqual(programador.ejecutar_pendientes(), [])
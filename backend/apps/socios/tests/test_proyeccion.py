@@ -0,0 +1,151 @@
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.socios import proyeccion
+from apps.socios.models import Pago, Prestamo, Socio, TipoPrestamo
+from apps.socios.views import calcular_tabla_amortizacion
+
+
+User = get_user_model()
+
+
+def _cartera(*prestamos):
+    """prestamos: (monto, tasa_anual, plazo, fecha_desembolso, pagado)."""
+    return proyeccion.Cartera(
+        monto=np.array([float(p[0]) * 100 for p in prestamos]),
+        tasa_anual=np.array([float(p[1]) for p in prestamos]),
+        plazo=np.array([p[2] for p in prestamos], dtype=np.int64),
+        mes_desembolso=np.array([proyeccion.indice_mes(p[3]) for p in prestamos], dtype=np.int64),
+        pagado=np.array([float(p[4]) * 100 for p in prestamos]),
+    )
+
+
+class ProyectarTests(SimpleTestCase):
+    def test_coincide_con_tabla_de_amortizacion(self):
+        for monto, tasa, plazo in ((Decimal("10000.00"), Decimal("18.5"), 24), (Decimal("3500.00"), Decimal("0"), 7)):
+            with self.subTest(tasa=tasa, plazo=plazo):
+                cartera = _cartera((monto, tasa, plazo, date(2026, 1, 20), 0))
+                resultado = proyeccion.proyeccion_cartera(date(2026, 2, 1), plazo, cartera)
+                tabla = calcular_tabla_amortizacion(monto, tasa, plazo)["cuotas"]
+
+                self.assertEqual([str(f["capital"]) for f in resultado["meses"]], [c["capital"] for c in tabla])
+                self.assertEqual([str(f["interes"]) for f in resultado["meses"]], [c["interes"] for c in tabla])
+                self.assertEqual(resultado["totales"]["vencido"], Decimal("0.00"))
+
+    def test_pagos_cubren_cuotas_en_orden_y_el_resto_vencido(self):
+        # Cuotas 1 y 2 vencen antes de marzo; la 1 está pagada, la 2 queda vencida
+        cartera = _cartera(
+            (Decimal("1200.00"), Decimal("0"), 12, date(2025, 12, 5), Decimal("100.00")),
+            (Decimal("600.00"), Decimal("0"), 6, date(2026, 2, 10), Decimal("150.00")),
+        )
+        resultado = proyeccion.proyeccion_cartera(date(2026, 3, 1), 3, cartera)
+
+        self.assertEqual(resultado["totales"]["vencido"], Decimal("100.00"))
+        meses = {f["mes"]: f for f in resultado["meses"]}
+        # marzo: cuota 3 del primero (la 1 del segundo está pagada); abril: cuota 4 + la mitad de la 2
+        self.assertEqual(meses["2026-03"]["capital"], Decimal("100.00"))
+        self.assertEqual(meses["2026-03"]["cuotas"], 1)
+        self.assertEqual(meses["2026-04"]["capital"], Decimal("150.00"))
+        self.assertEqual(meses["2026-05"]["capital"], Decimal("200.00"))
+
+    def test_cartera_grande_en_pocos_segundos(self):
+        n = 200_000
+        rng = np.random.default_rng(7)
+        cartera = proyeccion.Cartera(
+            monto=rng.integers(50_000, 5_000_000, n).astype(np.float64),
+            tasa_anual=rng.choice([0.0, 12.0, 18.5, 24.0], n),
+            plazo=rng.choice([6, 12, 24, 36, 60], n).astype(np.int64),
+            mes_desembolso=proyeccion.indice_mes(date(2026, 1, 1)) - rng.integers(0, 48, n),
+            pagado=np.zeros(n),
+        )
+        inicio = proyeccion.indice_mes(date(2026, 1, 1))
+        flujo = proyeccion.proyectar(cartera, inicio, 60)
+
+        desfase = cartera.mes_desembolso - inicio
+        self.assertEqual(flujo["cuotas"][0], int(((desfase < 0) & (desfase + cartera.plazo >= 0)).sum()))
+        self.assertGreater(flujo["capital"][0], 0)
+
+
+class CargarCarteraTests(TestCase):
+    def setUp(self):
+        socio = Socio.objects.create(
+            nombre_completo="Socio Cartera", documento="CC-CART", estado=Socio.ESTADO_ACTIVO, fecha_alta=date.today()
+        )
+        tipo = TipoPrestamo.objects.create(nombre="Consumo cartera", tasa_interes_anual=Decimal("12"), plazo_meses=4)
+        self.prestamo = Prestamo.objects.create(
+            socio=socio, tipo=tipo, monto=Decimal("4000.00"), estado="activo", fecha_desembolso=date(2026, 1, 15)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE TABLE IF NOT EXISTS solicitud (id TEXT PRIMARY KEY, plazo_meses INTEGER, tasa_interes REAL)")
+            cursor.execute(
+                "INSERT INTO solicitud (id, plazo_meses, tasa_interes) VALUES (%s, %s, %s), (%s, %s, %s)",
+                [str(self.prestamo.pk), 10, 24.0, "00000000-0000-0000-0000-000000000001", 36, 5.0],
+            )
+
+    def test_solo_lee_las_solicitudes_de_los_prestamos_proyectados(self):
+        with CaptureQueriesContext(connection) as consultas:
+            cartera = proyeccion.cargar_cartera()
+
+        self.assertEqual(cartera.plazo.tolist(), [10])
+        self.assertEqual(cartera.tasa_anual.tolist(), [24.0])
+        lecturas = [q["sql"] for q in consultas if "FROM solicitud" in q["sql"] and q["sql"].startswith("SELECT")]
+        self.assertEqual(len(lecturas), 1)
+        self.assertIn("WHERE id IN", lecturas[0])
+
+
+class ProyeccionEndpointTests(APITestCase):
+    def setUp(self):
+        # Sin réplica: la vista lee de `default`, donde están los datos de la prueba
+        patcher = patch("core.db_router.replica_configurada", return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.admin = User.objects.create_superuser(email="admin-proy@example.com", password="secret123", nombres="Admin")
+        self.no_admin = User.objects.create_user(email="user-proy@example.com", password="secret123", nombres="Usuario")
+        socio = Socio.objects.create(
+            nombre_completo="Socio Proyeccion", documento="CC-PROY", estado=Socio.ESTADO_ACTIVO, fecha_alta=date.today()
+        )
+        tipo = TipoPrestamo.objects.create(nombre="Consumo proyeccion", tasa_interes_anual=Decimal("12"), plazo_meses=4)
+        prestamo = Prestamo.objects.create(
+            socio=socio, tipo=tipo, monto=Decimal("4000.00"), estado="activo", fecha_desembolso=date(2026, 1, 15)
+        )
+        Pago.objects.create(prestamo=prestamo, monto=Decimal("500.00"), fecha_pago=date(2026, 2, 15))
+        Prestamo.objects.create(
+            socio=socio, tipo=tipo, monto=Decimal("999.00"), estado="pagado", fecha_desembolso=date(2026, 1, 15)
+        )
+
+    def test_admin_obtiene_flujo_mensual(self):
+        self.client.force_authenticate(user=self.admin)
+        resp = self.client.get(reverse("reportes-proyeccion"), {"desde": "2026-02-01", "meses": 6})
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["prestamos"], 1)
+        self.assertEqual(len(resp.data["meses"]), 6)
+        tabla = calcular_tabla_amortizacion(Decimal("4000.00"), Decimal("12"), 4)
+        # Cuota 1 (febrero) quedó parcialmente cubierta con el pago
+        total = sum(Decimal(c["capital"]) + Decimal(c["interes"]) for c in tabla["cuotas"])
+        self.assertEqual(Decimal(resp.data["totales"]["total"]), total - Decimal("500.00"))
+        self.assertEqual(resp.data["meses"][-1]["cuotas"], 0)
+
+    def test_exporta_excel_y_valida_parametros(self):
+        self.client.force_authenticate(user=self.admin)
+        resp = self.client.get(reverse("reportes-proyeccion"), {"export": "xlsx"})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIn("spreadsheetml", resp["Content-Type"])
+
+        resp = self.client.get(reverse("reportes-proyeccion"), {"meses": 500})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requiere_admin(self):
+        self.client.force_authenticate(user=self.no_admin)
+        resp = self.client.get(reverse("reportes-proyeccion"))
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
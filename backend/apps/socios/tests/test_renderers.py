@@ -0,0 +1,29 @@
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import JSONRapidoRenderer, a_columnas
+
+
+class RenderersTests(SimpleTestCase):
+    def test_json_rapido_igual_al_renderer_de_drf(self):
+        data = {
+            "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "monto": Decimal("1500.50"),
+            "creado": datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+            "fecha": date(2024, 5, 1),
+            "nombre": "Peñalosa\u2028",
+            "items": [{"n": 1}, {"n": None}],
+            1: "clave numérica",
+        }
+        self.assertEqual(JSONRapidoRenderer().render(data), JSONRenderer().render(data))
+
+    def test_a_columnas_completa_campos_ausentes(self):
+        filas = [{"id": 1, "monto": "10"}, {"id": 2, "nota": "x"}]
+        self.assertEqual(
+            a_columnas(filas),
+            {"id": [1, 2], "monto": ["10", None], "nota": [None, "x"]},
+        )
@@ -0,0 +1,65 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.socios.models import CambioSocio, Pago, Prestamo, Socio
+from core.db_router import leer_desde_replica
+
+
+class ReplicaRouterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.socio = Socio.objects.create(
+            nombre_completo="Socio Replica",
+            documento="CC-REP",
+            estado=Socio.ESTADO_ACTIVO,
+            fecha_alta=date.today(),
+        )
+        cls.prestamo = Prestamo.objects.create(
+            socio=cls.socio, monto=Decimal("1000.00"), estado="activo", fecha_desembolso=date.today()
+        )
+
+    def test_lecturas_van_a_la_replica_solo_dentro_del_bloque(self):
+        self.assertEqual(Prestamo.objects.all().db, "default")
+        with leer_desde_replica():
+            self.assertEqual(Prestamo.objects.all().db, "replica")
+        self.assertEqual(Prestamo.objects.all().db, "default")
+
+    def test_tras_escribir_la_request_lee_de_default(self):
+        with leer_desde_replica():
+            Pago.objects.create(prestamo=self.prestamo, monto=Decimal("10.00"), fecha_pago=date.today())
+            self.assertEqual(Prestamo.objects.all().db, "default")
+
+    @override_settings(DB_REPLICA_STICKY_SECONDS=30)
+    def test_socio_que_acaba_de_pagar_no_lee_de_la_replica(self):
+        CambioSocio.objects.update(created_at=timezone.now() - timedelta(hours=1))
+        with leer_desde_replica(socio_id=self.socio.id):
+            self.assertEqual(Prestamo.objects.all().db, "replica")
+
+        Pago.objects.create(prestamo=self.prestamo, monto=Decimal("10.00"), fecha_pago=date.today())
+
+        with leer_desde_replica(socio_id=self.socio.id):
+            self.assertEqual(Prestamo.objects.all().db, "default")
+        with leer_desde_replica():
+            self.assertEqual(Prestamo.objects.all().db, "replica")
+
+    @override_settings(DB_REPLICA_STICKY_SECONDS=30)
+    def test_adherencia_se_lee_de_la_base_compartida(self):
+        # Cambio registrado por otro worker: no hay nada en la memoria de este proceso
+        cambio = CambioSocio.objects.create(
+            socio_id=self.socio.id, entidad=CambioSocio.Entidades.PRESTAMO, objeto_id=str(self.prestamo.id)
+        )
+        with leer_desde_replica(socio_id=self.socio.id):
+            self.assertEqual(Prestamo.objects.all().db, "default")
+
+        CambioSocio.objects.filter(pk=cambio.pk).update(created_at=timezone.now() - timedelta(seconds=31))
+        with leer_desde_replica(socio_id=self.socio.id):
+            self.assertEqual(Prestamo.objects.all().db, "replica")
+
+    def test_sin_replica_no_consulta_la_adherencia(self):
+        with patch("core.db_router.replica_configurada", return_value=False), self.assertNumQueries(0):
+            with leer_desde_replica(socio_id=self.socio.id):
+                self.assertEqual(Prestamo.objects.all().db, "default")
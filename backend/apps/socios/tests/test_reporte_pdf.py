@@ -0,0 +1,169 @@
+import io
+import os
+import re
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.socios import exportaciones, reporte_pdf
+from apps.socios.models import ExportacionReporte, Pago, Prestamo, Socio, TipoPrestamo
+from core import db_router
+
+
+User = get_user_model()
+FILTROS = {"entidad": "todos", "estado": [], "q": "", "desde": None, "hasta": None, "tipo": ""}
+
+
+def _paginas(contenido: bytes) -> int:
+    return len(re.findall(rb"/Type\s*/Page\b", contenido))
+
+
+class ReportePDFTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email="admin-pdf@example.com", password="secret123", nombres="Admin")
+        tipo = TipoPrestamo.objects.create(nombre="Consumo pdf", tasa_interes_anual=Decimal("18"), plazo_meses=12)
+        for i in range(60):
+            socio = Socio.objects.create(
+                nombre_completo=f"Socio Ñandú {i}", documento=f"CC-PDF{i}", estado=Socio.ESTADO_ACTIVO
+            )
+            prestamo = Prestamo.objects.create(
+                socio=socio, tipo=tipo, monto=Decimal("1000.00"), estado="activo", fecha_desembolso=date(2026, 1, 1)
+            )
+            if i % 2:
+                Pago.objects.create(prestamo=prestamo, monto=Decimal("1000.00"), fecha_pago=date(2026, 2, 1))
+
+    def setUp(self):
+        patcher = patch("core.db_router.replica_configurada", return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client.force_authenticate(user=self.admin)
+
+    def test_genera_paginas_con_totales(self):
+        destino = io.BytesIO()
+        filas = reporte_pdf.generar(FILTROS, destino)
+
+        contenido = destino.getvalue()
+        self.assertEqual(filas, 120)
+        self.assertTrue(contenido.startswith(b"%PDF"))
+        self.assertGreater(_paginas(contenido), 2)
+
+        destino = io.BytesIO()
+        with override_settings(REPORTES_PDF_MAX_FILAS=10):
+            self.assertEqual(reporte_pdf.generar({**FILTROS, "estado": ["pagado"], "entidad": "prestamos"}, destino), 10)
+
+    def test_pdf_chico_va_en_la_respuesta(self):
+        resp = self.client.get(reverse("reportes"), {"entidad": "prestamos", "q": "CC-PDF1", "export": "pdf"})
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp["Content-Type"], "application/pdf")
+        self.assertTrue(b"".join(resp.streaming_content).startswith(b"%PDF"))
+        self.assertFalse(ExportacionReporte.objects.exists())
+
+    @override_settings(REPORTES_PDF_MAX_FILAS_SINCRONO=50)
+    def test_pdf_grande_se_exporta_en_segundo_plano(self):
+        resp = self.client.get(reverse("reportes"), {"export": "pdf", "estado": "pagado"})
+
+        self.assertEqual(resp.status_code, status.HTTP_202_ACCEPTED)
+        url = reverse("reportes-exportacion", args=[resp.data["id"]])
+        exportacion = ExportacionReporte.objects.get()
+        self.assertEqual(exportacion.parametros["estado"], ["pagado"])
+        self.assertEqual(self.client.get(url, {"descargar": "1"}).status_code, status.HTTP_409_CONFLICT)
+
+        self.assertEqual(exportaciones.procesar_pendientes(), {"listas": 1, "fallidas": 0})
+
+        estado = self.client.get(url)
+        self.assertEqual(estado.data["estado"], ExportacionReporte.Estados.LISTA)
+        self.assertEqual(estado.data["filas"], 30)
+        descarga = self.client.get(url, {"descargar": "1"})
+        self.assertEqual(descarga["Content-Type"], "application/pdf")
+        self.assertTrue(descarga.content.startswith(b"%PDF"))
+
+    def test_fallo_y_purga(self):
+        exportacion = exportaciones.encolar(self.admin, ExportacionReporte.Formatos.PDF, {**FILTROS, "desde": "no-es-fecha"})
+
+        with self.assertLogs("apps.socios.exportaciones", "ERROR"):
+            self.assertEqual(exportaciones.procesar_pendientes(), {"listas": 0, "fallidas": 1})
+        exportacion.refresh_from_db()
+        self.assertEqual(exportacion.estado, ExportacionReporte.Estados.FALLIDA)
+        self.assertTrue(exportacion.error)
+
+        exportaciones.procesar(exportaciones.encolar(None, ExportacionReporte.Formatos.PDF, FILTROS))
+        self.assertEqual(exportaciones.purgar_exportaciones(horas=0), 2)
+        self.assertFalse(ExportacionReporte.objects.exists())
+
+    def test_error_de_base_durante_la_generacion_marca_fallida(self):
+        def generar_con_error(filtros, destino):
+            # Rompe la transacción como lo haría una consulta fallida en PostgreSQL
+            Socio.objects.create(nombre_completo="Duplicado", documento="CC-PDF0")
+
+        exportacion = exportaciones.encolar(self.admin, ExportacionReporte.Formatos.PDF, FILTROS)
+        with patch.object(exportaciones, "_generador", return_value=generar_con_error), \
+                self.assertLogs("apps.socios.exportaciones", "ERROR"):
+            self.assertEqual(exportaciones.procesar_pendientes(), {"listas": 0, "fallidas": 1})
+
+        exportacion.refresh_from_db()
+        self.assertEqual(exportacion.estado, ExportacionReporte.Estados.FALLIDA)
+        self.assertIn("UNIQUE", exportacion.error.upper())
+
+    def test_descarga_no_depende_del_disco_del_programador(self):
+        exportacion = exportaciones.encolar(self.admin, ExportacionReporte.Formatos.PDF, FILTROS)
+        cwd = os.getcwd()
+        self.addCleanup(os.chdir, cwd)
+
+        # "Programador": otro directorio de trabajo y de temporales, que se borra al terminar
+        with tempfile.TemporaryDirectory() as disco_programador:
+            os.chdir(disco_programador)
+            with patch.object(tempfile, "tempdir", disco_programador):
+                exportaciones.procesar_pendientes()
+            self.assertEqual(os.listdir(disco_programador), [])
+            os.chdir(cwd)
+
+        descarga = self.client.get(reverse("reportes-exportacion", args=[exportacion.id]), {"descargar": "1"})
+
+        self.assertEqual(descarga.status_code, status.HTTP_200_OK)
+        self.assertIn(exportacion.id.hex[:8], descarga["Content-Disposition"])
+        exportacion.refresh_from_db()
+        self.assertEqual(descarga.content, bytes(exportacion.contenido))
+        self.assertTrue(descarga.content.startswith(b"%PDF"))
+
+
+class ExportacionEnSegundoPlanTests(TransactionTestCase):
+    def test_genera_desde_la_replica_fuera_de_la_transaccion_del_reclamo(self):
+        exportacion = exportaciones.encolar(None, ExportacionReporte.Formatos.PDF, FILTROS)
+        vistos = []
+
+        def generar(filtros, destino):
+            vistos.append((
+                connection.in_atomic_block,
+                db_router.ReplicaRouter().db_for_read(ExportacionReporte),
+                ExportacionReporte.objects.using("default").get(pk=exportacion.pk).iniciada_at is not None,
+            ))
+            destino.write(b"%PDF-")
+            return 1
+
+        with patch.object(db_router, "replica_configurada", return_value=True), \
+                patch.object(exportaciones, "_generador", return_value=generar):
+            self.assertEqual(exportaciones.procesar_pendientes(), {"listas": 1, "fallidas": 0})
+
+        # Sin transacción abierta (ni lock de la fila), lecturas a la réplica y reclamo ya confirmado
+        self.assertEqual(vistos, [(False, db_router.REPLICA, True)])
+
+    @override_settings(EXPORTACIONES_LEASE_SECONDS=60)
+    def test_reclamo_vigente_no_se_toma_dos_veces(self):
+        exportacion = exportaciones.encolar(None, ExportacionReporte.Formatos.PDF, FILTROS)
+        self.assertEqual(exportaciones._reclamar().pk, exportacion.pk)
+        self.assertIsNone(exportaciones._reclamar())
+
+        # Proceso caído: al vencer el lease otra instancia la retoma
+        ExportacionReporte.objects.filter(pk=exportacion.pk).update(iniciada_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(exportaciones._reclamar().pk, exportacion.pk)
@@ -86,7 +86,7 @@ class ReportesViewTest(SimpleTestCase):
             tipo=SimpleNamespace(id="t1", nombre="Libre inversion"),
             desembolsos_count=1,
         )
-        with patch("apps.socios.views.Socio") as socio_model, patch("apps.socios.views.Prestamo") as prestamo_model:
+        with patch("apps.socios.reportes.Socio") as socio_model, patch("apps.socios.reportes.Prestamo") as prestamo_model:
             socio_model.objects = FakeQS([])
             prestamo_model.objects = FakeQS([prestamo_pagado])
 
@@ -110,7 +110,7 @@ class ReportesViewTest(SimpleTestCase):
             tipo=SimpleNamespace(id="t2", nombre="Demo"),
             desembolsos_count=0,
         )
-        with patch("apps.socios.views.Socio") as socio_model, patch("apps.socios.views.Prestamo") as prestamo_model:
+        with patch("apps.socios.reportes.Socio") as socio_model, patch("apps.socios.reportes.Prestamo") as prestamo_model:
             socio_model.objects = FakeQS([socio])
             prestamo_model.objects = FakeQS([prestamo])
 
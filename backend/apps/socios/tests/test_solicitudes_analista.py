@@ -1,15 +1,20 @@
 import uuid
 from datetime import date
+from unittest import mock
 
 from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from apps.socios.models import Socio, TipoPrestamo
+from apps.socios import catalogos
+from apps.socios.models import CambioSocio, EventoCola, Notificacion, PoliticaAprobacion, Prestamo, Socio, TipoPrestamo
+from apps.socios.views import solicitudes as vistas_solicitudes
 from apps.usuarios.models import Usuario, Rol
+from core.db_router import escritura_reciente
 
 
 def ensure_tables_with_observaciones():
@@ -187,6 +192,12 @@ class SolicitudAnalistaEndpointsTests(TestCase):
         self.assertEqual(row[0], "aprobado")
         # comentario se guarda en observaciones si existe
         self.assertEqual(row[1], "Aprobada por score")
+        evento = EventoCola.objects.get(tipo=EventoCola.Tipos.SOLICITUD_DECIDIDA)
+        self.assertEqual(evento.payload["solicitud_id"], solicitud_id)
+        self.assertEqual(evento.payload["estado"], "aprobado")
+        aviso = Notificacion.objects.get()
+        self.assertEqual(aviso.destinatario, "socio@test.com")
+        self.assertEqual(aviso.estado, Notificacion.Estados.PENDIENTE)
 
     def test_rechazar_requiere_analista(self):
         solicitud_id = self._insert_solicitud()
@@ -195,3 +206,134 @@ class SolicitudAnalistaEndpointsTests(TestCase):
         self.client.force_authenticate(self.usuario_socio)
         resp = self.client.patch(url, {"comentario": "Falta documentacion"}, format="json")
         self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_evaluar_aplica_politicas_activas(self):
+        PoliticaAprobacion.objects.create(
+            nombre="Estandar", score_minimo=600, antiguedad_min_meses=0, ratio_cuota_ingreso_max="0.500",
+        )
+        self.socio.datos_fiscales = {"score": 720, "ingreso_mensual": "2000000"}
+        self.socio.save()
+        solicitud_id = self._insert_solicitud()
+
+        self.client.force_authenticate(self.analista)
+        resp = self.client.get(reverse("solicitudes-evaluar", kwargs={"solicitud_id": solicitud_id}))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        analisis = resp.data["analisis"]
+        self.assertEqual(analisis["recomendacion"], "aprobar")
+        self.assertEqual(analisis["politica"]["nombre"], "Estandar")
+        self.assertEqual(analisis["entradas"]["score"], 720)
+
+    def test_evaluacion_lote_consultas_constantes(self):
+        PoliticaAprobacion.objects.create(
+            nombre="Estandar", score_minimo=600, antiguedad_min_meses=0, ratio_cuota_ingreso_max="0.500",
+        )
+        self.addCleanup(catalogos.invalidar_catalogos)
+        self.client.force_authenticate(self.analista)
+        url = reverse("solicitudes-evaluacion-lote")
+
+        self._insert_solicitud()
+        with override_settings(CATALOG_CACHE_SECONDS=60), CaptureQueriesContext(connection) as una:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["count"], 1)
+
+        for _ in range(4):
+            self._insert_solicitud()
+        self._insert_solicitud(estado="aprobado")
+        with override_settings(CATALOG_CACHE_SECONDS=60), CaptureQueriesContext(connection) as varias:
+            resp = self.client.get(url)
+        self.assertEqual(resp.data["count"], 5)
+        # sin score/ingreso no se puede verificar la política
+        self.assertEqual(resp.data["resumen"]["revisar"], 5)
+        self.assertLessEqual(len(varias), len(una))
+
+    def test_evaluacion_lote_requiere_analista(self):
+        self.client.force_authenticate(self.usuario_socio)
+        resp = self.client.get(reverse("solicitudes-evaluacion-lote"))
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_decision_lote_aprueba_y_crea_prestamos(self):
+        self.client.force_authenticate(self.analista)
+        url = reverse("solicitudes-decision-lote")
+        ids = [self._insert_solicitud() for _ in range(2)]
+        with CaptureQueriesContext(connection) as dos:
+            resp = self.client.post(url, {"ids": ids, "decision": "aprobado", "comentario": "Lote"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["resumen"], {"aprobado": 2})
+
+        ids = [self._insert_solicitud() for _ in range(5)]
+        inexistente = str(uuid.uuid4())
+        with CaptureQueriesContext(connection) as cinco:
+            resp = self.client.post(url, {"ids": [*ids, inexistente], "decision": "aprobado", "comentario": "Lote"}, format="json")
+        self.assertEqual(resp.data["resumen"], {"aprobado": 5, "no_encontrada": 1})
+        self.assertEqual(len(dos), len(cinco))
+
+        por_id = {item["solicitud_id"]: item for item in resp.data["results"]}
+        self.assertEqual(por_id[ids[0]]["prestamo_id"], ids[0])
+        self.assertEqual(por_id[inexistente]["resultado"], "no_encontrada")
+        self.assertEqual(Prestamo.objects.filter(pk__in=ids, estado="aprobado").count(), 5)
+        self.assertEqual(EventoCola.objects.filter(tipo=EventoCola.Tipos.SOLICITUD_DECIDIDA).count(), 7)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT estado, observaciones FROM solicitud WHERE id IN ({', '.join(['?'] * 5)})", ids)
+            self.assertEqual(set(cursor.fetchall()), {("aprobado", "Lote")})
+
+    def test_decision_lote_bloquea_las_filas_dentro_de_la_transaccion(self):
+        self.client.force_authenticate(self.analista)
+        ids = [self._insert_solicitud() for _ in range(2)]
+        llamadas = []
+        original = vistas_solicitudes._solicitudes_por_ids
+
+        def espia(*args, **kwargs):
+            llamadas.append((kwargs.get("bloquear"), connection.in_atomic_block))
+            return original(*args, **kwargs)
+
+        with mock.patch.object(vistas_solicitudes, "_solicitudes_por_ids", side_effect=espia), \
+                CaptureQueriesContext(connection) as consultas:
+            resp = self.client.post(reverse("solicitudes-decision-lote"), {"ids": ids, "decision": "aprobado"}, format="json")
+        self.assertEqual(resp.data["resumen"], {"aprobado": 2})
+        self.assertEqual(llamadas, [(True, True)])
+        lectura = next(q["sql"] for q in consultas if q["sql"].startswith("SELECT") and "FROM solicitud" in q["sql"])
+        self.assertIn("ORDER BY id", lectura)
+
+    @override_settings(DB_REPLICA_STICKY_SECONDS=30)
+    def test_decision_lote_ejecuta_hooks_de_prestamo(self):
+        self.client.force_authenticate(self.analista)
+        ids = [self._insert_solicitud() for _ in range(2)]
+        CambioSocio.objects.all().delete()
+        self.assertFalse(escritura_reciente(self.socio.id))
+
+        resp = self.client.post(reverse("solicitudes-decision-lote"), {"ids": ids, "decision": "aprobado"}, format="json")
+        self.assertEqual(resp.data["resumen"], {"aprobado": 2})
+        self.assertEqual(
+            set(CambioSocio.objects.filter(entidad=CambioSocio.Entidades.PRESTAMO).values_list("objeto_id", flat=True)),
+            set(ids),
+        )
+        self.assertTrue(escritura_reciente(self.socio.id))
+
+    def test_decision_lote_omite_sin_cambios_y_auto_deja_en_revision(self):
+        self.client.force_authenticate(self.analista)
+        pendiente = self._insert_solicitud()
+        rechazada = self._insert_solicitud(estado="rechazado")
+        resp = self.client.post(
+            reverse("solicitudes-decision-lote"), {"ids": [pendiente, rechazada], "decision": "rechazado"}, format="json"
+        )
+        self.assertEqual(resp.data["resumen"], {"rechazado": 1, "sin_cambios": 1})
+
+        PoliticaAprobacion.objects.create(
+            nombre="Estandar", score_minimo=600, antiguedad_min_meses=0, ratio_cuota_ingreso_max="0.500",
+        )
+        otra = self._insert_solicitud()
+        resp = self.client.post(reverse("solicitudes-decision-lote"), {"ids": [otra], "decision": "auto"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["results"][0]["resultado"], "revisar")
+        self.assertFalse(Prestamo.objects.filter(pk=otra).exists())
+
+    def test_decision_lote_valida_entrada(self):
+        url = reverse("solicitudes-decision-lote")
+        self.client.force_authenticate(self.usuario_socio)
+        self.assertEqual(self.client.post(url, {"ids": [], "decision": "aprobado"}, format="json").status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(self.analista)
+        resp = self.client.post(url, {"ids": [self._insert_solicitud()], "decision": "quizas"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        resp = self.client.post(url, {"ids": ["no-uuid"], "decision": "aprobado"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,11 +1,13 @@
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 
-from apps.socios.models import TipoPrestamo
+from apps.socios import catalogos
+from apps.socios.models import PoliticaAprobacion, TipoPrestamo
 
 
 User = get_user_model()
@@ -108,3 +110,47 @@ class TipoPrestamoAdminTests(APITestCase):
         }, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('requisitos', response.data)
+
+
+@override_settings(CATALOG_CACHE_SECONDS=60)
+class CatalogoEnMemoriaTests(TestCase):
+    def setUp(self):
+        catalogos.invalidar_catalogos()
+        self.addCleanup(catalogos.invalidar_catalogos)
+        self.activo = TipoPrestamo.objects.create(
+            nombre='Personal', tasa_interes_anual=Decimal('18.00'), plazo_meses=24,
+        )
+        self.inactivo = TipoPrestamo.objects.create(
+            nombre='Vivienda', tasa_interes_anual=Decimal('12.00'), plazo_meses=120, activo=False,
+        )
+
+    def test_lookup_por_id_sin_consultas_repetidas(self):
+        self.assertEqual(catalogos.tipo_prestamo(self.activo.id).nombre, 'Personal')
+        with self.assertNumQueries(0):
+            self.assertEqual(catalogos.tipo_prestamo(str(self.activo.id)).nombre, 'Personal')
+            self.assertIsNone(catalogos.tipo_prestamo(self.inactivo.id, solo_activos=True))
+            self.assertEqual([t.nombre for t in catalogos.tipos_prestamo(solo_activos=True)], ['Personal'])
+            self.assertIsNone(catalogos.tipo_prestamo('no-es-uuid'))
+
+    def test_guardar_invalida_el_catalogo(self):
+        catalogos.tipo_prestamo(self.activo.id)
+        self.activo.tasa_interes_anual = Decimal('20.00')
+        self.activo.save()
+        self.assertEqual(catalogos.tipo_prestamo(self.activo.id).tasa_interes_anual, Decimal('20.00'))
+
+    def test_devuelve_copias(self):
+        tipo = catalogos.tipo_prestamo(self.activo.id)
+        tipo.nombre = 'Modificado'
+        self.assertEqual(catalogos.tipo_prestamo(self.activo.id).nombre, 'Personal')
+
+    def test_politicas_activas(self):
+        PoliticaAprobacion.objects.create(
+            nombre='Estandar', score_minimo=600, antiguedad_min_meses=6, ratio_cuota_ingreso_max=Decimal('0.350'),
+        )
+        PoliticaAprobacion.objects.create(
+            nombre='Antigua', score_minimo=500, antiguedad_min_meses=0,
+            ratio_cuota_ingreso_max=Decimal('0.400'), activo=False,
+        )
+        self.assertEqual([p.nombre for p in catalogos.politicas_aprobacion()], ['Estandar'])
+        with self.assertNumQueries(0):
+            self.assertEqual(len(catalogos.politicas_aprobacion(solo_activas=False)), 2)
@@ -9,6 +9,7 @@ from .views import (
     SocioExportView,
     SocioEstadoUpdateView,
     SocioListView,
+    SocioBusquedaView,
     TipoPrestamoDetailView,
     TipoPrestamoListCreateView,
     TipoPrestamoPublicListView,
@@ -24,16 +25,25 @@ from .views import (
     SolicitudRechazarView,
     SolicitudEstadoClienteView,
     SolicitudListView,
+    SolicitudDecisionLoteView,
+    SolicitudEvaluacionLoteView,
+    EventosColaStreamView,
     PrestamosAprobadosListView,
     DesembolsoListCreateView,
     PagoSimuladoView,
     ReportesAdminView,
+    ProyeccionCobrosView,
+    EstresCarteraView,
+    MoraTramosView,
+    ExportacionReporteView,
+    CambiosFeedView,
 )
 
 urlpatterns = [
     path('auth/me', MeView.as_view(), name='auth-me'),
     path('socios/profile', ProfileUpsertView.as_view(), name='socios-profile'),
     path('socios', SocioListView.as_view(), name='socios-list'),
+    path('socios/buscar', SocioBusquedaView.as_view(), name='socios-buscar'),
     path('socios/<uuid:socio_id>/', SocioAdminDetailView.as_view(), name='socios-detail'),
     path('socios/<uuid:socio_id>/estado/', SocioEstadoUpdateView.as_view(), name='socios-estado'),
     path('socios/historial/', SocioHistorialView.as_view(), name='socios-historial-global'),
@@ -55,10 +65,18 @@ urlpatterns = [
     path('prestamos/<uuid:prestamo_id>/pago-simulado', PagoSimuladoView.as_view(), name='prestamos-pago-simulado'),
     path('prestamos/aprobados/', PrestamosAprobadosListView.as_view(), name='prestamos-aprobados'),
     path('solicitudes/', SolicitudListView.as_view(), name='solicitudes-list'),
+    path('solicitudes/evaluacion/', SolicitudEvaluacionLoteView.as_view(), name='solicitudes-evaluacion-lote'),
+    path('solicitudes/decision/', SolicitudDecisionLoteView.as_view(), name='solicitudes-decision-lote'),
     path('solicitudes/<uuid:solicitud_id>/estado', SolicitudEstadoClienteView.as_view(), name='solicitudes-estado-cliente'),
     path('solicitudes/<uuid:solicitud_id>/evaluar/', SolicitudEvaluarView.as_view(), name='solicitudes-evaluar'),
     path('solicitudes/<uuid:solicitud_id>/aprobar/', SolicitudAprobarView.as_view(), name='solicitudes-aprobar'),
     path('solicitudes/<uuid:solicitud_id>/rechazar/', SolicitudRechazarView.as_view(), name='solicitudes-rechazar'),
+    path('eventos/', EventosColaStreamView.as_view(), name='eventos-stream'),
     path('desembolsos/', DesembolsoListCreateView.as_view(), name='desembolsos-list-create'),
     path('reportes/', ReportesAdminView.as_view(), name='reportes'),
+    path('reportes/proyeccion/', ProyeccionCobrosView.as_view(), name='reportes-proyeccion'),
+    path('reportes/estres/', EstresCarteraView.as_view(), name='reportes-estres'),
+    path('reportes/mora/', MoraTramosView.as_view(), name='reportes-mora'),
+    path('reportes/exportaciones/<uuid:exportacion_id>/', ExportacionReporteView.as_view(), name='reportes-exportacion'),
+    path('cambios/feed/', CambiosFeedView.as_view(), name='cambios-feed'),
 ]
@@ -0,0 +1,49 @@
+"""
+Vistas de la app socios, separadas por dominio. Se re-exportan aquí para que
+`apps.socios.urls` y el código existente sigan importando desde
+`apps.socios.views`.
+
+Las dependencias pesadas que solo usa un dominio (openpyxl en exportes) se
+importan dentro de la vista que las necesita.
+"""
+from .catalogo import (
+    PoliticaAprobacionDetailView,
+    PoliticaAprobacionListCreateView,
+    PoliticaAprobacionPublicListView,
+    TipoPrestamoDetailView,
+    TipoPrestamoListCreateView,
+    TipoPrestamoPublicDetailView,
+    TipoPrestamoPublicListView,
+    ensure_producto_from_tipo,
+)
+from .colas import EventosColaStreamView
+from .comunes import _fmt_uuid, _is_analista, _is_tesorero, add_months, calcular_tabla_amortizacion, fmt_decimal
+from .desembolsos import DesembolsoListCreateView, PrestamosAprobadosListView
+from .exportes import CambiosFeedView, SocioExportView, SocioHistorialExportView
+from .pagos import PagoSimuladoView
+from .prestamos import MisPrestamosSocioView, PrestamoSimulacionView, SolicitudEstadoClienteView
+from .reportes import EstresCarteraView, ExportacionReporteView, MoraTramosView, ProyeccionCobrosView, ReportesAdminView
+from .socios import (
+    AdminActivityView,
+    MeView,
+    ProfileUpsertView,
+    SocioAdminDetailView,
+    SocioBusquedaView,
+    SocioEstadoUpdateView,
+    SocioHistorialView,
+    SocioListView,
+)
+from .solicitudes import (
+    PrestamoSolicitudCreateView,
+    SolicitudAprobarView,
+    SolicitudDecisionBaseView,
+    SolicitudDecisionLoteView,
+    SolicitudEvaluacionLoteView,
+    SolicitudEvaluarView,
+    SolicitudListView,
+    SolicitudRechazarView,
+    _adjuntar_observacion_en_descripcion,
+    _extraer_observaciones,
+    _fetch_solicitud_row,
+    _obs_column,
+)
@@ -0,0 +1,337 @@
+"""Catálogos de tipos de préstamo y políticas de aprobación (admin y públicos)."""
+import uuid
+
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.db import connection
+from django.db.models import Q
+from asgiref.sync import sync_to_async
+from drf_spectacular.utils import extend_schema, OpenApiResponse
+from adrf.views import APIView as AsyncAPIView
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..http_cache import respuesta_catalogo, variante_desde_query
+from ..schema import get_table_metadata
+from ..models import Socio, TipoPrestamo, PoliticaAprobacion
+from ..serializers import (
+    TipoPrestamoSerializer,
+    TipoPrestamoUpsertSerializer,
+    PoliticaAprobacionSerializer,
+    PoliticaAprobacionUpsertSerializer,
+)
+from .comunes import _is_analista, _socio_de_usuario
+
+
+def ensure_producto_from_tipo(tipo) -> tuple[uuid.UUID | None, str | None]:
+    """Garantiza que exista un registro en producto_prestamo con el id del tipo."""
+    meta = get_table_metadata("producto_prestamo")
+    if not meta:
+        return None, "Tabla producto_prestamo no disponible."
+
+    producto_id = tipo.id
+    pid_param = str(producto_id)
+    table_name = "producto_prestamo" if connection.vendor != "postgresql" else "public.producto_prestamo"
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT 1 FROM {table_name} WHERE id = %s LIMIT 1", [pid_param])
+        if cursor.fetchone():
+            return producto_id, None
+
+    now = timezone.now()
+    base_payload = {
+        "id": producto_id,
+        "nombre": getattr(tipo, "nombre", None),
+        "descripcion": getattr(tipo, "descripcion", "") if hasattr(tipo, "descripcion") else "",
+        "tasa_interes": getattr(tipo, "tasa_interes_anual", None),
+        "plazo_meses": getattr(tipo, "plazo_meses", None),
+        # Campos adicionales comunes en producto_prestamo
+        "tipo": getattr(tipo, "nombre", None) or "producto",
+        "tasa_nominal_anual": getattr(tipo, "tasa_interes_anual", None),
+        "plazo_max_meses": getattr(tipo, "plazo_meses", None),
+        "activo": True,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+    columnas_insert: list[str] = []
+    valores: list = []
+    faltantes: list[str] = []
+    for col in meta:
+        name = col["name"]
+        if name in base_payload and base_payload[name] is not None:
+            columnas_insert.append(name)
+            valores.append(base_payload[name])
+        elif col["nullable"] or col["has_default"]:
+            continue
+        elif name == "nombre":
+            columnas_insert.append(name)
+            valores.append(base_payload.get("nombre") or "Producto generado")
+        else:
+            faltantes.append(name)
+
+    if faltantes:
+        return None, f"Faltan columnas obligatorias en producto_prestamo: {', '.join(faltantes)}"
+
+    if not columnas_insert:
+        return None, "No hay columnas válidas para insertar en producto_prestamo."
+
+    placeholders = ", ".join(["%s"] * len(columnas_insert))
+    columnas_sql = ", ".join(columnas_insert)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {table_name} ({columnas_sql}) VALUES ({placeholders})", [pid_param if v == producto_id else v for v in valores])
+    except Exception as exc:
+        return None, f"No se pudo crear producto_prestamo: {exc}"
+
+    return producto_id, None
+
+
+class TipoPrestamoListCreateView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        tags=['Prestamos'],
+        responses=TipoPrestamoSerializer(many=True),
+        summary='Listado de tipos de préstamo',
+        description='Devuelve los tipos de préstamo configurados. Solo administradores.',
+    )
+    def get(self, request):
+        def construir():
+            qs = TipoPrestamo.objects.all().order_by('nombre')
+            q = (request.query_params.get('q') or '').strip()
+            if q:
+                qs = qs.filter(Q(nombre__icontains=q) | Q(descripcion__icontains=q))
+
+            solo_activos = request.query_params.get('solo_activos') or request.query_params.get('soloActivos')
+            if solo_activos and str(solo_activos).lower() in {'1', 'true', 't', 'yes', 'on'}:
+                qs = qs.filter(activo=True)
+
+            return TipoPrestamoSerializer(qs, many=True).data
+
+        variante = variante_desde_query(request, 'q', 'solo_activos', 'soloActivos')
+        return respuesta_catalogo(request, TipoPrestamo, construir, variante=f"admin:{variante}")
+
+    @extend_schema(
+        tags=['Prestamos'],
+        request=TipoPrestamoUpsertSerializer,
+        responses={201: TipoPrestamoSerializer, 400: OpenApiResponse(description='Datos inválidos')},
+        summary='Crear tipo de préstamo',
+        description='Registra un nuevo tipo de préstamo con tasa, plazo y requisitos.',
+    )
+    def post(self, request):
+        serializer = TipoPrestamoUpsertSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        tipo = serializer.save()
+        return Response(TipoPrestamoSerializer(tipo).data, status=status.HTTP_201_CREATED)
+
+
+class TipoPrestamoDetailView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_object(self, tipo_id):
+        return get_object_or_404(TipoPrestamo, pk=tipo_id)
+
+    @extend_schema(
+        tags=['Prestamos'],
+        responses={200: TipoPrestamoSerializer, 404: OpenApiResponse(description='Tipo no encontrado')},
+        summary='Detalle de tipo de préstamo',
+        description='Obtiene la definición completa de un tipo de préstamo.',
+    )
+    def get(self, _request, tipo_id):
+        tipo = self.get_object(tipo_id)
+        return Response(TipoPrestamoSerializer(tipo).data)
+
+    @extend_schema(
+        tags=['Prestamos'],
+        request=TipoPrestamoUpsertSerializer,
+        responses={200: TipoPrestamoSerializer, 400: OpenApiResponse(description='Datos inválidos')},
+        summary='Actualizar tipo de préstamo',
+        description='Permite modificar tasa, plazo, requisitos o estado activo.',
+    )
+    def put(self, request, tipo_id):
+        tipo = self.get_object(tipo_id)
+        serializer = TipoPrestamoUpsertSerializer(instance=tipo, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        tipo = serializer.save()
+        return Response(TipoPrestamoSerializer(tipo).data)
+
+    @extend_schema(
+        tags=['Prestamos'],
+        request=TipoPrestamoUpsertSerializer,
+        responses={200: TipoPrestamoSerializer, 400: OpenApiResponse(description='Datos inválidos')},
+        summary='Actualización parcial de tipo de préstamo',
+        description='Actualiza parcialmente un tipo de préstamo.',
+    )
+    def patch(self, request, tipo_id):
+        tipo = self.get_object(tipo_id)
+        serializer = TipoPrestamoUpsertSerializer(instance=tipo, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        tipo = serializer.save()
+        return Response(TipoPrestamoSerializer(tipo).data)
+
+    @extend_schema(
+        tags=['Prestamos'],
+        responses={200: TipoPrestamoSerializer, 404: OpenApiResponse(description='Tipo no encontrado')},
+        summary='Desactivar tipo de préstamo',
+        description='Desactiva (soft delete) un tipo de préstamo para que no se use en nuevos créditos.',
+    )
+    def delete(self, _request, tipo_id):
+        tipo = self.get_object(tipo_id)
+        if tipo.activo:
+            tipo.activo = False
+            tipo.save(update_fields=['activo', 'updated_at'])
+        return Response(TipoPrestamoSerializer(tipo).data, status=status.HTTP_200_OK)
+
+
+class TipoPrestamoPublicListView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        tags=['Prestamos'],
+        responses=TipoPrestamoSerializer(many=True),
+        summary='Tipos de prestamo activos (socios)',
+        description='Listado simplificado de tipos de prestamo activos para que el socio pueda solicitarlos.',
+    )
+    async def get(self, request):
+        def construir():
+            qs = TipoPrestamo.objects.filter(activo=True).order_by('nombre')
+            return TipoPrestamoSerializer(qs, many=True).data
+
+        return await sync_to_async(respuesta_catalogo)(request, TipoPrestamo, construir, variante="activos")
+
+
+class TipoPrestamoPublicDetailView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        tags=["Prestamos"],
+        summary="Detalle público de tipo de préstamo",
+        description="Devuelve información y requisitos de un producto activo para socios autenticados.",
+        responses={200: TipoPrestamoSerializer, 404: OpenApiResponse(description="Tipo no encontrado")},
+    )
+    async def get(self, request, tipo_id: uuid.UUID):
+        socio = await sync_to_async(_socio_de_usuario)(request.user)
+        if not socio:
+            return Response({"detail": "Perfil de socio no encontrado."}, status=status.HTTP_404_NOT_FOUND)
+        if socio.estado != Socio.ESTADO_ACTIVO:
+            return Response({"detail": "El socio no se encuentra activo."}, status=status.HTTP_400_BAD_REQUEST)
+
+        def construir():
+            tipo = get_object_or_404(TipoPrestamo, pk=tipo_id, activo=True)
+            data = TipoPrestamoSerializer(tipo).data
+            if not data.get("requisitos"):
+                data["mensaje"] = "No hay requisitos configurados para este producto por ahora."
+            return data
+
+        return await sync_to_async(respuesta_catalogo)(request, TipoPrestamo, construir, variante=f"resumen:{tipo_id}")
+
+
+class PoliticaAprobacionListCreateView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        tags=['Configuracion'],
+        responses=PoliticaAprobacionSerializer(many=True),
+        summary='Listado de políticas de aprobación',
+        description='Devuelve las políticas de aprobación automática configuradas. Solo administradores.',
+    )
+    def get(self, request):
+        def construir():
+            qs = PoliticaAprobacion.objects.all().order_by('nombre')
+            q = (request.query_params.get('q') or '').strip()
+            if q:
+                qs = qs.filter(Q(nombre__icontains=q) | Q(descripcion__icontains=q))
+
+            solo_activas = request.query_params.get('solo_activos') or request.query_params.get('soloActivos')
+            if solo_activas and str(solo_activas).lower() in {'1', 'true', 't', 'yes', 'on'}:
+                qs = qs.filter(activo=True)
+
+            return PoliticaAprobacionSerializer(qs, many=True).data
+
+        variante = variante_desde_query(request, 'q', 'solo_activos', 'soloActivos')
+        return respuesta_catalogo(request, PoliticaAprobacion, construir, variante=f"admin:{variante}")
+
+    @extend_schema(
+        tags=['Configuracion'],
+        request=PoliticaAprobacionUpsertSerializer,
+        responses={201: PoliticaAprobacionSerializer, 400: OpenApiResponse(description='Datos inválidos')},
+        summary='Crear política de aprobación',
+        description='Registra una política basada en score, antigüedad y capacidad de pago.',
+    )
+    def post(self, request):
+        serializer = PoliticaAprobacionUpsertSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        politica = serializer.save()
+        return Response(PoliticaAprobacionSerializer(politica).data, status=status.HTTP_201_CREATED)
+
+
+class PoliticaAprobacionDetailView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_object(self, politica_id):
+        return get_object_or_404(PoliticaAprobacion, pk=politica_id)
+
+    @extend_schema(
+        tags=['Configuracion'],
+        responses={200: PoliticaAprobacionSerializer, 404: OpenApiResponse(description='Política no encontrada')},
+        summary='Detalle de política de aprobación',
+        description='Obtiene la definición de una política de aprobación automática.',
+    )
+    def get(self, _request, politica_id):
+        politica = self.get_object(politica_id)
+        return Response(PoliticaAprobacionSerializer(politica).data)
+
+    @extend_schema(
+        tags=['Configuracion'],
+        request=PoliticaAprobacionUpsertSerializer,
+        responses={200: PoliticaAprobacionSerializer, 400: OpenApiResponse(description='Datos inválidos')},
+        summary='Actualizar política de aprobación',
+        description='Actualiza los parámetros de score, antigüedad y capacidad de pago.',
+    )
+    def put(self, request, politica_id):
+        politica = self.get_object(politica_id)
+        serializer = PoliticaAprobacionUpsertSerializer(instance=politica, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        politica = serializer.save()
+        return Response(PoliticaAprobacionSerializer(politica).data)
+
+    @extend_schema(
+        tags=['Configuracion'],
+        request=PoliticaAprobacionUpsertSerializer,
+        responses={200: PoliticaAprobacionSerializer, 400: OpenApiResponse(description='Datos inválidos')},
+        summary='Actualización parcial de política',
+        description='Permite editar parcialmente una política de aprobación.',
+    )
+    def patch(self, request, politica_id):
+        politica = self.get_object(politica_id)
+        serializer = PoliticaAprobacionUpsertSerializer(instance=politica, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        politica = serializer.save()
+        return Response(PoliticaAprobacionSerializer(politica).data)
+
+    @extend_schema(
+        tags=['Configuracion'],
+        responses={200: PoliticaAprobacionSerializer, 404: OpenApiResponse(description='Política no encontrada')},
+        summary='Desactivar política de aprobación',
+        description='Desactiva (soft delete) una política para que no aplique a nuevas solicitudes.',
+    )
+    def delete(self, _request, politica_id):
+        politica = self.get_object(politica_id)
+        if politica.activo:
+            politica.activo = False
+            politica.save(update_fields=['activo', 'updated_at'])
+        return Response(PoliticaAprobacionSerializer(politica).data, status=status.HTTP_200_OK)
+
+
+class PoliticaAprobacionPublicListView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    async def get(self, request):
+        if not await sync_to_async(_is_analista)(request.user):
+            return Response({"detail": "No autorizado"}, status=status.HTTP_403_FORBIDDEN)
+        def construir():
+            qs = PoliticaAprobacion.objects.filter(activo=True).order_by("nombre")
+            return PoliticaAprobacionSerializer(qs, many=True).data
+
+        return await sync_to_async(respuesta_catalogo)(request, PoliticaAprobacion, construir, variante="activas")
@@ -0,0 +1,96 @@
+"""Stream SSE de eventos de colas para analistas y tesorería."""
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views import View
+from asgiref.sync import sync_to_async
+
+from core.auth import ApiKeyAuthentication
+
+from .. import eventos
+from ..models import EventoCola
+from .comunes import _is_analista, _is_tesorero
+
+
+def _tipos_evento_permitidos(user) -> set[str]:
+    permitidos: set[str] = set()
+    if _is_analista(user):
+        permitidos |= {EventoCola.Tipos.SOLICITUD_CREADA, EventoCola.Tipos.SOLICITUD_DECIDIDA}
+    if _is_tesorero(user):
+        permitidos |= {EventoCola.Tipos.SOLICITUD_DECIDIDA, EventoCola.Tipos.DESEMBOLSO_REGISTRADO}
+    return {str(t) for t in permitidos}
+
+
+async def _stream_eventos(ultimo_id: int, tipos: set[str], enviados: dict[int, datetime] | None = None):
+    fin = time.monotonic() + settings.EVENTOS_SSE_MAX_SECONDS
+    lote = 200
+    margen = eventos.margen()
+    # Ids ya enviados (o que el cliente ya tiene) dentro del margen de relectura
+    enviados = dict(enviados or {})
+    yield "retry: 3000\n\n"
+    while True:
+        desde = timezone.now() - margen
+        enviados = {id_: creado for id_, creado in enviados.items() if creado >= desde}
+        nuevos = await sync_to_async(eventos.eventos_desde)(ultimo_id, tipos, lote, desde, enviados.keys())
+        for evento in nuevos:
+            enviados[evento["id"]] = evento["created_at"]
+            yield eventos.formato_sse(evento)
+        if nuevos and nuevos[-1]["id"] < ultimo_id:
+            # Solo llegaron eventos confirmados tarde: el Last-Event-ID del
+            # cliente vuelve al mayor ya enviado (un id sin data no dispara evento)
+            yield f"id: {ultimo_id}\n\n"
+        ultimo_id = max([ultimo_id, *(evento["id"] for evento in nuevos)])
+        restante = fin - time.monotonic()
+        if restante <= 0:
+            # El cliente reconecta con Last-Event-ID; lo confirmado dentro del
+            # margen se reenvía y el cliente lo deduplica por id
+            break
+        if len(nuevos) == lote:
+            continue
+        if not await eventos.broker.esperar(min(settings.EVENTOS_POLL_SECONDS, restante)):
+            yield ": ping\n\n"
+
+
+class EventosColaStreamView(View):
+    """
+    Server-sent events con las novedades de las colas (solicitudes nuevas,
+    decisiones y desembolsos) para analistas y tesorería. Vista async: el
+    stream no ocupa un worker mientras espera eventos. Al reconectar con
+    Last-Event-ID pueden repetirse eventos del margen de relectura: el cliente
+    los descarta por id.
+    """
+
+    async def get(self, request):
+        user = await request.auser()
+        if not user.is_authenticated and request.headers.get("X-API-Key"):
+            resultado = await sync_to_async(ApiKeyAuthentication().authenticate)(request)
+            if resultado:
+                user = resultado[0]
+        if not user.is_authenticated:
+            return JsonResponse({"detail": "Las credenciales de autenticación no se proveyeron."}, status=401)
+
+        permitidos = await sync_to_async(_tipos_evento_permitidos)(user)
+        if not permitidos:
+            return JsonResponse({"detail": "Solo analistas o tesoreros pueden suscribirse a eventos."}, status=403)
+        pedidos = {t.strip() for t in (request.GET.get("tipos") or "").split(",") if t.strip()}
+        tipos = (pedidos & permitidos) if pedidos else permitidos
+
+        ultimo = request.headers.get("Last-Event-ID") or request.GET.get("desde")
+        try:
+            ultimo_id = int(ultimo) if ultimo else None
+        except ValueError:
+            ultimo_id = None
+        enviados = None
+        if ultimo_id is None:
+            # Cliente nuevo: solo lo que se confirme desde ahora, incluidos
+            # eventos de id menor que todavía no eran visibles
+            ultimo_id = await sync_to_async(eventos.ultimo_evento_id)()
+            enviados = await sync_to_async(eventos.recientes)(ultimo_id, timezone.now() - eventos.margen())
+
+        response = StreamingHttpResponse(_stream_eventos(ultimo_id, tipos, enviados), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
@@ -0,0 +1,74 @@
+"""Helpers compartidos por las vistas: formato de montos, fechas, roles y ids."""
+import calendar
+import uuid
+from decimal import Decimal
+from datetime import date
+
+from ..metricas import calcular_cuota_mensual
+from ..models import Socio
+
+
+def fmt_decimal(valor: Decimal) -> str:
+    """Devuelve el decimal con 2 decimales en formato string."""
+    return f"{valor.quantize(Decimal('0.01'))}"
+
+
+def calcular_tabla_amortizacion(monto: Decimal, tasa_anual: Decimal, plazo_meses: int):
+    """Calcula cuota, totales e historial simple de amortizacion."""
+    cuota = calcular_cuota_mensual(monto, tasa_anual, plazo_meses)
+    tasa_mensual = (Decimal(tasa_anual) / Decimal('100')) / Decimal('12')
+    saldo = monto
+    cuotas = []
+    for numero in range(1, plazo_meses + 1):
+        interes = (saldo * tasa_mensual).quantize(Decimal('0.01')) if tasa_mensual > 0 else Decimal('0.00')
+        capital = (cuota - interes).quantize(Decimal('0.01'))
+        saldo = (saldo - capital).quantize(Decimal('0.01'))
+        if saldo < Decimal('0'):
+            saldo = Decimal('0.00')
+        cuotas.append({
+            "numero": numero,
+            "cuota": fmt_decimal(cuota),
+            "capital": fmt_decimal(capital),
+            "interes": fmt_decimal(interes),
+            "saldo": fmt_decimal(saldo),
+        })
+
+    total_a_pagar = cuota * plazo_meses
+    total_intereses = total_a_pagar - monto
+    return {
+        "cuota_mensual": fmt_decimal(cuota),
+        "total_a_pagar": fmt_decimal(total_a_pagar),
+        "total_intereses": fmt_decimal(total_intereses if total_intereses > Decimal('0') else Decimal('0')),
+        "cuotas": cuotas,
+    }
+
+
+def add_months(fecha: date, months: int) -> date:
+    """Suma meses a una fecha manteniendo el dia valido."""
+    month = fecha.month - 1 + months
+    year = fecha.year + month // 12
+    month = month % 12 + 1
+    day = min(fecha.day, calendar.monthrange(year, month)[1])
+    return date(year, month, day)
+
+
+def _socio_de_usuario(user) -> Socio | None:
+    return getattr(user, "socio", None)
+
+
+def _is_analista(user) -> bool:
+    rol_nombre = getattr(getattr(user, "rol", None), "nombre", "") or getattr(user, "rol", "") or ""
+    return rol_nombre.upper() == "ANALISTA" or getattr(user, "is_staff", False) or getattr(user, "is_superuser", False)
+
+
+def _is_tesorero(user) -> bool:
+    rol_nombre = getattr(getattr(user, "rol", None), "nombre", "") or getattr(user, "rol", "") or ""
+    return rol_nombre.upper() == "TESORERO" or getattr(user, "is_staff", False) or getattr(user, "is_superuser", False)
+
+
+def _fmt_uuid(val):
+    if isinstance(val, uuid.UUID):
+        return str(val)
+    if isinstance(val, str) and len(val) == 32 and val.count("-") == 0:
+        return f"{val[0:8]}-{val[8:12]}-{val[12:16]}-{val[16:20]}-{val[20:]}"
+    return val
@@ -0,0 +1,336 @@
+"""Préstamos aprobados pendientes de desembolso y registro de desembolsos (tesorería)."""
+import uuid
+from decimal import Decimal
+
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.db import connection, transaction
+from django.db.models import Q, Count, Prefetch
+from django.db.models.functions import Lower, Trim
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.renderers import FormatoColumnasMixin
+
+from .. import cambios, estado_cliente, eventos, notificaciones
+from ..schema import get_table_columns
+from ..models import CambioSocio, Prestamo, Desembolso, EventoCola, Socio
+from ..serializers import DesembolsoSerializer
+from .comunes import _fmt_uuid, _is_tesorero, fmt_decimal
+
+
+def _desembolso_columnas(cols: set[str] | None = None) -> dict:
+    if cols is None:
+        cols = get_table_columns("desembolso")
+    metodo_col = "metodo_pago" if "metodo_pago" in cols else ("metodo" if "metodo" in cols else None)
+    metodo_legacy = "metodo" if "metodo" in cols and "metodo_pago" in cols else None
+    fecha_col = None
+    if "created_at" in cols:
+        fecha_col = "created_at"
+    elif "updated_at" in cols:
+        fecha_col = "updated_at"
+    elif "fecha" in cols:
+        fecha_col = "fecha"
+    return {
+        "cols": cols,
+        "metodo": metodo_col,
+        "metodo_legacy": metodo_legacy,
+        "fecha": fecha_col,
+        "comentarios": "comentarios" if "comentarios" in cols else None,
+        "socio": "socio_id" if "socio_id" in cols else None,
+        "tesorero": "tesorero_id" if "tesorero_id" in cols else None,
+        "updated": "updated_at" if "updated_at" in cols else None,
+        "referencia": "referencia" if "referencia" in cols else None,
+    }
+
+
+def _desembolso_prefetch(cols: set[str] | None = None) -> tuple[Prefetch | None, dict]:
+    meta = _desembolso_columnas(cols)
+    if not meta["cols"]:
+        return None, meta
+    qs = Desembolso.objects.all()
+    if "created_at" not in meta["cols"]:
+        qs = qs.defer("created_at")
+    if not meta["comentarios"]:
+        qs = qs.defer("comentarios")
+    # Solo ordenamos si la columna existe como campo del modelo (created_at)
+    if meta["fecha"] == "created_at":
+        qs = qs.order_by("-created_at")
+    else:
+        qs = qs.order_by()  # elimina orden por defecto que pueda apuntar a columnas inexistentes
+    return Prefetch("desembolsos", queryset=qs), meta
+
+
+class PrestamosAprobadosListView(FormatoColumnasMixin, APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _ensure_tesorero(self, request):
+        if not _is_tesorero(request.user):
+            return Response({"detail": "Solo tesorero o admin puede ver préstamos aprobados."}, status=status.HTTP_403_FORBIDDEN)
+        return None
+
+    def get(self, request):
+        forbidden = self._ensure_tesorero(request)
+        if forbidden:
+            return forbidden
+
+        q = (request.query_params.get("q") or "").strip()
+        limit = min(max(int(request.query_params.get("limit", 30)), 1), 100)
+        estados_permitidos = {"aprobado", Prestamo.Estados.ACTIVO, "activo"}
+        qs = (
+            Prestamo.objects.select_related("socio", "socio__usuario")
+            .annotate(
+                desembolsos_count=Count("desembolsos"),
+                pagos_count=Count("pagos"),
+                estado_norm=Lower(Trim("estado")),
+            )
+            .filter(estado_norm__in=["aprobado", "activo"])
+            .filter(desembolsos_count=0, pagos_count=0)
+            .order_by("-created_at")
+        )
+        if q:
+            qs = qs.filter(
+                Q(id__icontains=q)
+                | Q(descripcion__icontains=q)
+                | Q(socio__nombre_completo__icontains=q)
+                | Q(socio__documento__icontains=q)
+            )
+        qs = qs[:limit]
+
+        results = []
+        for prestamo in qs:
+            socio = prestamo.socio
+            results.append(
+                {
+                    "id": str(prestamo.id),
+                    "monto": fmt_decimal(prestamo.monto) if hasattr(prestamo.monto, "quantize") else str(prestamo.monto),
+                    "estado": prestamo.estado,
+                    "descripcion": prestamo.descripcion,
+                    "socio": {
+                        "id": str(socio.id),
+                        "nombre_completo": socio.nombre_completo,
+                        "documento": socio.documento,
+                        "email": socio.usuario.email if socio and socio.usuario else None,
+                    }
+                    if socio
+                    else None,
+                }
+            )
+
+        return Response({"results": results, "count": len(results)}, status=status.HTTP_200_OK)
+
+
+def _registrar_desembolso_sql(prestamo: Prestamo) -> None:
+    """
+    Lo que hacen los receivers de Desembolso, para el alta por SQL directo (que
+    no dispara signals). El cambio registrado también hace que el socio se lea
+    de `default` (ver core/db_router.py).
+    """
+    estado_cliente.invalidar_estado_cliente(prestamo.id)
+    cambios.registrar_cambio(prestamo.socio_id, CambioSocio.Entidades.PRESTAMO, prestamo.id)
+
+
+def _publicar_desembolso(prestamo: Prestamo, desembolso_id, monto: Decimal) -> None:
+    eventos.publicar_evento(
+        EventoCola.Tipos.DESEMBOLSO_REGISTRADO,
+        {
+            "desembolso_id": str(desembolso_id),
+            "prestamo_id": str(prestamo.id),
+            "socio_id": str(prestamo.socio_id),
+            "monto": fmt_decimal(monto),
+        },
+    )
+    socio = Socio.objects.filter(pk=prestamo.socio_id).select_related("usuario").first()
+    email = socio.usuario.email if socio and socio.usuario else None
+    notificaciones.encolar(notificaciones.aviso_desembolso(email, prestamo.id, fmt_decimal(monto)))
+
+
+class DesembolsoListCreateView(FormatoColumnasMixin, APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _ensure_tesorero(self, request):
+        if not _is_tesorero(request.user):
+            return Response({"detail": "Solo tesorero o admin puede gestionar desembolsos."}, status=status.HTTP_403_FORBIDDEN)
+        return None
+
+    def get(self, request):
+        forbidden = self._ensure_tesorero(request)
+        if forbidden:
+            return forbidden
+        meta = _desembolso_columnas()
+        cols = ["id", "prestamo_id", "monto"]
+        if meta["metodo"]:
+            cols.append(meta["metodo"])
+        if meta["referencia"]:
+            cols.append(meta["referencia"])
+        if meta["comentarios"]:
+            cols.append(meta["comentarios"])
+        if meta["fecha"]:
+            cols.append(meta["fecha"])
+        if meta["updated"]:
+            cols.append(meta["updated"])
+        socio_join = meta["socio"] is not None
+        socio_cols = []
+        if socio_join:
+            socio_cols = ["nombre_completo", "documento", "email"]
+        select_cols = ", ".join([f"d.{c}" for c in cols])
+        table_name = "desembolso" if connection.vendor != "postgresql" else "public.desembolso"
+        sql = f"SELECT {select_cols}"
+        if socio_join:
+            sql += ", s.nombre_completo, s.documento, u.email"
+        sql += f" FROM {table_name} d"
+        if socio_join:
+            sql += " LEFT JOIN socio s ON s.id = d.socio_id LEFT JOIN usuario u ON u.id = s.usuario_id"
+        sql += " ORDER BY d.id DESC LIMIT 100"
+
+        data = []
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            rows = cursor.fetchall()
+        for row in rows:
+            base = dict(zip([c.split(".")[-1] for c in cols], row[: len(cols)]))
+            record = {
+                "id": str(_fmt_uuid(base.get("id"))),
+                "prestamo_id": str(_fmt_uuid(base.get("prestamo_id"))),
+                "monto": str(base.get("monto")),
+                "metodo_pago": base.get(meta["metodo"]) if meta["metodo"] else None,
+                "referencia": base.get(meta["referencia"]) if meta["referencia"] else None,
+                "comentarios": base.get(meta["comentarios"]) if meta["comentarios"] else None,
+                "created_at": base.get(meta["fecha"]) if meta["fecha"] else None,
+                "updated_at": base.get(meta["updated"]) if meta["updated"] else None,
+                "socio": None,
+            }
+            if socio_join:
+                socio_data = row[len(cols) :]
+                record["socio"] = {
+                    "nombre_completo": socio_data[0],
+                    "documento": socio_data[1],
+                    "email": socio_data[2],
+                }
+            data.append(record)
+        return Response({"results": data, "count": len(data)}, status=status.HTTP_200_OK)
+
+    def post(self, request):
+        forbidden = self._ensure_tesorero(request)
+        if forbidden:
+            return forbidden
+        meta = _desembolso_columnas()
+        legacy_metodo = meta.get("metodo_legacy")
+        prestamo_id = (request.data or {}).get("prestamo_id")
+        monto = (request.data or {}).get("monto")
+        metodo_pago = (request.data or {}).get("metodo_pago") or (request.data or {}).get("metodo")
+        referencia = (request.data or {}).get("referencia") or ""
+        comentarios = (request.data or {}).get("comentarios") or ""
+
+        if not prestamo_id or not monto or not metodo_pago:
+            return Response({"detail": "prestamo_id, monto y metodo_pago son obligatorios"}, status=status.HTTP_400_BAD_REQUEST)
+
+        prestamo = get_object_or_404(Prestamo, pk=prestamo_id)
+        estado = (prestamo.estado or "").lower()
+        if estado not in {"aprobado", Prestamo.Estados.ACTIVO, "activo"}:
+            return Response({"prestamo_id": "El préstamo no está aprobado/activo para desembolso."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            monto_decimal = Decimal(str(monto))
+        except Exception:
+            return Response({"monto": "Monto inválido."}, status=status.HTTP_400_BAD_REQUEST)
+        if prestamo.monto and monto_decimal > prestamo.monto:
+            return Response({"monto": "El monto excede el valor del préstamo."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Si la tabla coincide con el esquema del modelo (metodo_pago/created_at y columnas clave), usamos ORM
+        can_use_orm = (
+            meta["metodo"] == "metodo_pago"
+            and meta["fecha"] == "created_at"
+            and meta["comentarios"] == "comentarios"
+            and meta["socio"] == "socio_id"
+            and not meta["tesorero"]
+            and not legacy_metodo
+        )
+        if can_use_orm:
+            serializer = DesembolsoSerializer(data={
+                "prestamo_id": prestamo.id,
+                "monto": monto_decimal,
+                "metodo_pago": metodo_pago,
+                "referencia": referencia,
+                "comentarios": comentarios,
+            })
+            serializer.is_valid(raise_exception=True)
+            with transaction.atomic():
+                desembolso = serializer.save()
+
+                if prestamo.estado not in {Prestamo.Estados.PAGADO, Prestamo.Estados.CANCELADO}:
+                    prestamo.estado = "desembolsado"
+                    prestamo.save(update_fields=["estado", "updated_at"])
+                _publicar_desembolso(prestamo, desembolso.id, monto_decimal)
+
+            return Response(DesembolsoSerializer(desembolso).data, status=status.HTTP_201_CREATED)
+
+        payload = {
+            "id": uuid.uuid4(),
+            "prestamo_id": prestamo.id,
+            "monto": monto_decimal,
+        }
+        if meta["metodo"]:
+            payload[meta["metodo"]] = metodo_pago
+        if legacy_metodo and legacy_metodo != meta["metodo"]:
+            payload[legacy_metodo] = metodo_pago
+        if meta["referencia"]:
+            payload[meta["referencia"]] = referencia
+        if meta["comentarios"]:
+            payload[meta["comentarios"]] = comentarios
+        if meta["fecha"]:
+            payload[meta["fecha"]] = timezone.now()
+        if meta["updated"]:
+            payload[meta["updated"]] = timezone.now()
+        if meta["socio"]:
+            payload[meta["socio"]] = prestamo.socio_id
+        if meta.get("tesorero"):
+            payload[meta["tesorero"]] = getattr(request.user, "id", None)
+
+        cols_presentes = [c for c in payload.keys() if c in meta["cols"] or c in {meta.get("fecha"), meta.get("metodo"), meta.get("referencia"), meta.get("comentarios"), meta.get("updated"), meta.get("socio")}]
+        placeholders = ", ".join(["%s"] * len(cols_presentes))
+        columnas_sql = ", ".join(cols_presentes)
+        valores = [payload[col] for col in cols_presentes]
+        if connection.vendor == "sqlite":
+            conv = []
+            for v in valores:
+                if isinstance(v, uuid.UUID):
+                    conv.append(str(v))
+                elif isinstance(v, Decimal):
+                    conv.append(float(v))
+                else:
+                    conv.append(v)
+            valores = conv
+        table_name = "desembolso" if connection.vendor != "postgresql" else "public.desembolso"
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {table_name} ({columnas_sql}) VALUES ({placeholders})",
+                    valores,
+                )
+
+            if prestamo.estado not in {Prestamo.Estados.PAGADO, Prestamo.Estados.CANCELADO}:
+                prestamo.estado = "desembolsado"
+                prestamo.save(update_fields=["estado", "updated_at"])
+            else:
+                # Sin save del préstamo ningún receiver registró el cambio
+                _registrar_desembolso_sql(prestamo)
+            _publicar_desembolso(prestamo, payload["id"], monto_decimal)
+
+        return Response(
+            {
+                "id": str(payload["id"]),
+                "prestamo_id": str(prestamo.id),
+                "monto": str(monto_decimal),
+                "metodo_pago": metodo_pago,
+                "referencia": referencia,
+                "comentarios": comentarios if meta["comentarios"] else None,
+                "socio": {
+                    "id": str(prestamo.socio_id),
+                    "nombre_completo": prestamo.socio.nombre_completo if prestamo.socio else None,
+                    "documento": prestamo.socio.documento if prestamo.socio else None,
+                    "email": prestamo.socio.usuario.email if prestamo.socio and prestamo.socio.usuario else None,
+                } if meta["socio"] else None,
+            },
+            status=status.HTTP_201_CREATED,
+        )
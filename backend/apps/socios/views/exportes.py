@@ -0,0 +1,455 @@
+"""
+Exportaciones de socios/auditoría e historial crediticio.
+
+XLSX por defecto (openpyxl se importa al exportar); `?format=csv` o
+`?format=parquet` devuelven una sola tabla (`?tabla=`) con las mismas columnas
+y filtros, sin el costo de estilos por celda de openpyxl (ver core/tablas.py).
+"""
+import io
+import json
+from datetime import datetime, date
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema, OpenApiResponse
+from rest_framework import permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.db_router import LecturaReplicaMixin
+from core.renderers import FormatoTablaMixin
+from core.tablas import respuesta_tabla
+
+from .. import feed_cambios
+from ..metricas import calcular_metricas_prestamo
+from ..models import Pago, Prestamo, Socio, SocioAuditLog
+
+
+HEADER_COLOR = "43A59D"
+CHUNK = 2000
+
+COLUMNAS_SOCIOS = (
+    ("ID", "texto"), ("Nombre", "texto"), ("Documento", "texto"), ("Estado", "texto"),
+    ("Email usuario", "texto"), ("Telefono", "texto"), ("Direccion", "texto"), ("Fecha alta", "texto"),
+    ("Creado", "texto"), ("Actualizado", "texto"), ("Usuario ID", "texto"),
+)
+COLUMNAS_AUDITORIA = (
+    ("ID", "entero"), ("Socio ID", "texto"), ("Socio", "texto"), ("Email", "texto"), ("Accion", "texto"),
+    ("Estado anterior", "texto"), ("Estado nuevo", "texto"), ("Campos modificados", "texto"),
+    ("Datos previos", "texto"), ("Datos nuevos", "texto"), ("Metadata", "texto"),
+    ("Ejecutado por", "texto"), ("Fecha", "texto"),
+)
+COLUMNAS_PRESTAMOS = (
+    ("ID", "texto"), ("Tipo", "texto"), ("Tasa anual", "decimal"), ("Plazo (meses)", "entero"),
+    ("Socio", "texto"), ("Documento", "texto"), ("Estado", "texto"),
+    ("Monto", "decimal"), ("Pagado", "decimal"), ("Saldo", "decimal"), ("Monto en mora", "decimal"),
+    ("Días mora", "entero"), ("Cuotas vencidas", "entero"),
+    ("Desembolso", "texto"), ("Vencimiento", "texto"), ("Descripción", "texto"),
+)
+COLUMNAS_PAGOS = (
+    ("ID", "entero"), ("Préstamo ID", "texto"), ("Socio", "texto"), ("Monto", "decimal"),
+    ("Método", "texto"), ("Fecha", "texto"), ("Referencia", "texto"),
+)
+
+
+def style_header_row(ws, row_idx: int = 1):
+    """Apply a simple header style to the given row."""
+    from openpyxl.styles import Alignment, Font, PatternFill
+
+    font = Font(bold=True, color="FFFFFF")
+    fill = PatternFill("solid", fgColor=HEADER_COLOR)
+    for cell in ws[row_idx]:
+        cell.font = font
+        cell.fill = fill
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+
+
+def wrap_columns(ws, col_letters: list[str]):
+    """Enable wrap_text for the provided columns (skip header)."""
+    from openpyxl.styles import Alignment
+
+    for col in col_letters:
+        for cell in ws[col][1:]:
+            cell.alignment = Alignment(wrap_text=True, vertical="top")
+
+
+def encabezados(columnas) -> list[str]:
+    return [nombre for nombre, _ in columnas]
+
+
+def tabla_param(request, opciones: tuple[str, ...]) -> str:
+    tabla = (request.query_params.get('tabla') or opciones[0]).strip().lower()
+    if tabla not in opciones:
+        raise ValidationError({'tabla': [f"Usa una de: {', '.join(opciones)}."]})
+    return tabla
+
+
+def filtros_socios(request) -> dict:
+    estados_param = request.query_params.get('estado')
+    desde_param = request.query_params.get('desde')
+    hasta_param = request.query_params.get('hasta')
+
+    def parse_dt(value: str):
+        try:
+            parsed = datetime.fromisoformat(value)
+            return parsed if parsed.tzinfo else timezone.make_aware(parsed)
+        except Exception:
+            return None
+
+    return {
+        'estados': {e.strip() for e in estados_param.split(',')} if estados_param else set(),
+        'accion': request.query_params.get('accion') or None,
+        'desde': parse_dt(desde_param) if desde_param else None,
+        'hasta': parse_dt(hasta_param) if hasta_param else None,
+    }
+
+
+def socios_qs(filtros: dict):
+    qs = Socio.objects.select_related('usuario').order_by('nombre_completo')
+    if filtros['estados']:
+        qs = qs.filter(estado__in=filtros['estados'])
+    return qs
+
+
+def auditoria_qs(filtros: dict):
+    qs = SocioAuditLog.objects.select_related('socio', 'socio__usuario', 'performed_by').order_by('-created_at')
+    if filtros['accion']:
+        qs = qs.filter(action=filtros['accion'])
+    if filtros['desde']:
+        qs = qs.filter(created_at__gte=filtros['desde'])
+    if filtros['hasta']:
+        qs = qs.filter(created_at__lte=filtros['hasta'])
+    return qs
+
+
+def filas_socios(qs):
+    for socio in qs.iterator(chunk_size=CHUNK):
+        yield [
+            str(socio.id),
+            socio.nombre_completo,
+            socio.documento or "",
+            socio.estado,
+            socio.usuario.email if socio.usuario else "",
+            socio.telefono or "",
+            socio.direccion or "",
+            socio.fecha_alta.isoformat() if socio.fecha_alta else "",
+            socio.created_at.isoformat(),
+            socio.updated_at.isoformat(),
+            str(socio.usuario.id) if socio.usuario else "",
+        ]
+
+
+def filas_auditoria(qs):
+    for entry in qs.iterator(chunk_size=CHUNK):
+        socio = entry.socio
+        yield [
+            entry.id,
+            str(socio.id) if socio else "",
+            socio.nombre_completo if socio else "",
+            socio.usuario.email if socio and socio.usuario else "",
+            entry.action,
+            entry.estado_anterior,
+            entry.estado_nuevo,
+            ", ".join(entry.campos_modificados or []),
+            json.dumps(entry.datos_previos or {}, ensure_ascii=False),
+            json.dumps(entry.datos_nuevos or {}, ensure_ascii=False),
+            json.dumps(entry.metadata or {}, ensure_ascii=False),
+            entry.performed_by.email if entry.performed_by else "",
+            entry.created_at.isoformat(),
+        ]
+
+
+def filtros_historial(request) -> dict:
+    estados_param = request.query_params.get('estado') or ''
+    estados = {e.strip() for e in estados_param.split(',') if e.strip()}
+    estados_validos = set(Prestamo.Estados.values)
+    if estados and not estados.issubset(estados_validos):
+        desconocidos = estados - estados_validos
+        raise ValidationError({'estado': [f"Estado(s) desconocido(s): {', '.join(desconocidos)}"]})
+
+    def parse_date(param_name: str):
+        valor = request.query_params.get(param_name)
+        if not valor:
+            return None
+        try:
+            return datetime.fromisoformat(valor).date()
+        except Exception:
+            raise ValidationError({param_name: 'Usa formato ISO AAAA-MM-DD.'})
+
+    return {'estados': estados, 'desde': parse_date('desde'), 'hasta': parse_date('hasta')}
+
+
+def prestamos_historial_qs(filtros: dict, socio=None):
+    qs = Prestamo.objects.select_related('socio', 'socio__usuario', 'tipo').prefetch_related('pagos')
+    if socio:
+        qs = qs.filter(socio=socio)
+    if filtros['estados']:
+        qs = qs.filter(estado__in=filtros['estados'])
+    if filtros['desde']:
+        qs = qs.filter(fecha_desembolso__gte=filtros['desde'])
+    if filtros['hasta']:
+        qs = qs.filter(fecha_desembolso__lte=filtros['hasta'])
+    return qs
+
+
+def pagos_historial_qs(prestamos):
+    # Mismo orden que recorrer los préstamos y luego sus pagos
+    return (
+        Pago.objects.select_related('prestamo__socio')
+        .filter(prestamo__in=prestamos.values('pk'))
+        .order_by('-prestamo__fecha_desembolso', '-prestamo__created_at', 'prestamo_id', '-fecha_pago', '-created_at')
+    )
+
+
+def filas_prestamos(qs, hoy: date):
+    for p in qs.iterator(chunk_size=CHUNK):
+        metricas = calcular_metricas_prestamo(p.monto, p.fecha_vencimiento, p.pagos.all(), hoy)
+        yield [
+            str(p.id),
+            p.tipo.nombre if p.tipo else "",
+            float(p.tipo.tasa_interes_anual) if p.tipo else None,
+            p.tipo.plazo_meses if p.tipo else None,
+            p.socio.nombre_completo if p.socio else "",
+            p.socio.documento if p.socio else "",
+            p.estado,
+            float(p.monto),
+            float(metricas["total_pagado"]),
+            float(metricas["saldo_pendiente"]),
+            float(metricas["monto_en_mora"]),
+            metricas["dias_en_mora"],
+            metricas["cuotas_vencidas"],
+            p.fecha_desembolso.isoformat(),
+            p.fecha_vencimiento.isoformat() if p.fecha_vencimiento else "",
+            p.descripcion,
+        ]
+
+
+def filas_pagos(qs):
+    for pago in qs.iterator(chunk_size=CHUNK):
+        p = pago.prestamo
+        yield [
+            pago.id,
+            str(p.id),
+            p.socio.nombre_completo if p.socio else "",
+            float(pago.monto),
+            pago.metodo,
+            pago.fecha_pago.isoformat(),
+            pago.referencia,
+        ]
+
+
+class SocioExportView(FormatoTablaMixin, LecturaReplicaMixin, APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        tags=['Socios'],
+        summary='Exportar socios y auditoria a Excel, CSV o Parquet',
+        description=(
+            'Genera un archivo Excel con los socios (filtrables por estado) '
+            'y el historial de auditoria de cambios, filtrable por rango de fechas y accion. '
+            'Con format=csv o format=parquet devuelve una sola tabla (tabla=socios|auditoria).'
+        ),
+        responses={200: OpenApiResponse(description='Archivo exportado')},
+    )
+    def get(self, request):
+        filtros = filtros_socios(request)
+        now = timezone.localtime()
+
+        formato = self.formato_tabla(request)
+        if formato:
+            tabla = tabla_param(request, ('socios', 'auditoria'))
+            if tabla == 'socios':
+                columnas, filas = COLUMNAS_SOCIOS, filas_socios(socios_qs(filtros))
+            else:
+                columnas, filas = COLUMNAS_AUDITORIA, filas_auditoria(auditoria_qs(filtros))
+            return respuesta_tabla(formato, f"{tabla}_{now.strftime('%Y%m%d_%H%M%S')}", columnas, filas)
+
+        from openpyxl import Workbook
+        from openpyxl.styles import Font
+        from openpyxl.utils import get_column_letter
+
+        estados, accion, desde, hasta = filtros['estados'], filtros['accion'], filtros['desde'], filtros['hasta']
+        wb = Workbook()
+
+        # Resumen / filtros aplicados
+        ws_meta = wb.active
+        ws_meta.title = "Resumen"
+        ws_meta.append(["Reporte generado"])
+        ws_meta.append(["Generado por", getattr(request.user, 'email', '')])
+        ws_meta.append(["Fecha/Hora", now.strftime("%Y-%m-%d %H:%M:%S %Z")])
+        ws_meta.append(["Filtros", ""])
+        ws_meta.append(["  Estado", ", ".join(sorted(estados)) if estados else "Todos"])
+        ws_meta.append(["  Accion (auditoria)", accion or "Todas"])
+        ws_meta.append(["  Desde", desde.strftime("%Y-%m-%d %H:%M:%S") if desde else ""])
+        ws_meta.append(["  Hasta", hasta.strftime("%Y-%m-%d %H:%M:%S") if hasta else ""])
+        for cell in ws_meta["A"]:
+            cell.font = Font(bold=True)
+
+        # Hoja de socios
+        ws_socios = wb.create_sheet("Socios")
+        socios_headers = encabezados(COLUMNAS_SOCIOS)
+        ws_socios.append(socios_headers)
+        for fila in filas_socios(socios_qs(filtros)):
+            ws_socios.append(fila)
+        style_header_row(ws_socios)
+        ws_socios.freeze_panes = "A2"
+        ws_socios.auto_filter.ref = f"A1:{get_column_letter(len(socios_headers))}{ws_socios.max_row}"
+        for idx in range(1, len(socios_headers) + 1):
+            ws_socios.column_dimensions[get_column_letter(idx)].width = 18
+
+        # Hoja de auditoria
+        ws_audit = wb.create_sheet("Auditoria")
+        audit_headers = encabezados(COLUMNAS_AUDITORIA)
+        ws_audit.append(audit_headers)
+        for fila in filas_auditoria(auditoria_qs(filtros)):
+            ws_audit.append(fila)
+        style_header_row(ws_audit)
+        ws_audit.freeze_panes = "A2"
+        ws_audit.auto_filter.ref = f"A1:{get_column_letter(len(audit_headers))}{ws_audit.max_row}"
+        wrap_columns(ws_audit, ["H", "I", "J", "K"])
+        for idx in range(1, len(audit_headers) + 1):
+            ws_audit.column_dimensions[get_column_letter(idx)].width = 20
+
+        # Preparar respuesta
+        output = io.BytesIO()
+        wb.save(output)
+        output.seek(0)
+        filename = f"socios_auditoria_{now.strftime('%Y%m%d_%H%M%S')}.xlsx"
+
+        response = HttpResponse(
+            output.getvalue(),
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class SocioHistorialExportView(FormatoTablaMixin, LecturaReplicaMixin, APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        tags=['Socios'],
+        summary='Exportar historial crediticio',
+        description=(
+            'Genera un XLSX con los préstamos y pagos del socio (o todos) aplicando los filtros. '
+            'Con format=csv o format=parquet devuelve una sola tabla (tabla=prestamos|pagos).'
+        ),
+        responses={200: OpenApiResponse(description='Archivo exportado')},
+    )
+    def get(self, request, socio_id=None):
+        filtros = filtros_historial(request)
+        socio = None
+        if socio_id:
+            socio = get_object_or_404(Socio, pk=socio_id)
+
+        prestamos_qs = prestamos_historial_qs(filtros, socio)
+        hoy = date.today()
+        now = timezone.localtime()
+        filename_base = "historial_crediticio"
+        if socio:
+            filename_base = f"historial_{socio.id}"
+
+        formato = self.formato_tabla(request)
+        if formato:
+            tabla = tabla_param(request, ('prestamos', 'pagos'))
+            if tabla == 'prestamos':
+                columnas, filas = COLUMNAS_PRESTAMOS, filas_prestamos(prestamos_qs, hoy)
+            else:
+                columnas, filas = COLUMNAS_PAGOS, filas_pagos(pagos_historial_qs(prestamos_qs))
+            return respuesta_tabla(formato, f"{filename_base}_{tabla}_{now.strftime('%Y%m%d_%H%M%S')}", columnas, filas)
+
+        from openpyxl import Workbook
+        from openpyxl.styles import Font
+
+        estados, desde, hasta = filtros['estados'], filtros['desde'], filtros['hasta']
+        wb = Workbook()
+
+        ws_meta = wb.active
+        ws_meta.title = "Resumen"
+        ws_meta.append(["Reporte generado"])
+        ws_meta.append(["Generado por", getattr(request.user, 'email', '')])
+        ws_meta.append(["Fecha/Hora", now.strftime("%Y-%m-%d %H:%M:%S %Z")])
+        ws_meta.append(["Socio", socio.nombre_completo if socio else "Todos"])
+        ws_meta.append(["Filtros", ""])
+        ws_meta.append(["  Estado", ", ".join(sorted(estados)) if estados else "Todos"])
+        ws_meta.append(["  Desde", desde.strftime("%Y-%m-%d") if desde else ""])
+        ws_meta.append(["  Hasta", hasta.strftime("%Y-%m-%d") if hasta else ""])
+        for cell in ws_meta["A"]:
+            cell.font = Font(bold=True)
+
+        # Hoja de prestamos
+        ws_prestamos = wb.create_sheet("Prestamos")
+        ws_prestamos.append(encabezados(COLUMNAS_PRESTAMOS))
+        for fila in filas_prestamos(prestamos_qs, hoy):
+            ws_prestamos.append(fila)
+        style_header_row(ws_prestamos)
+        ws_prestamos.freeze_panes = "A2"
+
+        # Hoja de pagos
+        ws_pagos = wb.create_sheet("Pagos")
+        ws_pagos.append(encabezados(COLUMNAS_PAGOS))
+        for fila in filas_pagos(pagos_historial_qs(prestamos_qs)):
+            ws_pagos.append(fila)
+        style_header_row(ws_pagos)
+        ws_pagos.freeze_panes = "A2"
+
+        # Preparar respuesta
+        output = io.BytesIO()
+        wb.save(output)
+        output.seek(0)
+        filename = f"{filename_base}_{now.strftime('%Y%m%d_%H%M%S')}.xlsx"
+
+        response = HttpResponse(
+            output.getvalue(),
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class CambiosFeedView(APIView):
+    """Sin `LecturaReplicaMixin`: el feed no puede leer de una réplica atrasada (ver apps/socios/feed_cambios.py)."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        tags=['Reportes'],
+        summary='Feed de cambios para el data warehouse',
+        description=(
+            'Filas insertadas o modificadas de una entidad (socio, prestamo, pago, desembolso, solicitud) '
+            'desde un cursor. Sin cursor empieza en desde (ISO) o en el principio; la respuesta trae el '
+            'cursor para la pagina siguiente y hay_mas.'
+        ),
+    )
+    def get(self, request):
+        entidad = (request.query_params.get('entidad') or '').strip().lower()
+        cursor = (request.query_params.get('cursor') or '').strip() or None
+        desde = None
+        if request.query_params.get('desde') and not cursor:
+            try:
+                desde = datetime.fromisoformat(request.query_params['desde'])
+            except ValueError:
+                raise ValidationError({'desde': 'Usa formato ISO AAAA-MM-DDTHH:MM:SS.'})
+            if timezone.is_naive(desde):
+                desde = timezone.make_aware(desde)
+        maximo = getattr(settings, 'FEED_CAMBIOS_MAX_LIMITE', 10000)
+        try:
+            limite = int(request.query_params.get('limite') or getattr(settings, 'FEED_CAMBIOS_LIMITE', 1000))
+        except ValueError:
+            raise ValidationError({'limite': 'Debe ser un entero.'})
+        if not 1 <= limite <= maximo:
+            raise ValidationError({'limite': f'Usa un valor entre 1 y {maximo}.'})
+
+        resultado = feed_cambios.pagina(entidad, cursor=cursor, desde=desde, limite=limite)
+        return Response(
+            {
+                'entidad': resultado.entidad,
+                'items': resultado.items,
+                'cursor': resultado.cursor,
+                'hay_mas': resultado.hay_mas,
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,131 @@
+"""Pago simulado del socio sobre un préstamo desembolsado."""
+import uuid
+from decimal import Decimal
+
+from django.db import transaction
+from django.http import Http404
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .. import notificaciones
+from ..models import Prestamo, Pago
+from .desembolsos import _desembolso_prefetch
+from .prestamos import _estado_cliente_prestamo, _plan_cliente_para_prestamo
+from .solicitudes import _fetch_solicitud_row, _solicitudes_por_socio
+from .comunes import fmt_decimal
+
+
+class PagoSimuladoView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        tags=["Prestamos"],
+        summary="Registrar pago simulado de cuotas",
+        description="Permite al socio pagar una o varias cuotas de un préstamo desembolsado (pasarela simulada).",
+    )
+    def post(self, request, prestamo_id: uuid.UUID):
+        socio = getattr(request.user, "socio", None)
+        if not socio:
+            return Response({"detail": "Perfil de socio no encontrado."}, status=status.HTTP_404_NOT_FOUND)
+
+        desembolso_prefetch, desembolso_meta = _desembolso_prefetch()
+        prefetches = ["pagos"]
+        if desembolso_prefetch:
+            prefetches.append(desembolso_prefetch)
+
+        prestamo = (
+            Prestamo.objects.filter(pk=prestamo_id, socio=socio)
+            .select_related("tipo")
+            .prefetch_related(*prefetches)
+            .first()
+        )
+        if not prestamo:
+            raise Http404("Prestamo no encontrado.")
+
+        desembolsos = list(prestamo.desembolsos.all()) if desembolso_meta["cols"] else []
+        if not desembolsos:
+            return Response({"detail": "El prestamo aun no esta desembolsado."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            cuotas = int((request.data or {}).get("cuotas") or 0)
+        except (TypeError, ValueError):
+            return Response({"cuotas": "Ingresa un numero de cuotas valido."}, status=status.HTTP_400_BAD_REQUEST)
+        if cuotas < 1:
+            return Response({"cuotas": "Debes elegir al menos 1 cuota."}, status=status.HTTP_400_BAD_REQUEST)
+
+        metodo = (request.data or {}).get("metodo") or (request.data or {}).get("metodo_pago") or "pasarela"
+        solicitud_rel = None
+        try:
+            solicitud_rel, _ = _fetch_solicitud_row(prestamo.id)
+        except Http404:
+            solicitudes = _solicitudes_por_socio(socio.id, limit=120)
+            solicitud_rel = next((s for s in solicitudes if str(s.get("id")) == str(prestamo.id)), None)
+
+        plan_info = _plan_cliente_para_prestamo(prestamo, solicitud_rel)
+        cuota_dec = plan_info.get("cuota_decimal", Decimal("0"))
+        if cuota_dec <= Decimal("0"):
+            plazo = plan_info.get("plazo_meses") or cuotas
+            try:
+                plazo_int = int(plazo) if plazo else cuotas
+            except (TypeError, ValueError):
+                plazo_int = cuotas
+            cuota_dec = (prestamo.monto / Decimal(plazo_int or 1)).quantize(Decimal("0.01"))
+
+        total_pagado_actual = sum((p.monto for p in prestamo.pagos.all()), Decimal("0"))
+        saldo = prestamo.monto - total_pagado_actual
+        if saldo <= Decimal("0"):
+            return Response({"detail": "El prestamo ya no tiene saldo pendiente."}, status=status.HTTP_400_BAD_REQUEST)
+
+        monto_pagar = (cuota_dec * Decimal(cuotas)).quantize(Decimal("0.01"))
+        if monto_pagar <= Decimal("0"):
+            monto_pagar = saldo
+        if monto_pagar > saldo:
+            monto_pagar = saldo
+
+        with transaction.atomic():
+            pago = Pago.objects.create(
+                prestamo=prestamo,
+                monto=monto_pagar,
+                fecha_pago=timezone.now().date(),
+                metodo=str(metodo)[:50],
+                referencia=f"SIM-{timezone.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:6].upper()}",
+            )
+
+            total_pagado = sum((p.monto for p in prestamo.pagos.all()), Decimal("0"))
+            saldo_restante = prestamo.monto - total_pagado
+            if saldo_restante < Decimal("0"):
+                saldo_restante = Decimal("0")
+
+            if saldo_restante == Decimal("0"):
+                prestamo.estado = Prestamo.Estados.PAGADO
+                prestamo.save(update_fields=["estado", "updated_at"])
+                estado_visible = "pagado"
+            else:
+                estado_visible = _estado_cliente_prestamo(prestamo, solicitud_rel, bool(desembolsos))
+            notificaciones.encolar(
+                notificaciones.aviso_pago(
+                    getattr(request.user, "email", None), prestamo.id, fmt_decimal(pago.monto), fmt_decimal(saldo_restante)
+                )
+            )
+
+        return Response(
+            {
+                "pago": {
+                    "id": pago.id,
+                    "monto": fmt_decimal(pago.monto),
+                    "fecha_pago": pago.fecha_pago,
+                    "metodo": pago.metodo,
+                    "referencia": pago.referencia,
+                },
+                "prestamo": {
+                    "id": str(prestamo.id),
+                    "estado": estado_visible,
+                    "total_pagado": fmt_decimal(total_pagado),
+                    "saldo_pendiente": fmt_decimal(saldo_restante),
+                },
+            },
+            status=status.HTTP_201_CREATED,
+        )
@@ -0,0 +1,484 @@
+"""Simulación y vistas del socio sobre sus préstamos: estado de solicitud y "mis préstamos"."""
+import uuid
+import math
+from decimal import Decimal
+from datetime import datetime, date, timezone as dt_timezone
+
+from django.http import Http404
+from django.utils import timezone
+from django.db.models import Count, DecimalField, Exists, OuterRef, Sum, Value
+from django.db.models.functions import Coalesce
+from asgiref.sync import sync_to_async
+from drf_spectacular.utils import extend_schema, OpenApiResponse
+from adrf.views import APIView as AsyncAPIView
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .. import cambios, catalogos, estado_cliente
+from ..concurrencia import en_paralelo
+from ..metricas import calcular_cuota_mensual
+from ..schema import get_table_columns, get_tables_columns
+from ..models import Prestamo, Socio, Desembolso
+from ..serializers import TipoPrestamoSerializer, PrestamoSimulacionSerializer
+from .desembolsos import _desembolso_prefetch
+from .solicitudes import _extraer_observaciones, _fetch_solicitud_row, _obs_column, _solicitudes_por_socio
+from .comunes import _fmt_uuid, _socio_de_usuario, calcular_tabla_amortizacion, fmt_decimal
+
+
+class PrestamoSimulacionView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        tags=['Prestamos'],
+        request=PrestamoSimulacionSerializer,
+        responses={200: OpenApiResponse(description='Simulacion generada'), 404: OpenApiResponse(description='Socio o tipo no encontrado')},
+        summary='Simular prestamo de socio',
+        description='Calcula cuota mensual, total a pagar e intereses usando el tipo de prestamo seleccionado.',
+    )
+    def post(self, request):
+        socio = getattr(request.user, 'socio', None)
+        if not socio:
+            return Response({'detail': 'Perfil de socio no encontrado.'}, status=status.HTTP_404_NOT_FOUND)
+        if socio.estado != Socio.ESTADO_ACTIVO:
+            return Response({'detail': 'El socio no se encuentra activo.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = PrestamoSimulacionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        tipo = catalogos.tipo_prestamo(serializer.validated_data['tipo_prestamo_id'], solo_activos=True)
+        if not tipo:
+            raise Http404
+        monto = serializer.validated_data['monto']
+        plazo = serializer.validated_data.get('plazo_meses') or tipo.plazo_meses
+        if plazo > tipo.plazo_meses:
+            return Response({'plazo_meses': f'Maximo permitido para este producto: {tipo.plazo_meses} meses.'}, status=status.HTTP_400_BAD_REQUEST)
+        if plazo < 6 or plazo % 6 != 0:
+            return Response({'plazo_meses': 'El plazo debe ser en saltos de 6 meses y al menos 6.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        plan = calcular_tabla_amortizacion(monto, tipo.tasa_interes_anual, plazo)
+
+        data = {
+            "socio": {
+                "id": str(socio.id),
+                "nombre_completo": socio.nombre_completo,
+                "documento": socio.documento,
+                "email": socio.usuario.email if socio.usuario else None,
+            },
+            "tipo": TipoPrestamoSerializer(tipo).data,
+            "monto": fmt_decimal(monto),
+            "plazo_meses": plazo,
+            **plan,
+        }
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class SolicitudEstadoClienteView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        tags=["Prestamos"],
+        summary="Estado y resumen de mi solicitud",
+        description="Entrega estado visible de la solicitud y, si ya existe el préstamo, incluye pagos y desembolsos registrados.",
+    )
+    async def get(self, request, solicitud_id: uuid.UUID):
+        socio = await sync_to_async(_socio_de_usuario)(request.user)
+        if not socio:
+            return Response({"detail": "Perfil de socio no encontrado."}, status=status.HTTP_404_NOT_FOUND)
+
+        cacheada = await sync_to_async(estado_cliente.respuesta_cacheada)(solicitud_id, socio.id)
+        if cacheada is not None:
+            return Response(cacheada, status=status.HTTP_200_OK)
+
+        # Columnas de solicitud y desembolso en una sola consulta de esquema;
+        # luego la fila de solicitud y el préstamo (con pagos/desembolsos) en paralelo
+        tablas = await sync_to_async(get_tables_columns)("solicitud", "desembolso")
+        (solicitud, columnas), (prestamo, desembolso_meta) = await en_paralelo(
+            lambda: _solicitud_opcional(solicitud_id, tablas["solicitud"]),
+            lambda: _prestamo_cliente(solicitud_id, socio, tablas["desembolso"]),
+        )
+        response = await sync_to_async(_respuesta_estado_cliente)(
+            solicitud_id, socio, solicitud, columnas, prestamo, desembolso_meta
+        )
+        if response.status_code == status.HTTP_200_OK:
+            await sync_to_async(estado_cliente.guardar_respuesta)(solicitud_id, socio.id, response.data)
+        return response
+
+
+def _solicitud_opcional(solicitud_id: uuid.UUID, columnas: set[str] | None = None) -> tuple[dict | None, set[str]]:
+    try:
+        return _fetch_solicitud_row(solicitud_id, columnas)
+    except Http404:
+        return None, set()
+
+
+def _prestamo_cliente(
+    solicitud_id: uuid.UUID, socio: Socio, desembolso_cols: set[str] | None = None
+) -> tuple[Prestamo | None, dict]:
+    desembolso_prefetch, desembolso_meta = _desembolso_prefetch(desembolso_cols)
+    prefetches = ["pagos"]
+    if desembolso_prefetch:
+        prefetches.append(desembolso_prefetch)
+    prestamo = (
+        Prestamo.objects.filter(pk=solicitud_id, socio=socio)
+        .select_related("tipo")
+        .prefetch_related(*prefetches)
+        .first()
+    )
+    return prestamo, desembolso_meta
+
+
+def _respuesta_estado_cliente(
+    solicitud_id: uuid.UUID,
+    socio: Socio,
+    solicitud: dict | None,
+    columnas: set[str],
+    prestamo: Prestamo | None,
+    desembolso_meta: dict,
+) -> Response:
+    """Arma la respuesta del estado de la solicitud con los datos ya leídos."""
+    if solicitud:
+        socio_raw = str(_fmt_uuid(solicitud.get("socio_id"))) if solicitud.get("socio_id") else None
+        if socio_raw and socio_raw != str(socio.id):
+            return Response({"detail": "No autorizado para esta solicitud."}, status=status.HTTP_403_FORBIDDEN)
+
+    if not solicitud and not prestamo:
+        return Response(
+            {"detail": "No encontramos la solicitud para tu usuario."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    mensajes: list[str] = []
+    solicitud_info = None
+    if solicitud:
+        try:
+            monto = Decimal(str(solicitud.get("monto") or "0"))
+        except Exception:
+            monto = Decimal("0")
+        obs_col = _obs_column(columnas)
+        solicitud_info = {
+            "id": str(_fmt_uuid(solicitud.get("id"))) if solicitud.get("id") else str(solicitud_id),
+            "estado": (solicitud.get("estado") or "pendiente").strip().lower() or "pendiente",
+            "monto": fmt_decimal(monto),
+            "plazo_meses": solicitud.get("plazo_meses"),
+            "tasa_interes": solicitud.get("tasa_interes"),
+            "descripcion": solicitud.get("descripcion") or "",
+            "observaciones": solicitud.get(obs_col) if obs_col else _extraer_observaciones(solicitud),
+            "created_at": solicitud.get("created_at"),
+            "updated_at": solicitud.get("updated_at"),
+        }
+
+    pagos_data = []
+    desembolsos_data = []
+    prestamo_info = None
+    if prestamo:
+        solicitud_rel = solicitud
+        desembolsos = list(prestamo.desembolsos.all()) if desembolso_meta["cols"] else []
+        total_pagado = sum((p.monto for p in prestamo.pagos.all()), Decimal("0"))
+        saldo = prestamo.monto - total_pagado
+        if saldo < Decimal("0"):
+            saldo = Decimal("0")
+        plan_info = _plan_cliente_para_prestamo(prestamo, solicitud_rel)
+        cuota_dec = plan_info.get("cuota_decimal", Decimal("0"))
+        cuotas_pendientes = 0
+        if cuota_dec > Decimal("0") and saldo > Decimal("0"):
+            cuotas_pendientes = max(1, math.ceil(saldo / cuota_dec))
+        for pago in prestamo.pagos.all():
+            pagos_data.append(
+                {
+                    "id": pago.id,
+                    "monto": fmt_decimal(pago.monto),
+                    "fecha_pago": pago.fecha_pago,
+                    "metodo": pago.metodo,
+                    "referencia": pago.referencia,
+                }
+            )
+        for des in desembolsos:
+            desembolsos_data.append(
+                {
+                    "id": str(des.id),
+                    "monto": fmt_decimal(des.monto),
+                    "metodo_pago": getattr(des, "metodo_pago", None),
+                    "referencia": getattr(des, "referencia", None),
+                    "comentarios": getattr(des, "comentarios", None),
+                    "created_at": getattr(des, "created_at", None),
+                }
+            )
+
+        estado_visible = _estado_cliente_prestamo(prestamo, solicitud_rel, bool(desembolsos))
+        prestamo_info = {
+            "id": str(prestamo.id),
+            "estado": estado_visible,
+            "monto": fmt_decimal(prestamo.monto),
+            "saldo_pendiente": fmt_decimal(saldo),
+            "total_pagado": fmt_decimal(total_pagado),
+            "cuota_mensual": plan_info.get("cuota_mensual"),
+            "plazo_meses": plan_info.get("plazo_meses"),
+            "cuotas_pendientes": cuotas_pendientes,
+            "fecha_desembolso": prestamo.fecha_desembolso,
+            "fecha_vencimiento": prestamo.fecha_vencimiento,
+            "tipo": {
+                "id": str(prestamo.tipo.id) if prestamo.tipo else None,
+                "nombre": prestamo.tipo.nombre if prestamo.tipo else None,
+            },
+            "tiene_desembolso": bool(desembolsos),
+            "puede_pagar": bool(desembolsos) and saldo > Decimal("0"),
+        }
+        if not pagos_data:
+            mensajes.append("Aún no registras pagos para este préstamo.")
+    else:
+        estado_visible = (solicitud_info.get("estado") if solicitud_info else "") or "pendiente"
+        mensajes.append("Tu solicitud sigue en revisión; aún no hay préstamo desembolsado.")
+
+    if not solicitud_info:
+        mensajes.append("No hay detalles de solicitud almacenados; si ya enviaste una, intenta de nuevo más tarde.")
+
+    response = {
+        "solicitud_id": str(solicitud_id),
+        "estado": estado_visible,
+        "solicitud": solicitud_info,
+        "prestamo": prestamo_info,
+        "pagos": pagos_data,
+        "desembolsos": desembolsos_data,
+    }
+    if mensajes:
+        response["mensajes"] = mensajes
+    return Response(response, status=status.HTTP_200_OK)
+
+
+class MisPrestamosSocioView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        tags=["Prestamos"],
+        summary="Mis prestamos (socio)",
+        description=(
+            "Devuelve solicitudes y prestamos del socio autenticado incluyendo estado visible y posibilidad de pago "
+            "cuando hay desembolso. La respuesta trae un token `since`; con `?since=<token>` solo se devuelven los "
+            "items modificados desde entonces y en `eliminados` los ids que ya no existen (`completo: false`). "
+            "Si el token venció o no es válido se responde el listado completo (`completo: true`)."
+        ),
+    )
+    async def get(self, request):
+        socio = await sync_to_async(_socio_de_usuario)(request.user)
+        if not socio:
+            return Response({"detail": "Perfil de socio no encontrado."}, status=status.HTTP_404_NOT_FOUND)
+
+        since = request.query_params.get("since")
+        if since:
+            delta = await sync_to_async(cambios.cambios_desde)(socio.id, since)
+            if delta is not None:
+                ids, token = delta
+                return Response(await _delta_prestamos_socio(socio, ids, token), status=status.HTTP_200_OK)
+
+        # El token se toma antes de leer: un cambio concurrente se reenvía, no se pierde
+        token = await sync_to_async(cambios.token_actual)(socio.id)
+        prestamos, solicitudes = await en_paralelo(
+            lambda: list(_prestamos_socio_agregados(socio)),
+            lambda: _solicitudes_por_socio(socio.id, limit=100),
+        )
+        data = await sync_to_async(_armar_prestamos_socio)(prestamos, solicitudes)
+        return Response({**data, "since": token, "completo": True}, status=status.HTTP_200_OK)
+
+
+async def _delta_prestamos_socio(socio: Socio, ids: set[str], token: str) -> dict:
+    """Items de "mis prestamos" de los ids modificados; los que ya no existen van como eliminados."""
+    data = {"prestamos": [], "eliminados": [], "since": token, "completo": False}
+    if not ids:
+        return data
+    prestamos, solicitudes = await en_paralelo(
+        lambda: list(_prestamos_socio_agregados(socio).filter(pk__in=ids)),
+        lambda: _solicitudes_por_socio(socio.id, limit=len(ids), ids=ids),
+    )
+    armado = await sync_to_async(_armar_prestamos_socio)(prestamos, solicitudes)
+    vigentes = {item["id"] for item in armado["prestamos"]}
+    data["prestamos"] = armado["prestamos"]
+    data["eliminados"] = sorted(ids - vigentes)
+    return data
+
+
+RESUMEN_MIS_PRESTAMOS = {
+    "pendiente": "pendientes",
+    "aprobado": "aprobados",
+    "rechazado": "rechazados",
+    "desembolsado": "desembolsados",
+    "pagado": "pagados",
+}
+
+
+def _prestamos_socio_agregados(socio: Socio):
+    """
+    Prestamos del socio con total pagado, cantidad de pagos y bandera de desembolso
+    resueltos por la base de datos en una sola consulta (sin precargar pagos).
+    """
+    qs = (
+        Prestamo.objects.filter(socio=socio)
+        .select_related("tipo")
+        .annotate(
+            total_pagado_agg=Coalesce(
+                Sum("pagos__monto"),
+                Value(Decimal("0")),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            ),
+            pagos_count=Count("pagos"),
+        )
+        .order_by("-fecha_desembolso", "-created_at")
+    )
+    if get_table_columns("desembolso"):
+        desembolsos = Desembolso.objects.filter(prestamo=OuterRef("pk")).order_by().values("pk")
+        qs = qs.annotate(tiene_desembolso=Exists(desembolsos))
+    return qs
+
+
+def _item_prestamo_socio(prestamo: Prestamo, solicitud: dict | None) -> dict:
+    tiene_desembolso = bool(getattr(prestamo, "tiene_desembolso", False))
+    plan_info = _plan_cliente_para_prestamo(prestamo, solicitud)
+    total_pagado = prestamo.total_pagado_agg
+    saldo = prestamo.monto - total_pagado
+    if saldo < Decimal("0"):
+        saldo = Decimal("0")
+    cuota_dec = plan_info.get("cuota_decimal", Decimal("0"))
+    cuotas_restantes = 0
+    if cuota_dec > Decimal("0") and saldo > Decimal("0"):
+        cuotas_restantes = max(1, math.ceil(saldo / cuota_dec))
+
+    return {
+        "id": str(prestamo.id),
+        "solicitud_id": str(solicitud.get("id") or prestamo.id) if solicitud else str(prestamo.id),
+        "estado": _estado_cliente_prestamo(prestamo, solicitud, tiene_desembolso),
+        "monto": fmt_decimal(prestamo.monto),
+        "cuota_mensual": plan_info.get("cuota_mensual"),
+        "plazo_meses": plan_info.get("plazo_meses"),
+        "tipo": {
+            "id": str(prestamo.tipo.id) if prestamo.tipo else None,
+            "nombre": prestamo.tipo.nombre if prestamo.tipo else None,
+        },
+        "descripcion": (solicitud or {}).get("descripcion") or prestamo.descripcion,
+        "fecha_solicitud": (solicitud or {}).get("created_at"),
+        "fecha_desembolso": prestamo.fecha_desembolso,
+        "fecha_vencimiento": prestamo.fecha_vencimiento,
+        "total_pagado": fmt_decimal(total_pagado),
+        "saldo_pendiente": fmt_decimal(saldo),
+        "pagos_registrados": prestamo.pagos_count,
+        "cuotas_restantes": cuotas_restantes,
+        "tiene_desembolso": tiene_desembolso,
+        "puede_pagar": tiene_desembolso and saldo > Decimal("0"),
+    }
+
+
+def _item_solicitud_socio(solicitud: dict) -> dict:
+    estado_raw = (solicitud.get("estado") or "pendiente").strip().lower()
+    try:
+        monto_dec = Decimal(str(solicitud.get("monto") or "0"))
+    except Exception:
+        monto_dec = Decimal("0")
+    plazo_raw = solicitud.get("plazo_meses")
+    try:
+        plazo = int(plazo_raw) if plazo_raw is not None else None
+    except (TypeError, ValueError):
+        plazo = None
+
+    return {
+        "id": str(_fmt_uuid(solicitud.get("id"))),
+        "solicitud_id": str(_fmt_uuid(solicitud.get("id"))),
+        "estado": estado_raw or "pendiente",
+        "monto": fmt_decimal(monto_dec),
+        "cuota_mensual": None,
+        "plazo_meses": plazo,
+        "tipo": None,
+        "descripcion": solicitud.get("descripcion") or "",
+        "fecha_solicitud": solicitud.get("created_at"),
+        "fecha_desembolso": None,
+        "fecha_vencimiento": None,
+        "total_pagado": "0.00",
+        "saldo_pendiente": fmt_decimal(monto_dec),
+        "pagos_registrados": 0,
+        "cuotas_restantes": plazo or 0,
+        "tiene_desembolso": False,
+        "puede_pagar": False,
+    }
+
+
+_FECHA_MINIMA = datetime(1900, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _clave_orden(valor) -> datetime:
+    """Normaliza fechas heterogeneas (date, datetime, texto ISO) a datetime aware."""
+    if isinstance(valor, datetime):
+        return valor if timezone.is_aware(valor) else timezone.make_aware(valor, timezone.get_current_timezone())
+    if isinstance(valor, date):
+        return timezone.make_aware(datetime.combine(valor, datetime.min.time()), timezone.get_current_timezone())
+    if isinstance(valor, str):
+        try:
+            parsed = datetime.fromisoformat(valor)
+        except ValueError:
+            return _FECHA_MINIMA
+        return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed, timezone.get_current_timezone())
+    return _FECHA_MINIMA
+
+
+def _armar_prestamos_socio(prestamos, filas_solicitud: list[dict]) -> dict:
+    solicitudes = {str(row.get("id")): row for row in filas_solicitud}
+    resumen = {clave: 0 for clave in RESUMEN_MIS_PRESTAMOS.values()}
+
+    ordenables = []
+    for prestamo in prestamos:
+        item = _item_prestamo_socio(prestamo, solicitudes.pop(str(prestamo.id), None))
+        ordenables.append((_clave_orden(item["fecha_desembolso"] or item["fecha_solicitud"]), item))
+
+    for solicitud in solicitudes.values():
+        item = _item_solicitud_socio(solicitud)
+        ordenables.append((_clave_orden(item["fecha_solicitud"]), item))
+
+    ordenables.sort(key=lambda par: par[0], reverse=True)
+    resultados = [item for _, item in ordenables]
+    for item in resultados:
+        resumen_key = RESUMEN_MIS_PRESTAMOS.get(item["estado"])
+        if resumen_key:
+            resumen[resumen_key] += 1
+    return {"prestamos": resultados, "resumen": resumen}
+
+
+def _estado_cliente_prestamo(prestamo: Prestamo, solicitud: dict | None, tiene_desembolso: bool) -> str:
+    estado_bruto = (prestamo.estado or (solicitud or {}).get("estado") or "").strip().lower()
+    if tiene_desembolso:
+        return "desembolsado"
+    if estado_bruto in {"pendiente", "rechazado"}:
+        return estado_bruto
+    if estado_bruto in {"aprobado", Prestamo.Estados.ACTIVO, "activo"}:
+        return "aprobado"
+    if estado_bruto == Prestamo.Estados.PAGADO:
+        return "pagado"
+    if estado_bruto == Prestamo.Estados.MOROSO:
+        return "moroso"
+    if estado_bruto == Prestamo.Estados.CANCELADO:
+        return "cancelado"
+    return estado_bruto or "pendiente"
+
+
+def _plan_cliente_para_prestamo(prestamo: Prestamo, solicitud: dict | None) -> dict:
+    """Calcula cuota mensual estimada para el prestamo con data de solicitud o tipo."""
+    plazo_raw = solicitud.get("plazo_meses") if solicitud else None
+    try:
+        plazo_meses = int(plazo_raw) if plazo_raw is not None else None
+    except (TypeError, ValueError):
+        plazo_meses = None
+    if not plazo_meses or plazo_meses <= 0:
+        plazo_meses = getattr(prestamo.tipo, "plazo_meses", None) or 12
+
+    tasa_raw = None
+    if solicitud:
+        tasa_raw = solicitud.get("tasa_interes") or solicitud.get("tasa_interes_anual")
+    if tasa_raw is None:
+        tasa_raw = prestamo.tasa_interes or getattr(prestamo.tipo, "tasa_interes_anual", Decimal("0"))
+    try:
+        tasa_decimal = Decimal(str(tasa_raw))
+    except Exception:
+        tasa_decimal = Decimal("0")
+
+    cuota_decimal = calcular_cuota_mensual(prestamo.monto, tasa_decimal, plazo_meses)
+    return {
+        "plazo_meses": plazo_meses,
+        "cuota_mensual": fmt_decimal(cuota_decimal),
+        "cuota_decimal": cuota_decimal,
+    }
@@ -0,0 +1,545 @@
+"""Reportes de socios y préstamos para administración."""
+import io
+import secrets
+import tempfile
+from decimal import Decimal
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Case, CharField, Count, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.http import FileResponse, Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.db.models.functions import Lower, Trim
+from drf_spectacular.utils import extend_schema
+from rest_framework import permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.db_router import LecturaReplicaMixin
+from core.renderers import FormatoColumnasMixin, FormatoTablaMixin
+from core.tablas import respuesta_tabla
+
+from .. import reportes
+from ..metricas import TRAMOS_MORA
+from ..models import ExportacionReporte, Pago, Prestamo, Socio
+from ..politicas import ESTADOS_EXPOSICION
+from .comunes import fmt_decimal
+from .exportes import style_header_row, tabla_param
+
+
+def _parse_date_param(request, param_name: str):
+    raw = (request.query_params.get(param_name) or "").strip()
+    if not raw:
+        return None
+    try:
+        return datetime.fromisoformat(raw).date()
+    except Exception:
+        raise ValidationError({param_name: "Usa formato ISO AAAA-MM-DD."})
+
+
+class ReportesAdminView(FormatoTablaMixin, FormatoColumnasMixin, LecturaReplicaMixin, APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        tags=["Reportes"],
+        summary="Reportes de socios y prestamos",
+        description=(
+            "Devuelve data filtrada (socios/prestamos) y permite exportar PDF (param export=pdf). "
+            "Con format=csv o format=parquet descarga todas las filas de una tabla (tabla=socios|prestamos)."
+        ),
+    )
+    def get(self, request):
+        filtros = _filtros_reporte(request)
+        if (request.query_params.get("export") or "").strip().lower() == "pdf":
+            return _exportar_pdf(request, filtros)
+        formato = self.formato_tabla(request)
+        if formato:
+            tabla = tabla_param(request, ("socios", "prestamos") if filtros["entidad"] == "socios" else ("prestamos", "socios"))
+            if tabla == "socios":
+                columnas, filas = reportes.COLUMNAS_SOCIOS, reportes.filas_socios(filtros)
+            else:
+                columnas, filas = reportes.COLUMNAS_PRESTAMOS, reportes.filas_prestamos(filtros)
+            return respuesta_tabla(formato, f"reporte_{tabla}_{timezone.now():%Y%m%d_%H%M%S}", columnas, filas)
+        limit = min(max(int(request.query_params.get("limit", 120)), 1), 500)
+
+        include_socios = reportes.incluye_socios(filtros)
+        include_prestamos = reportes.incluye_prestamos(filtros)
+
+        data_socios = {"items": [], "resumen": {}, "total": 0}
+        if include_socios:
+            socios_qs = reportes.socios_filtrados(filtros)
+            resumen_socios = {
+                "activo": socios_qs.filter(estado=Socio.ESTADO_ACTIVO).count(),
+                "inactivo": socios_qs.filter(estado=Socio.ESTADO_INACTIVO).count(),
+                "suspendido": socios_qs.filter(estado=Socio.ESTADO_SUSPENDIDO).count(),
+            }
+            data_socios["resumen"] = resumen_socios
+            data_socios["total"] = socios_qs.count()
+            data_socios["items"] = [
+                {
+                    "id": str(s.id),
+                    "nombre": s.nombre_completo,
+                    "documento": s.documento,
+                    "estado": s.estado,
+                    "email": s.usuario.email if s.usuario else None,
+                    "created_at": s.created_at,
+                    "fecha_alta": s.fecha_alta,
+                }
+                for s in socios_qs[:limit]
+            ]
+
+        data_prestamos = {"items": [], "resumen": {}, "total": 0}
+        if include_prestamos:
+            qs = reportes.prestamos_filtrados(filtros).annotate(
+                desembolsos_count=Count("desembolsos"),
+                pagos_count=Count("pagos"),
+                estado_norm=Lower(Trim("estado")),
+            )
+            estados_param = set(filtros["estado"])
+
+            resumen_prestamos = {
+                "aprobado": 0,
+                "desembolsado": 0,
+                "moroso": 0,
+                "pagado": 0,
+                "cancelado": 0,
+            }
+
+            prestamos_items = []
+            for prestamo in qs:
+                estado_vis = reportes.estado_visible(prestamo, prestamo.saldo_pendiente)
+                if estados_param and estado_vis not in estados_param:
+                    continue
+                socio = prestamo.socio
+                tipo = prestamo.tipo
+                resumen_prestamos[estado_vis] = resumen_prestamos.get(estado_vis, 0) + 1
+                prestamos_items.append(
+                    {
+                        "id": str(prestamo.id),
+                        "monto": fmt_decimal(prestamo.monto),
+                        "estado": prestamo.estado,
+                        "estado_visible": estado_vis,
+                        "fecha_desembolso": prestamo.fecha_desembolso,
+                        "fecha_vencimiento": prestamo.fecha_vencimiento,
+                        "socio": {
+                            "id": str(socio.id) if socio else None,
+                            "nombre": socio.nombre_completo if socio else None,
+                            "documento": socio.documento if socio else None,
+                            "estado": socio.estado if socio else None,
+                        },
+                        "tipo": {
+                            "id": str(tipo.id) if tipo else None,
+                            "nombre": tipo.nombre if tipo else None,
+                        },
+                        "total_pagado": fmt_decimal(prestamo.total_pagado),
+                        "saldo_pendiente": fmt_decimal(prestamo.saldo_pendiente),
+                        "desembolsos": getattr(prestamo, "desembolsos_count", 0),
+                    }
+                )
+
+            data_prestamos["resumen"] = resumen_prestamos
+            data_prestamos["total"] = len(prestamos_items)
+            data_prestamos["items"] = prestamos_items[:limit]
+
+        filtros_info = {
+            "entidad": filtros["entidad"],
+            "estado": filtros["estado"],
+            "desde": _parse_date_param(request, "desde"),
+            "hasta": _parse_date_param(request, "hasta"),
+            "tipo": filtros["tipo"] or None,
+            "limit": limit,
+            "q": filtros["q"] or None,
+        }
+
+        return Response(
+            {
+                "filtros": filtros_info,
+                "socios": data_socios if include_socios else None,
+                "prestamos": data_prestamos if include_prestamos else None,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+def _filtros_reporte(request) -> dict:
+    """Filtros del reporte como dict serializable (ver apps/socios/reportes.py)."""
+    desde = _parse_date_param(request, "desde")
+    hasta = _parse_date_param(request, "hasta")
+    return {
+        "entidad": (request.query_params.get("entidad") or "todos").strip().lower(),
+        "estado": sorted(
+            {e.strip().lower() for e in (request.query_params.get("estado") or "").split(",") if e.strip()}
+        ),
+        "q": (request.query_params.get("q") or "").strip(),
+        "desde": desde.isoformat() if desde else None,
+        "hasta": hasta.isoformat() if hasta else None,
+        "tipo": (request.query_params.get("tipo") or request.query_params.get("tipo_prestamo") or "").strip(),
+    }
+
+
+def _exportar_pdf(request, filtros: dict):
+    """
+    PDF en la respuesta si el reporte es chico; si no, una exportación en
+    segundo plano (202) que el programador genera y se descarga después.
+    """
+    from .. import exportaciones, reporte_pdf
+
+    maximo = getattr(settings, "REPORTES_PDF_MAX_FILAS_SINCRONO", 2000)
+    if reportes.filas_estimadas(filtros) > maximo:
+        exportacion = exportaciones.encolar(request.user, ExportacionReporte.Formatos.PDF, filtros)
+        return Response(exportaciones.como_dict(exportacion), status=status.HTTP_202_ACCEPTED)
+
+    archivo = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    reporte_pdf.generar(filtros, archivo)
+    archivo.seek(0)
+    filename = f"reporte_{timezone.now():%Y%m%d_%H%M%S}.pdf"
+    return FileResponse(archivo, as_attachment=True, filename=filename, content_type="application/pdf")
+
+
+class ExportacionReporteView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        tags=["Reportes"],
+        summary="Estado de una exportacion en segundo plano",
+        description="Devuelve el estado de la exportacion; con descargar=1 y estado lista entrega el archivo.",
+    )
+    def get(self, request, exportacion_id):
+        from .. import exportaciones
+
+        descargar = request.query_params.get("descargar") in ("1", "true")
+        qs = ExportacionReporte.objects.all() if descargar else ExportacionReporte.objects.defer("contenido")
+        exportacion = get_object_or_404(qs, pk=exportacion_id)
+        if not descargar:
+            return Response(exportaciones.como_dict(exportacion), status=status.HTTP_200_OK)
+        if exportacion.estado != ExportacionReporte.Estados.LISTA:
+            return Response({"detail": "La exportacion aun no esta lista."}, status=status.HTTP_409_CONFLICT)
+        if exportacion.contenido is None:
+            raise Http404("El archivo de la exportacion ya no esta disponible.")
+        response = HttpResponse(
+            bytes(exportacion.contenido), content_type=exportaciones.CONTENT_TYPES[exportacion.formato]
+        )
+        response["Content-Disposition"] = f'attachment; filename="{exportacion.archivo}"'
+        return response
+
+
+class ProyeccionCobrosView(FormatoColumnasMixin, LecturaReplicaMixin, APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        tags=["Reportes"],
+        summary="Proyeccion de cobros de la cartera",
+        description=(
+            "Capital e interes esperados por mes para los prestamos abiertos segun su tabla de amortizacion, "
+            "descontando lo ya pagado. Parametros: desde (AAAA-MM-DD, default hoy), meses (1-120, default 12) "
+            "y export=xlsx para descargar Excel."
+        ),
+    )
+    def get(self, request):
+        # NumPy solo se carga al pedir la proyección (ver scripts/medir_importacion.py)
+        from .. import proyeccion
+
+        desde = _parse_date_param(request, "desde") or timezone.localdate()
+        try:
+            meses = int(request.query_params.get("meses", 12))
+        except (TypeError, ValueError):
+            raise ValidationError({"meses": "Ingresa un numero de meses valido."})
+        if not 1 <= meses <= proyeccion.MAX_MESES:
+            raise ValidationError({"meses": f"Usa entre 1 y {proyeccion.MAX_MESES} meses."})
+
+        resultado = proyeccion.proyeccion_cartera(desde, meses)
+        if (request.query_params.get("export") or "").strip().lower() == "xlsx":
+            return self._exportar_xlsx(resultado)
+
+        return Response(
+            {
+                "desde": resultado["desde"],
+                "prestamos": resultado["prestamos"],
+                "meses": [
+                    {
+                        "mes": fila["mes"],
+                        "capital": fmt_decimal(fila["capital"]),
+                        "interes": fmt_decimal(fila["interes"]),
+                        "total": fmt_decimal(fila["total"]),
+                        "cuotas": fila["cuotas"],
+                    }
+                    for fila in resultado["meses"]
+                ],
+                "totales": {clave: fmt_decimal(valor) for clave, valor in resultado["totales"].items()},
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def _exportar_xlsx(self, resultado: dict) -> HttpResponse:
+        filas = [[f["mes"], f["capital"], f["interes"], f["total"], f["cuotas"]] for f in resultado["meses"]]
+        totales = resultado["totales"]
+        filas.append(["Total", totales["capital"], totales["interes"], totales["total"], None])
+        filas.append(["Vencido", None, None, totales["vencido"], None])
+        return _xlsx_response(
+            "Proyeccion",
+            ["Mes", "Capital", "Interes", "Total", "Cuotas"],
+            filas,
+            f"proyeccion_cobros_{resultado['desde']}.xlsx",
+        )
+
+
+def _xlsx_response(hoja: str, encabezados: list[str], filas: list[list], filename: str) -> HttpResponse:
+    """Excel de una hoja con encabezado estilizado; los Decimal quedan con formato de monto."""
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = hoja
+    ws.append(encabezados)
+    for fila in filas:
+        ws.append(fila)
+    style_header_row(ws)
+    ws.freeze_panes = "A2"
+    for fila in ws.iter_rows(min_row=2):
+        for cell in fila:
+            if isinstance(cell.value, Decimal):
+                cell.number_format = "#,##0.00"
+    for idx in range(1, len(encabezados) + 1):
+        ws.column_dimensions[get_column_letter(idx)].width = 18
+
+    output = io.BytesIO()
+    wb.save(output)
+    response = HttpResponse(
+        output.getvalue(),
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+class EstresCarteraView(LecturaReplicaMixin, APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        tags=["Reportes"],
+        summary="Escenarios predefinidos del simulador de estres",
+        description="Tramos de mora, PD anual por tramo y escenarios disponibles para la simulacion.",
+    )
+    def get(self, request):
+        from .. import estres
+
+        return Response(
+            {
+                "tramos": [tramo for tramo, _ in estres.TRAMOS],
+                "pd_tramo": estres.PD_TRAMO,
+                "prepago_anual": estres.PREPAGO_ANUAL,
+                "escenarios": estres.ESCENARIOS_PREDEFINIDOS,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @extend_schema(
+        tags=["Reportes"],
+        summary="Simular estres y provisiones de la cartera",
+        description=(
+            "Monte Carlo de default y prepago por producto y tramo de mora sobre los prestamos abiertos. "
+            "Body: escenarios (nombres predefinidos u objetos con factor_default, factor_prepago, lgd, "
+            "correlacion, pd_tramo y productos), simulaciones, horizonte_meses y semilla. Devuelve perdida "
+            "esperada, provision requerida y percentiles por escenario."
+        ),
+    )
+    def post(self, request):
+        from .. import estres
+
+        data = request.data or {}
+        escenarios_raw = data.get("escenarios") or list(estres.ESCENARIOS_PREDEFINIDOS)
+        if not isinstance(escenarios_raw, list) or len(escenarios_raw) > estres.MAX_ESCENARIOS:
+            raise ValidationError({"escenarios": f"Envia una lista de hasta {estres.MAX_ESCENARIOS} escenarios."})
+        maximo = getattr(settings, "ESTRES_MAX_SIMULACIONES", 5000)
+        simulaciones = _entero(data, "simulaciones", getattr(settings, "ESTRES_SIMULACIONES", 200), 1, maximo)
+        meses = _entero(data, "horizonte_meses", 12, 1, estres.MAX_HORIZONTE_MESES)
+        semilla = _entero(data, "semilla", secrets.randbelow(2**31), 0, 2**63 - 1)
+
+        cartera = estres.cargar_cartera()
+        escenarios = [estres.construir_escenario(esc, cartera.productos) for esc in escenarios_raw]
+        nombres = [esc.nombre for esc in escenarios]
+        if len(set(nombres)) != len(nombres):
+            raise ValidationError({"escenarios": "Los nombres de escenario deben ser unicos."})
+
+        resultados = estres.simular(cartera, escenarios, simulaciones, meses, semilla)
+        for resultado in resultados:
+            for clave, valor in resultado.items():
+                if isinstance(valor, Decimal):
+                    resultado[clave] = fmt_decimal(valor)
+            for fila in resultado["detalle"]:
+                for clave in ("exposicion", "perdida_esperada", "prepago_esperado"):
+                    fila[clave] = fmt_decimal(fila[clave])
+        return Response(
+            {
+                "simulaciones": simulaciones,
+                "horizonte_meses": meses,
+                "semilla": semilla,
+                "prestamos": len(cartera),
+                "exposicion": fmt_decimal(Decimal(str(round(float(cartera.exposicion.sum()), 2)))),
+                "escenarios": resultados,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+def _entero(data: dict, campo: str, defecto: int, minimo: int, maximo: int) -> int:
+    valor = data.get(campo)
+    if valor in (None, ""):
+        return defecto
+    try:
+        numero = int(valor)
+    except (TypeError, ValueError):
+        raise ValidationError({campo: "Debe ser un entero."})
+    if not minimo <= numero <= maximo:
+        raise ValidationError({campo: f"Usa un valor entre {minimo} y {maximo}."})
+    return numero
+
+
+# Agrupaciones del reporte de mora: nombre del parámetro -> campo de `values()`
+AGRUPACIONES_MORA = {"tipo": "tipo_nombre", "estado_socio": "socio__estado", "antiguedad": "antiguedad"}
+SIN_TIPO = "Sin tipo"
+
+
+def _tramos_mora(corte, agrupar: list[str]):
+    """
+    Saldo pendiente y cantidad de préstamos por tramo de atraso en una sola
+    consulta (CASE + GROUP BY). El atraso se mide como en
+    `calcular_metricas_prestamo`: días desde `fecha_vencimiento` a la fecha de
+    corte, solo si queda saldo; sin vencimiento o aún no vencido es "al_dia".
+    """
+    pagado = (
+        Pago.objects.filter(prestamo=OuterRef("pk"))
+        .order_by()
+        .values("prestamo")
+        .annotate(total=Sum("monto"))
+        .values("total")
+    )
+    monto = DecimalField(max_digits=14, decimal_places=2)
+    # Tramos de mayor a menor atraso: vence antes de (corte - primer día + 1)
+    tramo = Case(
+        *[
+            When(fecha_vencimiento__lte=corte - timedelta(days=inicio), then=Value(nombre))
+            for nombre, inicio in reversed(TRAMOS_MORA[1:])
+        ],
+        default=Value(TRAMOS_MORA[0][0]),
+        output_field=CharField(),
+    )
+    anotaciones = {
+        "saldo": F("monto") - Coalesce(Subquery(pagado, output_field=monto), Value(Decimal("0")), output_field=monto),
+        "tramo": tramo,
+    }
+    if "tipo" in agrupar:
+        anotaciones["tipo_nombre"] = Coalesce("tipo__nombre", Value(SIN_TIPO))
+    if "antiguedad" in agrupar:
+        anotaciones["antiguedad"] = Case(
+            When(socio__fecha_alta__isnull=True, then=Value("sin_fecha")),
+            When(socio__fecha_alta__gt=corte - timedelta(days=365), then=Value("menos_1_anio")),
+            When(socio__fecha_alta__gt=corte - timedelta(days=3 * 365), then=Value("1_3_anios")),
+            default=Value("mas_3_anios"),
+            output_field=CharField(),
+        )
+    campos = [AGRUPACIONES_MORA[nombre] for nombre in agrupar]
+    return (
+        Prestamo.objects.filter(estado__in=ESTADOS_EXPOSICION)
+        .annotate(**anotaciones)
+        .filter(saldo__gt=0)
+        .order_by()
+        .values(*campos, "tramo")
+        .annotate(prestamos=Count("pk"), saldo_total=Sum("saldo"))
+    )
+
+
+class MoraTramosView(FormatoColumnasMixin, LecturaReplicaMixin, APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        tags=["Reportes"],
+        summary="Cartera por tramos de mora",
+        description=(
+            "Saldo pendiente y cantidad de prestamos por tramo de atraso (al dia, 1-30, 31-60, 61-90, 90+) "
+            "calculados en la base. Parametros: corte (AAAA-MM-DD, default hoy), agrupar (tipo, estado_socio, "
+            "antiguedad; separados por coma) y export=xlsx."
+        ),
+    )
+    def get(self, request):
+        corte = _parse_date_param(request, "corte") or timezone.localdate()
+        agrupar = [a.strip() for a in (request.query_params.get("agrupar") or "").split(",") if a.strip()]
+        desconocidas = set(agrupar) - set(AGRUPACIONES_MORA)
+        if desconocidas:
+            raise ValidationError({"agrupar": f"Usa {', '.join(AGRUPACIONES_MORA)}."})
+        agrupar = list(dict.fromkeys(agrupar))
+
+        filas: dict[tuple, dict] = {}
+        for registro in _tramos_mora(corte, agrupar):
+            clave = tuple(registro[AGRUPACIONES_MORA[nombre]] for nombre in agrupar)
+            fila = filas.setdefault(clave, _fila_mora(dict(zip(agrupar, clave))))
+            _sumar_tramo(fila, registro["tramo"], registro["prestamos"], registro["saldo_total"])
+        totales = _fila_mora({})
+        for fila in filas.values():
+            for nombre, _ in TRAMOS_MORA:
+                _sumar_tramo(totales, nombre, fila[nombre]["prestamos"], fila[nombre]["saldo"])
+        ordenadas = [filas[clave] for clave in sorted(filas, key=lambda c: tuple(str(v) for v in c))]
+
+        if (request.query_params.get("export") or "").strip().lower() == "xlsx":
+            return self._exportar_xlsx(corte, agrupar, ordenadas, totales)
+        return Response(
+            {
+                "corte": corte,
+                "agrupar": agrupar,
+                "tramos": [nombre for nombre, _ in TRAMOS_MORA],
+                "filas": [_fila_mora_json(fila) for fila in ordenadas],
+                "totales": _fila_mora_json(totales),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def _exportar_xlsx(self, corte, agrupar: list[str], filas: list[dict], totales: dict) -> HttpResponse:
+        encabezados = [*agrupar]
+        for nombre, _ in TRAMOS_MORA:
+            encabezados += [f"{nombre} prestamos", f"{nombre} saldo"]
+        encabezados += ["Total prestamos", "Total saldo", "Indice de mora %"]
+
+        def celdas(fila: dict, etiqueta: list) -> list:
+            valores = list(etiqueta)
+            for nombre, _ in TRAMOS_MORA:
+                valores += [fila[nombre]["prestamos"], fila[nombre]["saldo"]]
+            return valores + [fila["total"]["prestamos"], fila["total"]["saldo"], _indice_mora(fila)]
+
+        contenido = [celdas(fila, [fila["grupo"][a] for a in agrupar]) for fila in filas]
+        if agrupar:
+            contenido.append(celdas(totales, ["Total"] + [None] * (len(agrupar) - 1)))
+        return _xlsx_response("Mora", encabezados, contenido, f"mora_tramos_{corte.isoformat()}.xlsx")
+
+
+def _fila_mora(grupo: dict) -> dict:
+    fila = {"grupo": grupo, "total": {"prestamos": 0, "saldo": Decimal("0")}}
+    for nombre, _ in TRAMOS_MORA:
+        fila[nombre] = {"prestamos": 0, "saldo": Decimal("0")}
+    return fila
+
+
+def _sumar_tramo(fila: dict, tramo: str, prestamos: int, saldo: Decimal) -> None:
+    for destino in (fila[tramo], fila["total"]):
+        destino["prestamos"] += prestamos
+        destino["saldo"] += saldo or Decimal("0")
+
+
+def _indice_mora(fila: dict) -> Decimal:
+    """Porcentaje del saldo con algún día de atraso."""
+    total = fila["total"]["saldo"]
+    if not total:
+        return Decimal("0.00")
+    en_mora = total - fila[TRAMOS_MORA[0][0]]["saldo"]
+    return (en_mora * 100 / total).quantize(Decimal("0.01"))
+
+
+def _fila_mora_json(fila: dict) -> dict:
+    data = {**fila["grupo"]}
+    for nombre in [nombre for nombre, _ in TRAMOS_MORA] + ["total"]:
+        data[nombre] = {"prestamos": fila[nombre]["prestamos"], "saldo": fmt_decimal(fila[nombre]["saldo"])}
+    data["indice_mora"] = fmt_decimal(_indice_mora(fila))
+    return data
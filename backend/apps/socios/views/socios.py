@@ -0,0 +1,285 @@
+"""Perfil propio y administración de socios (listado, búsqueda, detalle, estado, historial, actividad)."""
+from datetime import datetime, date
+
+from django.shortcuts import get_object_or_404
+from django.db.models import Q
+from drf_spectacular.utils import extend_schema, OpenApiResponse
+from rest_framework import permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.db_router import LecturaReplicaMixin
+from core.renderers import FormatoColumnasMixin
+
+from ..audit import snapshot_socio, register_audit_entry
+from ..busqueda import buscar_socios
+from ..metricas import precalcular_metricas
+from ..models import Prestamo, Socio, SocioAuditLog
+from ..serializers import (
+    HistorialCrediticioSerializer,
+    ProfileCreateSerializer,
+    SocioAdminUpdateSerializer,
+    SocioEstadoSerializer,
+    SocioSerializer,
+)
+
+
+class MeView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        socio = getattr(request.user, 'socio', None)
+        if not socio:
+            return Response({'detail': 'Perfil de socio no encontrado.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(SocioSerializer(socio).data)
+
+
+class ProfileUpsertView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = ProfileCreateSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        socio = serializer.save()
+        return Response(SocioSerializer(socio).data, status=status.HTTP_201_CREATED)
+
+
+class SocioListView(FormatoColumnasMixin, APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        tags=['Socios'],
+        responses=SocioSerializer(many=True),
+        summary='Listado de socios',
+        description='Devuelve todos los socios registrados. Solo administradores.',
+    )
+    def get(self, request):
+        queryset = Socio.objects.select_related('usuario').order_by('nombre_completo')
+
+        q = (request.query_params.get('q') or '').strip()
+        if q:
+            queryset = queryset.filter(
+                Q(nombre_completo__icontains=q)
+                | Q(documento__icontains=q)
+                | Q(usuario__email__icontains=q)
+                | Q(id__icontains=q)
+            )
+
+        return Response(SocioSerializer(queryset, many=True).data)
+
+
+class SocioBusquedaView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        tags=['Socios'],
+        summary='Buscar socios (autocompletado)',
+        description='Devuelve hasta `limit` socios (id, nombre, documento) que coinciden con `q`. Solo administradores.',
+        responses={200: OpenApiResponse(description='Coincidencias para el selector')},
+    )
+    def get(self, request):
+        q = (request.query_params.get('q') or '').strip()[:80]
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 25)
+        except (TypeError, ValueError):
+            limit = 10
+
+        return Response({"results": buscar_socios(q, limit)})
+
+
+class SocioAdminDetailView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_object(self, socio_id):
+        return get_object_or_404(Socio.objects.select_related('usuario'), pk=socio_id)
+
+    @extend_schema(
+        tags=['Socios'],
+        responses=SocioSerializer,
+        summary='Detalle socio',
+        description='Obtiene la información completa de un socio específico',
+    )
+    def get(self, _request, socio_id):
+        socio = self.get_object(socio_id)
+        return Response(SocioSerializer(socio).data)
+
+    @extend_schema(
+        tags=['Socios'],
+        request=SocioAdminUpdateSerializer,
+        responses={
+            200: SocioSerializer,
+            400: OpenApiResponse(description='Errores de validación'),
+            404: OpenApiResponse(description='Socio no encontrado'),
+        },
+        summary='Actualización completa',
+        description='Actualiza campos permitidos del socio. No permite modificar estado o campos críticos.',
+    )
+    def put(self, request, socio_id):
+        socio = self.get_object(socio_id)
+        serializer = SocioAdminUpdateSerializer(instance=socio, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        before = snapshot_socio(socio)
+        socio = serializer.save()
+        after = snapshot_socio(socio)
+        register_audit_entry(
+            socio=socio,
+            user=request.user,
+            action=SocioAuditLog.Actions.UPDATE,
+            before=before,
+            after=after,
+        )
+        return Response(SocioSerializer(socio).data)
+
+    @extend_schema(
+        tags=['Socios'],
+        responses={
+            200: SocioSerializer,
+            404: OpenApiResponse(description='Socio no encontrado'),
+        },
+        summary='Baja lógica de socio',
+        description='Marca al socio como inactivo (baja lógica). Solo administradores.',
+    )
+    def delete(self, _request, socio_id):
+        socio = self.get_object(socio_id)
+        before = snapshot_socio(socio)
+        if socio.estado != Socio.ESTADO_INACTIVO:
+            socio.estado = Socio.ESTADO_INACTIVO
+            socio.save(update_fields=['estado', 'updated_at'])
+            after = snapshot_socio(socio)
+            register_audit_entry(
+                socio=socio,
+                user=getattr(_request, 'user', None),
+                action=SocioAuditLog.Actions.STATE_CHANGE,
+                before=before,
+                after=after,
+                metadata={'motivo': 'baja_logica'},
+            )
+        return Response(SocioSerializer(socio).data, status=status.HTTP_200_OK)
+
+
+class SocioEstadoUpdateView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_object(self, socio_id):
+        return get_object_or_404(Socio, pk=socio_id)
+
+    @extend_schema(
+        tags=['Socios'],
+        request=SocioEstadoSerializer,
+        responses={
+            200: SocioSerializer,
+            400: OpenApiResponse(description='Transición no permitida o datos inválidos'),
+            404: OpenApiResponse(description='Socio no encontrado'),
+        },
+        summary='Cambio de estado',
+        description='Cambia el estado del socio controlando transiciones válidas.',
+    )
+    def patch(self, request, socio_id):
+        socio = self.get_object(socio_id)
+        serializer = SocioEstadoSerializer(data=request.data, context={'socio': socio})
+        serializer.is_valid(raise_exception=True)
+        before = snapshot_socio(socio)
+        socio.estado = serializer.validated_data['estado']
+        socio.save(update_fields=['estado', 'updated_at'])
+        after = snapshot_socio(socio)
+        register_audit_entry(
+            socio=socio,
+            user=request.user,
+            action=SocioAuditLog.Actions.STATE_CHANGE,
+            before=before,
+            after=after,
+            metadata={'motivo': serializer.validated_data.get('motivo') or ''},
+        )
+        return Response(SocioSerializer(socio).data)
+
+
+class SocioHistorialView(LecturaReplicaMixin, APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        tags=['Socios'],
+        responses={200: HistorialCrediticioSerializer},
+        summary='Historial crediticio de un socio',
+        description='Devuelve los préstamos previos del socio y sus pagos, filtrables por estado y rango de fechas.',
+    )
+    def get(self, request, socio_id=None):
+        socio = get_object_or_404(Socio.objects.select_related('usuario'), pk=socio_id) if socio_id else None
+
+        estados_param = request.query_params.get('estado') or ''
+        estados = {e.strip() for e in estados_param.split(',') if e.strip()}
+        estados_validos = set(Prestamo.Estados.values)
+        if estados and not estados.issubset(estados_validos):
+            desconocidos = estados - estados_validos
+            raise ValidationError({'estado': [f"Estado(s) desconocido(s): {', '.join(desconocidos)}"]})
+
+        def parse_date(param_name: str):
+            valor = request.query_params.get(param_name)
+            if not valor:
+                return None
+            try:
+                return datetime.fromisoformat(valor).date()
+            except Exception:
+                raise ValidationError({param_name: 'Usa formato ISO AAAA-MM-DD.'})
+
+        desde = parse_date('desde')
+        hasta = parse_date('hasta')
+
+        prestamos_qs = Prestamo.objects.filter(socio=socio) if socio else Prestamo.objects.all()
+        prestamos_qs = prestamos_qs.select_related('socio', 'tipo').prefetch_related('pagos').order_by('-fecha_desembolso')
+        if estados:
+            prestamos_qs = prestamos_qs.filter(estado__in=estados)
+        if desde:
+            prestamos_qs = prestamos_qs.filter(fecha_desembolso__gte=desde)
+        if hasta:
+            prestamos_qs = prestamos_qs.filter(fecha_desembolso__lte=hasta)
+
+        # Los pagos ya vienen precargados: se filtran en memoria y las métricas
+        # se calculan una sola vez por préstamo antes de serializar.
+        hoy = date.today()
+        prestamos = []
+        for prestamo in prestamos_qs:
+            pagos_filtrados = None
+            if desde or hasta:
+                pagos_filtrados = [
+                    pago for pago in prestamo.pagos.all()
+                    if (not desde or pago.fecha_pago >= desde) and (not hasta or pago.fecha_pago <= hasta)
+                ]
+            precalcular_metricas(prestamo, pagos_filtrados, hoy)
+            prestamos.append(prestamo)
+
+        serializer = HistorialCrediticioSerializer({
+            'socio': socio,
+            'prestamos': prestamos,
+        })
+        return Response(serializer.data)
+
+
+class AdminActivityView(LecturaReplicaMixin, APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        tags=['Socios'],
+        summary='Actividad reciente del admin',
+        description='Últimas acciones del administrador autenticado sobre socios.',
+        responses={200: OpenApiResponse(description='Listado de actividad')},
+    )
+    def get(self, request):
+        usuario = request.user
+        qs = (
+            SocioAuditLog.objects.select_related('socio')
+            .filter(performed_by=usuario)
+            .order_by('-created_at')[:10]
+        )
+        data = [
+            {
+                "socio": log.socio.nombre_completo if log.socio else "",
+                "accion": log.get_action_display(),
+                "estado_anterior": log.estado_anterior,
+                "estado_nuevo": log.estado_nuevo,
+                "campos": log.campos_modificados,
+                "fecha": log.created_at.isoformat(),
+            }
+            for log in qs
+        ]
+        return Response(data)
@@ -0,0 +1,891 @@
+"""Alta de solicitudes, cola del analista, evaluación y decisión. Incluye el acceso a la tabla `solicitud`."""
+import uuid
+from decimal import Decimal
+
+from django.http import Http404
+from django.utils import timezone
+from django.db import connection, transaction
+from drf_spectacular.utils import extend_schema, OpenApiResponse
+from rest_framework import permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.renderers import FormatoColumnasMixin
+
+from .. import cambios, catalogos, estado_cliente, eventos, notificaciones, politicas
+from ..schema import get_table_columns
+from ..models import CambioSocio, Prestamo, Socio, EventoCola
+from ..serializers import TipoPrestamoSerializer, PrestamoSolicitudSerializer
+from ..signals import prestamos_creados_en_lote
+from .comunes import _fmt_uuid, _is_analista, add_months, calcular_tabla_amortizacion, fmt_decimal
+from .catalogo import ensure_producto_from_tipo
+
+
+class PrestamoSolicitudCreateView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        tags=['Prestamos'],
+        request=PrestamoSolicitudSerializer,
+        responses={201: OpenApiResponse(description='Solicitud registrada'), 404: OpenApiResponse(description='Socio o tipo no encontrado')},
+        summary='Registrar solicitud de prestamo',
+        description='Crea un prestamo asociado al socio autenticado usando un tipo activo y devuelve el resumen calculado.',
+    )
+    def post(self, request):
+        socio = getattr(request.user, 'socio', None)
+        if not socio:
+            return Response({'detail': 'Perfil de socio no encontrado.'}, status=status.HTTP_404_NOT_FOUND)
+        if socio.estado != Socio.ESTADO_ACTIVO:
+            return Response({'detail': 'El socio no se encuentra activo.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = PrestamoSolicitudSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        tipo = catalogos.tipo_prestamo(serializer.validated_data['tipo_prestamo_id'], solo_activos=True)
+        if not tipo:
+            raise Http404
+        monto = serializer.validated_data['monto']
+        plazo = serializer.validated_data.get('plazo_meses') or tipo.plazo_meses
+        if plazo > tipo.plazo_meses:
+            return Response({'plazo_meses': f'Maximo permitido para este producto: {tipo.plazo_meses} meses.'}, status=status.HTTP_400_BAD_REQUEST)
+        if plazo < 6 or plazo % 6 != 0:
+            return Response({'plazo_meses': 'El plazo debe ser en saltos de 6 meses y al menos 6.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        plan = calcular_tabla_amortizacion(monto, tipo.tasa_interes_anual, plazo)
+
+        # Insertar en tabla de solicitudes (no crea prestamo aún)
+        columnas = get_table_columns('solicitud')
+        if not columnas:
+            return Response({'detail': 'Tabla de solicitud no disponible en la base de datos.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        solicitud_id = uuid.uuid4()
+        ahora = timezone.now()
+        descripcion = serializer.validated_data.get('descripcion') or ""
+        producto_id = None
+        if "producto_id" in columnas:
+            producto_id, error_producto = ensure_producto_from_tipo(tipo)
+            if error_producto:
+                return Response({'detail': error_producto}, status=status.HTTP_400_BAD_REQUEST)
+        # Campos candidatos (solo se insertan los que existan en la tabla)
+        payload = {
+            "id": solicitud_id,
+            "socio_id": socio.id,
+            "monto": monto,
+            "tasa_interes": tipo.tasa_interes_anual,
+            "plazo_meses": plazo,
+            "descripcion": descripcion,
+            "estado": "pendiente",
+            "created_at": ahora,
+            "updated_at": ahora,
+        }
+        # producto_id: obligatorio en schema actual, usamos el id del tipo de prestamo
+        if producto_id:
+            payload["producto_id"] = producto_id
+        # tipo_prestamo_id por compatibilidad si la columna existe
+        if "tipo_prestamo_id" in columnas:
+            payload["tipo_prestamo_id"] = tipo.id
+        cols_presentes = [col for col in payload.keys() if col in columnas]
+        if not cols_presentes:
+            return Response({'detail': 'No hay columnas compatibles para guardar la solicitud.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        placeholders = ", ".join(["%s"] * len(cols_presentes))
+        columnas_sql = ", ".join(cols_presentes)
+        valores = [payload[col] for col in cols_presentes]
+        solicitud_table = "solicitud" if connection.vendor != "postgresql" else "public.solicitud"
+        if connection.vendor != "postgresql":
+            valores = [str(v) if isinstance(v, uuid.UUID) else v for v in valores]
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"INSERT INTO {solicitud_table} ({columnas_sql}) VALUES ({placeholders})",
+                        valores,
+                    )
+                cambios.registrar_cambio(socio.id, CambioSocio.Entidades.SOLICITUD, solicitud_id)
+                # Notificar a analistas (stream de eventos)
+                eventos.publicar_evento(
+                    EventoCola.Tipos.SOLICITUD_CREADA,
+                    {
+                        "solicitud_id": str(solicitud_id),
+                        "socio_id": str(socio.id),
+                        "monto": fmt_decimal(monto),
+                        "tipo": tipo.nombre,
+                    },
+                )
+        except Exception as exc:
+            return Response({'detail': f'No se pudo registrar la solicitud: {exc}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response(
+            {
+                "solicitud_id": str(solicitud_id),
+                "estado": payload.get("estado") if "estado" in columnas else "registrada",
+                "fecha_desembolso": None,
+                "fecha_vencimiento": None,
+                "socio": {
+                    "id": str(socio.id),
+                    "nombre_completo": socio.nombre_completo,
+                    "documento": socio.documento,
+                    "email": socio.usuario.email if socio.usuario else None,
+                },
+                "tipo": TipoPrestamoSerializer(tipo).data,
+                "monto": fmt_decimal(monto),
+                "plazo_meses": tipo.plazo_meses,
+                **plan,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+def _fetch_solicitud_row(solicitud_id: uuid.UUID, columnas: set[str] | None = None) -> tuple[dict, set[str]]:
+    if columnas is None:
+        columnas = get_table_columns("solicitud")
+    if not columnas:
+        raise Http404("Tabla solicitud no encontrada.")
+    posibles = [
+        "id",
+        "socio_id",
+        "monto",
+        "tasa_interes",
+        "plazo_meses",
+        "descripcion",
+        "estado",
+        "created_at",
+        "updated_at",
+        "producto_id",
+        "tipo_prestamo_id",
+    ]
+    seleccionadas = [c for c in posibles if c in columnas]
+    if "observaciones" in columnas:
+        seleccionadas.append("observaciones")
+    if not seleccionadas:
+        raise Http404("No hay columnas legibles en la tabla solicitud.")
+
+    table_name = "solicitud" if connection.vendor != "postgresql" else "public.solicitud"
+    solicitud_str = str(solicitud_id)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {', '.join(seleccionadas)} FROM {table_name} WHERE id = %s LIMIT 1",
+            [solicitud_str],
+        )
+        row = cursor.fetchone()
+    if not row:
+        raise Http404("Solicitud no encontrada.")
+    data = dict(zip(seleccionadas, row))
+    return data, columnas
+
+
+def _extraer_observaciones(row: dict) -> str:
+    if "observaciones" in row:
+        return row.get("observaciones") or ""
+    if "comentarios" in row:
+        return row.get("comentarios") or ""
+    descripcion = row.get("descripcion") or ""
+    marker = "[OBS_ANALISTA]"
+    lines = []
+    for line in descripcion.splitlines():
+        if line.strip().startswith(marker):
+            lines.append(line.replace(marker, "", 1).strip())
+    return "\n".join(lines)
+
+
+def _adjuntar_observacion_en_descripcion(descripcion_actual: str, nueva_obs: str, marker: str = "[OBS_ANALISTA]") -> str:
+    base = descripcion_actual or ""
+    if marker in base and nueva_obs.strip() in base:
+        return base
+    separator = "\n" if base else ""
+    return f"{base}{separator}{marker} {nueva_obs.strip()}"
+
+
+def _obs_column(columnas: set[str]) -> str | None:
+    if "observaciones" in columnas:
+        return "observaciones"
+    if "comentarios" in columnas:
+        return "comentarios"
+    return None
+
+
+def _solicitudes_por_socio(socio_id: uuid.UUID, limit: int = 50, ids: set[str] | None = None) -> list[dict]:
+    """Devuelve las solicitudes registradas por el socio (si existe la tabla), opcionalmente solo las de `ids`."""
+    columnas = get_table_columns("solicitud")
+    if not columnas:
+        return []
+    posibles = [
+        "id",
+        "socio_id",
+        "monto",
+        "tasa_interes",
+        "plazo_meses",
+        "descripcion",
+        "estado",
+        "created_at",
+        "updated_at",
+        "producto_id",
+        "tipo_prestamo_id",
+    ]
+    seleccionadas = [c for c in posibles if c in columnas]
+    if "observaciones" in columnas:
+        seleccionadas.append("observaciones")
+    if not seleccionadas:
+        return []
+
+    table_name = "solicitud" if connection.vendor != "postgresql" else "public.solicitud"
+    params = [str(socio_id)]
+    filtro_ids = ""
+    if ids is not None:
+        if not ids:
+            return []
+        filtro_ids = f"AND id IN ({', '.join(['%s'] * len(ids))})"
+        params.extend(sorted(ids))
+    sql = f"""
+        SELECT {', '.join(seleccionadas)}
+        FROM {table_name}
+        WHERE socio_id = %s {filtro_ids}
+        ORDER BY created_at DESC
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*params, limit])
+        rows = cursor.fetchall()
+
+    data = []
+    for row in rows:
+        record = dict(zip(seleccionadas, row))
+        record["id"] = _fmt_uuid(record.get("id"))
+        record["socio_id"] = _fmt_uuid(record.get("socio_id"))
+        data.append(record)
+    return data
+
+
+def _crear_prestamo_desde_solicitud_row(solicitud_row: dict):
+    """
+    Genera un registro en prestamo usando los datos de la solicitud aprobada.
+    Devuelve (prestamo, error:str|None). Usa el id de la solicitud para mantener trazabilidad/idempotencia.
+    """
+    solicitud_id = solicitud_row.get("id")
+    socio_id = solicitud_row.get("socio_id")
+    if not socio_id:
+        return None, "La solicitud no tiene socio asociado."
+    socio = Socio.objects.filter(pk=socio_id).first()
+    if not socio:
+        return None, "No se encontró el socio asociado a la solicitud."
+
+    # Evita duplicar si ya existe el préstamo con ese id
+    if solicitud_id and Prestamo.objects.filter(pk=solicitud_id).exists():
+        return Prestamo.objects.get(pk=solicitud_id), None
+
+    tipo_id = solicitud_row.get("tipo_prestamo_id") or solicitud_row.get("producto_id")
+    prestamo, error = _prestamo_desde_solicitud_row(solicitud_row, socio, catalogos.tipo_prestamo(tipo_id))
+    if error:
+        return None, error
+    prestamo.save(force_insert=True)
+    return prestamo, None
+
+
+def _prestamo_desde_solicitud_row(solicitud_row: dict, socio: Socio, tipo):
+    """Arma (sin guardar) el préstamo de una solicitud aprobada. Devuelve (prestamo, error:str|None)."""
+    try:
+        monto = Decimal(str(solicitud_row.get("monto") or "0"))
+    except Exception:
+        return None, "Monto de solicitud inválido."
+
+    try:
+        tasa = Decimal(str(solicitud_row.get("tasa_interes") or "0"))
+    except Exception:
+        tasa = Decimal("0")
+
+    plazo_raw = solicitud_row.get("plazo_meses")
+    try:
+        plazo_meses = int(plazo_raw) if plazo_raw is not None else None
+    except (TypeError, ValueError):
+        plazo_meses = None
+
+    fecha_desembolso = timezone.now().date()
+    fecha_vencimiento = add_months(fecha_desembolso, plazo_meses) if plazo_meses else None
+
+    prestamo = Prestamo(
+        id=solicitud_row.get("id") or uuid.uuid4(),
+        socio=socio,
+        tipo=tipo,
+        monto=monto,
+        tasa_interes=tasa,
+        estado="aprobado",
+        fecha_desembolso=fecha_desembolso,
+        fecha_vencimiento=fecha_vencimiento,
+        descripcion=solicitud_row.get("descripcion") or "",
+    )
+    return prestamo, None
+
+
+class SolicitudEvaluarView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _ensure_analista(self, request):
+        if not _is_analista(request.user):
+            return Response({"detail": "Solo analistas o administradores pueden evaluar solicitudes."}, status=status.HTTP_403_FORBIDDEN)
+        return None
+
+    @extend_schema(
+        tags=["Prestamos"],
+        summary="Evaluar solicitud",
+        description="Retorna detalles de la solicitud y socio para ser evaluada por un analista.",
+        responses={200: OpenApiResponse(description="Detalle de solicitud para evaluar")},
+    )
+    def get(self, request, solicitud_id: uuid.UUID):
+        forbidden = self._ensure_analista(request)
+        if forbidden:
+            return forbidden
+        solicitud, columnas = _fetch_solicitud_row(solicitud_id)
+        socio = Socio.objects.filter(pk=solicitud.get("socio_id")).select_related("usuario").first()
+        evaluacion = politicas.evaluar_solicitud({**solicitud, "id": str(solicitud_id)})
+        recomendacion = evaluacion["recomendacion"]
+        observaciones = _extraer_observaciones(solicitud)
+
+        data = {
+            "solicitud": {
+                "id": str(solicitud_id),
+                "estado": solicitud.get("estado"),
+                "monto": str(solicitud.get("monto")),
+                "plazo_meses": solicitud.get("plazo_meses"),
+                "descripcion": solicitud.get("descripcion"),
+                "observaciones": observaciones,
+            },
+            "socio": None,
+            "analisis": {
+                "recomendacion": recomendacion,
+                "puede_aprobar": recomendacion == "aprobar",
+                "motivo": evaluacion["motivo"],
+                "politica": evaluacion["politica"],
+                "politicas": evaluacion["politicas"],
+                "entradas": evaluacion["entradas"],
+                "columns": list(columnas),
+            },
+        }
+        if socio:
+            data["socio"] = {
+                "id": str(socio.id),
+                "nombre_completo": socio.nombre_completo,
+                "documento": socio.documento,
+                "estado": socio.estado,
+                "email": socio.usuario.email if socio.usuario else None,
+                "fecha_alta": socio.fecha_alta,
+            }
+        return Response(data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        tags=["Prestamos"],
+        summary="Guardar observaciones de analista",
+        description="Permite registrar observaciones y recomendacion sobre una solicitud.",
+        request=None,
+        responses={200: OpenApiResponse(description="Observacion registrada")},
+    )
+    def put(self, request, solicitud_id: uuid.UUID):
+        forbidden = self._ensure_analista(request)
+        if forbidden:
+            return forbidden
+        observaciones = (request.data or {}).get("observaciones")
+        recomendacion_req = (request.data or {}).get("recomendacion")
+        if observaciones is None and recomendacion_req is None:
+            return Response({"detail": "Debe enviar observaciones o recomendacion."}, status=status.HTTP_400_BAD_REQUEST)
+
+        solicitud, columnas = _fetch_solicitud_row(solicitud_id)
+        obs_col = _obs_column(columnas)
+        updates = {}
+        descripcion_actual = solicitud.get("descripcion") or ""
+        now = timezone.now()
+        if observaciones:
+            if obs_col:
+                updates[obs_col] = observaciones
+            else:
+                updates["descripcion"] = _adjuntar_observacion_en_descripcion(descripcion_actual, observaciones)
+        if recomendacion_req:
+            updates["recomendacion"] = recomendacion_req  # solo se guarda si la columna existe
+        has_updated = "updated_at" in columnas
+        if has_updated:
+            updates["updated_at"] = now
+
+        set_parts = []
+        values = []
+        for col, val in updates.items():
+            if col not in columnas and not (col == "updated_at" and has_updated):
+                continue
+            set_parts.append(f"{col} = %s")
+            values.append(val)
+
+        if has_updated and all(not part.startswith("updated_at") for part in set_parts):
+            set_parts.append("updated_at = %s")
+            values.append(now)
+
+        if not set_parts:
+            return Response({"detail": "No hay columnas para actualizar observaciones."}, status=status.HTTP_400_BAD_REQUEST)
+
+        values.append(str(solicitud_id))
+        table_name = "solicitud" if connection.vendor != "postgresql" else "public.solicitud"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table_name} SET {', '.join(set_parts)} WHERE id = %s",
+                values,
+            )
+
+        cambios.registrar_cambio(solicitud.get("socio_id"), CambioSocio.Entidades.SOLICITUD, solicitud_id)
+        estado_cliente.invalidar_estado_cliente(solicitud_id)
+        solicitud_actualizada, _ = _fetch_solicitud_row(solicitud_id)
+        return Response(
+            {
+                "solicitud_id": str(solicitud_id),
+                "estado": solicitud_actualizada.get("estado"),
+                "observaciones": observaciones or _extraer_observaciones(solicitud_actualizada),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class SolicitudDecisionBaseView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    nuevo_estado: str = ""
+
+    def _ensure_analista(self, request):
+        if not _is_analista(request.user):
+            return Response({"detail": "Solo analistas o administradores pueden decidir solicitudes."}, status=status.HTTP_403_FORBIDDEN)
+        return None
+
+    def patch(self, request, solicitud_id: uuid.UUID):
+        forbidden = self._ensure_analista(request)
+        if forbidden:
+            return forbidden
+        comentario = (request.data or {}).get("comentario") or ""
+
+        solicitud, columnas = _fetch_solicitud_row(solicitud_id)
+        if "estado" not in columnas:
+            return Response({"detail": "La tabla de solicitudes no tiene columna 'estado'."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        descripcion_actual = solicitud.get("descripcion") or ""
+        now = timezone.now()
+
+        has_updated = "updated_at" in columnas
+        updates = {"estado": self.nuevo_estado}
+        if has_updated:
+            updates["updated_at"] = now
+        obs_col = _obs_column(columnas)
+        if obs_col and comentario:
+            updates[obs_col] = comentario
+        elif comentario:
+            updates["descripcion"] = _adjuntar_observacion_en_descripcion(descripcion_actual, comentario, marker="[DECISION]")
+
+        set_parts = []
+        values = []
+        for col, val in updates.items():
+            if col not in columnas and not (col == "updated_at" and has_updated):
+                continue
+            set_parts.append(f"{col} = %s")
+            values.append(val)
+
+        values.append(str(solicitud_id))
+        table_name = "solicitud" if connection.vendor != "postgresql" else "public.solicitud"
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {table_name} SET {', '.join(set_parts)} WHERE id = %s",
+                    values,
+                )
+
+            solicitud_actualizada, _ = _fetch_solicitud_row(solicitud_id)
+            prestamo_id = None
+            if self.nuevo_estado == "aprobado":
+                prestamo, error = _crear_prestamo_desde_solicitud_row(solicitud_actualizada)
+                if error:
+                    raise ValidationError({"detail": error})
+                if prestamo:
+                    prestamo_id = str(prestamo.id)
+            cambios.registrar_cambio(
+                solicitud_actualizada.get("socio_id"), CambioSocio.Entidades.SOLICITUD, solicitud_id
+            )
+            eventos.publicar_evento(
+                EventoCola.Tipos.SOLICITUD_DECIDIDA,
+                {"solicitud_id": str(solicitud_id), "estado": self.nuevo_estado, "prestamo_id": prestamo_id},
+            )
+            socio = Socio.objects.filter(pk=solicitud_actualizada.get("socio_id")).select_related("usuario").first()
+            email = socio.usuario.email if socio and socio.usuario else None
+            # El correo lo envía el despachador; aquí solo queda en la bandeja de salida
+            notificaciones.encolar(notificaciones.aviso_decision(email, solicitud_id, self.nuevo_estado))
+        estado_cliente.invalidar_estado_cliente(solicitud_id)
+
+        notificacion = f"Notificación encolada para {email}" if email else None
+
+        return Response(
+            {
+                "solicitud_id": str(solicitud_id),
+                "estado": solicitud_actualizada.get("estado"),
+                "comentario": comentario,
+                "notificacion": notificacion,
+                "prestamo_id": prestamo_id,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class SolicitudAprobarView(SolicitudDecisionBaseView):
+    nuevo_estado = "aprobado"
+
+
+class SolicitudRechazarView(SolicitudDecisionBaseView):
+    nuevo_estado = "rechazado"
+
+
+DECISIONES_LOTE = {"aprobado": "aprobado", "rechazado": "rechazado", "auto": None}
+ESTADO_POR_RECOMENDACION = {"aprobar": "aprobado", "rechazar": "rechazado"}
+MAX_DECISION_LOTE = 500
+
+
+class SolicitudDecisionLoteView(APIView):
+    """
+    Decide varias solicitudes en una sola request: una lectura de filas, un
+    UPDATE por estado resultante, los préstamos de las aprobadas con
+    `bulk_create` y los eventos de cola en un solo INSERT, todo en una
+    transacción. Las filas se leen con FOR UPDATE, así que dos lotes que
+    comparten solicitudes se serializan en vez de chocar en el INSERT del
+    préstamo. Como `bulk_create` no dispara post_save, lo que hacen los
+    receivers de Prestamo se llama explícitamente (`prestamos_creados_en_lote`).
+    Las solicitudes que no se pueden decidir se informan por item sin afectar
+    al resto.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        tags=["Prestamos"],
+        summary="Aprobar o rechazar solicitudes en lote",
+        description=(
+            "Recibe `ids` (lista de solicitudes), `decision` (`aprobado`, `rechazado` o `auto`) y un `comentario` "
+            "opcional. Con `auto` cada solicitud se decide según las políticas de aprobación activas; las que quedan "
+            "en `revisar` no se modifican. Devuelve el resultado de cada solicitud."
+        ),
+        request=None,
+        responses={200: OpenApiResponse(description="Resultado por solicitud")},
+    )
+    def post(self, request):
+        if not _is_analista(request.user):
+            return Response({"detail": "Solo analistas o administradores pueden decidir solicitudes."}, status=status.HTTP_403_FORBIDDEN)
+
+        body = request.data or {}
+        decision = str(body.get("decision") or "").strip().lower()
+        if decision not in DECISIONES_LOTE:
+            return Response({"decision": "Debe ser 'aprobado', 'rechazado' o 'auto'."}, status=status.HTTP_400_BAD_REQUEST)
+        ids_raw = body.get("ids")
+        if not isinstance(ids_raw, list) or not ids_raw:
+            return Response({"ids": "Debe enviar una lista de ids."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids_raw) > MAX_DECISION_LOTE:
+            return Response({"ids": f"Máximo {MAX_DECISION_LOTE} solicitudes por lote."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ids = list(dict.fromkeys(str(uuid.UUID(str(val).strip())) for val in ids_raw))
+        except ValueError:
+            return Response({"ids": "Lista de ids inválida."}, status=status.HTTP_400_BAD_REQUEST)
+        comentario = str(body.get("comentario") or "").strip()
+
+        columnas = get_table_columns("solicitud")
+        if "estado" not in columnas:
+            return Response({"detail": "La tabla de solicitudes no tiene columna 'estado'."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        # Filas bloqueadas hasta el commit: dos lotes con la misma solicitud se
+        # serializan y el segundo la ve ya decidida (sin_cambios)
+        with transaction.atomic():
+            filas = _solicitudes_por_ids(ids, columnas, bloquear=True)
+            evaluaciones = politicas.evaluar_solicitudes(list(filas.values())) if decision == "auto" else {}
+
+            resultados: dict[str, dict] = {}
+            destino: dict[str, str] = {}
+            for solicitud_id in ids:
+                fila = filas.get(solicitud_id)
+                if fila is None:
+                    resultados[solicitud_id] = {"resultado": "no_encontrada"}
+                    continue
+                item = {"estado_anterior": fila.get("estado")}
+                nuevo_estado = DECISIONES_LOTE[decision]
+                if decision == "auto":
+                    evaluacion = evaluaciones[solicitud_id]
+                    item.update(recomendacion=evaluacion["recomendacion"], motivo=evaluacion["motivo"])
+                    nuevo_estado = ESTADO_POR_RECOMENDACION.get(evaluacion["recomendacion"])
+                if nuevo_estado is None:
+                    resultados[solicitud_id] = {**item, "resultado": "revisar"}
+                elif (fila.get("estado") or "").strip().lower() == nuevo_estado:
+                    resultados[solicitud_id] = {**item, "resultado": "sin_cambios"}
+                else:
+                    resultados[solicitud_id] = item
+                    destino[solicitud_id] = nuevo_estado
+
+            aprobadas = [filas[sid] for sid, estado in destino.items() if estado == "aprobado"]
+            socio_ids = {fila.get("socio_id") for fila in filas.values() if fila.get("socio_id")}
+            socios = {str(s.pk): s for s in Socio.objects.filter(pk__in=socio_ids).select_related("usuario")} if socio_ids else {}
+            existentes = set()
+            if aprobadas:
+                existentes = {str(pk) for pk in Prestamo.objects.filter(pk__in=[f["id"] for f in aprobadas]).values_list("pk", flat=True)}
+
+            nuevos_prestamos = []
+            tipos: dict = {}
+            for fila in aprobadas:
+                solicitud_id = fila["id"]
+                if solicitud_id in existentes:
+                    continue
+                socio = socios.get(str(_fmt_uuid(fila.get("socio_id")))) if fila.get("socio_id") else None
+                if socio is None:
+                    error = "No se encontró el socio asociado a la solicitud."
+                else:
+                    tipo_id = fila.get("tipo_prestamo_id") or fila.get("producto_id")
+                    if tipo_id not in tipos:
+                        tipos[tipo_id] = catalogos.tipo_prestamo(tipo_id)
+                    prestamo, error = _prestamo_desde_solicitud_row(fila, socio, tipos[tipo_id])
+                if error:
+                    resultados[solicitud_id] = {**resultados[solicitud_id], "resultado": "error", "detalle": error}
+                    destino.pop(solicitud_id)
+                    continue
+                nuevos_prestamos.append(prestamo)
+
+            emails = {}
+            for sid in destino:
+                socio = socios.get(str(_fmt_uuid(filas[sid].get("socio_id")))) if filas[sid].get("socio_id") else None
+                emails[sid] = socio.usuario.email if socio and socio.usuario else None
+
+            if destino:
+                now = timezone.now()
+                for nuevo_estado in sorted(set(destino.values())):
+                    grupo = [filas[sid] for sid, estado in destino.items() if estado == nuevo_estado]
+                    _actualizar_estado_solicitudes(grupo, nuevo_estado, columnas, comentario, now)
+                Prestamo.objects.bulk_create(nuevos_prestamos)
+                prestamos_creados_en_lote(nuevos_prestamos)
+                cambios.registrar_cambios(
+                    [(filas[sid].get("socio_id"), CambioSocio.Entidades.SOLICITUD, sid) for sid in destino]
+                )
+                eventos.publicar_eventos(
+                    EventoCola.Tipos.SOLICITUD_DECIDIDA,
+                    [
+                        {
+                            "solicitud_id": sid,
+                            "estado": estado,
+                            "prestamo_id": sid if estado == "aprobado" else None,
+                        }
+                        for sid, estado in destino.items()
+                    ],
+                )
+                notificaciones.encolar(
+                    *(notificaciones.aviso_decision(emails.get(sid), sid, estado) for sid, estado in destino.items())
+                )
+        if destino:
+            estado_cliente.invalidar_estados_cliente(destino.keys())
+
+        for sid, estado in destino.items():
+            resultados[sid].update(
+                resultado=estado,
+                prestamo_id=sid if estado == "aprobado" else None,
+                notificacion=f"Notificación encolada para {emails[sid]}" if emails.get(sid) else None,
+            )
+
+        results = [{"solicitud_id": sid, **resultados[sid]} for sid in ids]
+        resumen: dict[str, int] = {}
+        for item in results:
+            resumen[item["resultado"]] = resumen.get(item["resultado"], 0) + 1
+        return Response(
+            {"decision": decision, "results": results, "count": len(results), "resumen": resumen},
+            status=status.HTTP_200_OK,
+        )
+
+
+def _solicitudes_por_ids(ids: list[str], columnas: set[str], bloquear: bool = False) -> dict[str, dict]:
+    """
+    Filas de solicitud por id (con el id normalizado como clave) en una sola
+    consulta. Con `bloquear` (dentro de una transacción) las toma con
+    FOR UPDATE, en orden de id para que dos lotes no se bloqueen en cruz.
+    """
+    posibles = [
+        "id", "socio_id", "monto", "tasa_interes", "plazo_meses", "descripcion", "estado",
+        "created_at", "producto_id", "tipo_prestamo_id",
+    ]
+    select_cols = [c for c in posibles if c in columnas]
+    table_name = "solicitud" if connection.vendor != "postgresql" else "public.solicitud"
+    bloqueo = " FOR UPDATE" if bloquear and connection.features.has_select_for_update else ""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {', '.join(select_cols)} FROM {table_name} WHERE id IN ({', '.join(['%s'] * len(ids))}) "
+            f"ORDER BY id{bloqueo}",
+            ids,
+        )
+        filas = [dict(zip(select_cols, row)) for row in cursor.fetchall()]
+    for fila in filas:
+        fila["id"] = str(_fmt_uuid(fila.get("id")))
+    return {fila["id"]: fila for fila in filas}
+
+
+def _actualizar_estado_solicitudes(filas: list[dict], nuevo_estado: str, columnas: set[str], comentario: str, now) -> None:
+    """Un solo UPDATE para todas las solicitudes que pasan a `nuevo_estado`."""
+    set_parts = ["estado = %s"]
+    values: list = [nuevo_estado]
+    obs_col = _obs_column(columnas)
+    if comentario and obs_col:
+        set_parts.append(f"{obs_col} = %s")
+        values.append(comentario)
+    elif comentario and "descripcion" in columnas:
+        # Sin columna de observaciones el comentario se agrega a la descripción de cada fila
+        casos = []
+        for fila in filas:
+            casos.append("WHEN %s THEN %s")
+            values.extend(
+                [fila["id"], _adjuntar_observacion_en_descripcion(fila.get("descripcion") or "", comentario, marker="[DECISION]")]
+            )
+        set_parts.append(f"descripcion = CASE id {' '.join(casos)} ELSE descripcion END")
+    if "updated_at" in columnas:
+        set_parts.append("updated_at = %s")
+        values.append(now)
+
+    values.extend(fila["id"] for fila in filas)
+    table_name = "solicitud" if connection.vendor != "postgresql" else "public.solicitud"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table_name} SET {', '.join(set_parts)} WHERE id IN ({', '.join(['%s'] * len(filas))})",
+            values,
+        )
+
+
+class SolicitudListView(FormatoColumnasMixin, APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if not _is_analista(request.user):
+            return Response({"detail": "Solo analistas o administradores pueden listar solicitudes."}, status=status.HTTP_403_FORBIDDEN)
+
+        q = (request.query_params.get("q") or "").strip().lower()
+        estado = (request.query_params.get("estado") or "").strip().lower()
+        limit = min(max(int(request.query_params.get("limit", 20)), 1), 100)
+
+        columnas = get_table_columns("solicitud")
+        if not columnas:
+            return Response({"detail": "Tabla solicitud no disponible."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        base_cols = ["id", "socio_id", "monto", "plazo_meses", "estado", "created_at", "updated_at", "descripcion"]
+        select_cols = [c for c in base_cols if c in columnas]
+        if "observaciones" in columnas:
+            select_cols.append("observaciones")
+        table_name = "solicitud" if connection.vendor != "postgresql" else "public.solicitud"
+
+        where_parts = []
+        params: list = []
+        if estado:
+            where_parts.append("LOWER(estado) = %s")
+            params.append(estado)
+        if q:
+            where_parts.append("(LOWER(id::text) LIKE %s OR LOWER(descripcion) LIKE %s)")
+            like = f"%{q}%"
+            params.extend([like, like])
+
+        where_sql = f"WHERE {' AND '.join(where_parts)}" if where_parts else ""
+        sql = f"""
+            SELECT {', '.join(select_cols)}
+            FROM {table_name}
+            {where_sql}
+            ORDER BY created_at DESC
+            LIMIT %s
+        """
+        params.append(limit)
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        results = []
+        for row in rows:
+            data = dict(zip(select_cols, row))
+            socio = Socio.objects.filter(pk=data.get("socio_id")).select_related("usuario").first()
+            obs_col = _obs_column(columnas)
+            results.append(
+                {
+                    "id": str(data.get("id")),
+                    "estado": data.get("estado"),
+                    "monto": str(data.get("monto")),
+                    "plazo_meses": data.get("plazo_meses"),
+                    "descripcion": data.get("descripcion"),
+                    "observaciones": data.get(obs_col) if obs_col and obs_col in data else _extraer_observaciones(data),
+                    "created_at": data.get("created_at"),
+                    "socio": {
+                        "id": str(socio.id),
+                        "nombre_completo": socio.nombre_completo,
+                        "documento": socio.documento,
+                        "email": socio.usuario.email if socio and socio.usuario else None,
+                        "estado": socio.estado if socio else None,
+                        "fecha_alta": socio.fecha_alta if socio else None,
+                    } if socio else None,
+                }
+            )
+        return Response({"results": results, "count": len(results)}, status=status.HTTP_200_OK)
+
+
+class SolicitudEvaluacionLoteView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        tags=["Prestamos"],
+        summary="Evaluar solicitudes en lote",
+        description=(
+            "Evalua contra las politicas de aprobacion activas la cola de solicitudes "
+            "(por defecto las pendientes) o los ids indicados en `ids` separados por coma."
+        ),
+        responses={200: OpenApiResponse(description="Recomendacion por solicitud")},
+    )
+    def get(self, request):
+        if not _is_analista(request.user):
+            return Response({"detail": "Solo analistas o administradores pueden evaluar solicitudes."}, status=status.HTTP_403_FORBIDDEN)
+
+        estado = (request.query_params.get("estado") or "pendiente").strip().lower()
+        ids_raw = (request.query_params.get("ids") or "").strip()
+        limit = min(max(int(request.query_params.get("limit", 100)), 1), 500)
+
+        columnas = get_table_columns("solicitud")
+        if not columnas:
+            return Response({"detail": "Tabla solicitud no disponible."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        posibles = ["id", "socio_id", "monto", "tasa_interes", "plazo_meses", "estado", "created_at", "producto_id", "tipo_prestamo_id"]
+        select_cols = [c for c in posibles if c in columnas]
+        table_name = "solicitud" if connection.vendor != "postgresql" else "public.solicitud"
+
+        where_parts = []
+        params: list = []
+        if ids_raw:
+            try:
+                ids = [str(uuid.UUID(val.strip())) for val in ids_raw.split(",") if val.strip()]
+            except ValueError:
+                return Response({"ids": "Lista de ids inválida."}, status=status.HTTP_400_BAD_REQUEST)
+            if not ids:
+                return Response({"results": [], "count": 0}, status=status.HTTP_200_OK)
+            where_parts.append(f"id IN ({', '.join(['%s'] * len(ids))})")
+            params.extend(ids)
+        elif estado != "todas":
+            where_parts.append("LOWER(estado) = %s")
+            params.append(estado)
+
+        where_sql = f"WHERE {' AND '.join(where_parts)}" if where_parts else ""
+        order_sql = "ORDER BY created_at ASC" if "created_at" in columnas else ""
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT {', '.join(select_cols)} FROM {table_name} {where_sql} {order_sql} LIMIT %s", params)
+            filas = [dict(zip(select_cols, row)) for row in cursor.fetchall()]
+
+        for fila in filas:
+            fila["id"] = _fmt_uuid(fila.get("id"))
+        evaluaciones = politicas.evaluar_solicitudes(filas)
+
+        results = []
+        for fila in filas:
+            evaluacion = evaluaciones[str(fila["id"])]
+            results.append(
+                {
+                    "id": str(fila["id"]),
+                    "estado": fila.get("estado"),
+                    "monto": str(fila.get("monto")),
+                    "socio_id": str(_fmt_uuid(fila.get("socio_id"))) if fila.get("socio_id") else None,
+                    "recomendacion": evaluacion["recomendacion"],
+                    "motivo": evaluacion["motivo"],
+                    "politica": evaluacion["politica"],
+                    "politicas": evaluacion["politicas"],
+                    "entradas": evaluacion["entradas"],
+                }
+            )
+        resumen = {r: 0 for r in politicas.RECOMENDACIONES}
+        for item in results:
+            resumen[item["recomendacion"]] += 1
+        return Response({"results": results, "count": len(results), "resumen": resumen}, status=status.HTTP_200_OK)
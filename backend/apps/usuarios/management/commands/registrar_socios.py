@@ -0,0 +1,55 @@
+"""
+Alta masiva de socios desde un CSV (campañas de vinculación).
+
+Uso:
+    python manage.py registrar_socios --archivo campania.csv
+    python manage.py registrar_socios --archivo campania.csv --lote 1000 --rechazados rechazados.csv
+
+El CSV lleva encabezados `email,nombres` y opcionalmente `documento`,
+`fecha_alta` (AAAA-MM-DD) y `password`. Las filas inválidas o ya registradas
+no detienen la carga: se listan al final o se escriben en `--rechazados`.
+"""
+import csv
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.usuarios.registro import registrar_socios
+
+
+class Command(BaseCommand):
+    help = 'Registra socios (usuario + socio) en lote desde un CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--archivo', required=True, help='CSV con email, nombres, documento, fecha_alta, password')
+        parser.add_argument('--lote', type=int, default=None, help='Filas por transacción (default REGISTRO_MASIVO_LOTE)')
+        parser.add_argument('--rechazados', help='CSV donde escribir las filas rechazadas')
+
+    def handle(self, *args, **options):
+        archivo = Path(options['archivo'])
+        if not archivo.exists():
+            raise CommandError(f'No existe el archivo {archivo}')
+        if options['lote'] is not None and options['lote'] < 1:
+            raise CommandError('--lote debe ser mayor que 0')
+
+        with archivo.open(newline='', encoding='utf-8-sig') as entrada:
+            lector = csv.DictReader(entrada)
+            faltantes = {'email', 'nombres'} - set(lector.fieldnames or ())
+            if faltantes:
+                raise CommandError(f"Faltan columnas: {', '.join(sorted(faltantes))}")
+            resultado = registrar_socios(
+                ({k: (v or None) for k, v in fila.items()} for fila in lector), lote=options['lote']
+            )
+
+        if options['rechazados'] and resultado.rechazados:
+            with open(options['rechazados'], 'w', newline='', encoding='utf-8') as salida:
+                escritor = csv.DictWriter(salida, fieldnames=['indice', 'email', 'error'])
+                escritor.writeheader()
+                escritor.writerows(resultado.rechazados)
+        elif resultado.rechazados:
+            for rechazo in resultado.rechazados:
+                self.stdout.write(f"Fila {rechazo['indice'] + 2}: {rechazo['email']} - {rechazo['error']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(resultado.creados)} socios registrados, {len(resultado.rechazados)} rechazados'
+        ))
@@ -0,0 +1,231 @@
+"""
+Alta de socios: crea el usuario con rol SOCIO y su Socio en una sola transacción.
+
+`registrar_socio` (endpoint `registro/`) valida duplicados de email y documento,
+toma el rol de la caché por proceso e inserta usuario y socio con los datos
+definitivos. El usuario se guarda marcado para que `crear_socio_automatico` no
+cree el socio provisional que antes había que corregir con un `.update`.
+
+`registrar_socios` es la variante masiva para campañas de vinculación
+(`manage.py registrar_socios`): valida todas las filas con dos consultas por
+lote, hashea las contraseñas en paralelo e inserta con `bulk_create`. Las filas
+inválidas o duplicadas se reportan y no frenan al resto.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, connection, transaction
+from django.db.models.functions import Lower
+
+from apps.socios.busqueda import invalidar_busqueda_socios
+from apps.socios.models import Socio
+
+from .models import Rol
+
+
+User = get_user_model()
+
+ROL_SOCIO = "SOCIO"
+DOCUMENTO_MAX = Socio._meta.get_field("documento").max_length
+
+_roles: dict[tuple[str, str], tuple[float, Rol]] = {}
+_lock = threading.Lock()
+
+
+class RegistroError(ValueError):
+    """Datos de registro inválidos o ya registrados."""
+
+
+@dataclass
+class ResultadoMasivo:
+    creados: list[User] = field(default_factory=list)
+    rechazados: list[dict] = field(default_factory=list)
+
+
+def rol(nombre: str) -> Rol:
+    """
+    Rol por nombre, servido desde memoria durante `ROLES_CACHE_SECONDS`. Si no
+    existe se crea, pero no se cachea hasta leerlo ya confirmado.
+    """
+    ttl = getattr(settings, "ROLES_CACHE_SECONDS", 0)
+    key = (connection.alias, nombre)
+    if ttl > 0:
+        hit = _roles.get(key)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+    encontrado = Rol.objects.filter(nombre=nombre).first()
+    if encontrado is None:
+        encontrado, _ = Rol.objects.get_or_create(nombre=nombre)
+    elif ttl > 0:
+        with _lock:
+            _roles[key] = (time.monotonic() + ttl, encontrado)
+    return encontrado
+
+
+def invalidar_roles() -> None:
+    with _lock:
+        _roles.clear()
+
+
+def _limpiar(email, nombres, documento, fecha_alta) -> tuple[str, str, str, object]:
+    email = User.objects.normalize_email((email or "").strip())
+    nombres = (nombres or "").strip()
+    if not email:
+        raise RegistroError("Email es obligatorio")
+    if not nombres:
+        raise RegistroError("Nombres son obligatorios")
+    documento = (documento or "").strip() or email  # usa email como fallback
+    if len(documento) > DOCUMENTO_MAX:
+        raise RegistroError(f"Documento admite máximo {DOCUMENTO_MAX} caracteres")
+    return email, nombres, documento, fecha_alta or date.today()
+
+
+def _usuario(email: str, nombres: str, password_hash: str, rol_socio: Rol) -> User:
+    usuario = User(
+        email=email, nombres=nombres, activo=True, is_active=True, rol=rol_socio, password=password_hash
+    )
+    # El socio lo crea el servicio con los datos reales, no el signal
+    usuario._sin_socio_automatico = True
+    return usuario
+
+
+def registrar_socio(email: str, password: str, nombres: str, documento: str | None = None,
+                    fecha_alta=None) -> User:
+    """Crea usuario y socio activos. Lanza RegistroError si faltan datos o ya existen."""
+    if not email or not password:
+        raise RegistroError("Email y password son obligatorios")
+    email, nombres, documento, fecha_alta = _limpiar(email, nombres, documento, fecha_alta)
+    rol_socio = rol(ROL_SOCIO)
+    # El hash (PBKDF2) va fuera de la transacción para no alargarla
+    password_hash = make_password(password)
+
+    try:
+        with transaction.atomic():
+            if User.objects.filter(email__iexact=email).exists():
+                raise RegistroError("Este email ya está registrado")
+            if Socio.objects.filter(documento=documento).exists():
+                raise RegistroError("Este documento ya está registrado")
+            usuario = _usuario(email, nombres, password_hash, rol_socio)
+            usuario.save(force_insert=True)
+            Socio.objects.create(
+                usuario=usuario,
+                nombre_completo=nombres,
+                documento=documento,
+                estado=Socio.ESTADO_ACTIVO,
+                fecha_alta=fecha_alta,
+            )
+    except IntegrityError:
+        # Registro concurrente con el mismo email o documento
+        raise RegistroError("Este email o documento ya está registrado")
+    return usuario
+
+
+def _hashes(passwords: list[str | None]) -> list[str]:
+    # PBKDF2 libera el GIL: los hilos reparten el costo entre núcleos
+    workers = max(1, getattr(settings, "REGISTRO_HASH_WORKERS", 4))
+    if workers == 1 or sum(1 for p in passwords if p) < 2:
+        return [make_password(p or None) for p in passwords]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda p: make_password(p or None), passwords))
+
+
+def _registrar_lote(filas: list[tuple[int, dict]], rol_socio: Rol, resultado: ResultadoMasivo) -> None:
+    validas = []
+    emails_lote, documentos_lote = set(), set()
+    for indice, fila in filas:
+        try:
+            email, nombres, documento, fecha_alta = _limpiar(
+                fila.get("email"), fila.get("nombres") or fila.get("nombreCompleto"),
+                fila.get("documento"), fila.get("fecha_alta"),
+            )
+            if email.lower() in emails_lote:
+                raise RegistroError("Email repetido en la carga")
+            if documento in documentos_lote:
+                raise RegistroError("Documento repetido en la carga")
+        except RegistroError as exc:
+            resultado.rechazados.append({"indice": indice, "email": fila.get("email"), "error": str(exc)})
+            continue
+        emails_lote.add(email.lower())
+        documentos_lote.add(documento)
+        validas.append((indice, email, nombres, documento, fecha_alta, fila.get("password")))
+
+    emails_existentes = set(
+        User.objects.annotate(email_lower=Lower("email"))
+        .filter(email_lower__in=emails_lote)
+        .values_list("email_lower", flat=True)
+    )
+    documentos_existentes = set(
+        Socio.objects.filter(documento__in=documentos_lote).values_list("documento", flat=True)
+    )
+    nuevas = []
+    for indice, email, nombres, documento, fecha_alta, password in validas:
+        if email.lower() in emails_existentes:
+            error = "Este email ya está registrado"
+        elif documento in documentos_existentes:
+            error = "Este documento ya está registrado"
+        else:
+            nuevas.append((indice, email, nombres, documento, fecha_alta, password))
+            continue
+        resultado.rechazados.append({"indice": indice, "email": email, "error": error})
+    if not nuevas:
+        return
+
+    hashes = _hashes([password for *_, password in nuevas])
+    usuarios = [
+        _usuario(email, nombres, password_hash, rol_socio)
+        for (_, email, nombres, *_), password_hash in zip(nuevas, hashes)
+    ]
+    socios = [
+        Socio(
+            usuario=usuario,
+            nombre_completo=nombres,
+            documento=documento,
+            estado=Socio.ESTADO_ACTIVO,
+            fecha_alta=fecha_alta,
+        )
+        for usuario, (_, _, nombres, documento, fecha_alta, _) in zip(usuarios, nuevas)
+    ]
+    # bulk_create no dispara post_save: ni el signal de socio automático ni la invalidación de búsqueda
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(usuarios)
+            Socio.objects.bulk_create(socios)
+    except IntegrityError:
+        # Otro registro ganó la carrera entre la validación y el insert: el lote entero se descarta
+        resultado.rechazados += [
+            {"indice": indice, "email": email, "error": "Conflicto con un registro concurrente, reintentar"}
+            for indice, email, *_ in nuevas
+        ]
+        return
+    resultado.creados += usuarios
+
+
+def registrar_socios(filas, lote: int | None = None) -> ResultadoMasivo:
+    """
+    Alta masiva. Cada fila es un dict con email, nombres (o nombreCompleto) y
+    opcionalmente documento, fecha_alta y password; sin password el usuario
+    queda con contraseña inutilizable hasta que la restablezca. Cada lote se
+    confirma por separado.
+    """
+    lote = lote or getattr(settings, "REGISTRO_MASIVO_LOTE", 500)
+    rol_socio = rol(ROL_SOCIO)
+    resultado = ResultadoMasivo()
+    pendientes: list[tuple[int, dict]] = []
+    for indice, fila in enumerate(filas):
+        pendientes.append((indice, fila))
+        if len(pendientes) >= lote:
+            _registrar_lote(pendientes, rol_socio, resultado)
+            pendientes = []
+    if pendientes:
+        _registrar_lote(pendientes, rol_socio, resultado)
+    if resultado.creados:
+        invalidar_busqueda_socios()
+    return resultado
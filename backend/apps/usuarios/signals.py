@@ -2,10 +2,12 @@
 Signals para crear automáticamente un Socio cuando se registra un Usuario
 con rol SOCIO.
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from apps.socios.models import Socio
+from .models import Rol
+from .registro import invalidar_roles
 
 User = get_user_model()
 
@@ -19,8 +21,10 @@ def crear_socio_automatico(sender, instance, created, **kwargs):
     - Se crea un nuevo usuario (created=True)
     - El usuario tiene rol SOCIO
     - El usuario no tiene socio asociado
+    - No viene del servicio de registro (apps/usuarios/registro.py), que crea
+      el socio en la misma transacción con los datos reales
     """
-    if not created:
+    if not created or getattr(instance, '_sin_socio_automatico', False):
         return
     
     # Solo crear socio si el usuario tiene rol SOCIO
@@ -38,3 +42,10 @@ def crear_socio_automatico(sender, instance, created, **kwargs):
                 estado=Socio.ESTADO_ACTIVO,
                 fecha_alta=date.today(),  # Fecha actual como default
             )
+
+
+@receiver(post_save, sender=Rol)
+@receiver(post_delete, sender=Rol)
+def invalidar_cache_roles(sender, **kwargs):
+    """Descarta los roles cacheados por el servicio de registro."""
+    invalidar_roles()
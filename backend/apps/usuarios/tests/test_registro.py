@@ -0,0 +1,120 @@
+import tempfile
+from datetime import date
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.socios.models import Socio
+from apps.usuarios import registro
+from apps.usuarios.models import Rol
+
+
+User = get_user_model()
+
+
+class RegistroSocioTests(APITestCase):
+    def setUp(self):
+        Rol.objects.get_or_create(nombre='SOCIO')
+
+    def test_registro_sin_update_ni_socio_provisional(self):
+        payload = {
+            'email': 'Nuevo@Example.com',
+            'password': 'secreto123',
+            'nombreCompleto': 'Nuevo Socio',
+            'documento': 'CC-1001',
+            'fecha_alta': '2026-03-01',
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('registro'), payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        sql = [q['sql'].upper() for q in queries]
+        self.assertFalse([q for q in sql if q.startswith('UPDATE')])
+        self.assertEqual(len([q for q in sql if q.startswith('INSERT')]), 2)
+        socio = Socio.objects.select_related('usuario').get()
+        self.assertEqual(socio.documento, 'CC-1001')
+        self.assertEqual(socio.fecha_alta, date(2026, 3, 1))
+        self.assertEqual(socio.usuario.email, 'Nuevo@example.com')
+        self.assertTrue(socio.usuario.check_password('secreto123'))
+
+    def test_duplicados_responden_400_sin_crear_nada(self):
+        registro.registrar_socio('ya@example.com', 'secreto123', 'Ya Existe', documento='CC-2002')
+
+        for payload in (
+            {'email': 'YA@example.com', 'password': 'x', 'nombres': 'Otro', 'documento': 'CC-3003'},
+            {'email': 'otro@example.com', 'password': 'x', 'nombres': 'Otro', 'documento': 'CC-2002'},
+            {'email': 'largo-' + 'x' * 30 + '@example.com', 'password': 'x', 'nombres': 'Sin documento'},
+        ):
+            response = self.client.post(reverse('registro'), payload, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('error', response.data)
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(Socio.objects.count(), 1)
+
+    @override_settings(ROLES_CACHE_SECONDS=60)
+    def test_rol_cacheado_e_invalidado_por_signal(self):
+        self.addCleanup(registro.invalidar_roles)
+        rol = registro.rol('SOCIO')
+        with self.assertNumQueries(0):
+            self.assertEqual(registro.rol('SOCIO'), rol)
+        rol.save()
+        with self.assertNumQueries(1):
+            registro.rol('SOCIO')
+
+    def test_signal_sigue_creando_socio_fuera_del_servicio(self):
+        usuario = User.objects.create_user(
+            email='admin-alta@example.com', password='x', nombres='Alta Manual', rol=Rol.objects.get(nombre='SOCIO')
+        )
+        self.assertTrue(Socio.objects.filter(usuario=usuario).exists())
+
+
+class RegistroMasivoTests(TestCase):
+    def setUp(self):
+        registro.registrar_socio('existente@example.com', 'secreto123', 'Existente', documento='CC-0')
+
+    def test_crea_en_lotes_y_reporta_rechazos(self):
+        filas = [
+            {'email': f'campania{i}@example.com', 'nombres': f'Socio {i}', 'documento': f'CC-{i + 10}',
+             'password': 'clave-123' if i % 2 else None}
+            for i in range(5)
+        ]
+        filas += [
+            {'email': 'CAMPANIA0@example.com', 'nombres': 'Repetido', 'documento': 'CC-99'},
+            {'email': 'existente@example.com', 'nombres': 'Ya registrado'},
+            {'email': 'nuevo@example.com', 'nombres': 'Documento tomado', 'documento': 'CC-0'},
+            {'email': 'sin-nombre@example.com', 'nombres': ''},
+        ]
+
+        resultado = registro.registrar_socios(filas, lote=3)
+
+        self.assertEqual(len(resultado.creados), 5)
+        self.assertEqual([r['indice'] for r in sorted(resultado.rechazados, key=lambda r: r['indice'])], [5, 6, 7, 8])
+        self.assertEqual(Socio.objects.filter(documento__startswith='CC-1').count(), 5)
+        socio = Socio.objects.select_related('usuario').get(documento='CC-11')
+        self.assertEqual(socio.usuario.rol.nombre, 'SOCIO')
+        self.assertEqual(socio.estado, Socio.ESTADO_ACTIVO)
+        self.assertTrue(socio.usuario.check_password('clave-123'))
+        self.assertFalse(User.objects.get(email='campania0@example.com').has_usable_password())
+
+    def test_comando_desde_csv(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            archivo = Path(directorio) / 'campania.csv'
+            archivo.write_text(
+                'email,nombres,documento,fecha_alta\n'
+                'csv1@example.com,Socio Csv,CC-501,2026-05-04\n'
+                'existente@example.com,Ya Registrado,,\n'
+            )
+            salida = StringIO()
+            call_command('registrar_socios', '--archivo', str(archivo), stdout=salida)
+
+        self.assertIn('1 socios registrados, 1 rechazados', salida.getvalue())
+        self.assertIn('Fila 3: existente@example.com', salida.getvalue())
+        self.assertEqual(Socio.objects.get(documento='CC-501').fecha_alta, date(2026, 5, 4))
@@ -11,8 +11,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.middleware.csrf import get_token
 from apps.usuarios.models import Rol
-from apps.socios.models import Socio
-from datetime import date
+from apps.usuarios.registro import RegistroError, registrar_socio
 from django.shortcuts import get_object_or_404
 
 User = get_user_model()
@@ -22,82 +21,31 @@ User = get_user_model()
 @permission_classes([permissions.AllowAny])
 def registro(request):
     """
-    Registra un nuevo usuario en la tabla 'usuario' de nuestra BD.
-    Automáticamente crea un Socio asociado.
+    Registra un nuevo usuario en la tabla 'usuario' de nuestra BD junto con
+    su Socio, en una sola transacción (ver apps/usuarios/registro.py).
     """
-    email = request.data.get('email')
-    password = request.data.get('password')
-    nombres = request.data.get('nombres') or request.data.get('nombreCompleto')
-    documento = request.data.get('documento') or email  # usa email como fallback
-    fecha_alta = request.data.get('fecha_alta') or date.today()
-    
-    if not email or not password:
-        return Response(
-            {'error': 'Email y password son obligatorios'},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
-    if not nombres:
-        return Response(
-            {'error': 'Nombres son obligatorios'},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-
-    if not documento:
-        return Response(
-            {'error': 'Documento es obligatorio'},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
-    # Verificar que el email no exista
-    if User.objects.filter(email=email).exists():
-        return Response(
-            {'error': 'Este email ya está registrado'},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
-    # Obtener o crear rol SOCIO
-    rol_socio, _ = Rol.objects.get_or_create(nombre='SOCIO')
-    
-    # Crear usuario
     try:
-        usuario = User.objects.create_user(
-            email=email,
-            password=password,
-            nombres=nombres,
-            activo=True,
-            rol=rol_socio,
+        usuario = registrar_socio(
+            email=request.data.get('email'),
+            password=request.data.get('password'),
+            nombres=request.data.get('nombres') or request.data.get('nombreCompleto'),
+            documento=request.data.get('documento'),
+            fecha_alta=request.data.get('fecha_alta'),
         )
-        
-        # El signal automáticamente creará el Socio
-        # Pero verificamos por si acaso
-        if not hasattr(usuario, 'socio'):
-            Socio.objects.create(
-                usuario=usuario,
-                nombre_completo=nombres,
-                documento=documento,
-                estado=Socio.ESTADO_ACTIVO,
-                fecha_alta=fecha_alta,
-            )
-        else:
-            Socio.objects.filter(pk=usuario.socio.pk).update(
-                nombre_completo=nombres,
-                documento=documento,
-                fecha_alta=fecha_alta,
-            )
-        
-        return Response({
-            'message': 'Usuario registrado exitosamente',
-            'usuario_id': str(usuario.id),
-            'email': usuario.email,
-        }, status=status.HTTP_201_CREATED)
-        
+    except RegistroError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response(
             {'error': f'Error al crear usuario: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+    return Response({
+        'message': 'Usuario registrado exitosamente',
+        'usuario_id': str(usuario.id),
+        'email': usuario.email,
+    }, status=status.HTTP_201_CREATED)
+
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
@@ -0,0 +1,54 @@
+"""
+Trabajo de arranque que conviene hacer una sola vez antes de atender tráfico.
+
+Con `preload_app` (gunicorn.conf.py) esto corre en el proceso maestro y los
+workers lo heredan al hacer fork: rutas resueltas, campos de serializers
+construidos y columnas de las tablas no administradas ya en la caché de
+`apps.socios.schema`. Al final se cierran conexiones y pools para que ningún
+worker herede un socket abierto; cada worker abre su pool en `post_worker_init`.
+"""
+import inspect
+import logging
+
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver
+from rest_framework import serializers
+
+
+logger = logging.getLogger(__name__)
+
+TABLAS_NO_ADMINISTRADAS = ("solicitud", "desembolso", "producto_prestamo")
+
+
+def _calentar_serializers() -> None:
+    from apps.socios import serializers as socios_serializers
+
+    for _, clase in inspect.getmembers(socios_serializers, inspect.isclass):
+        if issubclass(clase, serializers.BaseSerializer) and clase.__module__ == socios_serializers.__name__:
+            try:
+                clase().fields
+            except Exception:
+                logger.debug("No se pudo precalentar %s", clase.__name__, exc_info=True)
+
+
+def _calentar_esquema() -> None:
+    from apps.socios.schema import get_tables_columns
+
+    try:
+        get_tables_columns(*TABLAS_NO_ADMINISTRADAS)
+    except Exception:
+        # Sin base al arrancar: las columnas se leerán en la primera request
+        logger.warning("No se pudo precargar el esquema de tablas no administradas", exc_info=True)
+
+
+def calentar_aplicacion() -> None:
+    if not getattr(settings, "APP_WARMUP", False):
+        return
+    get_resolver().reverse_dict  # noqa: B018  (construye el índice de rutas)
+    _calentar_serializers()
+    _calentar_esquema()
+    for conn in connections.all(initialized_only=True):
+        conn.close()
+        if conn.alias in getattr(conn, "_connection_pools", {}):
+            conn.close_pool()
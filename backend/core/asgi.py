@@ -3,6 +3,13 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Production runs it under gunicorn with uvicorn workers (see Procfile):
+    gunicorn core.asgi:application -k uvicorn_worker.UvicornWorker
+Async views (event stream, "mis préstamos", estado de solicitud, catálogos,
+healthz/ping) then wait on the database without holding a worker thread.
+The app is preloaded in the gunicorn master (gunicorn.conf.py) and warmed up
+by core/arranque.py; each worker then opens its database pool (core/db.py).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -14,3 +21,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_asgi_application()
+
+from core.arranque import calentar_aplicacion  # noqa: E402
+
+calentar_aplicacion()
@@ -0,0 +1,30 @@
+"""
+Calentamiento de conexiones al arrancar un worker.
+
+Con `OPTIONS['pool']` Django crea el pool de psycopg en la primera conexión, así
+que la primera request de cada worker pagaría el handshake TLS contra Supabase
+de las `DB_POOL_MIN_SIZE` conexiones. `calentar_conexiones()` abre el pool en
+cada worker al iniciar (hook `post_worker_init` de gunicorn.conf.py), después
+del fork: un pool abierto en el maestro no se puede compartir entre procesos.
+"""
+import logging
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+def calentar_conexiones(alias: str = "default") -> None:
+    if not getattr(settings, "DB_WARMUP", False):
+        return
+    pool = getattr(connections[alias], "pool", None)
+    if pool is None:
+        # Sin pool las conexiones son por hilo: abrir una aquí no la reutilizaría ninguna request
+        return
+    try:
+        pool.open(wait=True, timeout=getattr(settings, "DB_POOL_TIMEOUT", 10))
+    except Exception:
+        # La base puede no estar disponible aún; el pool se abrirá en la primera request
+        logger.warning("No se pudo abrir el pool de conexiones al arrancar", exc_info=True)
@@ -0,0 +1,81 @@
+"""
+Enrutamiento de lecturas pesadas (reportes, historial, exportaciones) a la
+réplica de solo lectura `DATABASES['replica']`, si está configurada.
+
+Solo se leen de la réplica las consultas hechas dentro de
+`leer_desde_replica()` (o de una vista con `LecturaReplicaMixin`); todo lo
+demás, y cualquier escritura, va a `default`. Para leer lo propio recién
+escrito pese al retraso de replicación:
+
+- si la request ya escribió algo, sus lecturas siguientes vuelven a `default`;
+- un socio con préstamos, pagos o desembolsos recientes
+  (`DB_REPLICA_STICKY_SECONDS`) se lee de `default` aunque la vista use la
+  réplica. La marca es la bitácora `cambio_socio` (apps/socios/cambios.py),
+  que esas escrituras ya llenan en su misma transacción y que leen todos los
+  workers; una caché local por proceso no serviría con varios workers.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+REPLICA = "replica"
+
+_leer_replica: ContextVar[bool] = ContextVar("leer_replica", default=False)
+_escribio: ContextVar[bool] = ContextVar("escribio", default=False)
+
+
+def replica_configurada() -> bool:
+    return REPLICA in settings.DATABASES
+
+
+def escritura_reciente(socio_id) -> bool:
+    """True si el socio tuvo cambios en los últimos `DB_REPLICA_STICKY_SECONDS` (leído de `default`)."""
+    ttl = getattr(settings, "DB_REPLICA_STICKY_SECONDS", 0)
+    if not socio_id or ttl <= 0:
+        return False
+    from apps.socios.cambios import cambio_reciente
+
+    return cambio_reciente(socio_id, ttl)
+
+
+@contextmanager
+def leer_desde_replica(socio_id=None):
+    """Envía a la réplica las lecturas ORM del bloque (salvo escrituras recientes del socio)."""
+    if not replica_configurada() or escritura_reciente(socio_id):
+        yield
+        return
+    token = _leer_replica.set(True)
+    escribio = _escribio.set(False)
+    try:
+        yield
+    finally:
+        _escribio.reset(escribio)
+        _leer_replica.reset(token)
+
+
+class LecturaReplicaMixin:
+    """Vistas de solo lectura cuyas consultas van a la réplica; usa `socio_id` de la URL para la adherencia."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with leer_desde_replica(socio_id=kwargs.get("socio_id")):
+            return super().dispatch(request, *args, **kwargs)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _leer_replica.get() and not _escribio.get():
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        if _leer_replica.get():
+            _escribio.set(True)
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Mismos datos en ambas bases
+        return True
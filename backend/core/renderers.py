@@ -0,0 +1,117 @@
+"""
+Renderers JSON de la API.
+
+`JSONRapidoRenderer` serializa con orjson cuando está instalado (mismo JSON
+que el renderer de DRF: fechas con milisegundos y `Z`, Decimal como número,
+UUID como texto) y cae al `JSONRenderer` de DRF si no lo está o si se pide
+indentación.
+
+`ColumnasRenderer` responde `?format=columns`: cada lista de objetos del
+payload se envía como un objeto con un arreglo por campo
+(`{"id": [...], "monto": [...]}`), sin repetir las claves en cada fila. Lo
+habilitan las vistas de listados grandes con `FormatoColumnasMixin`.
+
+`FormatoTablaMixin` agrega `?format=csv` y `?format=parquet` a las
+exportaciones: los renderers solo sirven para la negociación y la vista arma
+la respuesta con `core/tablas.py`. Los errores se siguen respondiendo en JSON.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+
+_encoder = encoders.JSONEncoder()
+
+
+class JSONRapidoRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type or "", renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data,
+            # Fechas y dataclasses pasan por el encoder de DRF para dar el mismo formato
+            default=_encoder.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS,
+        )
+        # Igual que DRF: U+2028/U+2029 escapados para poder embeber el JSON en <script>
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+def a_columnas(filas: list[dict]) -> dict[str, list]:
+    """Lista de objetos -> un arreglo por campo (los campos ausentes en una fila quedan en null)."""
+    columnas: dict[str, list] = {}
+    for idx, fila in enumerate(filas):
+        for campo in fila:
+            if campo not in columnas:
+                columnas[campo] = [None] * idx
+        for campo, valores in columnas.items():
+            valores.append(fila.get(campo))
+    return columnas
+
+
+def _columnizar(data):
+    if isinstance(data, list) and data and all(isinstance(fila, dict) for fila in data):
+        return a_columnas(data)
+    if isinstance(data, dict):
+        return {clave: _columnizar(valor) for clave, valor in data.items()}
+    return data
+
+
+class ColumnasRenderer(JSONRapidoRenderer):
+    format = "columns"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get("response")
+        if response is not None and response.status_code < 400:
+            data = _columnizar(data)
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class FormatoColumnasMixin:
+    """Agrega `?format=columns` a los renderers de la vista."""
+
+    def get_renderers(self):
+        return [*super().get_renderers(), ColumnasRenderer()]
+
+
+class TablaRenderer(BaseRenderer):
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return JSONRapidoRenderer().render(data, accepted_media_type, renderer_context)
+
+
+class CSVRenderer(TablaRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class ParquetRenderer(TablaRenderer):
+    media_type = "application/vnd.apache.parquet"
+    format = "parquet"
+
+
+class FormatoTablaMixin:
+    """Agrega `?format=csv` y `?format=parquet` a los renderers de la vista."""
+
+    def get_renderers(self):
+        return [*super().get_renderers(), CSVRenderer(), ParquetRenderer()]
+
+    def formato_tabla(self, request) -> str | None:
+        renderer = getattr(request, "accepted_renderer", None)
+        return renderer.format if isinstance(renderer, TablaRenderer) else None
+
+    def handle_exception(self, exc):
+        if isinstance(getattr(self.request, "accepted_renderer", None), TablaRenderer):
+            self.request.accepted_renderer = JSONRapidoRenderer()
+            self.request.accepted_media_type = JSONRapidoRenderer.media_type
+        return super().handle_exception(exc)
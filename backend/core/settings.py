@@ -147,10 +147,23 @@ SUPABASE_DB_NAME = os.environ.get("SUPABASE_DB_NAME", "postgres")
 SUPABASE_PORT = os.environ.get("SUPABASE_PORT", "5432")
 SUPABASE_POOL_MODE = os.environ.get("SUPABASE_POOL_MODE", "direct").lower()
 RUNNING_TESTS = 'test' in sys.argv
-DB_CONN_MAX_AGE = env_int("DB_CONN_MAX_AGE", 0 if SUPABASE_POOL_MODE == "transaction" else 60)
 DB_CONNECT_TIMEOUT = env_int("DB_CONNECT_TIMEOUT", 10)
 PG_APP_NAME = os.environ.get("PG_APP_NAME", "coop-backend")
 
+# Pool de conexiones en proceso (psycopg_pool vía OPTIONS['pool']): cada worker mantiene
+# conexiones TLS abiertas contra Supabase/pooler y las presta por request.
+DB_POOL = os.environ.get("DB_POOL", "true").lower() == "true"
+DB_POOL_MIN_SIZE = env_int("DB_POOL_MIN_SIZE", 2)
+DB_POOL_MAX_SIZE = env_int("DB_POOL_MAX_SIZE", 10)
+DB_POOL_TIMEOUT = env_int("DB_POOL_TIMEOUT", 10)  # segundos esperando una conexión libre
+DB_POOL_MAX_IDLE = env_int("DB_POOL_MAX_IDLE", 300)
+# Abrir el pool al arrancar el worker (ver core/db.py) en vez de en la primera request
+DB_WARMUP = os.environ.get("DB_WARMUP", "true").lower() == "true" and not RUNNING_TESTS
+# Rutas, serializers y esquema precalentados al cargar la app (ver core/arranque.py)
+APP_WARMUP = os.environ.get("APP_WARMUP", "true").lower() == "true" and not RUNNING_TESTS
+# Sin pool: conexiones persistentes por hilo (0 en modo transacción)
+DB_CONN_MAX_AGE = 0 if DB_POOL else env_int("DB_CONN_MAX_AGE", 0 if SUPABASE_POOL_MODE == "transaction" else 60)
+
 if not SUPABASE_HOST or RUNNING_TESTS:
     DATABASES = {
         'default': {
@@ -168,15 +181,106 @@ else:
             'HOST': SUPABASE_HOST,
             'PORT': SUPABASE_PORT,
             'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            # Con pool: el pool verifica la conexión al prestarla; sin pool: al reutilizarla
+            'CONN_HEALTH_CHECKS': True,
+            # Tras un pooler los cursores con nombre no sobreviven entre transacciones
+            'DISABLE_SERVER_SIDE_CURSORS': SUPABASE_POOL_MODE in {'session', 'transaction'},
             'OPTIONS': {
                 'sslmode': 'require',
                 'connect_timeout': DB_CONNECT_TIMEOUT,
-                'options': f"-c application_name={PG_APP_NAME}",
+                # Parámetro de arranque que pgbouncer/Supavisor aceptan (a diferencia de `options`)
+                'application_name': PG_APP_NAME,
+                # El pooler en modo transacción reparte las sentencias entre conexiones:
+                # nada de prepared statements del lado del servidor
+                'prepare_threshold': None,
             },
         }
     }
+    if DB_POOL:
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+            'max_idle': DB_POOL_MAX_IDLE,
+            'name': PG_APP_NAME,
+        }
+
+# Réplica de solo lectura para reportes, historial y exportaciones (ver core/db_router.py).
+# En producción: DB_REPLICA_HOST (y opcionalmente DB_REPLICA_PORT) con las mismas credenciales.
+# En local/tests la réplica es un segundo archivo SQLite; en tests espeja `default`.
+DB_REPLICA_HOST = os.environ.get("DB_REPLICA_HOST")
+DB_REPLICA_SQLITE = os.environ.get("DB_REPLICA_SQLITE", "false").lower() == "true"
+# Segundos que un socio con cambios recientes (cambio_socio) se sigue leyendo de `default`
+DB_REPLICA_STICKY_SECONDS = env_int("DB_REPLICA_STICKY_SECONDS", 30)
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql' and DB_REPLICA_HOST:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': DB_REPLICA_HOST,
+        'PORT': os.environ.get("DB_REPLICA_PORT", SUPABASE_PORT),
+        'OPTIONS': {**DATABASES['default']['OPTIONS']},
+    }
+    if 'pool' in DATABASES['replica']['OPTIONS']:
+        DATABASES['replica']['OPTIONS']['pool'] = {
+            **DATABASES['replica']['OPTIONS']['pool'],
+            'name': f"{PG_APP_NAME}-replica",
+        }
+elif DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3' and (DB_REPLICA_SQLITE or RUNNING_TESTS):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
+# Vistas async: lanzar en paralelo (un hilo/conexión por consulta) las lecturas independientes
+ASYNC_DB_CONCURRENCY = os.environ.get("ASYNC_DB_CONCURRENCY", "true").lower() == "true"
+
+# Columnas de tablas no administradas (solicitud, desembolso...) cacheadas por proceso
+SCHEMA_CACHE_SECONDS = 0 if RUNNING_TESTS else env_int("SCHEMA_CACHE_SECONDS", 300)
+
+# Cache-Control de catálogos (tipos de préstamo, políticas): segundos que el navegador
+# reutiliza la respuesta antes de revalidar con ETag. 0 = revalidar siempre.
+CATALOG_HTTP_MAX_AGE = env_int("CATALOG_HTTP_MAX_AGE", 60)
 
-DISABLE_SERVER_SIDE_CURSORS = SUPABASE_POOL_MODE in {'session', 'transaction'}
+# Filas de catálogos servidas desde memoria en simulación/solicitudes/aprobación
+CATALOG_CACHE_SECONDS = 0 if RUNNING_TESTS else env_int("CATALOG_CACHE_SECONDS", 300)
+
+# Rol SOCIO servido desde memoria en el registro de socios
+ROLES_CACHE_SECONDS = 0 if RUNNING_TESTS else env_int("ROLES_CACHE_SECONDS", 300)
+
+# Alta masiva de socios (manage.py registrar_socios): filas por transacción e
+# hilos para hashear contraseñas
+REGISTRO_MASIVO_LOTE = env_int("REGISTRO_MASIVO_LOTE", 500)
+REGISTRO_HASH_WORKERS = env_int("REGISTRO_HASH_WORKERS", 4)
+
+# Resultados del autocompletado de socios (caché de Django, TTL corto)
+SOCIO_BUSQUEDA_CACHE_SECONDS = 0 if RUNNING_TESTS else env_int("SOCIO_BUSQUEDA_CACHE_SECONDS", 30)
+
+# Respuesta de estado de solicitud para el chatbot (por solicitud, TTL de segundos)
+ESTADO_CLIENTE_CACHE_SECONDS = 0 if RUNNING_TESTS else env_int("ESTADO_CLIENTE_CACHE_SECONDS", 5)
+
+# Stream SSE de eventos de colas (analistas/tesorería)
+EVENTOS_POLL_SECONDS = env_int("EVENTOS_POLL_SECONDS", 5)
+EVENTOS_SSE_MAX_SECONDS = env_int("EVENTOS_SSE_MAX_SECONDS", 300)
+EVENTOS_RETENCION_HORAS = env_int("EVENTOS_RETENCION_HORAS", 72)
+# Relectura de eventos confirmados tarde (id menor que el último enviado); ver apps/socios/eventos.py
+EVENTOS_MARGEN_SEGUNDOS = env_int("EVENTOS_MARGEN_SEGUNDOS", 30)
+# LISTEN/NOTIFY necesita una conexión de sesión: no funciona tras el pooler en modo transacción
+EVENTOS_PG_LISTEN = (
+    os.environ.get("EVENTOS_PG_LISTEN", "true").lower() == "true"
+    and SUPABASE_POOL_MODE != "transaction"
+)
+
+# Sincronización incremental de "Mis préstamos" (?since=)
+CAMBIOS_RETENCION_HORAS = env_int("CAMBIOS_RETENCION_HORAS", 720)
+CAMBIOS_MARGEN_SEGUNDOS = env_int("CAMBIOS_MARGEN_SEGUNDOS", 10)
+
+# Feed de cambios para el data warehouse (ver apps/socios/feed_cambios.py)
+FEED_CAMBIOS_LIMITE = env_int("FEED_CAMBIOS_LIMITE", 1000)
+FEED_CAMBIOS_MAX_LIMITE = env_int("FEED_CAMBIOS_MAX_LIMITE", 10000)
+FEED_CAMBIOS_MARGEN_SEGUNDOS = env_int("FEED_CAMBIOS_MARGEN_SEGUNDOS", 30)
 
 
 # Password validation
@@ -234,6 +338,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.JSONRapidoRenderer',  # orjson si está instalado
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
@@ -244,6 +352,38 @@ SPECTACULAR_SETTINGS = {
     'SERVE_INCLUDE_SCHEMA': False,
 }
 
+# Tareas periódicas (manage.py run_scheduler, ver apps/socios/programador.py)
+SCHEDULER_MODULOS = ["apps.socios.tareas"]
+SCHEDULER_TICK_SECONDS = env_int("SCHEDULER_TICK_SECONDS", 30)
+SCHEDULER_HISTORIAL_DIAS = env_int("SCHEDULER_HISTORIAL_DIAS", 30)
+
+# Simulador de estrés de cartera (ver apps/socios/estres.py). Por defecto corre en el mismo proceso;
+# ESTRES_WORKERS > 1 usa un pool de procesos compartido por proceso del servidor (acotado por los CPU).
+ESTRES_WORKERS = 1 if RUNNING_TESTS else env_int("ESTRES_WORKERS", 1)
+ESTRES_SIMULACIONES = env_int("ESTRES_SIMULACIONES", 200)
+ESTRES_MAX_SIMULACIONES = env_int("ESTRES_MAX_SIMULACIONES", 5000)
+ESTRES_SIMULACIONES_POR_BLOQUE = env_int("ESTRES_SIMULACIONES_POR_BLOQUE", 100)
+
+# PDF de Reportes (ver apps/socios/reporte_pdf.py). Por encima de MAX_FILAS_SINCRONO se genera
+# en segundo plano (tarea procesar_exportaciones) y se guarda en la fila de ExportacionReporte.
+REPORTES_PDF_MAX_FILAS_SINCRONO = env_int("REPORTES_PDF_MAX_FILAS_SINCRONO", 2000)
+REPORTES_PDF_MAX_FILAS = env_int("REPORTES_PDF_MAX_FILAS", 50000)
+EXPORTACIONES_LOTE = env_int("EXPORTACIONES_LOTE", 5)
+# Tiempo tras el cual una exportación reclamada que no terminó (proceso caído) vuelve a tomarse
+EXPORTACIONES_LEASE_SECONDS = env_int("EXPORTACIONES_LEASE_SECONDS", 1800)
+EXPORTACIONES_RETENCION_HORAS = env_int("EXPORTACIONES_RETENCION_HORAS", 48)
+
 # Notificaciones (Resend)
 RESEND_API_KEY = os.environ.get("RESEND_API_KEY", "")
 NOTIFY_FROM = os.environ.get("NOTIFY_FROM", "onboarding@resend.dev")
+# Bandeja de salida: las envía `manage.py despachar_notificaciones` (ver apps/socios/notificaciones.py)
+NOTIFY_TRANSPORT = os.environ.get("NOTIFY_TRANSPORT", "resend" if RESEND_API_KEY else "consola")
+NOTIFY_ARCHIVO = os.environ.get("NOTIFY_ARCHIVO", str(BASE_DIR / "notificaciones.jsonl"))
+NOTIFY_LOTE = env_int("NOTIFY_LOTE", 50)
+NOTIFY_RATE_PER_SECOND = float(os.environ.get("NOTIFY_RATE_PER_SECOND", "2"))
+NOTIFY_MAX_INTENTOS = env_int("NOTIFY_MAX_INTENTOS", 6)
+NOTIFY_BACKOFF_SECONDS = env_int("NOTIFY_BACKOFF_SECONDS", 30)
+NOTIFY_BACKOFF_MAX_SECONDS = env_int("NOTIFY_BACKOFF_MAX_SECONDS", 3600)
+NOTIFY_LEASE_SECONDS = env_int("NOTIFY_LEASE_SECONDS", 300)
+NOTIFY_POLL_SECONDS = env_int("NOTIFY_POLL_SECONDS", 5)
+NOTIFY_RETENCION_DIAS = env_int("NOTIFY_RETENCION_DIAS", 30)
@@ -0,0 +1,152 @@
+"""
+Exportaciones tabulares para consumo de datos: CSV en streaming y Parquet.
+
+Las columnas se declaran como `(encabezado, tipo)` con tipo `texto`, `entero`
+o `decimal` (floats); el tipo solo lo usa Parquet para fijar el esquema. Las
+filas llegan como un iterable de listas, normalmente armado sobre
+`QuerySet.iterator()`, así que ningún formato materializa la tabla completa:
+
+- CSV se envía en bloques de ~64 KB a medida que se leen las filas.
+- Parquet (pyarrow, opcional y importado al exportar) se envía un row group
+  por cada lote de `LOTE` filas; el pie con el esquema sale al final.
+
+El cuerpo se consume después de que la vista termina; por eso se genera dentro
+del contexto de la vista (p. ej. la lectura desde la réplica). Bajo ASGI
+(gunicorn + uvicorn_worker) Django consumiría un iterador síncrono completo
+con `sync_to_async(list)` antes de enviar el primer byte: `RespuestaStreaming`
+lo recorre bloque a bloque desde un iterador async, como el stream SSE de
+`views/colas.py`.
+"""
+from __future__ import annotations
+
+import contextvars
+import csv
+import io
+from itertools import islice
+from typing import Iterable, Iterator, Sequence
+
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import NotAcceptable
+
+
+Columnas = Sequence[tuple[str, str]]
+
+LOTE = 5000
+BLOQUE_CSV = 64 * 1024
+
+
+class RespuestaStreaming(StreamingHttpResponse):
+    """
+    StreamingHttpResponse con iterador síncrono que bajo ASGI se envía bloque
+    a bloque. Cada `next` corre con `sync_to_async` en el hilo de la vista,
+    así que el cursor de `QuerySet.iterator()` sigue en su conexión.
+    """
+
+    async def __aiter__(self):
+        bloques = iter(self.streaming_content)
+        siguiente = sync_to_async(next, thread_sensitive=True)
+        fin = object()
+        while (bloque := await siguiente(bloques, fin)) is not fin:
+            yield bloque
+
+
+def _en_contexto(iterable: Iterable) -> Iterator:
+    contexto = contextvars.copy_context()
+    iterador = iter(iterable)
+    while True:
+        try:
+            yield contexto.run(next, iterador)
+        except StopIteration:
+            return
+
+
+def _csv(columnas: Columnas, filas: Iterable[Sequence]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([nombre for nombre, _ in columnas])
+    for fila in filas:
+        writer.writerow(fila)
+        if buffer.tell() >= BLOQUE_CSV:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def respuesta_csv(filename: str, columnas: Columnas, filas: Iterable[Sequence]) -> StreamingHttpResponse:
+    response = RespuestaStreaming(_en_contexto(_csv(columnas, filas)), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise NotAcceptable("La exportacion Parquet requiere pyarrow instalado en el servidor.")
+    return pa, pq
+
+
+def _lotes_parquet(destino, columnas: Columnas, filas: Iterable[Sequence]) -> Iterator[int]:
+    """Escribe en `destino` un row group por lote; cede las filas escritas tras cada uno."""
+    pa, pq = _pyarrow()
+    tipos = {"texto": pa.string(), "entero": pa.int64(), "decimal": pa.float64()}
+    schema = pa.schema([(nombre, tipos[tipo]) for nombre, tipo in columnas])
+    filas = iter(filas)
+    with pq.ParquetWriter(destino, schema, compression="snappy") as writer:
+        while lote := list(islice(filas, LOTE)):
+            valores = list(zip(*lote))
+            writer.write_batch(
+                pa.record_batch([pa.array(col, type=campo.type) for col, campo in zip(valores, schema)], schema=schema)
+            )
+            yield len(lote)
+
+
+class _Sumidero(io.RawIOBase):
+    """Destino de ParquetWriter que guarda lo escrito hasta que se retira."""
+
+    def __init__(self):
+        super().__init__()
+        self._partes: list[bytes] = []
+        self._posicion = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, datos) -> int:
+        self._partes.append(bytes(datos))
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self) -> int:
+        return self._posicion
+
+    def retirar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def _parquet(columnas: Columnas, filas: Iterable[Sequence]) -> Iterator[bytes]:
+    sumidero = _Sumidero()
+    for _ in _lotes_parquet(sumidero, columnas, filas):
+        yield sumidero.retirar()
+    # Al cerrar el writer queda el pie del archivo
+    yield sumidero.retirar()
+
+
+def respuesta_parquet(filename: str, columnas: Columnas, filas: Iterable[Sequence]) -> StreamingHttpResponse:
+    # Sin pyarrow se responde 406 antes de empezar el stream
+    _pyarrow()
+    response = RespuestaStreaming(_en_contexto(_parquet(columnas, filas)), content_type="application/vnd.apache.parquet")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def respuesta_tabla(formato: str, nombre: str, columnas: Columnas, filas: Iterable[Sequence]):
+    """`formato` es `csv` o `parquet`; `nombre` va sin extensión."""
+    if formato == "parquet":
+        return respuesta_parquet(f"{nombre}.parquet", columnas, filas)
+    return respuesta_csv(f"{nombre}.csv", columnas, filas)
@@ -7,11 +7,11 @@ from django.urls import include, path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
 
-def healthz(_request):
+async def healthz(_request):
     return HttpResponse("ok")
 
 
-def api_ping(_request):
+async def api_ping(_request):
     return JsonResponse({"status": "ok"})
 
 
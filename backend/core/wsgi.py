@@ -15,4 +15,8 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
 
+from core.arranque import calentar_aplicacion  # noqa: E402
+
+calentar_aplicacion()
+
 app = application
@@ -0,0 +1,19 @@
+"""
+Configuración de gunicorn (se carga sola desde backend/).
+
+La app se importa una vez en el maestro (`preload_app`) junto con el
+calentamiento de core/arranque.py; los workers nacen por fork ya listos y solo
+abren su pool de conexiones antes de aceptar tráfico.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+preload_app = True
+
+
+def post_worker_init(worker):
+    from core.db import calentar_conexiones
+
+    calentar_conexiones()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Mide el tiempo de importación de la aplicación con `python -X importtime`.
+
+Carga Django y las URLs (lo mismo que hace un worker antes de atender tráfico)
+en un proceso aparte y resume el reporte de importtime: tiempo total y los
+módulos con mayor tiempo acumulado.
+
+Uso (desde backend/):
+    python scripts/medir_importacion.py
+    python scripts/medir_importacion.py --top 30 --max-ms 1500   # falla si se supera el umbral
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+CARGA = "import django; django.setup(); import core.urls"
+
+
+def medir() -> list[tuple[int, int, str]]:
+    """(self_us, cumulative_us, módulo) por cada import registrado."""
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "core.settings")}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CARGA],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(proc.returncode)
+
+    filas = []
+    for linea in proc.stderr.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        self_us, acumulado_us, modulo = (parte.strip() for parte in linea[len("import time:"):].split("|", 2))
+        filas.append((int(self_us), int(acumulado_us), modulo))
+    return filas
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=20, help="Módulos a listar (por tiempo acumulado)")
+    parser.add_argument("--max-ms", type=float, default=None, help="Umbral de tiempo total; sale con 1 si se supera")
+    args = parser.parse_args()
+
+    filas = medir()
+    total_ms = sum(self_us for self_us, _, _ in filas) / 1000
+    print(f"Módulos importados: {len(filas)}")
+    print(f"Tiempo total de importación: {total_ms:.1f} ms")
+    print(f"\n{'acumulado ms':>12}  {'propio ms':>9}  módulo")
+    for self_us, acumulado_us, modulo in sorted(filas, key=lambda f: f[1], reverse=True)[: args.top]:
+        print(f"{acumulado_us / 1000:12.1f}  {self_us / 1000:9.1f}  {modulo}")
+
+    pesados = [m for m in ("openpyxl",) if any(modulo.strip() == m for _, _, modulo in filas)]
+    if pesados:
+        print(f"\nAviso: se importan al arrancar módulos que deberían ser diferidos: {', '.join(pesados)}")
+
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"\nSupera el umbral de {args.max_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
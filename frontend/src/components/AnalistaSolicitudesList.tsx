@@ -1,5 +1,6 @@
 import { useEffect, useState } from "react";
 import { api } from "../api";
+import { useEventosCola } from "../eventos";
 
 type SolicitudItem = {
   id: string;
@@ -46,6 +47,9 @@ export default function AnalistaSolicitudesList({ onSelect }: Props) {
     void fetchListado();
   }, []); // solo on-mount
 
+  // Nuevas solicitudes o decisiones de otros analistas refrescan el listado sin re-consultar en bucle
+  useEventosCola(["solicitud_creada", "solicitud_decidida"], () => void fetchListado());
+
   return (
     <div className="analista-card">
       <div className="analista-card__header">
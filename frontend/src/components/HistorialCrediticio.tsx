@@ -69,8 +69,11 @@ const currency = new Intl.NumberFormat("es-CO", {
   maximumFractionDigits: 0,
 });
 
+type SocioOpcion = Pick<SocioDto, "id" | "nombre_completo" | "documento">;
+
 export default function HistorialCrediticio() {
-  const [socios, setSocios] = useState<SocioDto[]>([]);
+  const [socios, setSocios] = useState<SocioOpcion[]>([]);
+  const [busquedaSocio, setBusquedaSocio] = useState("");
   const [socioId, setSocioId] = useState<string>("all");
   const [estadoFiltro, setEstadoFiltro] = useState<"todos" | PrestamoDto["estado"]>("todos");
   const [desde, setDesde] = useState("");
@@ -80,17 +83,31 @@ export default function HistorialCrediticio() {
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
-    const cargarSocios = async () => {
+    const controller = new AbortController();
+    const timer = window.setTimeout(async () => {
       try {
-        const { data: resp } = await api.get<SocioDto[]>("socios");
-        setSocios(resp);
+        const { data: resp } = await api.get<{ results: SocioOpcion[] }>("socios/buscar", {
+          params: { q: busquedaSocio.trim(), limit: 20 },
+          signal: controller.signal,
+        });
+        setSocios((prev) => {
+          // Conserva la opcion seleccionada aunque ya no coincida con la busqueda
+          const seleccionado = prev.find((s) => s.id === socioId);
+          const ids = new Set(resp.results.map((s) => s.id));
+          return seleccionado && !ids.has(seleccionado.id) ? [seleccionado, ...resp.results] : resp.results;
+        });
       } catch (err) {
+        if (controller.signal.aborted) return;
         console.error(err);
         setError("No se pudo cargar la lista de socios.");
       }
+    }, 250);
+    return () => {
+      controller.abort();
+      window.clearTimeout(timer);
     };
-    void cargarSocios();
-  }, []);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [busquedaSocio]);
 
   const fetchHistorial = async () => {
     setLoading(true);
@@ -179,6 +196,12 @@ export default function HistorialCrediticio() {
         <div className="filters-bar">
           <label className="filter-field">
             <span>Socio</span>
+            <input
+              type="search"
+              placeholder="Buscar por nombre o documento"
+              value={busquedaSocio}
+              onChange={(e) => setBusquedaSocio(e.target.value)}
+            />
             <select value={socioId} onChange={(e) => setSocioId(e.target.value)}>
               <option value="all">Todos los socios</option>
               {socios.map((s) => (
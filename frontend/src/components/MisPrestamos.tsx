@@ -1,4 +1,4 @@
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import "../styles/MisPrestamos.css";
 import { api } from "../api";
 import soloLogo from "../assets/solo-logo-cooprestamos-vector.svg";
@@ -99,6 +99,16 @@ const normalizarPrestamo = (p: Prestamo): Prestamo => ({
   estado: (p.estado || "").toLowerCase(),
 });
 
+const fechaOrden = (p: Prestamo) => parseDate(p.fecha_desembolso || p.fecha_solicitud)?.getTime() ?? 0;
+
+// Aplica la respuesta de prestamos/mis?since=: reemplaza los items modificados y quita los eliminados
+const aplicarCambios = (actuales: Prestamo[], cambios: Prestamo[], eliminados: string[]): Prestamo[] => {
+  const porId = new Map(actuales.map((p) => [p.id, p]));
+  eliminados.forEach((id) => porId.delete(id));
+  cambios.forEach((p) => porId.set(p.id, normalizarPrestamo(p)));
+  return Array.from(porId.values()).sort((a, b) => fechaOrden(b) - fechaOrden(a));
+};
+
 const toNumber = (value: number | string | null | undefined): number => {
   const num = Number(value);
   return Number.isFinite(num) ? num : 0;
@@ -133,6 +143,7 @@ const calcularMora = (prestamo: Prestamo) => {
 export default function MisPrestamos({ onVolver, onSolicitar, usuario }: MisPrestamosProps) {
   const [prestamos, setPrestamos] = useState<Prestamo[]>([]);
   const [loading, setLoading] = useState(true);
+  const tokenCambios = useRef<string | null>(null);
   const [error, setError] = useState("");
   const [ok, setOk] = useState("");
   const [filtro, setFiltro] = useState<EstadoResumenItem["key"]>("todos");
@@ -200,6 +211,7 @@ export default function MisPrestamos({ onVolver, onSolicitar, usuario }: MisPres
       const { data } = await api.get("prestamos/mis");
       const listado = Array.isArray(data?.prestamos) ? data.prestamos : Array.isArray(data) ? data : [];
       setPrestamos(listado.map((p: Prestamo) => normalizarPrestamo(p)));
+      tokenCambios.current = data?.since ?? null;
     } catch (err) {
       console.error("No se pudieron cargar los prestamos", err);
       setError("No pudimos cargar tus prestamos. Intenta nuevamente.");
@@ -208,6 +220,27 @@ export default function MisPrestamos({ onVolver, onSolicitar, usuario }: MisPres
     }
   };
 
+  // Tras un pago solo se piden los prestamos modificados; sin token se recarga todo
+  const sincronizar = async () => {
+    if (!tokenCambios.current) {
+      await cargar();
+      return;
+    }
+    try {
+      const { data } = await api.get("prestamos/mis", { params: { since: tokenCambios.current } });
+      const listado: Prestamo[] = Array.isArray(data?.prestamos) ? data.prestamos : [];
+      if (data?.completo === false) {
+        setPrestamos((actuales) => aplicarCambios(actuales, listado, data.eliminados ?? []));
+      } else {
+        setPrestamos(listado.map((p) => normalizarPrestamo(p)));
+      }
+      tokenCambios.current = data?.since ?? null;
+    } catch (err) {
+      console.error("No se pudieron sincronizar los prestamos", err);
+      await cargar();
+    }
+  };
+
   useEffect(() => {
     void cargar();
   }, []);
@@ -256,7 +289,7 @@ export default function MisPrestamos({ onVolver, onSolicitar, usuario }: MisPres
       });
       setOk("Pago simulado aplicado correctamente.");
       setPago(null);
-      await cargar();
+      await sincronizar();
     } catch (err: any) {
       console.error("No se pudo procesar el pago", err);
       const detail = err?.response?.data?.detail || err?.response?.data?.cuotas;
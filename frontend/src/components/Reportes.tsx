@@ -57,6 +57,31 @@ type ReporteData = {
   } | null;
 };
 
+type EscenarioEstres = {
+  escenario: string;
+  perdida_esperada: string;
+  provision_requerida: string;
+  perdida_p95: string;
+  perdida_p99: string;
+  perdida_inesperada: string;
+  prepago_esperado: string;
+};
+
+type EstresData = {
+  simulaciones: number;
+  horizonte_meses: number;
+  prestamos: number;
+  exposicion: string;
+  escenarios: EscenarioEstres[];
+};
+
+type ExportacionReporte = {
+  id: string;
+  estado: "pendiente" | "lista" | "fallida";
+  filas: number;
+  error: string | null;
+};
+
 type TipoPrestamoDto = {
   id: string;
   nombre: string;
@@ -94,6 +119,8 @@ export default function Reportes() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [exportando, setExportando] = useState(false);
+  const [estres, setEstres] = useState<EstresData | null>(null);
+  const [simulando, setSimulando] = useState(false);
 
   const fetchTipos = async () => {
     try {
@@ -145,21 +172,52 @@ export default function Reportes() {
       if (fechaHasta) params.hasta = fechaHasta;
       if (tipo) params.tipo = tipo;
       if (busqueda.trim()) params.q = busqueda.trim();
-      const html = buildPdfHtml();
-      const w = window.open("", "_blank", "width=900,height=1200");
-      if (!w) throw new Error("No se pudo abrir la ventana de exportacion.");
-      w.document.write(html);
-      w.document.close();
-      w.focus();
-      w.print();
+      const resp = await api.get<ArrayBuffer>("reportes", { params, responseType: "arraybuffer" });
+      let pdf = resp.data;
+      if (resp.status === 202) {
+        // Reporte grande: el servidor lo genera en segundo plano
+        let exportacion = JSON.parse(new TextDecoder().decode(resp.data)) as ExportacionReporte;
+        while (exportacion.estado === "pendiente") {
+          await new Promise((resolve) => setTimeout(resolve, 3000));
+          ({ data: exportacion } = await api.get<ExportacionReporte>(`reportes/exportaciones/${exportacion.id}/`));
+        }
+        if (exportacion.estado !== "lista") throw new Error(exportacion.error || "La exportacion fallo.");
+        ({ data: pdf } = await api.get<ArrayBuffer>(`reportes/exportaciones/${exportacion.id}/`, {
+          params: { descargar: "1" },
+          responseType: "arraybuffer",
+        }));
+      }
+      const url = window.URL.createObjectURL(new Blob([pdf], { type: "application/pdf" }));
+      const link = document.createElement("a");
+      link.href = url;
+      const stamp = new Date().toISOString().replace(/[-:T]/g, "").slice(0, 14);
+      link.download = `reporte_${stamp}.pdf`;
+      document.body.appendChild(link);
+      link.click();
+      link.remove();
+      window.URL.revokeObjectURL(url);
     } catch (err: any) {
-      const detail = err?.response?.data?.detail || "No pudimos exportar el PDF.";
+      const detail = err?.response?.data?.detail || err?.message || "No pudimos exportar el PDF.";
       setError(typeof detail === "string" ? detail : "No pudimos exportar el PDF.");
     } finally {
       setExportando(false);
     }
   };
 
+  const simularEstres = async () => {
+    setSimulando(true);
+    setError(null);
+    try {
+      const { data } = await api.post<EstresData>("reportes/estres/", {});
+      setEstres(data);
+    } catch (err: any) {
+      const detail = err?.response?.data?.detail || "No pudimos simular el estres de la cartera.";
+      setError(typeof detail === "string" ? detail : "No pudimos simular el estres de la cartera.");
+    } finally {
+      setSimulando(false);
+    }
+  };
+
   const toggleEstado = (valor: string) => {
     setEstados((prev) => (prev.includes(valor) ? prev.filter((e) => e !== valor) : [...prev, valor]));
   };
@@ -181,80 +239,6 @@ export default function Reportes() {
     return [...estadoSociosOpts, ...estadoPrestamoOpts];
   }, [entidad]);
 
-  const buildPdfHtml = () => {
-    const fecha = new Date().toLocaleString("es-CO");
-    const socioRows =
-      data?.socios?.items
-        .map(
-          (s: SocioReporte) => `
-        <tr>
-          <td>${s.nombre || ""}</td>
-          <td>${s.documento || ""}</td>
-          <td>${s.estado || ""}</td>
-          <td>${s.created_at ? String(s.created_at).slice(0, 10) : ""}</td>
-        </tr>`
-        )
-        .join("") || "";
-    const prestRows =
-      data?.prestamos?.items
-        .map(
-          (p: PrestamoReporte) => `
-        <tr>
-          <td>${p.socio?.nombre || ""}</td>
-          <td>${p.tipo?.nombre || ""}</td>
-          <td>${p.estado_visible || p.estado || ""}</td>
-          <td>${currency.format(Number(p.monto || 0))}</td>
-          <td>${p.fecha_desembolso || ""}</td>
-        </tr>`
-        )
-        .join("") || "";
-    return `
-<!doctype html>
-<html>
-<head>
-  <meta charset="utf-8" />
-  <title>Reporte Cooprestamos</title>
-  <style>
-    body { font-family: Arial, sans-serif; margin: 24px; color: #111; }
-    h1 { margin: 0 0 6px; }
-    .muted { color: #6b7280; font-size: 12px; }
-    table { width: 100%; border-collapse: collapse; margin-top: 12px; }
-    th, td { border: 1px solid #e5e7eb; padding: 6px; font-size: 12px; text-align: left; }
-    th { background: #f8fafc; }
-    .pill { display: inline-block; padding: 2px 8px; border-radius: 12px; background: #e6f4f1; color: #0f766e; font-weight: 700; font-size: 11px; }
-    .section { margin-top: 16px; }
-  </style>
-</head>
-<body>
-  <h1>Reporte de gestion</h1>
-  <p class="muted">Generado: ${fecha}</p>
-  <p class="muted">Entidad: ${entidad}, Estados: ${estados.join(",") || "todos"}, Rango: ${fechaDesde || "-"} a ${fechaHasta || "-"}, Tipo: ${tipo || "todos"}, Busqueda: ${busqueda || "-"}</p>
-  ${
-    data?.socios
-      ? `<div class="section">
-    <h3>Socios <span class="pill">Total ${data.socios.total}</span></h3>
-    <table>
-      <thead><tr><th>Nombre</th><th>Documento</th><th>Estado</th><th>Alta</th></tr></thead>
-      <tbody>${socioRows || "<tr><td colspan='4'>Sin resultados</td></tr>"}</tbody>
-    </table>
-  </div>`
-      : ""
-  }
-  ${
-    data?.prestamos
-      ? `<div class="section">
-    <h3>Prestamos <span class="pill">Total ${data.prestamos.total}</span></h3>
-    <table>
-      <thead><tr><th>Socio</th><th>Tipo</th><th>Estado</th><th>Monto</th><th>Desembolso</th></tr></thead>
-      <tbody>${prestRows || "<tr><td colspan='5'>Sin resultados</td></tr>"}</tbody>
-    </table>
-  </div>`
-      : ""
-  }
-</body>
-</html>`;
-  };
-
   return (
     <section className="reportes-panel">
       <header className="reportes-header">
@@ -434,6 +418,40 @@ export default function Reportes() {
           </section>
         )}
       </div>
+
+      <section className="panel-section">
+        <div className="panel-section__head">
+          <div>
+            <p className="eyebrow">Estres de cartera</p>
+            <h4>Perdida esperada y provisiones por escenario</h4>
+          </div>
+          <button className="ghost" onClick={() => void simularEstres()} disabled={simulando}>
+            {simulando ? "Simulando..." : "Simular escenarios"}
+          </button>
+        </div>
+        {estres && (
+          <>
+            <p className="muted small">
+              {estres.prestamos} prestamos, exposicion {currency.format(Number(estres.exposicion))},{" "}
+              {estres.simulaciones} simulaciones a {estres.horizonte_meses} meses
+            </p>
+            <div className="resumen-grid">
+              {estres.escenarios.map((esc) => (
+                <article className="summary-card" key={esc.escenario}>
+                  <p className="eyebrow">{esc.escenario}</p>
+                  <h3>{currency.format(Number(esc.provision_requerida))}</h3>
+                  <p className="muted">Provision requerida</p>
+                  <div className="summary-tags">
+                    <span>P99: {currency.format(Number(esc.perdida_p99))}</span>
+                    <span>Inesperada: {currency.format(Number(esc.perdida_inesperada))}</span>
+                    <span>Prepago: {currency.format(Number(esc.prepago_esperado))}</span>
+                  </div>
+                </article>
+              ))}
+            </div>
+          </>
+        )}
+      </section>
     </section>
   );
 }
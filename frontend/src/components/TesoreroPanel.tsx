@@ -1,5 +1,6 @@
 import { useEffect, useState } from "react";
 import { api } from "../api";
+import { useEventosCola } from "../eventos";
 import logo from "../assets/solo-logo-cooprestamos-vector.svg";
 
 type Desembolso = {
@@ -94,6 +95,14 @@ export default function TesoreroPanel({ usuario, onLogout }: Props) {
     void fetchAprobados();
   }, []);
 
+  useEventosCola(["solicitud_decidida", "desembolso_registrado"], (tipo) => {
+    if (tipo === "solicitud_decidida") void fetchAprobados();
+    if (tipo === "desembolso_registrado") {
+      void fetchListado();
+      void fetchAprobados();
+    }
+  });
+
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     setLoading(true);
@@ -0,0 +1,40 @@
+import { useEffect, useRef } from "react";
+import { api } from "./api";
+
+export type TipoEventoCola = "solicitud_creada" | "solicitud_decidida" | "desembolso_registrado";
+
+/**
+ * Suscribe el componente al stream SSE de eventos de colas (api/eventos/).
+ * EventSource reconecta solo y reenvía Last-Event-ID, así no se pierden eventos.
+ */
+export function useEventosCola(
+  tipos: TipoEventoCola[],
+  onEvento: (tipo: TipoEventoCola, data: Record<string, unknown>) => void
+) {
+  const handler = useRef(onEvento);
+  handler.current = onEvento;
+  const clave = tipos.join(",");
+
+  useEffect(() => {
+    if (typeof EventSource === "undefined" || !clave) return;
+    const url = new URL("eventos/", api.defaults.baseURL ?? window.location.origin);
+    url.searchParams.set("tipos", clave);
+    const source = new EventSource(url.toString(), { withCredentials: true });
+
+    const listener = (event: MessageEvent) => {
+      let data: Record<string, unknown> = {};
+      try {
+        data = JSON.parse(event.data);
+      } catch {
+        // evento sin payload JSON
+      }
+      handler.current(event.type as TipoEventoCola, data);
+    };
+    const lista = clave.split(",");
+    lista.forEach((tipo) => source.addEventListener(tipo, listener as EventListener));
+    return () => {
+      lista.forEach((tipo) => source.removeEventListener(tipo, listener as EventListener));
+      source.close();
+    };
+  }, [clave]);
+}